@@ -1,8 +1,26 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from allauth.account import apps as account_apps
 
 class AuthenticationConfig(AppConfig):
   default_auto_field = 'django.db.models.BigAutoField'
   name = 'authentication'
   
   def ready(self):
-    import authentication.signals
\ No newline at end of file
+    import authentication.signals
+    from authentication.utils import check_social_stub_settings
+    check_social_stub_settings()
+
+
+class AccountConfig(account_apps.AccountConfig):
+  """
+  allauth.accountの設定（INSTALLED_APPSで'allauth.account'の代わりに使う）
+  必須ミドルウェアのチェックを非同期対応版（AsyncAccountMiddleware）に合わせる
+  """
+  default = False
+
+  def ready(self):
+    required_mw = 'authentication.middleware.AsyncAccountMiddleware'
+    if required_mw not in settings.MIDDLEWARE:
+      raise ImproperlyConfigured(f"{required_mw} must be added to settings.MIDDLEWARE")
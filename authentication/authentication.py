@@ -1,5 +1,11 @@
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework.exceptions import AuthenticationFailed
+from django.utils.translation import gettext_lazy as _
+from authentication.tokens import VERSION_CLAIM
+from authentication.utils import CachedUserResolver, VerifiedTokenCache
+from permissions.utils import AuthzClaims
 
 
 class CookieJWTAuthentication(JWTAuthentication):
@@ -19,4 +25,41 @@ class CookieJWTAuthentication(JWTAuthentication):
       validated_token = self.get_validated_token(raw_token)
       return self.get_user(validated_token), validated_token
     except AuthenticationFailed:
-      return None
\ No newline at end of file
+      return None
+
+  def get_validated_token(self, raw_token):
+    """検証済みトークンはキャッシュから返す（署名検証・デコードを省略）"""
+    validated_token = VerifiedTokenCache.get(raw_token)
+    if validated_token is None:
+      validated_token = super().get_validated_token(raw_token)
+      VerifiedTokenCache.set(raw_token, validated_token)
+
+    if VerifiedTokenCache.is_revoked(validated_token):
+      VerifiedTokenCache.discard(raw_token)
+      raise InvalidToken(_('Token is blacklisted'))
+
+    return validated_token
+
+  def get_user(self, validated_token):
+    """キャッシュ経由でユーザーを取得（リクエストごとのSELECTを回避）"""
+    try:
+      user_id = validated_token[api_settings.USER_ID_CLAIM]
+    except KeyError:
+      raise InvalidToken(_('Token contained no recognizable user identification'))
+
+    try:
+      user = CachedUserResolver.get_user(user_id)
+    except self.user_model.DoesNotExist:
+      raise AuthenticationFailed(_('User not found'), code='user_not_found')
+
+    if not user.is_active:
+      raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+    # 全端末ログアウト等でtoken_versionが更新されたトークンは無効
+    if validated_token.get(VERSION_CLAIM, 0) != user.token_version:
+      raise AuthenticationFailed(_('Token has been revoked'), code='token_revoked')
+
+    # トークン内の権限情報（古い場合はNone → 権限チェック時にDBから取得）
+    user._authz_claims = AuthzClaims.from_token(validated_token, user)
+
+    return user
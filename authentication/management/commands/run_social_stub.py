@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+from authentication.providers.stub_server import StubProviderServer
+from authentication.utils import is_social_stub_allowed
+
+
+class Command(BaseCommand):
+  help = '負荷試験用のスタブプロバイダー（Google・Facebook・LINE）を起動'
+
+  def add_arguments(self, parser):
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--latency', type=float, default=0, help='各レスポンスの待ち時間（秒）')
+
+  def handle(self, *args, **options):
+    if not is_social_stub_allowed():
+      raise CommandError('スタブプロバイダーはDEBUG（またはSOCIAL_PROVIDER_STUB_ALLOWED）の環境でのみ起動できます')
+    server = StubProviderServer(options['host'], options['port'], options['latency'])
+    self.stdout.write(self.style.SUCCESS(f'Stub provider server running at {server.url}'))
+    self.stdout.write(f'Set SOCIAL_PROVIDER_STUB_URL={server.url} on the API server')
+    try:
+      server.serve_forever()
+    except KeyboardInterrupt:
+      pass
+    finally:
+      server.stop()
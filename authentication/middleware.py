@@ -1,3 +1,6 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from allauth.account.middleware import AccountMiddleware
+from allauth.core import context
 from django.utils import translation
 
 class UserLanguageMiddleware:
@@ -22,4 +25,30 @@ class UserLanguageMiddleware:
     
     translation.deactivate()
     
-    return response
\ No newline at end of file
+    return response
+
+
+class AsyncAccountMiddleware(AccountMiddleware):
+  """
+  allauthのAccountMiddlewareの非同期対応版
+  同期専用のミドルウェアがあると、ASGIでも非同期ビューが1スレッドで順番に実行されるため置き換える
+  """
+  sync_capable = True
+  async_capable = True
+
+  def __init__(self, get_response):
+    super().__init__(get_response)
+    if iscoroutinefunction(self.get_response):
+      markcoroutinefunction(self)
+
+  def __call__(self, request):
+    if iscoroutinefunction(self):
+      return self.__acall__(request)
+    return super().__call__(request)
+
+  async def __acall__(self, request):
+    with context.request_context(request):
+      response = await self.get_response(request)
+      # セッションの読み込み（DB）を含むため同期で実行
+      await sync_to_async(self._remove_dangling_login)(request, response)
+      return response
@@ -0,0 +1,36 @@
+# Generated by Django 5.0 on 2026-10-19 07:07
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Max
+from django.db.models.functions import Lower
+
+
+def lowercase_emails(apps, schema_editor):
+    """既存のメールアドレスを小文字へ正規化（大文字小文字違いの仮登録は最新の1件を残す）"""
+    PendingUser = apps.get_model('authentication', 'PendingUser')
+    latest_ids = (
+        PendingUser.objects.annotate(normalized=Lower('email'))
+        .values('normalized')
+        .annotate(latest_id=Max('pk'))
+        .values_list('latest_id', flat=True)
+    )
+    PendingUser.objects.exclude(pk__in=list(latest_ids)).delete()
+    PendingUser.objects.exclude(email=Lower('email')).update(email=Lower('email'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0004_rename_timezone_pendinguser_user_timezone'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(lowercase_emails, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='pendinguser',
+            constraint=models.CheckConstraint(check=models.Q(('email', django.db.models.functions.text.Lower('email'))), name='pending_user_email_lowercase'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.0 on 2026-10-19 08:26
+
+import common.utils.db_functions
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Lower
+
+from common.utils.db_functions import CaseSensitive
+
+
+def lowercase_emails(apps, schema_editor):
+    """
+    0005の正規化はMySQLの既定の照合順序では大文字を含む行を検出できないため、
+    大文字小文字を区別して比較し直す（大文字小文字違いの重複は0005で解消済み）
+    """
+    PendingUser = apps.get_model('authentication', 'PendingUser')
+    PendingUser.objects.exclude(email=CaseSensitive(Lower('email'))).update(email=Lower('email'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0005_lowercase_email'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='pendinguser',
+            name='pending_user_email_lowercase',
+        ),
+        migrations.RunPython(lowercase_emails, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='pendinguser',
+            constraint=models.CheckConstraint(check=models.Q(('email', common.utils.db_functions.CaseSensitive(django.db.models.functions.text.Lower('email')))), name='pending_user_email_lowercase'),
+        ),
+    ]
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models.functions import Lower
+from common.utils import CaseSensitive
 from django.utils import timezone
 from users.models import User
 from django.db import transaction
@@ -37,12 +39,17 @@ class PendingUser(models.Model):
         fields=['email', 'user_type'],
         name='unique_email_user_type'
       ),
+      models.CheckConstraint(check=models.Q(email=CaseSensitive(Lower('email'))), name='pending_user_email_lowercase'),
     ]
     indexes = [
       models.Index(fields=['token_expires_at'], name='idx_pending_token_expires'),
       models.Index(fields=['email', 'user_type'], name='idx_email_pending_user_type'),
     ]
   
+  def save(self, *args, **kwargs):
+    self.email = User.objects.normalize_email(self.email)
+    super().save(*args, **kwargs)
+
   def is_token_valid(self):
     return timezone.now() < self.token_expires_at
   
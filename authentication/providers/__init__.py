@@ -0,0 +1,15 @@
+from .base import SocialProvider
+from .registry import register, get_provider, get_provider_names
+from .google import GoogleProvider
+from .facebook import FacebookProvider
+from .line import LineProvider
+
+__all__ = [
+  'SocialProvider',
+  'register',
+  'get_provider',
+  'get_provider_names',
+  'GoogleProvider',
+  'FacebookProvider',
+  'LineProvider',
+]
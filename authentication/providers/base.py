@@ -0,0 +1,73 @@
+import jwt
+import requests
+from django.core.exceptions import ValidationError
+
+from authentication.utils import get_social_stub_url
+from common.utils import HTTPClient
+
+
+class SocialProvider:
+  """
+  ソーシャルログインのプロバイダーアダプター（共通インターフェース）
+  サブクラスでNAME・ENDPOINTSを定義し、get_user_dataで正規化したユーザー情報を返す
+    {'id', 'email', 'first_name', 'last_name', 'picture', 'email_verified'}
+  HTTPはプロバイダーごとのHTTPClient（プール・リトライ・サーキットブレーカー）を使う
+  SOCIAL_PROVIDER_STUB_URLを設定すると、全エンドポイントをローカルのスタブサーバーへ向ける（DEBUG・負荷試験用の設定のみ）
+  """
+
+  NAME = None
+  DISPLAY_NAME = None
+  # {エンドポイント名: 本番のURL}（スタブ使用時は{SOCIAL_PROVIDER_STUB_URL}/{NAME}/{エンドポイント名}）
+  ENDPOINTS = {}
+  CONNECT_TIMEOUT = HTTPClient.CONNECT_TIMEOUT
+  READ_TIMEOUT = HTTPClient.READ_TIMEOUT
+  # IDトークンを検証するIDTokenVerifier（IDトークンに対応しない場合None）
+  id_token_verifier = None
+
+  def get_user_data(self, access_token=None, id_token=None):
+    """
+    Returns: 正規化したユーザー情報
+    Raises: ValidationError
+    """
+    raise NotImplementedError
+
+  def url(self, endpoint):
+    stub_url = get_social_stub_url()
+    if stub_url:
+      return f'{stub_url}/{self.NAME}/{endpoint}'
+    return self.ENDPOINTS[endpoint]
+
+  def fetch(self, endpoint, **kwargs):
+    """
+    Raises: ValidationError（接続できない・タイムアウト・障害中）, requests.exceptions.HTTPError
+    """
+    kwargs.setdefault('timeout', (self.CONNECT_TIMEOUT, self.READ_TIMEOUT))
+    try:
+      response = HTTPClient.for_service(self.NAME).get(self.url(endpoint), **kwargs)
+    except requests.exceptions.RequestException:
+      raise self.unavailable()
+    if response.status_code >= 500:
+      raise self.unavailable()
+    response.raise_for_status()
+    return response
+
+  def verify_id_token(self, id_token):
+    """
+    Returns: 検証済みのクレーム
+    Raises: ValidationError
+    """
+    try:
+      return self.id_token_verifier.verify(id_token)
+    except requests.exceptions.RequestException:
+      raise self.unavailable()
+    except jwt.exceptions.PyJWTError:
+      raise self.invalid_token()
+
+  def invalid_token(self):
+    return ValidationError(f"{self.DISPLAY_NAME}トークンが無効です。再ログインしてください。")
+
+  def unavailable(self):
+    return ValidationError(f"{self.DISPLAY_NAME}に接続できませんでした。しばらくしてから再度お試しください。")
+
+  def missing_email(self):
+    return ValidationError(f"{self.DISPLAY_NAME}からメールアドレスを取得できませんでした。")
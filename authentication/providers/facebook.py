@@ -0,0 +1,35 @@
+import requests
+
+from .base import SocialProvider
+from .registry import register
+
+
+@register
+class FacebookProvider(SocialProvider):
+  """Facebook: アクセストークンでGraph APIから取得"""
+
+  NAME = 'facebook'
+  DISPLAY_NAME = 'Facebook'
+  ENDPOINTS = {
+    'me': 'https://graph.facebook.com/me',
+  }
+  FIELDS = 'id,email,first_name,last_name,name,picture,email_verified'
+
+  def get_user_data(self, access_token=None, id_token=None):
+    try:
+      response = self.fetch('me', params={'fields': self.FIELDS, 'access_token': access_token})
+    except requests.exceptions.HTTPError:
+      raise self.invalid_token()
+
+    data = response.json()
+    if not data.get('id') or not data.get('email'):
+      raise self.missing_email()
+
+    return {
+      'id': data['id'],
+      'email': data['email'],
+      'first_name': data.get('first_name', ''),
+      'last_name': data.get('last_name', ''),
+      'picture': data.get('picture', {}).get('data', {}).get('url', ''),
+      'email_verified' : data.get('email_verified', False)
+    }
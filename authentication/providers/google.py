@@ -0,0 +1,56 @@
+import requests
+
+from authentication.utils import GoogleIDTokenVerifier
+from .base import SocialProvider
+from .registry import register
+
+
+@register
+class GoogleProvider(SocialProvider):
+  """
+  Google: IDトークンがあればローカルで検証（外部への問い合わせなし）
+  なければアクセストークンでuserinfoを取得
+  """
+
+  NAME = 'google'
+  DISPLAY_NAME = 'Google'
+  ENDPOINTS = {
+    'userinfo': 'https://www.googleapis.com/oauth2/v2/userinfo',
+  }
+  id_token_verifier = GoogleIDTokenVerifier
+
+  def get_user_data(self, access_token=None, id_token=None):
+    if id_token:
+      return self._from_id_token(id_token)
+
+    try:
+      response = self.fetch('userinfo', headers={"Authorization": f"Bearer {access_token}"})
+    except requests.exceptions.HTTPError:
+      raise self.invalid_token()
+
+    data = response.json()
+    if not data.get('id') or not data.get('email'):
+      raise self.missing_email()
+
+    return {
+      'id': data['id'],
+      'email': data['email'],
+      'first_name': data.get('given_name', ''),
+      'last_name': data.get('family_name', ''),
+      'picture': data.get('picture', ''),
+      'email_verified': data.get('verified_email', False)
+    }
+
+  def _from_id_token(self, id_token):
+    payload = self.verify_id_token(id_token)
+    if not payload.get('email'):
+      raise self.missing_email()
+
+    return {
+      'id': payload['sub'],
+      'email': payload['email'],
+      'first_name': payload.get('given_name', ''),
+      'last_name': payload.get('family_name', ''),
+      'picture': payload.get('picture', ''),
+      'email_verified': payload.get('email_verified', False)
+    }
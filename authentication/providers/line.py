@@ -0,0 +1,78 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import jwt
+import requests
+from django.core.exceptions import ValidationError
+
+from authentication.utils import LineIDTokenVerifier
+from .base import SocialProvider
+from .registry import register
+
+logger = logging.getLogger(__name__)
+
+
+@register
+class LineProvider(SocialProvider):
+  """
+  LINE: IDトークンを署名検証し、名前・画像のクレームがなければプロフィールを並行して取得
+  （レイテンシは検証と取得の合計ではなく大きい方）
+  """
+
+  NAME = 'line'
+  DISPLAY_NAME = 'LINE'
+  ENDPOINTS = {
+    'profile': 'https://api.line.me/v2/profile',
+  }
+  id_token_verifier = LineIDTokenVerifier
+
+  # IDトークンにこのクレームがあればプロフィール取得を省略
+  PROFILE_CLAIMS = ('name', 'picture')
+  # プロフィール取得をIDトークンの検証と並行して行うスレッド
+  _executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='line-profile')
+
+  def get_user_data(self, access_token=None, id_token=None):
+    if not id_token:
+      raise ValidationError("IDトークンが必要です")
+
+    profile_future = None
+    if access_token and not self._has_profile_claims(id_token):
+      profile_future = self._executor.submit(self._get_profile, access_token)
+
+    payload = self.verify_id_token(id_token)
+
+    profile_data = profile_future.result() if profile_future else {}
+    if profile_data.get("userId") and profile_data["userId"] != payload["sub"]:
+      raise self.invalid_token()
+
+    if not payload.get("email"):
+      raise self.missing_email()
+
+    return {
+      "id": payload["sub"],
+      "name": payload.get("name") or profile_data.get("displayName"),
+      "email": payload["email"],
+      "picture": payload.get("picture") or profile_data.get("pictureUrl"),
+      "email_verified": True
+    }
+
+  def _has_profile_claims(self, id_token):
+    """IDトークンに名前・画像が含まれているか（検証前の判定, 検証はverify_id_tokenで行う）"""
+    try:
+      claims = jwt.decode(id_token, options={"verify_signature": False})
+    except jwt.exceptions.PyJWTError:
+      return False
+    return all(claims.get(claim) for claim in self.PROFILE_CLAIMS)
+
+  def _get_profile(self, access_token):
+    """
+    Returns: プロフィール（LINEが障害中なら空, IDトークンの情報だけでログインを続ける）
+    Raises: ValidationError（アクセストークンが無効）
+    """
+    try:
+      return self.fetch('profile', headers={'Authorization': f'Bearer {access_token}'}).json()
+    except requests.exceptions.HTTPError:
+      raise self.invalid_token()
+    except ValidationError:
+      logger.warning("LINE profile is unavailable, continuing with ID token claims")
+      return {}
@@ -0,0 +1,22 @@
+_providers = {}
+
+
+def register(provider_class):
+  """プロバイダーアダプターを登録（クラスデコレーター）"""
+  _providers[provider_class.NAME] = provider_class()
+  return provider_class
+
+
+def get_provider(name):
+  """
+  Returns: SocialProvider
+  Raises: ValueError（未登録のプロバイダー）
+  """
+  try:
+    return _providers[name]
+  except KeyError:
+    raise ValueError(f"未対応のプロバイダー: {name}")
+
+
+def get_provider_names():
+  return list(_providers)
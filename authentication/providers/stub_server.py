@@ -0,0 +1,185 @@
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from django.conf import settings
+
+from authentication.utils import GoogleIDTokenVerifier, LineIDTokenVerifier
+
+
+class StubProviderServer:
+  """
+  負荷試験用のローカルスタブプロバイダー（Google・Facebook・LINE）
+  SOCIAL_PROVIDER_STUB_URLにこのサーバーのURLを設定すると、ソーシャルログインが外部へ接続せずに動く
+
+  アクセストークン: "stub:<email>" の形式（ユーザーIDはメールアドレスから決まる）
+    GET /google/userinfo    Authorization: Bearer <token>
+    GET /facebook/me        ?access_token=<token>
+    GET /line/profile       Authorization: Bearer <token>
+  IDトークン: スタブの鍵で署名したトークンを発行（鍵は/{provider}/certsで公開）
+    GET /google/id_token?email=<email>
+    GET /line/id_token?email=<email>[&profile=1]
+  latency: 各レスポンスを返すまでの待ち時間（秒, 実際のプロバイダーの応答時間を模擬）
+  """
+
+  TOKEN_PREFIX = 'stub:'
+  CERTS_MAX_AGE = 3600
+
+  def __init__(self, host='127.0.0.1', port=0, latency=0):
+    self.latency = latency
+    self.google_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    self.line_key = ec.generate_private_key(ec.SECP256R1())
+    self.jwks = {
+      'google': self._public_jwk(jwt.algorithms.RSAAlgorithm, self.google_key, 'stub-google', 'RS256'),
+      'line': self._public_jwk(jwt.algorithms.ECAlgorithm, self.line_key, 'stub-line', 'ES256'),
+    }
+    self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+    self.httpd.daemon_threads = True
+    self._thread = None
+
+  @property
+  def url(self):
+    host, port = self.httpd.server_address[:2]
+    return f'http://{host}:{port}'
+
+  def serve_forever(self):
+    self.httpd.serve_forever()
+
+  def start(self):
+    """バックグラウンドのスレッドで起動（ベンチマーク・テスト用）"""
+    self._thread = threading.Thread(target=self.serve_forever, name='social-stub', daemon=True)
+    self._thread.start()
+    return self
+
+  def stop(self):
+    self.httpd.shutdown()
+    self.httpd.server_close()
+
+  @classmethod
+  def access_token(cls, email):
+    return f'{cls.TOKEN_PREFIX}{email}'
+
+  @staticmethod
+  def user_id(provider, email):
+    return hashlib.sha256(f'{provider}:{email}'.encode()).hexdigest()[:21]
+
+  def issue_id_token(self, provider, email, profile=False):
+    now = int(time.time())
+    payload = {
+      'sub': self.user_id(provider, email),
+      'email': email,
+      'iat': now,
+      'exp': now + 3600,
+    }
+    if provider == 'google':
+      payload.update({
+        'iss': GoogleIDTokenVerifier.ISSUERS[-1],
+        'aud': settings.GOOGLE_OAUTH2_CLIENT_ID or 'stub-google-client',
+        'email_verified': True,
+        'given_name': 'Stub',
+        'family_name': 'User',
+      })
+      return jwt.encode(payload, self.google_key, algorithm='RS256', headers={'kid': 'stub-google'})
+
+    payload.update({
+      'iss': LineIDTokenVerifier.ISSUERS[0],
+      'aud': settings.LINE_CHANNEL_ID or 'stub-line-channel',
+    })
+    if profile:
+      payload.update({'name': 'Stub User', 'picture': 'https://example.com/stub.jpg'})
+    return jwt.encode(payload, self.line_key, algorithm='ES256', headers={'kid': 'stub-line'})
+
+  def _email_from_token(self, token):
+    if not token or not token.startswith(self.TOKEN_PREFIX):
+      return None
+    return token[len(self.TOKEN_PREFIX):]
+
+  def handle(self, path, query, headers):
+    """
+    Returns: (ステータス, レスポンスボディ, 追加のヘッダー)
+    """
+    provider, _, endpoint = path.strip('/').partition('/')
+    bearer = headers.get('Authorization', '').removeprefix('Bearer ')
+
+    if endpoint == 'certs' and provider in self.jwks:
+      return 200, {'keys': [self.jwks[provider]]}, {'Cache-Control': f'public, max-age={self.CERTS_MAX_AGE}'}
+
+    if endpoint == 'id_token' and provider in self.jwks and query.get('email'):
+      id_token = self.issue_id_token(provider, query['email'], profile=query.get('profile') == '1')
+      return 200, {'id_token': id_token, 'access_token': self.access_token(query['email'])}, {}
+
+    if (provider, endpoint) == ('google', 'userinfo'):
+      email = self._email_from_token(bearer)
+      if email:
+        return 200, {
+          'id': self.user_id('google', email),
+          'email': email,
+          'verified_email': True,
+          'given_name': 'Stub',
+          'family_name': 'User',
+        }, {}
+
+    elif (provider, endpoint) == ('facebook', 'me'):
+      email = self._email_from_token(query.get('access_token'))
+      if email:
+        return 200, {
+          'id': self.user_id('facebook', email),
+          'email': email,
+          'first_name': 'Stub',
+          'last_name': 'User',
+          'email_verified': True,
+        }, {}
+
+    elif (provider, endpoint) == ('line', 'profile'):
+      email = self._email_from_token(bearer)
+      if email:
+        return 200, {
+          'userId': self.user_id('line', email),
+          'displayName': 'Stub User',
+          'pictureUrl': 'https://example.com/stub.jpg',
+        }, {}
+
+    else:
+      return 404, {'error': 'not_found'}, {}
+
+    return 401, {'error': 'invalid_token'}, {}
+
+  def _handler_class(self):
+    server = self
+
+    class Handler(BaseHTTPRequestHandler):
+      protocol_version = 'HTTP/1.1'
+      # ヘッダーとボディを別々に送るため、Nagle + 遅延ACKで約40ms待たされないようにする
+      disable_nagle_algorithm = True
+
+      def do_GET(self):
+        parsed = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+        if server.latency:
+          time.sleep(server.latency)
+
+        status, body, headers = server.handle(parsed.path, query, self.headers)
+        content = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        for name, value in headers.items():
+          self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+      def log_message(self, format, *args):
+        pass
+
+    return Handler
+
+  @staticmethod
+  def _public_jwk(algorithm, private_key, kid, alg):
+    jwk = algorithm.to_jwk(private_key.public_key(), as_dict=True)
+    jwk.update({'kid': kid, 'alg': alg, 'use': 'sig'})
+    return jwk
@@ -6,8 +6,16 @@ class BusinessLoginSerializer(serializers.Serializer):
   password = serializers.CharField(write_only=True, min_length=8)
   platform = serializers.ChoiceField(required=True, choices=["web", "ios", "android"])
 
+  def validate_email(self, value):
+    """保存時と同じく小文字に正規化（インデックスの完全一致で検索する）"""
+    return value.lower().strip()
+
 class CustomerLoginSerializer(serializers.Serializer):
   user_type = serializers.ChoiceField(required=True ,choices=["CUSTOMER"])
   email = serializers.EmailField(required=True)
   password = serializers.CharField(write_only=True, min_length=8)
-  platform = serializers.ChoiceField(required=True, choices=["web", "ios", "android"])
\ No newline at end of file
+  platform = serializers.ChoiceField(required=True, choices=["web", "ios", "android"])
+
+  def validate_email(self, value):
+    """保存時と同じく小文字に正規化（インデックスの完全一致で検索する）"""
+    return value.lower().strip()
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
 from ..utils import DisposableEmailChecker
+from ..providers import get_provider_names
 from django.utils.translation import gettext as _
 from django.contrib.auth.password_validation import validate_password as django_validate_password
 from django.core.exceptions import ValidationError as DjangoValidationError
@@ -23,7 +24,8 @@ class OwnerSignupSerializer(serializers.Serializer):
     """メールアドレスのバリデーション"""
     email = value.lower().strip()
     
-    if DisposableEmailChecker.is_disposable(email):
+    # 非同期ビューではDisposableEmailChecker.ais_disposableで別途判定する
+    if self.context.get('check_disposable', True) and DisposableEmailChecker.is_disposable(email):
       raise serializers.ValidationError(_('使い捨てメールアドレスは使用できません。'))
     return email
   
@@ -70,6 +72,9 @@ class EmailChangeSerializer(serializers.Serializer):
   old_email = serializers.EmailField(required=True)
   new_email = serializers.EmailField(required=True)
 
+  def validate_old_email(self, value):
+    return value.lower().strip()
+
   def validate_new_email(self, value):
     """メールアドレスのバリデーション"""
     new_email = value.lower().strip()
@@ -80,7 +85,13 @@ class EmailChangeSerializer(serializers.Serializer):
 
 class SocialLoginSerializer(serializers.Serializer):
   """ソーシャルログイン用Serializer"""
-  provider = serializers.ChoiceField(choices=['google', 'line', 'facebook'])
-  access_token = serializers.CharField(required=True)
+  provider = serializers.ChoiceField(choices=get_provider_names())
+  access_token = serializers.CharField(required=False)
   user_type = serializers.ChoiceField(required=True ,choices=["STAFF", "OWNER", "CUSTOMER"])
   id_token = serializers.CharField(required=False)
+
+  def validate(self, attrs):
+    # Google・LINEはIDトークンのみでもログインできる（ローカルで検証）
+    if not attrs.get('access_token') and not (attrs['provider'] in ('google', 'line') and attrs.get('id_token')):
+      raise serializers.ValidationError({'access_token': _('この項目は必須です。')})
+    return attrs
@@ -10,6 +10,12 @@ from .user_activation_service import(
 from.email_service import(
   RegistrationEmailService
 )
+from .session_service import (
+  SessionService
+)
+from .token_refresh_service import (
+  TokenRefreshService
+)
 
 
 __all__ = [
@@ -17,4 +23,6 @@ __all__ = [
   'SocialLoginService',
   'UserActivationService',
   'RegistrationEmailService',
+  'SessionService',
+  'TokenRefreshService',
 ]
\ No newline at end of file
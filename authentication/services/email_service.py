@@ -1,3 +1,4 @@
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from common.service import EmailService
 from django.template.loader import render_to_string
@@ -29,6 +30,11 @@ class RegistrationEmailService:
       logging_text='Send verification mail'
     )
 
+  @classmethod
+  async def asend_registration_confirmation(cls, pending_user):
+    # SMTP送信はブロッキングのため、イベントループ外のスレッドで実行
+    return await sync_to_async(cls.send_registration_confirmation, thread_sensitive=False)(pending_user)
+
   @classmethod
   def resend_confirmation(cls, pending_user):
     current_language = get_language() 
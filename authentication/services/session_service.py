@@ -0,0 +1,57 @@
+from django.db.models import F
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.exceptions import TokenError
+from authentication.tokens import FAMILY_CLAIM, RefreshToken
+from authentication.utils import CachedUserResolver, TokenBlacklist, TokenFamilyRegistry
+from users.models import User
+
+
+class SessionService:
+  """ログインセッション（トークンファミリー）の一覧・ログアウト"""
+
+  @classmethod
+  def list_sessions(cls, user, current_token=None):
+    current_family = current_token.get(FAMILY_CLAIM) if current_token is not None else None
+    sessions = TokenFamilyRegistry().list_sessions(user.pk)
+    for session in sessions:
+      session['is_current'] = session['family'] == current_family
+    return sessions
+
+  @classmethod
+  def logout(cls, user, access_token, refresh_token=None):
+    """
+    現在のセッションのみログアウト（アクセストークンも失効）
+    refresh_token: クライアントが送ったリフレッシュトークン
+      レジストリ（Redis）を使えない環境でも、同じセッションのものであれば直接失効させる
+    """
+    family = access_token.get(FAMILY_CLAIM)
+    if family:
+      TokenFamilyRegistry().revoke(user.pk, family)
+    if refresh_token:
+      cls._revoke_refresh_token(user, family, refresh_token)
+    TokenBlacklist().add(access_token[api_settings.JTI_CLAIM], access_token['exp'])
+
+  @staticmethod
+  def _revoke_refresh_token(user, family, refresh_token):
+    try:
+      refresh = RefreshToken(refresh_token, check_blacklist=False)
+    except TokenError:
+      return
+    if str(refresh.get(api_settings.USER_ID_CLAIM)) == str(user.pk) and refresh.get(FAMILY_CLAIM) == family:
+      refresh.blacklist()
+
+  @classmethod
+  def logout_all(cls, user):
+    """
+    全端末からログアウト
+    各ファミリーのリフレッシュトークンを失効し、token_versionの更新（1回の書き込み）で
+    発行済みのアクセストークンもすべて無効にする
+    Returns: 失効したセッション数
+    """
+    revoked = TokenFamilyRegistry().revoke_all(user.pk)
+
+    User.objects.filter(pk=user.pk).update(token_version=F('token_version') + 1)
+    user.refresh_from_db(fields=['token_version'])
+    CachedUserResolver.invalidate(user.pk)
+
+    return revoked
@@ -1,61 +1,58 @@
 from django.db import transaction
 from django.core.exceptions import ValidationError
-import requests, jwt
-import requests
+from authentication.providers import get_provider
 from users.models import User, CustomerRegistrationProgress
 from django.core.cache import cache
-from rest_framework_simplejwt.tokens import RefreshToken
+from authentication.tokens import RefreshToken
 from .user_activation_service import UserActivationService
-from django.db.models import Q
 
 class SocialLoginService:
-  """ソーシャルログイン専用サービス"""
+  """ソーシャルログイン専用サービス（プロバイダーごとの処理はauthentication.providers）"""
   
+  @classmethod
+  def get_or_create_user( cls, user_type, access_token, provider, session_token=None, id_token=None, platform=None):
+    """platform: ログインセッション（トークンファミリー）に記録する端末の種類"""
+    # プロバイダーへの問い合わせはトランザクションの外で行う（応答待ちの間DB接続・ロックを保持しない）
+    social_user_data = get_provider(provider).get_user_data(access_token, id_token)
+    return cls._get_or_create_from_social_data(user_type, provider, social_user_data, session_token, platform)
+
   @classmethod
   @transaction.atomic
-  def get_or_create_user( cls, user_type, access_token, provider, session_token=None, id_token=None):
-
-    if provider == 'google':
-      social_user_data = cls._get_google_user_data(access_token)
-    elif provider == 'line':
-      social_user_data = cls._get_line_user_data(access_token, id_token)
-    elif provider == 'facebook':
-      social_user_data = cls._get_facebook_user_data(access_token)
-    else:
-      raise ValueError(f"未対応のプロバイダー: {provider}")
-    
+  def _get_or_create_from_social_data(cls, user_type, provider, social_user_data, session_token=None, platform=None):
     social_id = social_user_data['id']
-    email = social_user_data['email']
+    email = User.objects.normalize_email(social_user_data['email'])
     picture = social_user_data.get('picture', '')
-    user_id_field = f'{provider}_user_id'
     email_verified = social_user_data['email_verified']
-    existing_user = User.objects.filter(Q(**{user_id_field: social_id}) | Q(email=email)).first()
+    existing_user = User.objects.find_for_social_login(provider, social_id, email, user_type)
 
     ## 1 既存ユーザーあり
     if existing_user:
-      existing_social_id = getattr(existing_user, user_id_field, None)
+      existing_social_id = existing_user.get_social_id(provider)
 
       # ケース1-1: 既に同じソーシャルアカウントが紐づいている
       if existing_social_id == social_id:
-        return cls._handle_existing_social_user(existing_user, email, provider, picture, email_verified)
+        # ソーシャルIDは全グループで一意のため、別グループ（顧客⇔スタッフ・オーナー）のユーザーとしてはログインさせない
+        if existing_user.user_group != User.get_user_group(user_type):
+          raise ValidationError(f'この{get_provider(provider).DISPLAY_NAME}アカウントは別の種類のアカウントで使用されています')
+        return cls._handle_existing_social_user(existing_user, email, provider, picture, email_verified, platform)
       
       # ケース1-2: 別のソーシャルアカウントが紐づいている
       elif existing_social_id:
-        raise ValidationError( f'既に別の{provider.capitalize()}アカウントが紐づいています')
+        raise ValidationError( f'既に別の{get_provider(provider).DISPLAY_NAME}アカウントが紐づいています')
       
       # ケース1-3: ソーシャルアカウント未紐付け
       else:
         # スタッフの招待アクティベート
         if session_token and user_type == 'STAFF':
-          return cls._handle_activate_social( session_token, provider, social_user_data )
+          return cls._handle_activate_social( session_token, provider, social_user_data, platform )
         
         # 既存ユーザーにソーシャルアカウントを追加
-        return cls._add_social_to_existing_user(existing_user, provider, social_id, picture, email_verified)
+        return cls._add_social_to_existing_user(existing_user, provider, social_id, picture, email_verified, platform)
     
     # 2. 既存ユーザーなし → 新規登録
     else:
       if user_type in ['CUSTOMER', 'OWNER']:
-        return cls._handle_signup_social(user_type, provider, social_user_data)
+        return cls._handle_signup_social(user_type, provider, social_user_data, platform)
       else:
         raise ValidationError("スタッフの登録には招待が必要です。")
       
@@ -81,23 +78,21 @@ class SocialLoginService:
 
   
   @classmethod
-  def _add_social_to_existing_user(cls, existing_user, provider, social_id, picture, email_verified):
-    
-    user_id_field = f'{provider}_user_id'
+  def _add_social_to_existing_user(cls, existing_user, provider, social_id, picture, email_verified, platform=None):
     update_fields = cls._check_existing_user(existing_user, provider, picture, email_verified )
     
-    setattr(existing_user, user_id_field, social_id)
-    update_fields.append(user_id_field)
-    existing_user.save(update_fields=update_fields)
+    existing_user.link_social_identity(provider, social_id)
+    if update_fields:
+      existing_user.save(update_fields=update_fields)
 
     if not existing_user.is_active:
       return existing_user, None, 'メール認証リンクを送信しました。メールを確認してください。'
-    refresh = RefreshToken.for_user(existing_user)
-    return existing_user, refresh, f'{provider.capitalize()}アカウントを追加しました'
+    refresh = RefreshToken.for_user(existing_user, platform)
+    return existing_user, refresh, f'{get_provider(provider).DISPLAY_NAME}アカウントを追加しました'
 
 
   @classmethod
-  def _handle_existing_social_user(cls, existing_user, email, provider, picture, email_verified ):
+  def _handle_existing_social_user(cls, existing_user, email, provider, picture, email_verified, platform=None):
     update_fields = cls._check_existing_user(existing_user, provider, picture, email_verified )
 
     if existing_user.email != email:
@@ -108,13 +103,12 @@ class SocialLoginService:
     
     if not existing_user.is_active:
       return existing_user, None, 'メール認証リンクを送信しました。メールを確認してください。'
-    refresh = RefreshToken.for_user(existing_user)
-    return existing_user, refresh, f'{provider.capitalize()}アカウントでログインしました'
+    refresh = RefreshToken.for_user(existing_user, platform)
+    return existing_user, refresh, f'{get_provider(provider).DISPLAY_NAME}アカウントでログインしました'
   
 
   @classmethod
-  def _handle_signup_social(cls, user_type, provider, social_user_data):
-    user_id_field = f'{provider}_user_id'
+  def _handle_signup_social(cls, user_type, provider, social_user_data, platform=None):
     user_data = {
       'email': social_user_data['email'],
       'user_type': user_type,
@@ -124,11 +118,13 @@ class SocialLoginService:
       'first_name': social_user_data.get('first_name', ''),
       'last_name': social_user_data.get('last_name', ''),
       'profile_image_url': social_user_data.get('picture', ''),
-      user_id_field: social_user_data['id']
     }
     
-    user = User.objects.create(**user_data)
-    refresh = RefreshToken.for_user(user)
+    user = User(**user_data)
+    # ソーシャルログインのみのユーザーはパスワードを持たない
+    user.set_unusable_password()
+    user.save()
+    user.link_social_identity(provider, social_user_data['id'])
 
     if user_type == 'CUSTOMER':
       progress = CustomerRegistrationProgress.objects.get(user=user)  # 1クエリ
@@ -136,18 +132,17 @@ class SocialLoginService:
     
     if user.is_active == False:
       return user, None, 'メール認証リンクを送信しました。メールを確認してください。'
-    refresh = RefreshToken.for_user(user)
-    return user, refresh, f'{provider.capitalize()}でアカウントを作成しました'
+    refresh = RefreshToken.for_user(user, platform)
+    return user, refresh, f'{get_provider(provider).DISPLAY_NAME}でアカウントを作成しました'
 
 
   @classmethod
-  def _handle_activate_social(cls, session_token, provider, data):
+  def _handle_activate_social(cls, session_token, provider, data, platform=None):
 
     invitation =UserActivationService.get_invitation_from_session(session_token)
-    user_id_field = f'{provider}_user_id'
 
     user = invitation.user
-    setattr(user, user_id_field, data['id'])
+    user.link_social_identity(provider, data['id'])
     user.is_active = True
     user.is_email_verified = True
     user.auth_provider = provider
@@ -155,93 +150,4 @@ class SocialLoginService:
     user.profile_image_url = data['picture']
     user.save()
 
-    return UserActivationService.complete_activation(user, invitation, session_token)
-
-  @classmethod
-  def _get_google_user_data(cls, access_token):
-    try:
-      response = requests.get(
-        'https://www.googleapis.com/oauth2/v2/userinfo',
-        headers={"Authorization": f"Bearer {access_token}"}
-      )
-      response.raise_for_status()
-    except requests.exceptions.HTTPError:
-        raise ValidationError("Googleトークンが無効です。再ログインしてください。")
-    
-    data = response.json()
-
-    if not data.get('id') or not data.get('email'):
-      raise ValidationError("Googleからメールアドレスを取得できませんでした。")
-    
-    return {
-      'id': data['id'],
-      'email': data['email'],
-      'first_name': data.get('given_name', ''),
-      'last_name': data.get('family_name', ''),
-      'picture': data.get('picture', ''),
-      'email_verified': data.get('verified_email', False)
-    }
-  
-  @classmethod
-  def _get_facebook_user_data(cls, access_token):
-    try:
-      response = requests.get(
-        'https://graph.facebook.com/me',
-        params={ 
-          'fields': 'id,email,first_name,last_name,name,picture,email_verified', 
-          'access_token': access_token
-					}
-      )
-      response.raise_for_status()
-    except requests.exceptions.HTTPError:
-        raise ValidationError("Facebookトークンが無効です。再ログインしてください。")
-    
-    data = response.json()
-
-    if not data.get('id') or not data.get('email'):
-      raise ValidationError("facebookからメールアドレスを取得できませんでした。")
-    
-    return {
-      'id': data['id'],
-      'email': data['email'],
-      'first_name': data.get('first_name', ''),
-      'last_name': data.get('last_name', ''),
-      'picture': data.get('picture', {}).get('data', {}).get('url', ''),
-      'email_verified' : data.get('email_verified', False)
-    }
-  
-  @classmethod
-  def _get_line_user_data(cls, access_token, id_token):
-    if not access_token:
-      raise ValidationError("アクセストークンが必要です")
-    if not id_token:
-      raise ValidationError("IDトークンが必要です")
-    
-    try:
-      response = requests.get(
-          'https://api.line.me/v2/profile',
-          headers={'Authorization': f'Bearer {access_token}'}
-      )
-      response.raise_for_status()
-      profile_data = response.json()
-      
-      payload = jwt.decode(id_token, options={"verify_signature": False})
-        
-    except requests.exceptions.HTTPError:
-      raise ValidationError("LINEトークンが無効です。再ログインしてください。")
-    except (jwt.exceptions.DecodeError, jwt.exceptions.InvalidTokenError, Exception) as e:
-      raise ValidationError("LINEトークンが無効です。再ログインしてください。")
-    
-    if not payload.get("sub") and not profile_data.get("userId"):
-      raise ValidationError("LINEからユーザー情報を取得できませんでした。")
-    
-    if not payload.get("email"):
-      raise ValidationError("LINEからメールアドレスを取得できませんでした。")
-    
-    return {
-      "id": payload.get("sub") or profile_data.get("userId"),
-      "name": profile_data.get("displayName"),
-      "email": payload["email"],
-      "picture": profile_data.get("pictureUrl"),
-      "email_verified": True
-    }
\ No newline at end of file
+    return UserActivationService.complete_activation(user, invitation, session_token, platform)
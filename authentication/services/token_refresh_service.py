@@ -0,0 +1,18 @@
+from rest_framework_simplejwt.settings import api_settings
+from authentication.tokens import RefreshToken
+
+
+class TokenRefreshService:
+  """リフレッシュトークンの検証・ローテーション・失効（RefreshTokenView/TokenRefreshView共通）"""
+
+  @classmethod
+  def refresh(cls, raw_token):
+    """
+    署名・期限の検証、使用済みチェック（SETNX）、ローテーションを1回で行う
+    Returns: (access_token, refresh_token)
+    Raises: TokenError
+    """
+    # ローテーションで失効させる場合はSETNXが使用済みチェックを兼ねる
+    check_blacklist = not (api_settings.ROTATE_REFRESH_TOKENS and api_settings.BLACKLIST_AFTER_ROTATION)
+    refresh = RefreshToken(raw_token, check_blacklist=check_blacklist)
+    return refresh.rotate()
@@ -2,7 +2,7 @@ from django.db import transaction
 from django.core.exceptions import ValidationError
 from django.core.exceptions import ValidationError
 from django.core.cache import cache
-from rest_framework_simplejwt.tokens import RefreshToken
+from authentication.tokens import RefreshToken
 from invitation.models import StaffInvitation
 from users.models import User
 
@@ -30,6 +30,14 @@ class UserActivationService:
     else :
       raise ValidationError("許可されていない登録です")
 
+  @classmethod
+  def validate_invitation(cls, invitation_token):
+    """招待リンクのトークンを検証（未使用・期限内の招待を返す）"""
+    invitation = StaffInvitation.objects.valid().by_token(invitation_token).with_related_info().first()
+    if not invitation:
+      raise ValidationError('無効または期限切れの招待リンクです')
+    return invitation
+
   @classmethod
   def get_invitation_from_session(cls, session_token,):
     cache_key = f'invitation_session:{session_token}'
@@ -61,24 +69,17 @@ class UserActivationService:
       raise
 
   @classmethod
-  def complete_activation(cls, user, invitation, session_token):
+  def complete_activation(cls, user, invitation, session_token, platform=None):
     progress = user.staff_progress
     progress.step = 'profile'
     progress.save(update_fields=['step'])
 
     cache_key = f'invitation_session:{session_token}'
     cache.delete(cache_key)
-    refresh = RefreshToken.for_user(user)
+    refresh = RefreshToken.for_user(user, platform)
     
     from authentication.services.user_registration_service import UserRegistrationService
     UserRegistrationService.process_invitation(invitation, user)
     
     return user, refresh, 'USERをアクティベートしました'
   
-  
-  def validate_invitation(invitation_token):
-    try:
-      invitation = StaffInvitation.objects.valid().unused().by_token(invitation_token).get()
-      return invitation
-    except StaffInvitation.DoesNotExist:
-        raise ValidationError('無効または期限切れの招待リンクです')
\ No newline at end of file
@@ -7,12 +7,13 @@ from users.models import User, CustomerRegistrationProgress
 from invitation.models import StaffInvitation
 from users.service.profile_service import ProfileService
 from django.core.cache import cache
-from rest_framework_simplejwt.tokens import RefreshToken
+from authentication.tokens import RefreshToken
 from django.db.models import Q
 from authentication.models import PendingUser
 import secrets
 from datetime import timedelta
 from django.contrib.auth.hashers import make_password
+from asgiref.sync import sync_to_async
 from .email_service import RegistrationEmailService
 from .email_service import RegistrationEmailService
 from common.service import EmailSendException
@@ -53,6 +54,43 @@ class UserRegistrationService:
     except EmailSendException:
       raise
 
+    return cls._pending_user_result(existing_user)
+
+  @classmethod
+  async def aregister_pending_user(cls, email, password, user_type, country, user_timezone, first_name, last_name):
+    """register_pending_userの非同期版（ハッシュ計算・メール送信はスレッドで実行）"""
+    await PendingUser.objects.filter(email=email).adelete()
+
+    existing_user = await User.objects.aemail_exists_in_group(email, user_type)
+
+    if existing_user:
+      if existing_user.has_usable_password():
+        raise ValidationError(_('This email is already registered. Please log in.'))
+
+    pending_user = await PendingUser.objects.acreate(
+      user = existing_user if existing_user else None,
+      email=email,
+      password_hash=await sync_to_async(make_password, thread_sensitive=False)(password),
+      user_type=user_type,
+      verification_token=secrets.token_urlsafe(32),
+      token_expires_at=timezone.now() + timedelta(hours=24),
+      country=country,
+      user_timezone=user_timezone,
+      first_name=first_name,
+      last_name=last_name
+    )
+
+    # 非同期ではtransaction.atomicを使えないため、送信に失敗したら仮登録を削除
+    try:
+      await RegistrationEmailService.asend_registration_confirmation(pending_user)
+    except EmailSendException:
+      await pending_user.adelete()
+      raise
+
+    return cls._pending_user_result(existing_user)
+
+  @staticmethod
+  def _pending_user_result(existing_user):
     if existing_user:
       return True, _('An existing account was found. For security reasons, please click the link in the email to verify your email address.')
     return False, _('A verification email has been sent. Please click the link in the email to activate your account.')
@@ -83,6 +121,29 @@ class UserRegistrationService:
     #   cls.create_user_relationships(user)  
     
     return user, False, _('Your registration is complete.')
+
+  @classmethod
+  async def averify_and_activate(cls, token):
+    """verify_and_activateの非同期版"""
+    try:
+      pending_user = await PendingUser.objects.select_related('user').aget(verification_token=token)
+    except PendingUser.DoesNotExist:
+      raise NotFound(_('The verification link is invalid.'))
+    
+    if not pending_user.is_token_valid():
+      raise ValidationError(_('The verification link has expired. Please Sign up again.'))
+
+    # 作成・紐付けはトランザクション内で行うため同期で実行
+    if pending_user.user != None:
+      user = await sync_to_async(pending_user.link_social_account)()
+      is_link_social, message = True, _('Your password has been set successfully.')
+    else:
+      user = await sync_to_async(pending_user.create_user)()
+      is_link_social, message = False, _('Your registration is complete.')
+
+    # 非同期では遅延読み込みできないため、レスポンスで使うprogressも取得
+    user = await User.objects.select_related('staff_progress', 'customer_progress').aget(pk=user.pk)
+    return user, is_link_social, message
   
   
   @classmethod
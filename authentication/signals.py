@@ -1,20 +1,47 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
+from django.contrib.auth.signals import user_logged_in
+from django.contrib.auth.models import update_last_login
 from users.models import User, StaffProfile, StaffRegistrationProgress, CustomerRegistrationProgress
+from users.utils import LastLoginBuffer
+from authentication.utils import CachedUserResolver
+
+# Django標準のupdate_last_login（ログインごとにUPDATE）をバッファ版に置き換え
+user_logged_in.disconnect(update_last_login, dispatch_uid='update_last_login')
+
+
+@receiver(user_logged_in)
+def buffer_last_login(sender, user, **kwargs):
+  LastLoginBuffer().record(user)
+
 
 @receiver(post_save, sender=User)
 def create_user_related_objects(sender, instance, created, **kwargs):
   if created:
     if instance.user_type == 'CUSTOMER':
-      if not instance.first_name or not instance.last_name or not instance.phone_number:
-        step = 'detail'
-      else:
-        step = 'done'
-      CustomerRegistrationProgress.objects.create(user=instance, step=step)
+      CustomerRegistrationProgress.objects.create(
+        user=instance,
+        step=CustomerRegistrationProgress.initial_step(instance)
+      )
   
     elif instance.user_type == 'STAFF':
       StaffProfile.objects.create(user=instance)
       StaffRegistrationProgress.objects.create(
           user=instance,
           step='basic_info'
-      )
\ No newline at end of file
+      )
+
+
+# 認証用ユーザーキャッシュの無効化（無効化・ロック等の更新もsave経由で反映）
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+  CachedUserResolver.invalidate(instance.pk)
+
+
+@receiver(post_save, sender=StaffRegistrationProgress)
+@receiver(post_save, sender=CustomerRegistrationProgress)
+@receiver(post_delete, sender=StaffRegistrationProgress)
+@receiver(post_delete, sender=CustomerRegistrationProgress)
+def invalidate_cached_user_progress(sender, instance, **kwargs):
+  CachedUserResolver.invalidate(instance.user_id)
@@ -4,10 +4,11 @@ from django.utils import timezone
 from datetime import timedelta
 from unittest.mock import patch, MagicMock
 from rest_framework.test import APIClient
-from rest_framework_simplejwt.tokens import RefreshToken
+from authentication.tokens import RefreshToken
 from django.test.utils import CaptureQueriesContext
 from django.db import connection
 import requests
+import jwt
 from django.test import RequestFactory
 from django.contrib.sessions.middleware import SessionMiddleware
 from django.contrib.messages.storage.fallback import FallbackStorage
@@ -16,9 +17,16 @@ from django.contrib.messages.storage.fallback import FallbackStorage
 @pytest.fixture(autouse=True)
 def clear_cache():
   """各テスト前後でRedisキャッシュをクリア"""
+  from authentication.utils import CachedUserResolver, TokenBlacklist, VerifiedTokenCache
   cache.clear()
+  CachedUserResolver.clear_local()
+  TokenBlacklist.reset_local()
+  VerifiedTokenCache.clear()
   yield
   cache.clear()
+  CachedUserResolver.clear_local()
+  TokenBlacklist.reset_local()
+  VerifiedTokenCache.clear()
 
 
 @pytest.fixture
@@ -27,6 +35,12 @@ def api_client():
   return APIClient()
 
 
+@pytest.fixture
+def customer(create_user):
+  """有効な顧客ユーザー"""
+  return create_user(user_type='CUSTOMER', is_active=True)
+
+
 @pytest.fixture
 def authenticated_client(api_client, user_factory):
   """認証済みAPIクライアント"""
@@ -63,9 +77,10 @@ def django_db_setup(django_db_setup, django_db_blocker):
 @pytest.fixture
 def mock_google_api():
   """Google API モック"""
-  with patch('authentication.services.social_login_service.requests.get') as mock_get:
+  with patch('common.utils.http_client.HTTPClient.get') as mock_get:
     def side_effect(url, *args, **kwargs):
       response = MagicMock()
+      response.status_code = 200
       response.raise_for_status = MagicMock()
       
       if 'googleapis.com' in url:
@@ -87,9 +102,10 @@ def mock_google_api():
 @pytest.fixture
 def mock_google_api_no_name():
   """Google API モック（名前なし）"""
-  with patch('authentication.services.social_login_service.requests.get') as mock_get:
+  with patch('common.utils.http_client.HTTPClient.get') as mock_get:
     def side_effect(url, *args, **kwargs):
       response = MagicMock()
+      response.status_code = 200
       response.raise_for_status = MagicMock()
       
       if 'googleapis.com' in url:
@@ -107,9 +123,10 @@ def mock_google_api_no_name():
 @pytest.fixture
 def mock_google_api_no_picture():
   """Google API モック（画像なし）"""
-  with patch('authentication.services.social_login_service.requests.get') as mock_get:
+  with patch('common.utils.http_client.HTTPClient.get') as mock_get:
     def side_effect(url, *args, **kwargs):
       response = MagicMock()
+      response.status_code = 200
       response.raise_for_status = MagicMock()
       
       if 'googleapis.com' in url:
@@ -129,9 +146,10 @@ def mock_google_api_no_picture():
 @pytest.fixture
 def mock_google_api_no_email():
   """Google API モック（メールなし）"""
-  with patch('authentication.services.social_login_service.requests.get') as mock_get:
+  with patch('common.utils.http_client.HTTPClient.get') as mock_get:
     def side_effect(url, *args, **kwargs):
       response = MagicMock()
+      response.status_code = 200
       response.raise_for_status = MagicMock()
       
       if 'googleapis.com' in url:
@@ -148,7 +166,7 @@ def mock_google_api_no_email():
 @pytest.fixture
 def mock_google_api_error_401():
   """Google APIエラー 401 モック"""
-  with patch('authentication.services.social_login_service.requests.get') as mock_get:
+  with patch('common.utils.http_client.HTTPClient.get') as mock_get:
     response = MagicMock()
     response.status_code = 401
     response.reason = 'Unauthorized'
@@ -163,7 +181,7 @@ def mock_google_api_error_401():
 @pytest.fixture
 def mock_google_api_error_403():
   """Google APIエラー 403 モック"""
-  with patch('authentication.services.social_login_service.requests.get') as mock_get:
+  with patch('common.utils.http_client.HTTPClient.get') as mock_get:
     response = MagicMock()
     response.status_code = 403
     response.reason = 'Forbidden'
@@ -179,7 +197,7 @@ def mock_google_api_error_403():
 @pytest.fixture
 def mock_google_api_error_500():
   """Google APIエラー 500 モック"""
-  with patch('authentication.services.social_login_service.requests.get') as mock_get:
+  with patch('common.utils.http_client.HTTPClient.get') as mock_get:
     response = MagicMock()
     response.status_code = 500
     response.reason = 'Internal Server Error'
@@ -196,11 +214,12 @@ def mock_google_api_error_500():
 @pytest.fixture
 def mock_line_api():
   """LINE API モック"""
-  with patch('authentication.services.social_login_service.requests.get') as mock_get, \
-      patch('authentication.services.social_login_service.jwt.decode') as mock_jwt:
+  with patch('common.utils.http_client.HTTPClient.get') as mock_get, \
+      patch('authentication.utils.id_token_verifier.LineIDTokenVerifier.verify') as mock_jwt:
     
     def get_side_effect(url, *args, **kwargs):
       response = MagicMock()
+      response.status_code = 200
       response.raise_for_status = MagicMock()
       
       if 'line.me/v2/profile' in url:
@@ -223,11 +242,12 @@ def mock_line_api():
 @pytest.fixture
 def mock_line_api_no_picture():
   """LINE API モック（画像なし）"""
-  with patch('authentication.services.social_login_service.requests.get') as mock_get, \
-      patch('authentication.services.social_login_service.jwt.decode') as mock_jwt:
+  with patch('common.utils.http_client.HTTPClient.get') as mock_get, \
+      patch('authentication.utils.id_token_verifier.LineIDTokenVerifier.verify') as mock_jwt:
     
     def get_side_effect(url, *args, **kwargs):
       response = MagicMock()
+      response.status_code = 200
       response.raise_for_status = MagicMock()
       
       if 'line.me/v2/profile' in url:
@@ -249,11 +269,12 @@ def mock_line_api_no_picture():
 @pytest.fixture
 def mock_line_api_no_email():
   """LINE API モック（メールなし）"""
-  with patch('authentication.services.social_login_service.requests.get') as mock_get, \
-      patch('authentication.services.social_login_service.jwt.decode') as mock_jwt:
+  with patch('common.utils.http_client.HTTPClient.get') as mock_get, \
+      patch('authentication.utils.id_token_verifier.LineIDTokenVerifier.verify') as mock_jwt:
     
     def get_side_effect(url, *args, **kwargs):
       response = MagicMock()
+      response.status_code = 200
       response.raise_for_status = MagicMock()
       
       if 'line.me/v2/profile' in url:
@@ -275,7 +296,7 @@ def mock_line_api_no_email():
 @pytest.fixture
 def mock_line_api_error_401():
   """LINE APIエラー 401 モック"""
-  with patch('authentication.services.social_login_service.requests.get') as mock_get:
+  with patch('common.utils.http_client.HTTPClient.get') as mock_get:
     response = MagicMock()
     response.status_code = 401
     response.reason = 'Unauthorized'
@@ -290,11 +311,12 @@ def mock_line_api_error_401():
 @pytest.fixture
 def mock_line_api_invalid_id_token():
   """LINE 無効なIDトークン モック"""
-  with patch('authentication.services.social_login_service.requests.get') as mock_get, \
-      patch('authentication.services.social_login_service.jwt.decode') as mock_jwt:
+  with patch('common.utils.http_client.HTTPClient.get') as mock_get, \
+      patch('authentication.utils.id_token_verifier.LineIDTokenVerifier.verify') as mock_jwt:
     
     def get_side_effect(url, *args, **kwargs):
       response = MagicMock()
+      response.status_code = 200
       response.raise_for_status = MagicMock()
       
       if 'line.me/v2/profile' in url:
@@ -305,18 +327,19 @@ def mock_line_api_invalid_id_token():
       return response
     
     mock_get.side_effect = get_side_effect
-    mock_jwt.side_effect = Exception("Invalid token")
+    mock_jwt.side_effect = jwt.exceptions.InvalidSignatureError("Invalid token")
     
     yield mock_get, mock_jwt
 
 @pytest.fixture
 def mock_social_apis():
   """LINE & Google API モック"""
-  with patch('authentication.services.social_login_service.requests.get') as mock_get, \
-    patch('authentication.services.social_login_service.jwt.decode') as mock_jwt:
+  with patch('common.utils.http_client.HTTPClient.get') as mock_get, \
+    patch('authentication.utils.id_token_verifier.LineIDTokenVerifier.verify') as mock_jwt:
     
     def get_side_effect(url, *args, **kwargs):
       response = MagicMock()
+      response.status_code = 200
       response.raise_for_status = MagicMock()
       
       if 'line.me/v2/profile' in url:
@@ -348,9 +371,10 @@ def mock_social_apis():
 @pytest.fixture
 def mock_facebook_api():
   """Facebook API モック"""
-  with patch('authentication.services.social_login_service.requests.get') as mock_get:
+  with patch('common.utils.http_client.HTTPClient.get') as mock_get:
     def side_effect(url, *args, **kwargs):
       response = MagicMock()
+      response.status_code = 200
       response.raise_for_status = MagicMock()
       
       if 'graph.facebook.com' in url:
@@ -375,9 +399,10 @@ def mock_facebook_api():
 @pytest.fixture
 def mock_facebook_api_no_email():
   """Facebook API モック NO EMAIL"""
-  with patch('authentication.services.social_login_service.requests.get') as mock_get:
+  with patch('common.utils.http_client.HTTPClient.get') as mock_get:
     def side_effect(url, *args, **kwargs):
       response = MagicMock()
+      response.status_code = 200
       response.raise_for_status = MagicMock()
       
       if 'graph.facebook.com' in url:
@@ -5,6 +5,7 @@ from datetime import timedelta
 import uuid
 from users.models import User
 from authentication.models import PendingUser
+from organizations.models import Company, Tenant
 from django.contrib.auth.hashers import make_password
 import secrets
 
@@ -66,4 +67,25 @@ class PendingUserFactory(DjangoModelFactory):
   )
   user = None
 
-  
\ No newline at end of file
+  
+
+
+class CompanyFactory(DjangoModelFactory):
+  class Meta:
+    model = Company
+
+  name = 'Test Company'
+
+
+class TenantFactory(DjangoModelFactory):
+  class Meta:
+    model = Tenant
+
+  company = factory.SubFactory(CompanyFactory)
+  code = factory.Sequence(lambda n: f'T{n:05}')
+  name = factory.SelfAttribute('code')
+  address = '1 Test St'
+  state = 'NSW'
+  post_code = '2000'
+  country = 'AU'
+  phone_number = '0200000000'
@@ -0,0 +1,127 @@
+import pytest
+from asgiref.sync import async_to_sync
+from unittest.mock import patch
+from django.test import AsyncClient
+from django.urls import reverse
+
+from authentication.models import PendingUser
+from authentication.tests.factories import PendingUserFactory
+from authentication.tokens import RefreshToken
+from common.service import EmailSendException
+from users.models import User
+
+SEND_CONFIRMATION = 'authentication.services.email_service.RegistrationEmailService.send_registration_confirmation'
+
+
+def post(url, data, **extra):
+  return async_to_sync(AsyncClient().post)(url, data, content_type='application/json', secure=True, **extra)
+
+
+@pytest.fixture
+def customer(create_user):
+  return create_user(user_type='CUSTOMER', email='customer@example.com', is_active=True)
+
+
+@pytest.fixture
+def owner(create_user):
+  return create_user(user_type='OWNER', email='owner@example.com', is_active=True)
+
+
+@pytest.fixture
+def signup_data():
+  return {
+    'user_type': 'OWNER',
+    'email': 'new-owner@example.com',
+    'password': 'Str0ng-passw0rd!',
+    'confirm_password': 'Str0ng-passw0rd!',
+    'country': 'AU',
+    'user_timezone': 'Australia/Sydney',
+    'first_name': '太郎',
+    'last_name': '山田',
+  }
+
+
+@pytest.mark.django_db
+class TestAsyncLogin:
+
+  def test_customer_login_returns_tokens_for_mobile(self, customer):
+    response = post(reverse('async-customer-login'), {
+      'user_type': 'CUSTOMER', 'email': customer.email, 'password': 'testpassword123', 'platform': 'ios',
+    })
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body['user']['email'] == customer.email
+    assert body['user']['progress'] is not None
+    assert RefreshToken(body['refresh'])['user_id'] == str(customer.pk)
+
+  def test_business_login_sets_cookies_for_web(self, owner):
+    response = post(reverse('async-business-login'), {
+      'user_type': 'OWNER', 'email': owner.email, 'password': 'testpassword123', 'platform': 'web',
+    })
+
+    assert response.status_code == 200
+    assert 'access' not in response.json()
+    assert response.cookies['access_token'].value
+
+  def test_wrong_password_returns_401(self, customer):
+    response = post(reverse('async-customer-login'), {
+      'user_type': 'CUSTOMER', 'email': customer.email, 'password': 'wrongpassword', 'platform': 'ios',
+    })
+
+    assert response.status_code == 401
+
+  def test_invalid_data_returns_400(self, customer):
+    response = post(reverse('async-customer-login'), {'email': customer.email})
+
+    assert response.status_code == 400
+    assert 'password' in response.json()
+
+  def test_login_is_rate_limited(self, customer):
+    data = {'user_type': 'CUSTOMER', 'email': customer.email, 'password': 'wrongpassword', 'platform': 'ios'}
+
+    with patch('authentication.utils.AuthRateLimiter.LOGIN_LIMIT', 2):
+      statuses = [post(reverse('async-customer-login'), data).status_code for _ in range(3)]
+
+    assert statuses == [401, 401, 429]
+
+
+@pytest.mark.django_db
+class TestAsyncRegistration:
+
+  def test_owner_register_creates_pending_user(self, signup_data):
+    with patch(SEND_CONFIRMATION) as mock_send, \
+         patch('authentication.utils.DisposableEmailChecker.is_disposable', return_value=False):
+      response = post(reverse('async-business-register'), signup_data)
+
+    assert response.status_code == 201
+    assert response.json()['is_link_social'] is False
+    pending_user = PendingUser.objects.get(email=signup_data['email'])
+    assert pending_user.user_type == 'OWNER'
+    mock_send.assert_called_once()
+
+  def test_email_failure_removes_pending_user(self, signup_data):
+    with patch(SEND_CONFIRMATION, side_effect=EmailSendException('failed')), \
+         patch('authentication.utils.DisposableEmailChecker.is_disposable', return_value=False):
+      response = post(reverse('async-business-register'), signup_data)
+
+    assert response.status_code == 500
+    assert not PendingUser.objects.filter(email=signup_data['email']).exists()
+
+  def test_verify_email_creates_user_and_issues_tokens(self):
+    pending_user = PendingUserFactory(email='pending@example.com', user_type='CUSTOMER')
+
+    response = post(reverse('async-email-verify'), {'token': pending_user.verification_token, 'platform': 'android'})
+
+    assert response.status_code == 201
+    body = response.json()
+    assert body['is_link_social'] is False
+    assert body['user']['progress'] == {'step': 'detail'}
+    user = User.objects.get(email='pending@example.com')
+    assert RefreshToken(body['refresh'])['user_id'] == str(user.pk)
+    assert not PendingUser.objects.filter(pk=pending_user.pk).exists()
+
+  def test_verify_email_with_unknown_token_returns_404(self):
+    response = post(reverse('async-email-verify'), {'token': 'unknown', 'platform': 'ios'})
+
+    assert response.status_code == 404
@@ -0,0 +1,68 @@
+import pytest
+from authentication.tokens import RefreshToken
+
+from authentication.utils import CachedUserResolver
+
+CURRENT_USER_URL = '/api/auth/me/'
+
+
+@pytest.fixture
+def token_client(api_client, customer):
+  """アクセストークンをCookieに設定したクライアント"""
+  refresh = RefreshToken.for_user(customer)
+  api_client.cookies['access_token'] = str(refresh.access_token)
+  return api_client
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('redis_blacklist')
+class TestCookieJWTAuthenticationCache:
+
+  def test_current_user_served_from_cache(self, token_client, customer, django_assert_num_queries):
+    """2回目以降のリクエストはDBにアクセスしない"""
+    response = token_client.get(CURRENT_USER_URL, secure=True)
+    assert response.status_code == 200, response.content
+
+    with django_assert_num_queries(0):
+      response = token_client.get(CURRENT_USER_URL, secure=True)
+
+    assert response.status_code == 200
+    assert response.data['user']['email'] == customer.email
+    assert response.data['user']['progress'] is not None
+
+  def test_l2_cache_hit_after_local_eviction(self, token_client, django_assert_num_queries):
+    """プロセス内キャッシュが切れても共有キャッシュから取得"""
+    token_client.get(CURRENT_USER_URL, secure=True)
+    CachedUserResolver.clear_local()
+
+    with django_assert_num_queries(0):
+      response = token_client.get(CURRENT_USER_URL, secure=True)
+    assert response.status_code == 200
+
+  def test_save_invalidates_cache(self, token_client, customer):
+    """ユーザー更新時にキャッシュを破棄"""
+    token_client.get(CURRENT_USER_URL, secure=True)
+
+    customer.first_name = '更新'
+    customer.save(skip_validation=True)
+
+    response = token_client.get(CURRENT_USER_URL, secure=True)
+    assert response.data['user']['first_name'] == '更新'
+
+  def test_deactivated_user_is_rejected(self, token_client, customer):
+    """無効化されたユーザーはキャッシュ済みでも認証されない"""
+    assert token_client.get(CURRENT_USER_URL, secure=True).status_code == 200
+
+    customer.is_active = False
+    customer.save(skip_validation=True)
+
+    response = token_client.get(CURRENT_USER_URL, secure=True)
+    assert response.status_code in (401, 403)
+
+  def test_cached_instance_is_not_shared(self, customer):
+    """キャッシュ済みインスタンスの変更が他のリクエストに漏れない"""
+    first = CachedUserResolver.get_user(customer.pk)
+    first.first_name = 'changed'
+
+    second = CachedUserResolver.get_user(customer.pk)
+    assert second.first_name == customer.first_name
@@ -1,4 +1,6 @@
 import pytest
+import httpx
+from asgiref.sync import async_to_sync
 from authentication.utils import DisposableEmailChecker
 from unittest.mock import patch, MagicMock
 import requests
@@ -72,6 +74,78 @@ class TestDisposableEmailChecker:
     assert result is False
 
 
+class TestBulkDisposableEmailCheck:
+  """一括登録用の判定（disposable_domains）"""
+
+  @pytest.fixture(autouse=True)
+  def use_api(self, settings):
+    from django.core.cache import cache
+    from common.utils import HTTPClient
+    settings.USE_DISPOSABLE_EMAIL_API = True
+    cache.clear()
+    HTTPClient.reset()
+    yield
+    cache.clear()
+    HTTPClient.reset()
+
+  @staticmethod
+  def kickbox(delays, disposable=()):
+    """ドメインごとに応答を遅らせるKickbox APIのモック"""
+    import time
+
+    def get(url, **kwargs):
+      domain = url.rsplit('/', 1)[-1]
+      time.sleep(delays.get(domain, 0))
+      response = MagicMock(status_code=200)
+      response.json.return_value = {'disposable': domain in disposable}
+      return response
+    return patch('common.utils.http_client.HTTPClient.get', side_effect=get)
+
+  def test_uncached_domains_are_checked_concurrently(self):
+    import time
+    domains = [f'domain{i}.example' for i in range(6)]
+
+    with self.kickbox({domain: 0.2 for domain in domains}, disposable={'domain3.example'}) as mock_get:
+      start = time.perf_counter()
+      result = DisposableEmailChecker.disposable_domains(f'user@{domain}' for domain in domains)
+      elapsed = time.perf_counter() - start
+
+    assert result == {'domain3.example'}
+    assert mock_get.call_count == 6
+    assert elapsed < 0.6
+    assert DisposableEmailChecker._get_cached('domain3.example') is True
+
+  def test_slow_domains_do_not_exceed_budget(self):
+    import time
+
+    with patch.object(DisposableEmailChecker, 'BULK_API_BUDGET', 0.2), \
+         self.kickbox({'slow.example': 1}, disposable={'fast.example'}):
+      start = time.perf_counter()
+      result = DisposableEmailChecker.disposable_domains(['a@slow.example', 'b@fast.example'])
+      elapsed = time.perf_counter() - start
+
+    assert result == {'fast.example'}
+    assert elapsed < 0.8
+
+  def test_failed_domain_is_treated_as_unknown(self):
+    """不正なレスポンス・キャッシュの障害は判定不能として扱い、他のドメインの結果は返す"""
+    def get(url, **kwargs):
+      response = MagicMock(status_code=200)
+      if url.endswith('broken.example'):
+        response.json.side_effect = ValueError('not json')
+      else:
+        response.json.return_value = {'disposable': True}
+      return response
+
+    with patch('common.utils.http_client.HTTPClient.get', side_effect=get):
+      result = DisposableEmailChecker.disposable_domains(['a@broken.example', 'b@temp.example'])
+    assert result == {'temp.example'}
+
+    with self.kickbox({}, disposable={'temp2.example'}), \
+         patch.object(DisposableEmailChecker, '_set_cached', side_effect=ConnectionError('redis down')):
+      assert DisposableEmailChecker.disposable_domains(['a@temp2.example']) == set()
+
+
 class TestDisposableEmailInSerializer:
   """Serializerでの使い捨てメールチェック"""
   
@@ -104,4 +178,65 @@ class TestDisposableEmailInSerializer:
     }
     
     serializer = OwnerSignupSerializer(data=data)
-    assert serializer.is_valid() is True
\ No newline at end of file
+    assert serializer.is_valid() is True
+
+@pytest.fixture
+def redis_clients(fake_redis, fake_async_redis):
+  with patch('authentication.utils.email_validator.get_redis_client', return_value=fake_redis), \
+       patch('authentication.utils.email_validator.get_async_redis_client', return_value=fake_async_redis):
+    yield fake_redis
+
+
+def kickbox(handler):
+  """httpxのモック（Kickbox API）"""
+  return patch.object(
+    DisposableEmailChecker, '_get_async_http_client',
+    return_value=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+  )
+
+
+class TestAsyncDisposableEmailChecker:
+  """ais_disposable（非同期版）のテスト"""
+
+  def test_local_list_and_invalid_email(self):
+    assert async_to_sync(DisposableEmailChecker.ais_disposable)('test@BestTempMail.COM') is True
+    assert async_to_sync(DisposableEmailChecker.ais_disposable)('invalid-email') is False
+    assert async_to_sync(DisposableEmailChecker.ais_disposable)(None) is False
+
+  def test_api_result_is_cached_for_sync_and_async(self, redis_clients, settings):
+    settings.USE_DISPOSABLE_EMAIL_API = True
+    requested = []
+
+    def handler(request):
+      requested.append(request.url.path)
+      return httpx.Response(200, json={'disposable': True})
+
+    with kickbox(handler):
+      assert async_to_sync(DisposableEmailChecker.ais_disposable)('a@new-disposable.example') is True
+      assert async_to_sync(DisposableEmailChecker.ais_disposable)('b@new-disposable.example') is True
+
+    assert requested == ['/v1/disposable/new-disposable.example']
+    # 同期版も同じキャッシュを参照する（APIは呼ばない）
+    with patch('authentication.utils.email_validator.requests.get') as mock_get:
+      assert DisposableEmailChecker.is_disposable('c@new-disposable.example') is True
+      mock_get.assert_not_called()
+
+  def test_sync_result_is_used_by_async(self, redis_clients, settings):
+    settings.USE_DISPOSABLE_EMAIL_API = True
+    mock_response = MagicMock(status_code=200)
+    mock_response.json.return_value = {'disposable': False}
+
+    with patch('authentication.utils.email_validator.requests.get', return_value=mock_response):
+      assert DisposableEmailChecker.is_disposable('a@legitimate.example') is False
+
+    with kickbox(lambda request: httpx.Response(200, json={'disposable': True})):
+      assert async_to_sync(DisposableEmailChecker.ais_disposable)('b@legitimate.example') is False
+
+  def test_api_timeout_returns_false(self, redis_clients, settings):
+    settings.USE_DISPOSABLE_EMAIL_API = True
+
+    def handler(request):
+      raise httpx.ReadTimeout('timeout', request=request)
+
+    with kickbox(handler):
+      assert async_to_sync(DisposableEmailChecker.ais_disposable)('a@slow.example') is False
@@ -0,0 +1,329 @@
+import time
+import threading
+import jwt
+import pytest
+import requests
+from unittest.mock import patch, MagicMock
+from cryptography.hazmat.primitives.asymmetric import rsa, ec
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+
+from authentication.utils import GoogleIDTokenVerifier, LineIDTokenVerifier
+from authentication.providers import get_provider
+
+
+WEB_CLIENT_ID = 'web-client.apps.googleusercontent.com'
+IOS_CLIENT_ID = 'ios-client.apps.googleusercontent.com'
+
+
+def generate_key(kid):
+  private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+  jwk = jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+  jwk.update({'kid': kid, 'alg': 'RS256', 'use': 'sig'})
+  return private_key, jwk
+
+
+@pytest.fixture(scope='module')
+def signing_key():
+  return generate_key('key-1')
+
+
+@pytest.fixture(scope='module')
+def other_key():
+  return generate_key('key-2')
+
+
+@pytest.fixture(autouse=True)
+def google_settings(settings):
+  settings.GOOGLE_OAUTH2_CLIENT_ID = WEB_CLIENT_ID
+  settings.GOOGLE_IOS_CLIENT_ID = IOS_CLIENT_ID
+  settings.GOOGLE_ANDROID_CLIENT_ID = ''
+  GoogleIDTokenVerifier.clear()
+  cache.clear()
+  yield
+  GoogleIDTokenVerifier.clear()
+  cache.clear()
+
+
+@pytest.fixture
+def mock_jwks(signing_key):
+  """JWKSエンドポイントのモック"""
+  with patch('authentication.utils.id_token_verifier.HTTPClient.get') as mock_get:
+    response = MagicMock()
+    response.status_code = 200
+    response.headers = {'Cache-Control': 'public, max-age=21600, must-revalidate'}
+    response.json.return_value = {'keys': [signing_key[1]]}
+    mock_get.return_value = response
+    yield mock_get
+
+
+def make_id_token(key, **claims):
+  private_key, jwk = key
+  now = int(time.time())
+  payload = {
+    'iss': 'https://accounts.google.com',
+    'aud': WEB_CLIENT_ID,
+    'sub': '1234567890',
+    'email': 'google@example.com',
+    'email_verified': True,
+    'given_name': '太郎',
+    'family_name': '山田',
+    'iat': now,
+    'exp': now + 3600,
+  }
+  payload.update(claims)
+  return jwt.encode(payload, private_key, algorithm='RS256', headers={'kid': jwk['kid']})
+
+
+class TestGoogleIDTokenVerifier:
+
+  def test_verify_valid_token(self, signing_key, mock_jwks):
+    claims = GoogleIDTokenVerifier.verify(make_id_token(signing_key))
+
+    assert claims['sub'] == '1234567890'
+    assert claims['email'] == 'google@example.com'
+
+  def test_accepts_mobile_client_audience(self, signing_key, mock_jwks):
+    claims = GoogleIDTokenVerifier.verify(make_id_token(signing_key, aud=IOS_CLIENT_ID))
+
+    assert claims['aud'] == IOS_CLIENT_ID
+
+  @pytest.mark.parametrize('claims, error', [
+    ({'aud': 'other-client'}, jwt.exceptions.InvalidAudienceError),
+    ({'iss': 'https://evil.example.com'}, jwt.exceptions.InvalidIssuerError),
+    ({'exp': int(time.time()) - 3600}, jwt.exceptions.ExpiredSignatureError),
+  ])
+  def test_rejects_invalid_claims(self, signing_key, mock_jwks, claims, error):
+    with pytest.raises(error):
+      GoogleIDTokenVerifier.verify(make_id_token(signing_key, **claims))
+
+  def test_rejects_token_signed_with_unknown_key(self, other_key, mock_jwks):
+    with pytest.raises(jwt.exceptions.InvalidKeyError):
+      GoogleIDTokenVerifier.verify(make_id_token(other_key))
+
+  def test_rejects_forged_signature(self, signing_key, other_key, mock_jwks):
+    forged = jwt.encode(
+      {'iss': 'accounts.google.com', 'aud': WEB_CLIENT_ID, 'sub': '1', 'iat': int(time.time()), 'exp': int(time.time()) + 60},
+      other_key[0], algorithm='RS256', headers={'kid': signing_key[1]['kid']},
+    )
+    with pytest.raises(jwt.exceptions.InvalidSignatureError):
+      GoogleIDTokenVerifier.verify(forged)
+
+  def test_keys_are_cached_for_max_age(self, signing_key, mock_jwks):
+    for _ in range(3):
+      GoogleIDTokenVerifier.verify(make_id_token(signing_key))
+
+    assert mock_jwks.call_count == 1
+    assert GoogleIDTokenVerifier._expires_at == pytest.approx(time.time() + 21600, abs=5)
+
+  def test_keys_are_shared_through_cache(self, signing_key, mock_jwks):
+    GoogleIDTokenVerifier.verify(make_id_token(signing_key))
+    # 別プロセスの起動直後を想定
+    GoogleIDTokenVerifier.clear()
+    GoogleIDTokenVerifier.verify(make_id_token(signing_key))
+
+    assert mock_jwks.call_count == 1
+
+  def test_refreshes_in_background_before_expiry(self, signing_key, mock_jwks):
+    GoogleIDTokenVerifier.verify(make_id_token(signing_key))
+    GoogleIDTokenVerifier._expires_at = time.time() + GoogleIDTokenVerifier.REFRESH_BEFORE - 1
+
+    with patch.object(GoogleIDTokenVerifier, '_refresh_in_background') as mock_refresh:
+      GoogleIDTokenVerifier.verify(make_id_token(signing_key))
+
+    mock_refresh.assert_called_once()
+    assert mock_jwks.call_count == 1
+
+  def test_uses_stale_keys_when_refresh_fails(self, signing_key, mock_jwks):
+    GoogleIDTokenVerifier.verify(make_id_token(signing_key))
+    GoogleIDTokenVerifier._expires_at = time.time() - 1
+    cache.clear()
+    mock_jwks.side_effect = requests.exceptions.ConnectTimeout
+
+    claims = GoogleIDTokenVerifier.verify(make_id_token(signing_key))
+
+    assert claims['sub'] == '1234567890'
+
+  def test_unknown_kid_refetch_is_throttled(self, other_key, mock_jwks):
+    for _ in range(3):
+      with pytest.raises(jwt.exceptions.InvalidKeyError):
+        GoogleIDTokenVerifier.verify(make_id_token(other_key))
+
+    assert mock_jwks.call_count == 1
+
+
+class TestSocialLoginWithIDToken:
+
+  def test_user_data_from_id_token(self, signing_key, mock_jwks):
+    data = get_provider('google').get_user_data(id_token=make_id_token(signing_key))
+
+    assert data == {
+      'id': '1234567890',
+      'email': 'google@example.com',
+      'first_name': '太郎',
+      'last_name': '山田',
+      'picture': '',
+      'email_verified': True,
+    }
+
+  def test_invalid_id_token(self, signing_key, mock_jwks):
+    with pytest.raises(ValidationError, match='Googleトークンが無効'):
+      get_provider('google').get_user_data(id_token=make_id_token(signing_key, aud='other-client'))
+
+
+LINE_CHANNEL_ID = '1234567890'
+LINE_CHANNEL_SECRET = 'line-channel-secret'
+
+
+@pytest.fixture
+def line_settings(settings):
+  settings.LINE_CHANNEL_ID = LINE_CHANNEL_ID
+  settings.LINE_CHANNEL_SECRET = LINE_CHANNEL_SECRET
+  LineIDTokenVerifier.clear()
+  yield
+  LineIDTokenVerifier.clear()
+
+
+@pytest.fixture(scope='module')
+def line_signing_key():
+  private_key = ec.generate_private_key(ec.SECP256R1())
+  jwk = jwt.algorithms.ECAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+  jwk.update({'kid': 'line-key-1', 'alg': 'ES256', 'use': 'sig'})
+  return private_key, jwk
+
+
+@pytest.fixture
+def mock_line_endpoints(line_signing_key):
+  """LINEのJWKS・プロフィールのモック（HTTPClient.getは共通のため1つのモックでURLごとに応答）"""
+  profile = {'userId': 'U1234567890abcdef', 'displayName': '山田太郎', 'pictureUrl': 'https://example.com/line.jpg'}
+
+  def get_side_effect(url, *args, **kwargs):
+    response = MagicMock()
+    response.status_code = 200
+    response.headers = {'Cache-Control': 'max-age=86400'}
+    if url == LineIDTokenVerifier.JWKS_URL:
+      response.json.return_value = {'keys': [line_signing_key[1]]}
+    else:
+      response.json.return_value = profile
+    return response
+
+  with patch('common.utils.http_client.HTTPClient.get', side_effect=get_side_effect) as mock_get:
+    yield mock_get, profile
+
+
+def count_requests(mock_get, url):
+  return sum(1 for call in mock_get.call_args_list if call.args[0] == url)
+
+
+def make_line_id_token(key=None, **claims):
+  now = int(time.time())
+  payload = {
+    'iss': 'https://access.line.me',
+    'aud': LINE_CHANNEL_ID,
+    'sub': 'U1234567890abcdef',
+    'email': 'line@example.com',
+    'iat': now,
+    'exp': now + 3600,
+  }
+  payload.update(claims)
+  if key is None:
+    return jwt.encode(payload, LINE_CHANNEL_SECRET, algorithm='HS256')
+  return jwt.encode(payload, key[0], algorithm='ES256', headers={'kid': key[1]['kid']})
+
+
+@pytest.mark.usefixtures('line_settings')
+class TestLineIDTokenVerifier:
+
+  def test_verify_with_channel_secret(self, mock_line_endpoints):
+    claims = LineIDTokenVerifier.verify(make_line_id_token())
+
+    assert claims['sub'] == 'U1234567890abcdef'
+    # HS256はJWKSを取得しない
+    assert count_requests(mock_line_endpoints[0], LineIDTokenVerifier.JWKS_URL) == 0
+
+  def test_verify_with_jwks(self, line_signing_key, mock_line_endpoints):
+    claims = LineIDTokenVerifier.verify(make_line_id_token(line_signing_key))
+
+    assert claims['email'] == 'line@example.com'
+    assert count_requests(mock_line_endpoints[0], LineIDTokenVerifier.JWKS_URL) == 1
+
+  def test_rejects_wrong_secret(self, mock_line_endpoints):
+    token = jwt.encode({'iss': 'https://access.line.me', 'aud': LINE_CHANNEL_ID, 'sub': 'U1'}, 'wrong-secret', algorithm='HS256')
+
+    with pytest.raises(jwt.exceptions.InvalidSignatureError):
+      LineIDTokenVerifier.verify(token)
+
+  def test_rejects_other_channel(self, mock_line_endpoints):
+    with pytest.raises(jwt.exceptions.InvalidAudienceError):
+      LineIDTokenVerifier.verify(make_line_id_token(aud='other-channel'))
+
+  def test_keys_are_separate_from_google(self, line_signing_key, signing_key, mock_line_endpoints):
+    GoogleIDTokenVerifier._set_keys({'keys': [signing_key[1]]}, time.time() + 3600)
+    LineIDTokenVerifier.verify(make_line_id_token(line_signing_key))
+
+    assert set(GoogleIDTokenVerifier._keys) == {'key-1'}
+    assert set(LineIDTokenVerifier._keys) == {'line-key-1'}
+
+
+@pytest.mark.usefixtures('line_settings')
+class TestSocialLoginLineUserData:
+
+  def test_skips_profile_when_claims_present(self, mock_line_endpoints):
+    token = make_line_id_token(name='LINE太郎', picture='https://example.com/claim.jpg')
+
+    data = get_provider('line').get_user_data('access', token)
+
+    assert data['name'] == 'LINE太郎'
+    assert data['picture'] == 'https://example.com/claim.jpg'
+    assert count_requests(mock_line_endpoints[0], 'https://api.line.me/v2/profile') == 0
+
+  def test_fetches_profile_when_claims_missing(self, mock_line_endpoints):
+    data = get_provider('line').get_user_data('access', make_line_id_token())
+
+    assert data == {
+      'id': 'U1234567890abcdef',
+      'name': '山田太郎',
+      'email': 'line@example.com',
+      'picture': 'https://example.com/line.jpg',
+      'email_verified': True,
+    }
+
+  def test_profile_fetch_runs_concurrently_with_verification(self, mock_line_endpoints):
+    # 直列に実行されると両方がbarrierで待ち続けてタイムアウトする
+    barrier = threading.Barrier(2, timeout=2)
+    fetch = mock_line_endpoints[0].side_effect
+    verify = LineIDTokenVerifier.verify
+
+    def slow_fetch(url, *args, **kwargs):
+      barrier.wait()
+      return fetch(url, *args, **kwargs)
+
+    def slow_verify(id_token):
+      barrier.wait()
+      return verify(id_token)
+
+    mock_line_endpoints[0].side_effect = slow_fetch
+    with patch('authentication.utils.id_token_verifier.LineIDTokenVerifier.verify', side_effect=slow_verify):
+      data = get_provider('line').get_user_data('access', make_line_id_token())
+
+    assert data['name'] == '山田太郎'
+
+  def test_rejects_profile_of_other_user(self, mock_line_endpoints):
+    mock_line_endpoints[1]['userId'] = 'U-other'
+
+    with pytest.raises(ValidationError, match='LINEトークンが無効'):
+      get_provider('line').get_user_data('access', make_line_id_token())
+
+  def test_continues_without_profile_when_line_is_down(self, mock_line_endpoints):
+    mock_line_endpoints[0].side_effect = requests.exceptions.ConnectTimeout
+
+    data = get_provider('line').get_user_data('access', make_line_id_token())
+
+    assert data['id'] == 'U1234567890abcdef'
+    assert data['picture'] is None
+
+  def test_unsigned_token_rejected(self, mock_line_endpoints):
+    token = jwt.encode({'iss': 'https://access.line.me', 'aud': LINE_CHANNEL_ID, 'sub': 'U1', 'email': 'x@example.com'}, None, algorithm='none')
+
+    with pytest.raises(ValidationError, match='LINEトークンが無効'):
+      get_provider('line').get_user_data('access', token)
@@ -0,0 +1,49 @@
+import pytest
+import requests
+from unittest.mock import patch
+from django.core.exceptions import ValidationError
+
+from authentication.providers import get_provider
+from common.utils import HTTPClient
+
+
+@pytest.fixture(autouse=True)
+def reset_clients():
+  HTTPClient.reset()
+  yield
+  HTTPClient.reset()
+
+
+class TestSocialLoginProviderFetch:
+
+  def test_google_user_data(self, mock_google_api):
+    data = get_provider('google').get_user_data('token')
+
+    assert data['id'] == '123456789'
+    assert data['email'] == 'test@example.com'
+    assert mock_google_api.call_args.args[0] == 'https://www.googleapis.com/oauth2/v2/userinfo'
+
+  def test_invalid_token(self, mock_google_api_error_401):
+    with pytest.raises(ValidationError, match='トークンが無効'):
+      get_provider('google').get_user_data('token')
+
+  def test_provider_server_error(self, mock_google_api_error_500):
+    with pytest.raises(ValidationError, match='接続できませんでした'):
+      get_provider('google').get_user_data('token')
+
+  def test_provider_timeout(self):
+    client = HTTPClient.for_service('google')
+    with patch.object(client.session, 'request', side_effect=requests.exceptions.ReadTimeout):
+      with pytest.raises(ValidationError, match='Googleに接続できませんでした'):
+        get_provider('google').get_user_data('token')
+
+  def test_open_circuit_fails_fast(self):
+    client = HTTPClient.for_service('facebook')
+    for _ in range(client.breaker.failure_threshold):
+      client.breaker.record_failure()
+
+    with patch.object(client.session, 'request') as mock_request:
+      with pytest.raises(ValidationError, match='Facebookに接続できませんでした'):
+        get_provider('facebook').get_user_data('token')
+
+    mock_request.assert_not_called()
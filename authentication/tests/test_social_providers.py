@@ -0,0 +1,170 @@
+import pytest
+import requests
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.core.management import CommandError, call_command
+from unittest.mock import patch
+from rest_framework.test import APIClient
+
+from authentication.providers import get_provider, get_provider_names, SocialProvider
+from authentication.providers.stub_server import StubProviderServer
+from authentication.utils import (
+  GoogleIDTokenVerifier, LineIDTokenVerifier, TokenFamilyRegistry, check_social_stub_settings,
+)
+from common.utils import HTTPClient
+from users.models import User
+
+SOCIAL_LOGIN_URL = '/api/auth/social/login/'
+
+
+@pytest.fixture(scope='module')
+def stub_server():
+  server = StubProviderServer().start()
+  yield server
+  server.stop()
+
+
+@pytest.fixture
+def use_stub(settings, stub_server):
+  settings.SOCIAL_PROVIDER_STUB_URL = stub_server.url
+  settings.GOOGLE_OAUTH2_CLIENT_ID = 'stub-google-client'
+  settings.LINE_CHANNEL_ID = 'stub-line-channel'
+  for verifier in (GoogleIDTokenVerifier, LineIDTokenVerifier):
+    verifier.clear()
+  HTTPClient.reset()
+  cache.clear()
+  yield stub_server
+  for verifier in (GoogleIDTokenVerifier, LineIDTokenVerifier):
+    verifier.clear()
+  HTTPClient.reset()
+
+
+def get_id_token(stub_server, provider, email, profile=False):
+  params = {'email': email, 'profile': '1' if profile else '0'}
+  return requests.get(f'{stub_server.url}/{provider}/id_token', params=params, timeout=5).json()['id_token']
+
+
+class TestProviderRegistry:
+
+  def test_registered_providers(self):
+    assert set(get_provider_names()) == {'google', 'facebook', 'line'}
+    for name in get_provider_names():
+      provider = get_provider(name)
+      assert isinstance(provider, SocialProvider)
+      assert provider.NAME == name
+
+  def test_unknown_provider(self):
+    with pytest.raises(ValueError):
+      get_provider('myspace')
+
+  def test_endpoints_point_to_stub(self, settings):
+    settings.SOCIAL_PROVIDER_STUB_URL = 'http://127.0.0.1:8900/'
+
+    assert get_provider('google').url('userinfo') == 'http://127.0.0.1:8900/google/userinfo'
+    assert LineIDTokenVerifier.get_jwks_url() == 'http://127.0.0.1:8900/line/certs'
+
+  def test_production_endpoints(self, settings):
+    settings.SOCIAL_PROVIDER_STUB_URL = ''
+
+    assert get_provider('google').url('userinfo') == 'https://www.googleapis.com/oauth2/v2/userinfo'
+    assert LineIDTokenVerifier.get_jwks_url() == LineIDTokenVerifier.JWKS_URL
+
+  def test_stub_is_ignored_outside_debug(self, settings):
+    """本番（DEBUGでなく許可もない）では環境変数が設定されていてもスタブへ向けない"""
+    settings.SOCIAL_PROVIDER_STUB_URL = 'http://127.0.0.1:8900/'
+    settings.SOCIAL_PROVIDER_STUB_ALLOWED = False
+    settings.DEBUG = False
+
+    assert get_provider('google').url('userinfo') == 'https://www.googleapis.com/oauth2/v2/userinfo'
+    assert LineIDTokenVerifier.get_jwks_url() == LineIDTokenVerifier.JWKS_URL
+    with pytest.raises(ImproperlyConfigured):
+      check_social_stub_settings()
+    with pytest.raises(CommandError):
+      call_command('run_social_stub')
+
+
+class TestStubProviders:
+
+  @pytest.mark.parametrize('provider', ['google', 'facebook'])
+  def test_access_token_flow(self, use_stub, provider):
+    data = get_provider(provider).get_user_data(StubProviderServer.access_token('stub@example.com'))
+
+    assert data['email'] == 'stub@example.com'
+    assert data['id'] == StubProviderServer.user_id(provider, 'stub@example.com')
+
+  def test_invalid_access_token(self, use_stub):
+    with pytest.raises(ValidationError, match='Googleトークンが無効'):
+      get_provider('google').get_user_data('not-a-stub-token')
+
+  def test_google_id_token_flow(self, use_stub):
+    id_token = get_id_token(use_stub, 'google', 'stub@example.com')
+
+    data = get_provider('google').get_user_data(id_token=id_token)
+
+    assert data['id'] == StubProviderServer.user_id('google', 'stub@example.com')
+
+  @pytest.mark.parametrize('profile', [True, False])
+  def test_line_flow(self, use_stub, profile):
+    email = 'line-stub@example.com'
+    id_token = get_id_token(use_stub, 'line', email, profile=profile)
+
+    data = get_provider('line').get_user_data(StubProviderServer.access_token(email), id_token)
+
+    assert data['id'] == StubProviderServer.user_id('line', email)
+    assert data['picture'] == 'https://example.com/stub.jpg'
+
+
+@pytest.mark.django_db
+class TestSocialLoginEndToEnd:
+
+  @pytest.mark.parametrize('provider', ['google', 'facebook'])
+  def test_signup_with_access_token(self, use_stub, provider):
+    email = f'{provider}-e2e@example.com'
+
+    response = APIClient().post(SOCIAL_LOGIN_URL, {
+      'provider': provider,
+      'access_token': StubProviderServer.access_token(email),
+      'user_type': 'CUSTOMER',
+    }, format='json', secure=True)
+
+    assert response.status_code == 200, response.content
+    assert response.json()['tokens']['access']
+    user = User.objects.get(email=email)
+    assert user.get_social_id(provider) == StubProviderServer.user_id(provider, email)
+
+  def test_login_with_line_id_token(self, use_stub):
+    email = 'line-e2e@example.com'
+    payload = {
+      'provider': 'line',
+      'id_token': get_id_token(use_stub, 'line', email, profile=True),
+      'user_type': 'CUSTOMER',
+    }
+
+    first = APIClient().post(SOCIAL_LOGIN_URL, payload, format='json', secure=True)
+    second = APIClient().post(SOCIAL_LOGIN_URL, payload, format='json', secure=True)
+
+    assert first.status_code == 200 and second.status_code == 200
+    assert 'LINEアカウントでログインしました' == second.json()['message']
+    assert User.objects.filter(email=email).count() == 1
+
+  def test_social_account_of_other_group_is_rejected(self, use_stub):
+    email = 'owner-e2e@example.com'
+    payload = {'provider': 'google', 'access_token': StubProviderServer.access_token(email)}
+    APIClient().post(SOCIAL_LOGIN_URL, {**payload, 'user_type': 'OWNER'}, format='json', secure=True)
+
+    response = APIClient().post(SOCIAL_LOGIN_URL, {**payload, 'user_type': 'CUSTOMER'}, format='json', secure=True)
+
+    assert response.status_code == 400
+    assert User.objects.get(email=email).user_type == 'OWNER'
+
+  def test_session_records_platform(self, use_stub, fake_redis):
+    """ソーシャルログインのセッションもメールログインと同じく端末の種類を記録する"""
+    email = 'platform-e2e@example.com'
+    payload = {'provider': 'google', 'access_token': StubProviderServer.access_token(email), 'user_type': 'CUSTOMER'}
+
+    with patch('authentication.utils.token_family_registry.get_redis_client', return_value=fake_redis):
+      APIClient().post(SOCIAL_LOGIN_URL, {**payload, 'platform': 'ios'}, format='json', secure=True)
+      APIClient().post(SOCIAL_LOGIN_URL, payload, format='json', secure=True, HTTP_X_PLATFORM='android')
+      sessions = TokenFamilyRegistry().list_sessions(User.objects.get(email=email).pk)
+
+    assert sorted(session['platform'] for session in sessions) == ['android', 'ios']
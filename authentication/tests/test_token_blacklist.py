@@ -0,0 +1,105 @@
+import pytest
+import time
+import uuid
+from unittest.mock import patch
+from django.core.cache import cache
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken, BlacklistedToken
+
+from authentication.tokens import RefreshToken
+from authentication.utils import TokenBlacklist
+from common.utils import BloomFilter
+
+REFRESH_URL = '/api/auth/refresh/'
+
+
+class TestBloomFilter:
+
+  def test_no_false_negatives(self):
+    bloom = BloomFilter(1000, 0.01)
+    items = [uuid.uuid4().hex for _ in range(1000)]
+    for item in items:
+      bloom.add(item)
+
+    assert all(item in bloom for item in items)
+    false_positives = sum(uuid.uuid4().hex in bloom for _ in range(1000))
+    assert false_positives < 50
+
+
+@pytest.mark.django_db
+class TestRedisRefreshToken:
+
+  def test_for_user_does_not_write_outstanding_token(self, customer, django_assert_num_queries):
+    with django_assert_num_queries(0):
+      RefreshToken.for_user(customer)
+
+    assert not OutstandingToken.objects.exists()
+
+  def test_blacklisted_token_is_rejected(self, customer, redis_blacklist):
+    refresh = RefreshToken.for_user(customer)
+    assert refresh.blacklist() is True
+    assert refresh.blacklist() is False
+
+    with pytest.raises(TokenError):
+      RefreshToken(str(refresh))
+    assert redis_blacklist.zscore(TokenBlacklist.LOG_KEY, refresh['jti']) is not None
+
+  def test_unrevoked_token_skips_cache_lookup(self, redis_blacklist):
+    """Bloomフィルタに含まれないjtiはキャッシュを参照しない"""
+    blacklist = TokenBlacklist()
+
+    with patch('authentication.utils.token_blacklist.cache.get') as cache_get:
+      assert blacklist.is_blacklisted(uuid.uuid4().hex) is False
+    cache_get.assert_not_called()
+
+  def test_revocation_from_other_process_is_synced(self, redis_blacklist):
+    """他プロセスでの失効は次回同期でBloomフィルタに反映"""
+    blacklist = TokenBlacklist()
+    jti = uuid.uuid4().hex
+    assert blacklist.is_blacklisted(jti) is False
+
+    # 別プロセスでの失効を再現
+    redis_blacklist.zadd(TokenBlacklist.LOG_KEY, {jti: time.time()})
+    cache.add(f'{TokenBlacklist.KEY_PREFIX}:{jti}', 1, timeout=60)
+    TokenBlacklist._last_sync = 0.0
+
+    assert blacklist.is_blacklisted(jti) is True
+
+  def test_without_redis_falls_back_to_db(self, customer):
+    """Redis未使用時はワーカー間で共有できるDB（BlacklistedToken）に保存する"""
+    with patch('authentication.utils.token_blacklist.get_redis_client', return_value=None):
+      refresh = RefreshToken.for_user(customer)
+      assert refresh.blacklist() is True
+      assert refresh.blacklist() is False
+
+      cache.clear()
+      TokenBlacklist.reset_local()
+      with pytest.raises(TokenError):
+        RefreshToken(str(refresh))
+    assert BlacklistedToken.objects.filter(token__jti=refresh['jti']).exists()
+
+
+@pytest.mark.django_db
+class TestRefreshTokenView:
+
+  def test_refresh_rotates_and_rejects_reuse(self, api_client, customer, redis_blacklist):
+    """ローテーション後の古いトークンは再利用できない"""
+    old_refresh = str(RefreshToken.for_user(customer))
+    api_client.cookies['refresh_token'] = old_refresh
+
+    response = api_client.post(REFRESH_URL, secure=True)
+    assert response.status_code == 200, response.content
+    new_refresh = response.cookies['refresh_token'].value
+    assert new_refresh != old_refresh
+    assert response.cookies['access_token'].value
+
+    api_client.cookies['refresh_token'] = old_refresh
+    response = api_client.post(REFRESH_URL, secure=True)
+    assert response.status_code == 401
+
+    api_client.cookies['refresh_token'] = new_refresh
+    response = api_client.post(REFRESH_URL, secure=True)
+    assert response.status_code == 200
+
+    assert not OutstandingToken.objects.exists()
+    assert not BlacklistedToken.objects.exists()
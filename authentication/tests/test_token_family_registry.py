@@ -0,0 +1,125 @@
+import pytest
+from unittest.mock import patch
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import TokenError
+
+from authentication.tokens import RefreshToken, FAMILY_CLAIM, VERSION_CLAIM
+from authentication.utils import TokenFamilyRegistry
+
+CURRENT_USER_URL = '/api/auth/me/'
+
+
+@pytest.fixture
+def redis_registry(fake_redis):
+  """fakeredisを使うTokenFamilyRegistry/TokenBlacklist"""
+  with patch('authentication.utils.token_family_registry.get_redis_client', return_value=fake_redis), \
+       patch('authentication.utils.token_blacklist.get_redis_client', return_value=fake_redis):
+    yield fake_redis
+
+
+def client_for(refresh):
+  client = APIClient()
+  client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+  return client
+
+
+@pytest.mark.django_db
+class TestTokenFamilyRegistry:
+
+  def test_for_user_registers_family(self, customer, redis_registry):
+    refresh = RefreshToken.for_user(customer, 'ios')
+
+    assert refresh[VERSION_CLAIM] == 0
+    assert refresh.access_token[FAMILY_CLAIM] == refresh[FAMILY_CLAIM]
+    assert redis_registry.sismember(f'auth:families:{customer.pk}:ios', refresh[FAMILY_CLAIM])
+
+    sessions = TokenFamilyRegistry().list_sessions(customer.pk)
+    assert [s['platform'] for s in sessions] == ['ios']
+
+  def test_rotation_keeps_family(self, customer, redis_registry):
+    refresh = RefreshToken.for_user(customer, 'android')
+    family = refresh[FAMILY_CLAIM]
+
+    _, new_refresh = refresh.rotate()
+
+    new_token = RefreshToken(new_refresh)
+    assert new_token[FAMILY_CLAIM] == family
+    assert redis_registry.hget(f'auth:family:{family}', 'jti') == new_token['jti']
+
+  def test_revoked_family_cannot_refresh(self, customer, redis_registry):
+    refresh = RefreshToken.for_user(customer, 'web')
+    TokenFamilyRegistry().revoke(customer.pk, refresh[FAMILY_CLAIM])
+
+    with pytest.raises(TokenError):
+      RefreshToken(str(refresh))
+
+
+@pytest.mark.django_db
+class TestSessionViews:
+
+  def test_list_sessions(self, customer, redis_registry):
+    web = RefreshToken.for_user(customer, 'web')
+    RefreshToken.for_user(customer, 'ios')
+
+    response = client_for(web).get(reverse('session-list'), secure=True)
+
+    assert response.status_code == 200
+    sessions = response.data['sessions']
+    assert sorted(s['platform'] for s in sessions) == ['ios', 'web']
+    assert [s['platform'] for s in sessions if s['is_current']] == ['web']
+
+  def test_logout_revokes_only_current_session(self, customer, redis_registry):
+    web = RefreshToken.for_user(customer, 'web')
+    ios = RefreshToken.for_user(customer, 'ios')
+    client = client_for(web)
+
+    response = client.post(reverse('logout'), secure=True)
+    assert response.status_code == 200
+
+    assert client.get(CURRENT_USER_URL, secure=True).status_code == 401
+    assert client_for(ios).get(CURRENT_USER_URL, secure=True).status_code == 200
+    with pytest.raises(TokenError):
+      RefreshToken(str(web))
+
+  def test_logout_all_revokes_every_token(self, customer, redis_registry):
+    tokens = [RefreshToken.for_user(customer, platform) for platform in ('web', 'ios', 'android')]
+
+    response = client_for(tokens[0]).post(reverse('logout-all'), secure=True)
+    assert response.status_code == 200
+    assert response.data['revoked_sessions'] == 3
+
+    customer.refresh_from_db()
+    assert customer.token_version == 1
+    for refresh in tokens:
+      assert client_for(refresh).get(CURRENT_USER_URL, secure=True).status_code == 401
+      with pytest.raises(TokenError):
+        RefreshToken(str(refresh))
+    assert TokenFamilyRegistry().list_sessions(customer.pk) == []
+
+  def test_logout_without_redis_revokes_presented_refresh_token(self, customer):
+    """Redis未使用でも送られたリフレッシュトークンを失効させる"""
+    web = RefreshToken.for_user(customer, 'web')
+    ios = RefreshToken.for_user(customer, 'ios')
+    client = client_for(web)
+    client.cookies['refresh_token'] = str(web)
+    # 他のセッションのトークンは失効させない
+    client_for(ios).post(reverse('logout'), {'refresh': str(web)}, format='json', secure=True)
+    RefreshToken(str(web))
+
+    assert client.post(reverse('logout'), secure=True).status_code == 200
+
+    with pytest.raises(TokenError):
+      RefreshToken(str(web))
+    RefreshToken(str(ios))
+
+  def test_logout_all_without_redis_uses_token_version(self, customer):
+    """Redis未使用でもtoken_versionで発行済みトークンを無効化"""
+    refresh = RefreshToken.for_user(customer, 'ios')
+    client = client_for(refresh)
+
+    assert client.post(reverse('logout-all'), secure=True).status_code == 200
+
+    assert client.get(CURRENT_USER_URL, secure=True).status_code == 401
+    with pytest.raises(TokenError):
+      RefreshToken(str(refresh)).rotate()
@@ -0,0 +1,79 @@
+import pytest
+from unittest.mock import patch
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from authentication.tokens import RefreshToken
+from authentication.utils import AuthRateLimiter
+
+REFRESH_URLS = ['/api/auth/refresh/', '/api/auth/token/refresh/']
+
+
+@pytest.fixture
+def redis_store(fake_redis):
+  with patch('authentication.utils.token_family_registry.get_redis_client', return_value=fake_redis), \
+       patch('authentication.utils.token_blacklist.get_redis_client', return_value=fake_redis):
+    yield fake_redis
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url', REFRESH_URLS)
+class TestTokenRefresh:
+
+  def test_mobile_refresh_returns_tokens_in_body(self, url, customer, redis_store):
+    refresh = RefreshToken.for_user(customer, 'ios')
+
+    response = APIClient().post(url, {'platform': 'ios', 'refresh_token': str(refresh)}, format='json', secure=True)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body['access'] and body['refresh'] != str(refresh)
+    assert RefreshToken(body['refresh'])['user_id'] == str(customer.pk)
+
+  def test_web_refresh_sets_cookies(self, url, customer, redis_store):
+    refresh = RefreshToken.for_user(customer, 'web')
+    client = APIClient()
+    client.cookies['refresh_token'] = str(refresh)
+
+    response = client.post(url, {'platform': 'web'}, format='json', secure=True)
+
+    assert response.status_code == 200
+    assert 'access' not in response.json()
+    assert response.cookies['access_token'].value
+    assert response.cookies['refresh_token'].value != str(refresh)
+
+  def test_reused_token_is_rejected(self, url, customer, redis_store):
+    refresh = str(RefreshToken.for_user(customer, 'android'))
+    client = APIClient()
+    data = {'platform': 'android', 'refresh': refresh}
+
+    assert client.post(url, data, format='json', secure=True).status_code == 200
+    assert client.post(url, data, format='json', secure=True).status_code == 401
+
+  def test_missing_token_returns_401(self, url, customer):
+    response = APIClient().post(url, {'platform': 'ios'}, format='json', secure=True)
+
+    assert response.status_code == 401
+
+
+@pytest.mark.django_db
+def test_fast_refresh_is_rate_limited(customer):
+  client = APIClient()
+  url = reverse('token-refresh-fast')
+  data = {'platform': 'ios', 'refresh': str(RefreshToken.for_user(customer, 'ios'))}
+
+  with patch.object(AuthRateLimiter, 'TOKEN_REFRESH_LIMIT', 1):
+    assert client.post(url, data, format='json', secure=True).status_code == 200
+    assert client.post(url, data, format='json', secure=True).status_code == 429
+
+
+@pytest.mark.django_db
+def test_fast_refresh_does_not_issue_csrf_cookie(customer, redis_store):
+  """CSRF除外のエンドポイントなのでcsrftokenを発行しない"""
+  client = APIClient()
+  client.cookies['refresh_token'] = str(RefreshToken.for_user(customer, 'web'))
+
+  response = client.post(reverse('token-refresh-fast'), {'platform': 'web'}, format='json', secure=True)
+
+  assert response.status_code == 200
+  assert 'csrftoken' not in response.cookies
@@ -0,0 +1,54 @@
+import pytest
+from unittest.mock import patch
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.tokens import AccessToken
+
+from authentication.authentication import CookieJWTAuthentication
+from authentication.utils import TokenBlacklist, VerifiedTokenCache
+
+
+@pytest.fixture
+def access_token(customer):
+  return AccessToken.for_user(customer)
+
+
+class TestVerifiedTokenCache:
+
+  def test_repeated_validation_uses_cache(self, access_token):
+    """同じトークンの2回目以降は署名検証を行わない"""
+    raw_token = str(access_token).encode()
+    auth = CookieJWTAuthentication()
+
+    original = JWTAuthentication.get_validated_token
+    with patch.object(JWTAuthentication, 'get_validated_token', autospec=True, side_effect=original) as base:
+      first = auth.get_validated_token(raw_token)
+      second = auth.get_validated_token(raw_token)
+
+    assert base.call_count == 1
+    assert second['jti'] == first['jti']
+
+  def test_str_and_bytes_share_entry(self, access_token):
+    auth = CookieJWTAuthentication()
+    validated = auth.get_validated_token(str(access_token).encode())
+
+    assert VerifiedTokenCache.get(str(access_token)) is validated
+
+  def test_revoked_token_is_rejected_even_if_cached(self, access_token):
+    """キャッシュ済みでも失効したトークンは拒否"""
+    auth = CookieJWTAuthentication()
+    raw_token = str(access_token)
+    auth.get_validated_token(raw_token)
+
+    TokenBlacklist().add(access_token['jti'], access_token['exp'])
+
+    with pytest.raises(InvalidToken):
+      auth.get_validated_token(raw_token)
+    assert VerifiedTokenCache.get(raw_token) is None
+
+  def test_invalid_token_is_not_cached(self):
+    auth = CookieJWTAuthentication()
+
+    with pytest.raises(InvalidToken):
+      auth.get_validated_token(b'invalid.token.value')
+    assert VerifiedTokenCache.get(b'invalid.token.value') is None
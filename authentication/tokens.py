@@ -0,0 +1,111 @@
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken as BaseRefreshToken, Token
+from authentication.utils.token_blacklist import TokenBlacklist
+from authentication.utils.token_family_registry import TokenFamilyRegistry
+from authentication.utils.user_cache import CachedUserResolver
+from permissions.utils import AuthzClaims
+
+# ログインセッション（トークンファミリー）ID。ローテーション後も引き継ぐ
+FAMILY_CLAIM = 'fam'
+# User.token_versionの発行時点の値。一致しないトークンは無効
+VERSION_CLAIM = 'ver'
+
+
+class RefreshToken(BaseRefreshToken):
+  """
+  Redisの失効リスト（TokenBlacklist）を使うリフレッシュトークン
+  発行・失効時にOutstandingToken/BlacklistedTokenへは書き込まない
+  """
+
+  def __init__(self, token=None, verify=True, check_blacklist=True):
+    # ローテーション時はblacklist()のSETNXで使用済みを検出するため、事前のチェックを省略できる
+    self._check_blacklist_on_verify = check_blacklist
+    super().__init__(token, verify)
+
+  def verify(self, *args, **kwargs):
+    if self._check_blacklist_on_verify:
+      self.check_blacklist()
+    Token.verify(self, *args, **kwargs)
+
+  def check_blacklist(self):
+    if TokenBlacklist().is_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+      raise TokenError(_('Token is blacklisted'))
+
+  def blacklist(self):
+    """
+    Returns: 新たに失効させた場合True, 既に失効済みならFalse
+    """
+    return TokenBlacklist().add(self.payload[api_settings.JTI_CLAIM], self.payload['exp'])
+
+  @classmethod
+  def for_user(cls, user, platform=None):
+    """トークンを発行し、新しいファミリーとしてレジストリに登録"""
+    token = Token.for_user.__func__(cls, user)
+    token[FAMILY_CLAIM] = uuid.uuid4().hex
+    token[VERSION_CLAIM] = user.token_version
+    AuthzClaims.embed(token, user)
+
+    TokenFamilyRegistry().register(
+      user.pk, token[FAMILY_CLAIM], platform, token[api_settings.JTI_CLAIM], token['exp']
+    )
+    return token
+
+  def check_session(self):
+    """
+    ユーザーの状態とファミリーが有効かチェック
+    Returns: User
+    Raises: TokenError
+    """
+    User = get_user_model()
+    try:
+      user = CachedUserResolver.get_user(self.payload[api_settings.USER_ID_CLAIM])
+    except (KeyError, User.DoesNotExist):
+      raise TokenError(_('User not found'))
+
+    if not user.is_active:
+      raise TokenError(_('User is inactive'))
+
+    if self.payload.get(VERSION_CLAIM, 0) != user.token_version:
+      raise TokenError(_('Token has been revoked'))
+
+    family = self.payload.get(FAMILY_CLAIM)
+    if family and TokenFamilyRegistry().is_active(family) is False:
+      raise TokenError(_('Token has been revoked'))
+
+    return user
+
+  def rotate(self):
+    """
+    アクセストークンを発行し、設定に応じてリフレッシュトークンをローテーション
+    失効はSETNXで行うため、同じトークンでの同時リフレッシュは1回のみ成功する
+    Returns: (access_token, refresh_token)
+    Raises: TokenError
+    """
+    user = self.check_session()
+
+    if api_settings.ROTATE_REFRESH_TOKENS and api_settings.BLACKLIST_AFTER_ROTATION and not self.blacklist():
+      raise TokenError(_('Token is blacklisted'))
+
+    # 権限情報が古ければ最新の内容で埋め込み直す
+    if AuthzClaims.is_stale(self, user):
+      AuthzClaims.embed(self, user)
+
+    if not api_settings.ROTATE_REFRESH_TOKENS:
+      return str(self.access_token), str(self)
+
+    access_token = str(self.access_token)
+
+    self.set_jti()
+    self.set_exp()
+    self.set_iat()
+
+    family = self.payload.get(FAMILY_CLAIM)
+    if family:
+      TokenFamilyRegistry().rotate(family, self.payload[api_settings.JTI_CLAIM], self.payload['exp'])
+
+    return access_token, str(self)
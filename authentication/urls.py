@@ -4,21 +4,40 @@ from authentication.views import (
   CustomerLoginView,
   StaffOwnerLoginView,
   RefreshTokenView,
+  TokenRefreshView,
+  AsyncCustomerLoginView,
+  AsyncStaffOwnerLoginView,
+  AsyncOwnerRegisterView,
+  AsyncVerifyEmailView,
+  SocialLoginAPIView,
   OwnerRegisterView, 
   CustomerRegisterView, 
   VerifyEmailView,
   ResendVerificationEmailView,
-  ChangePendingEmailView
+  ChangePendingEmailView,
+  SessionListView,
+  LogoutView,
+  LogoutAllView
 )
 
 urlpatterns = [
   path('me/', CurrentUserView.as_view(), name='current-user'),
-  path('refresh/', RefreshTokenView.as_view(), name='current-user'),
+  path('refresh/', RefreshTokenView.as_view(), name='token-refresh'),
+  path('token/refresh/', TokenRefreshView.as_view(), name='token-refresh-fast'),
   path('login/', CustomerLoginView.as_view(), name='customer-login'),
   path('business_login/', StaffOwnerLoginView.as_view(), name='business-login'),
+  path('logout/', LogoutView.as_view(), name='logout'),
+  path('logout/all/', LogoutAllView.as_view(), name='logout-all'),
+  path('sessions/', SessionListView.as_view(), name='session-list'),
   path('register/', CustomerRegisterView.as_view(), name='customer-register'),
   path('business_register/', OwnerRegisterView.as_view(), name='business-register'),
+  path('social/login/', SocialLoginAPIView.as_view(), name='social-login'),
   path('email/verify/', VerifyEmailView.as_view(), name='email-verify'),
   path('email/verify/resend/', ResendVerificationEmailView.as_view(), name='email-verify-resend'),
-  path('email/verify/change/', ChangePendingEmailView.as_view(), name='email-verify-change')
+  path('email/verify/change/', ChangePendingEmailView.as_view(), name='email-verify-change'),
+  # ASGI用の非同期版
+  path('async/login/', AsyncCustomerLoginView.as_view(), name='async-customer-login'),
+  path('async/business_login/', AsyncStaffOwnerLoginView.as_view(), name='async-business-login'),
+  path('async/business_register/', AsyncOwnerRegisterView.as_view(), name='async-business-register'),
+  path('async/email/verify/', AsyncVerifyEmailView.as_view(), name='async-email-verify'),
 ]
\ No newline at end of file
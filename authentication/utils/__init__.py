@@ -1,7 +1,22 @@
 from .auth_rate_limiter import AuthRateLimiter
 from .email_validator import DisposableEmailChecker
+from .user_cache import CachedUserResolver
+from .token_blacklist import TokenBlacklist
+from .verified_token_cache import VerifiedTokenCache
+from .token_family_registry import TokenFamilyRegistry
+from .id_token_verifier import GoogleIDTokenVerifier, LineIDTokenVerifier
+from .social_stub import is_social_stub_allowed, get_social_stub_url, check_social_stub_settings
 
 __all__ = [
   'AuthRateLimiter',
   'DisposableEmailChecker',
-]
\ No newline at end of file
+  'CachedUserResolver',
+  'TokenBlacklist',
+  'VerifiedTokenCache',
+  'TokenFamilyRegistry',
+  'GoogleIDTokenVerifier',
+  'LineIDTokenVerifier',
+  'is_social_stub_allowed',
+  'get_social_stub_url',
+  'check_social_stub_settings',
+]
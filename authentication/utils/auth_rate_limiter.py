@@ -11,6 +11,9 @@ class AuthRateLimiter:
   
   EMAIL_RESEND_LIMIT = 5
   EMAIL_RESEND_PERIOD = 3600
+
+  TOKEN_REFRESH_LIMIT = 100
+  TOKEN_REFRESH_PERIOD = 3600
   
   def __init__(self):
     self.rate_limiter = RateLimiter()
@@ -26,6 +29,15 @@ class AuthRateLimiter:
       self.REGISTER_LIMIT, 
       self.REGISTER_PERIOD
     )
+
+  async def acheck_register_limit(self, identifier):
+    key = self._get_register_key(identifier)
+    return await self.rate_limiter.acheck_rate_limit(
+      key,
+      self.REGISTER_LIMIT,
+      self.REGISTER_PERIOD
+    )
+
   def get_register_remaining(self, identifier):
     key = self._get_register_key(identifier)
     return self.rate_limiter.get_remaining(key, self.REGISTER_LIMIT)
@@ -34,6 +46,10 @@ class AuthRateLimiter:
     key = self._get_register_key(identifier)
     return self.rate_limiter.get_reset_time(key)
   
+  async def aget_register_reset_time(self, identifier):
+    key = self._get_register_key(identifier)
+    return await self.rate_limiter.aget_reset_time(key)
+
   def _get_register_key(self, identifier):
     return f"auth:register:{identifier}"
   
@@ -48,6 +64,14 @@ class AuthRateLimiter:
       self.LOGIN_LIMIT, 
       self.LOGIN_PERIOD
     )
+
+  async def acheck_login_limit(self, identifier):
+    key = self._get_login_key(identifier)
+    return await self.rate_limiter.acheck_rate_limit(
+      key,
+      self.LOGIN_LIMIT,
+      self.LOGIN_PERIOD
+    )
   
   def get_login_remaining(self, identifier):
     key = self._get_login_key(identifier)
@@ -57,6 +81,10 @@ class AuthRateLimiter:
     key = self._get_login_key(identifier)
     return self.rate_limiter.get_reset_time(key)
   
+  async def aget_login_reset_time(self, identifier):
+    key = self._get_login_key(identifier)
+    return await self.rate_limiter.aget_reset_time(key)
+
   def _get_login_key(self, identifier):
     return f"auth:login:{identifier}"
   
@@ -64,7 +92,7 @@ class AuthRateLimiter:
   # メール再送信
   # ========================================
   def check_email_resend_limit(self, identifier):
-    key = f"auth:email_resend:{identifier}"
+    key = self._get_email_resend_key(identifier)
     return self.rate_limiter.check_rate_limit(
       key, 
       self.EMAIL_RESEND_LIMIT, 
@@ -80,3 +108,17 @@ class AuthRateLimiter:
 
   def _get_email_resend_key(self, identifier):
     return f"auth:email_resend:{identifier}"
+
+  # ========================================
+  # トークンリフレッシュ
+  # ========================================
+  def check_token_refresh_limit(self, identifier):
+    key = self._get_token_refresh_key(identifier)
+    return self.rate_limiter.check_rate_limit(
+      key,
+      self.TOKEN_REFRESH_LIMIT,
+      self.TOKEN_REFRESH_PERIOD
+    )
+
+  def _get_token_refresh_key(self, identifier):
+    return f"auth:token_refresh:{identifier}"
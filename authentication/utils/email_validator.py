@@ -1,15 +1,30 @@
+import asyncio
+import weakref
+from concurrent.futures import ThreadPoolExecutor, wait
+import httpx
 import requests
 from pathlib import Path
 from django.core.cache import cache
 from django.conf import settings
+from common.utils import HTTPClient, get_redis_client, get_async_redis_client
 import logging
 
 logger = logging.getLogger('django')
 
 
 class DisposableEmailChecker:
+
+  API_URL = 'https://open.kickbox.com/v1/disposable/{domain}'
+  API_TIMEOUT = 2
+  CACHE_TIMEOUT = 2592000
+  # 一括判定（disposable_domains）でAPIを待つ時間の合計（超えたドメインは使い捨てでないとみなす）
+  BULK_API_BUDGET = 5
   
   _disposable_domains = None
+  # 一括判定でAPIを並行して呼ぶスレッド
+  _executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='kickbox')
+  # イベントループ → httpx.AsyncClient（接続を使い回す）
+  _async_http_clients = weakref.WeakKeyDictionary()
   
   @classmethod
   def _load_disposable_domains(cls):
@@ -50,38 +65,144 @@ class DisposableEmailChecker:
 
   @classmethod
   def is_disposable(cls, email):
-    if not email or '@' not in email:
+    domain = cls._get_domain(email)
+    if domain is None:
       return False
-    
-    domain = email.split('@')[-1].lower()
-    
-    disposable_domains = cls._load_disposable_domains()
 
-    if domain in disposable_domains:
-      logger.info(f"Disposable email detected (local): {domain}")
+    if cls._is_locally_disposable(domain):
       return True
-    
-    cache_key = f"disposable:{domain}"
-    cached_result = cache.get(cache_key)
+
+    cached_result = cls._get_cached(domain)
     if cached_result is not None:
       return cached_result
-    
-    use_api = getattr(settings, 'USE_DISPOSABLE_EMAIL_API', True)
-    if use_api:
-      is_disposable = cls._check_with_api(domain)
-      cache.set(cache_key, is_disposable, 2592000)
-      return is_disposable
-  
-    cache.set(cache_key, False, 2592000)
+
+    is_disposable = cls._check_with_api(domain) if cls._use_api() else False
+    cls._set_cached(domain, is_disposable)
+    return is_disposable
+
+  @classmethod
+  async def ais_disposable(cls, email):
+    """is_disposableの非同期版（redis.asyncio・httpxを使い、スレッドを使わない）"""
+    domain = cls._get_domain(email)
+    if domain is None:
+      return False
+
+    if cls._is_locally_disposable(domain):
+      return True
+
+    cached_result = await cls._aget_cached(domain)
+    if cached_result is not None:
+      return cached_result
+
+    is_disposable = await cls._acheck_with_api(domain) if cls._use_api() else False
+    await cls._aset_cached(domain, is_disposable)
+    return is_disposable
+
+  @classmethod
+  def disposable_domains(cls, emails):
+    """
+    複数のメールアドレスをまとめて判定（一括登録用）
+    ドメインごとに1回だけ判定し、キャッシュはまとめて取得する（Redisでは1回のMGET）
+    キャッシュにないドメインはAPIを並行して呼び、全体でBULK_API_BUDGET秒まで待つ
+    Returns: 使い捨てと判定したドメインのset
+    """
+    domains = {domain for domain in map(cls._get_domain, emails) if domain}
+    disposable = domains & cls._load_disposable_domains()
+    remaining = sorted(domains - disposable)
+    if not remaining:
+      return disposable
+
+    cached = cls._get_cached_many(remaining)
+    unknown = [domain for domain in remaining if cached.get(domain) is None]
+    if cls._use_api():
+      cached.update(cls._check_many_with_api(unknown))
+    else:
+      for domain in unknown:
+        cls._set_cached(domain, False)
+
+    disposable.update(domain for domain in remaining if cached.get(domain))
+    return disposable
+
+  @staticmethod
+  def _get_domain(email):
+    if not email or '@' not in email:
+      return None
+    return email.split('@')[-1].lower()
+
+  @classmethod
+  def _is_locally_disposable(cls, domain):
+    if domain in cls._load_disposable_domains():
+      logger.info(f"Disposable email detected (local): {domain}")
+      return True
     return False
-  
-  
+
+  @staticmethod
+  def _use_api():
+    return getattr(settings, 'USE_DISPOSABLE_EMAIL_API', True)
+
+  # ========================================
+  # 判定結果のキャッシュ
+  # 同期・非同期で同じキー（cache.make_key）に "1"/"0" で保存する
+  # ========================================
+
+  @classmethod
+  def _get_cached(cls, domain):
+    client = get_redis_client()
+    if client is None:
+      return cache.get(cls._cache_key(domain))
+    return cls._decode(client.get(cache.make_key(cls._cache_key(domain))))
+
+  @classmethod
+  def _set_cached(cls, domain, is_disposable):
+    client = get_redis_client()
+    if client is None:
+      cache.set(cls._cache_key(domain), is_disposable, cls.CACHE_TIMEOUT)
+      return
+    client.set(cache.make_key(cls._cache_key(domain)), int(is_disposable), ex=cls.CACHE_TIMEOUT)
+
+  @classmethod
+  def _get_cached_many(cls, domains):
+    """Returns: {ドメイン: 判定結果}（キャッシュにないドメインは含まないかNone）"""
+    client = get_redis_client()
+    if client is None:
+      keys = {cls._cache_key(domain): domain for domain in domains}
+      return {keys[key]: value for key, value in cache.get_many(list(keys)).items()}
+    values = client.mget([cache.make_key(cls._cache_key(domain)) for domain in domains])
+    return {domain: cls._decode(value) for domain, value in zip(domains, values)}
+
+  @classmethod
+  async def _aget_cached(cls, domain):
+    client = get_async_redis_client()
+    if client is None:
+      return await cache.aget(cls._cache_key(domain))
+    return cls._decode(await client.get(cache.make_key(cls._cache_key(domain))))
+
+  @classmethod
+  async def _aset_cached(cls, domain, is_disposable):
+    client = get_async_redis_client()
+    if client is None:
+      await cache.aset(cls._cache_key(domain), is_disposable, cls.CACHE_TIMEOUT)
+      return
+    await client.set(cache.make_key(cls._cache_key(domain)), int(is_disposable), ex=cls.CACHE_TIMEOUT)
+
+  @staticmethod
+  def _cache_key(domain):
+    return f"disposable:{domain}"
+
+  @staticmethod
+  def _decode(value):
+    return None if value is None else bool(int(value))
+
+  # ========================================
+  # Kickbox API
+  # ========================================
+
   @classmethod
   def _check_with_api(cls, domain):
     try:
       response = requests.get(
-        f'https://open.kickbox.com/v1/disposable/{domain}',
-        timeout=2
+        cls.API_URL.format(domain=domain),
+        timeout=cls.API_TIMEOUT
       )
       
       if response.status_code == 200:
@@ -102,4 +223,96 @@ class DisposableEmailChecker:
       return False
     except Exception as e:
       logger.error(f"Kickbox API error: {str(e)}")
-      return False
\ No newline at end of file
+      return False
+
+  @classmethod
+  def _check_many_with_api(cls, domains):
+    """
+    複数のドメインをプール済みの接続（HTTPClient）で並行して判定し、結果をキャッシュする
+    Returns: {ドメイン: 判定結果}（BULK_API_BUDGET秒以内に判定できなかったドメインは含まない）
+    """
+    if not domains:
+      return {}
+
+    futures = {cls._executor.submit(cls._check_with_pooled_api, domain): domain for domain in domains}
+    done, not_done = wait(futures, timeout=cls.BULK_API_BUDGET)
+    for future in not_done:
+      # 実行中のものは完了後にキャッシュされ、次回の判定で使われる
+      future.cancel()
+    if not_done:
+      logger.warning(f"Kickbox API did not answer for {len(not_done)} domains within {cls.BULK_API_BUDGET}s")
+
+    results = {}
+    for future in done:
+      domain = futures[future]
+      try:
+        is_disposable = future.result()
+      except Exception as e:
+        # 1ドメインの失敗（不正なレスポンス・キャッシュの障害等）で全体を止めず、判定不能として扱う
+        logger.error(f"Kickbox API check failed for domain {domain}: {str(e)}")
+        continue
+      if is_disposable is not None:
+        results[domain] = is_disposable
+    return results
+
+  @classmethod
+  def _check_with_pooled_api(cls, domain):
+    """Returns: 判定結果（APIが失敗した場合はNone, キャッシュしない）"""
+    try:
+      response = HTTPClient.for_service('kickbox').get(
+        cls.API_URL.format(domain=domain),
+        timeout=cls.API_TIMEOUT
+      )
+    except requests.exceptions.RequestException as e:
+      logger.warning(f"Kickbox API error for domain {domain}: {str(e)}")
+      return None
+
+    if response.status_code != 200:
+      logger.warning(f"Kickbox API returned status {response.status_code}")
+      return None
+
+    try:
+      is_disposable = bool(response.json().get('disposable', False))
+    except ValueError:
+      logger.warning(f"Kickbox API returned an invalid response for domain {domain}")
+      return None
+    if is_disposable:
+      logger.info(f"Disposable email detected (API): {domain}")
+    cls._set_cached(domain, is_disposable)
+    return is_disposable
+
+  @classmethod
+  async def _acheck_with_api(cls, domain):
+    """_check_with_apiの非同期版"""
+    try:
+      response = await cls._get_async_http_client().get(
+        cls.API_URL.format(domain=domain),
+        timeout=cls.API_TIMEOUT
+      )
+
+      if response.status_code == 200:
+        is_disposable = response.json().get('disposable', False)
+
+        if is_disposable:
+          logger.info(f"Disposable email detected (API): {domain}")
+
+        return is_disposable
+      else:
+        logger.warning(f"Kickbox API returned status {response.status_code}")
+        return False
+
+    except httpx.TimeoutException:
+      logger.warning(f"Kickbox API timeout for domain: {domain}")
+      return False
+    except Exception as e:
+      logger.error(f"Kickbox API error: {str(e)}")
+      return False
+
+  @classmethod
+  def _get_async_http_client(cls):
+    loop = asyncio.get_running_loop()
+    client = cls._async_http_clients.get(loop)
+    if client is None:
+      client = httpx.AsyncClient()
+      cls._async_http_clients[loop] = client
+    return client
@@ -0,0 +1,225 @@
+import re
+import threading
+import time
+import logging
+
+import jwt
+import requests
+from django.conf import settings
+from django.core.cache import cache
+
+from common.utils import HTTPClient
+from .social_stub import get_social_stub_url
+
+logger = logging.getLogger(__name__)
+
+
+class IDTokenVerifier:
+  """
+  OpenID ConnectのIDトークンをローカルで検証（プロバイダーへの問い合わせが不要）
+  署名鍵（JWKS）はCache-Controlのmax-ageに従ってプロセス内とキャッシュ（Redis）に保持し、
+  期限が近づいたらバックグラウンドで更新する（ログイン処理中は外部へリクエストしない）
+  プロセス起動直後・期限切れ・未知のkid（鍵のローテーション）の場合のみ同期的に取得する
+  プロバイダーごとにサブクラスでJWKS_URL・ISSUERS・ALGORITHMS・get_client_idsを定義する
+  """
+
+  PROVIDER = None
+  JWKS_URL = None
+  ISSUERS = ()
+  ALGORITHMS = ['RS256']
+  LEEWAY = 30
+  REQUIRED_CLAIMS = ['exp', 'iat', 'iss', 'aud', 'sub']
+
+  DEFAULT_MAX_AGE = 3600
+  # 期限のこの秒数前からバックグラウンドで更新
+  REFRESH_BEFORE = 300
+  # 未知のkidによる再取得の最小間隔（不正なトークンで何度も取得させない）
+  MIN_REFETCH_INTERVAL = 60
+
+  def __init_subclass__(cls, **kwargs):
+    super().__init_subclass__(**kwargs)
+    # 鍵・ロックはプロバイダーごとに持つ
+    cls._keys = {}
+    cls._expires_at = 0
+    cls._fetched_at = 0
+    cls._lock = threading.Lock()
+    cls._refreshing = threading.Lock()
+
+  @classmethod
+  def verify(cls, id_token):
+    """
+    Returns: 検証済みのクレーム
+    Raises: jwt.exceptions.PyJWTError, requests.exceptions.RequestException
+    """
+    key, algorithms = cls.get_verification_key(jwt.get_unverified_header(id_token))
+
+    return jwt.decode(
+      id_token,
+      key,
+      algorithms=algorithms,
+      audience=cls.get_client_ids(),
+      issuer=cls.ISSUERS,
+      leeway=cls.LEEWAY,
+      options={'require': cls.REQUIRED_CLAIMS},
+    )
+
+  @classmethod
+  def get_verification_key(cls, header):
+    """
+    Returns: (検証に使う鍵, 許可するアルゴリズム)
+    Raises: jwt.exceptions.InvalidKeyError
+    """
+    key = cls.get_key(header.get('kid'))
+    if key is None:
+      raise jwt.exceptions.InvalidKeyError('Unknown signing key')
+    return key, cls.ALGORITHMS
+
+  @classmethod
+  def get_client_ids(cls):
+    raise NotImplementedError
+
+  @classmethod
+  def get_jwks_url(cls):
+    stub_url = get_social_stub_url()
+    if stub_url:
+      return f'{stub_url}/{cls.PROVIDER}/certs'
+    return cls.JWKS_URL
+
+  @classmethod
+  def get_key(cls, kid):
+    """kidに対応する公開鍵（見つからなければNone）"""
+    now = time.time()
+    if not cls._keys or now >= cls._expires_at:
+      cls._load(now)
+    elif cls._expires_at - now <= cls.REFRESH_BEFORE:
+      cls._refresh_in_background()
+
+    key = cls._keys.get(kid)
+    if key is None and now - cls._fetched_at >= cls.MIN_REFETCH_INTERVAL:
+      cls._fetch()
+      key = cls._keys.get(kid)
+    return key
+
+  @classmethod
+  def clear(cls):
+    with cls._lock:
+      cls._keys = {}
+      cls._expires_at = 0
+      cls._fetched_at = 0
+
+  @classmethod
+  def _cache_key(cls):
+    return f'jwks:{cls.PROVIDER}'
+
+  @classmethod
+  def _load(cls, now):
+    """キャッシュ（他のプロセスが取得済み）から読み込み、なければプロバイダーから取得"""
+    cached = cache.get(cls._cache_key())
+    if cached and cached['expires_at'] > now:
+      cls._set_keys(cached['jwks'], cached['expires_at'])
+      return
+
+    try:
+      cls._fetch()
+    except requests.exceptions.RequestException:
+      # 取得できなければ期限切れの鍵で検証を続ける（鍵は期限後もしばらく有効）
+      if not cls._keys:
+        raise
+      logger.warning(f"Failed to refresh {cls.PROVIDER} JWKS, using stale keys", exc_info=True)
+
+  @classmethod
+  def _fetch(cls):
+    response = HTTPClient.for_service(cls.PROVIDER).get(cls.get_jwks_url())
+    response.raise_for_status()
+    jwks = response.json()
+
+    now = time.time()
+    expires_at = now + cls._get_max_age(response.headers.get('Cache-Control', ''))
+    cls._set_keys(jwks, expires_at, fetched_at=now)
+    cache.set(cls._cache_key(), {'jwks': jwks, 'expires_at': expires_at}, timeout=int(expires_at - now))
+
+  @classmethod
+  def _set_keys(cls, jwks, expires_at, fetched_at=None):
+    keys = {}
+    for jwk in jwks.get('keys', []):
+      try:
+        keys[jwk['kid']] = jwt.PyJWK(jwk).key
+      except (KeyError, jwt.exceptions.PyJWKError):
+        logger.warning(f"Skipping invalid {cls.PROVIDER} JWK: {jwk.get('kid')}")
+
+    with cls._lock:
+      cls._keys = keys
+      cls._expires_at = expires_at
+      if fetched_at is not None:
+        cls._fetched_at = fetched_at
+
+  @classmethod
+  def _refresh_in_background(cls):
+    # 同時に1つだけ更新する
+    if not cls._refreshing.acquire(blocking=False):
+      return
+
+    def refresh():
+      try:
+        cls._fetch()
+      except Exception:
+        logger.warning(f"Failed to refresh {cls.PROVIDER} JWKS in background", exc_info=True)
+      finally:
+        cls._refreshing.release()
+
+    threading.Thread(target=refresh, name=f'{cls.PROVIDER}-jwks-refresh', daemon=True).start()
+
+  @classmethod
+  def _get_max_age(cls, cache_control):
+    match = re.search(r'max-age=(\d+)', cache_control)
+    if not match:
+      return cls.DEFAULT_MAX_AGE
+    return max(int(match.group(1)), cls.MIN_REFETCH_INTERVAL)
+
+
+class GoogleIDTokenVerifier(IDTokenVerifier):
+  """GoogleのIDトークン（RS256）"""
+
+  PROVIDER = 'google'
+  JWKS_URL = 'https://www.googleapis.com/oauth2/v3/certs'
+  ISSUERS = ('accounts.google.com', 'https://accounts.google.com')
+
+  @classmethod
+  def get_client_ids(cls):
+    client_ids = [
+      client_id for client_id in (
+        settings.GOOGLE_OAUTH2_CLIENT_ID,
+        settings.GOOGLE_IOS_CLIENT_ID,
+        settings.GOOGLE_ANDROID_CLIENT_ID,
+      ) if client_id
+    ]
+    if not client_ids:
+      raise jwt.exceptions.InvalidAudienceError('Google client ID is not configured')
+    return client_ids
+
+
+class LineIDTokenVerifier(IDTokenVerifier):
+  """
+  LINEのIDトークン
+  ES256: JWKSの公開鍵で検証（ネイティブアプリ）
+  HS256: チャネルシークレットで検証（Webログイン, 外部への問い合わせなし）
+  """
+
+  PROVIDER = 'line'
+  JWKS_URL = 'https://api.line.me/oauth2/v2.1/certs'
+  ISSUERS = ('https://access.line.me',)
+  ALGORITHMS = ['ES256']
+
+  @classmethod
+  def get_verification_key(cls, header):
+    if header.get('alg') == 'HS256':
+      if not settings.LINE_CHANNEL_SECRET:
+        raise jwt.exceptions.InvalidKeyError('LINE channel secret is not configured')
+      return settings.LINE_CHANNEL_SECRET, ['HS256']
+    return super().get_verification_key(header)
+
+  @classmethod
+  def get_client_ids(cls):
+    if not settings.LINE_CHANNEL_ID:
+      raise jwt.exceptions.InvalidAudienceError('LINE channel ID is not configured')
+    return [settings.LINE_CHANNEL_ID]
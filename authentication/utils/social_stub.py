@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+
+def is_social_stub_allowed():
+  """
+  スタブプロバイダーを使えるか
+  DEBUG、またはテスト・負荷試験用の設定ファイルでSOCIAL_PROVIDER_STUB_ALLOWED = Trueにした場合のみ
+  （スタブは"stub:<email>"のトークンで任意のメールアドレスのログインを通すため、本番では使わない）
+  """
+  return settings.DEBUG or getattr(settings, 'SOCIAL_PROVIDER_STUB_ALLOWED', False)
+
+
+def get_social_stub_url():
+  """スタブプロバイダーのURL（使わない場合は空文字）"""
+  if not is_social_stub_allowed():
+    return ''
+  return settings.SOCIAL_PROVIDER_STUB_URL.rstrip('/')
+
+
+def check_social_stub_settings():
+  """
+  起動時のチェック（AuthenticationConfig.ready）
+  Raises: ImproperlyConfigured（許可されていない環境でSOCIAL_PROVIDER_STUB_URLが設定されている）
+  """
+  if settings.SOCIAL_PROVIDER_STUB_URL and not is_social_stub_allowed():
+    raise ImproperlyConfigured(
+      'SOCIAL_PROVIDER_STUB_URL can only be set when DEBUG or SOCIAL_PROVIDER_STUB_ALLOWED is enabled'
+    )
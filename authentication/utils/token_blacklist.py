@@ -0,0 +1,203 @@
+import logging
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from rest_framework_simplejwt.settings import api_settings
+from common.utils.bloom_filter import BloomFilter
+from common.utils.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBlacklist:
+  """
+  jtiによるトークン失効リスト（OutstandingToken/BlacklistedTokenテーブルの代替）
+  失効エントリはトークンの有効期限までのTTLで保持し、期限後は自動で消える
+  プロセス内のBloomフィルタを定期同期し、未失効トークンのキャッシュ参照を省略する
+  Redisを使わない環境（LocMem・ダミーキャッシュ）ではワーカー間で共有できず再起動で消えるため、
+  simplejwtのBlacklistedTokenテーブルに保存する（期限切れの行はflushexpiredtokensで削除）
+  """
+
+  KEY_PREFIX = 'auth:blacklist'
+  # 失効ログ（member: jti, score: 失効時刻）。Bloomフィルタの差分同期に使用
+  LOG_KEY = 'auth:blacklist:log'
+
+  SYNC_INTERVAL = 5
+  REBUILD_INTERVAL = 3600
+  CLOCK_SKEW = 5
+
+  BLOOM_CAPACITY = 1_000_000
+  BLOOM_ERROR_RATE = 0.001
+
+  _bloom = None
+  _bloom_lock = threading.Lock()
+  _bloom_built_at = 0.0
+  _last_sync = 0.0
+  _watermark = 0.0
+
+  def __init__(self, redis_client=None):
+    self._redis_client = redis_client
+
+  @property
+  def redis_client(self):
+    # Bloomフィルタで判定できる場合は接続を取得しない
+    if self._redis_client is None:
+      self._redis_client = get_redis_client()
+    return self._redis_client
+
+  # ========================================
+  # 失効
+  # ========================================
+
+  def add(self, jti, exp):
+    """
+    トークンを失効させる（SETNX）
+    Returns: 新たに失効させた場合True, 既に失効済みならFalse
+    """
+    timeout = int(exp - time.time())
+    if timeout <= 0:
+      # 期限切れのトークンは検証で弾かれるため登録不要
+      return True
+
+    if self.redis_client is None:
+      return self._add_to_db(jti, exp)
+
+    added = cache.add(self._get_key(jti), 1, timeout=timeout)
+
+    with self._bloom_lock:
+      if TokenBlacklist._bloom is not None:
+        TokenBlacklist._bloom.add(jti)
+
+    if added:
+      try:
+        now = time.time()
+        pipe = self.redis_client.pipeline()
+        pipe.zadd(self.LOG_KEY, {jti: now})
+        pipe.zremrangebyscore(self.LOG_KEY, '-inf', now - self._get_retention())
+        pipe.execute()
+      except Exception as e:
+        logger.error(f"Redis error in token blacklist log: {str(e)}")
+
+    return added
+
+  # ========================================
+  # 判定
+  # ========================================
+
+  def is_blacklisted(self, jti):
+    if self._sync_if_due() and not self._might_contain(jti):
+      return False
+    if self.redis_client is None:
+      return self._is_in_db(jti)
+    return cache.get(self._get_key(jti)) is not None
+
+  def _might_contain(self, jti):
+    with self._bloom_lock:
+      return TokenBlacklist._bloom is not None and jti in TokenBlacklist._bloom
+
+  # ========================================
+  # Redis未使用時（DB）
+  # ========================================
+
+  @staticmethod
+  def _add_to_db(jti, exp):
+    """BlacklistedTokenの一意制約（OneToOne）でSETNXと同じく1回のみTrueを返す"""
+    from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+    outstanding, _ = OutstandingToken.objects.get_or_create(
+      jti=jti, defaults={'token': '', 'expires_at': datetime.fromtimestamp(exp, tz=dt_timezone.utc)}
+    )
+    try:
+      with transaction.atomic():
+        BlacklistedToken.objects.create(token=outstanding)
+    except IntegrityError:
+      return False
+    return True
+
+  @staticmethod
+  def _is_in_db(jti):
+    from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+    return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+  # ========================================
+  # Bloomフィルタ同期
+  # ========================================
+
+  def _sync_if_due(self):
+    """
+    必要に応じてBloomフィルタを同期
+    Returns: Bloomフィルタで判定してよい場合True
+    """
+    now = time.monotonic()
+    if TokenBlacklist._bloom is not None and now - TokenBlacklist._last_sync < self.SYNC_INTERVAL:
+      return True
+
+    if self.redis_client is None:
+      # 失効ログを共有できないため、常にDBを参照する
+      return False
+
+    try:
+      if TokenBlacklist._bloom is None or now - TokenBlacklist._bloom_built_at >= self.REBUILD_INTERVAL:
+        self._rebuild()
+      else:
+        self._sync()
+    except Exception as e:
+      logger.error(f"Redis error in token blacklist sync: {str(e)}")
+      return False
+
+    TokenBlacklist._last_sync = now
+    return True
+
+  def _rebuild(self):
+    """期限切れのエントリを落とすため、失効ログから作り直す"""
+    now = time.time()
+    self.redis_client.zremrangebyscore(self.LOG_KEY, '-inf', now - self._get_retention())
+    entries = self.redis_client.zrange(self.LOG_KEY, 0, -1, withscores=True)
+
+    bloom = BloomFilter(max(self.BLOOM_CAPACITY, len(entries)), self.BLOOM_ERROR_RATE)
+    watermark = 0.0
+    for jti, revoked_at in entries:
+      bloom.add(self._to_str(jti))
+      watermark = max(watermark, revoked_at)
+
+    with self._bloom_lock:
+      TokenBlacklist._bloom = bloom
+      TokenBlacklist._bloom_built_at = time.monotonic()
+      TokenBlacklist._watermark = watermark
+
+  def _sync(self):
+    """前回同期以降の失効分を追加（時刻のずれを考慮して少し遡る）"""
+    entries = self.redis_client.zrangebyscore(
+      self.LOG_KEY, TokenBlacklist._watermark - self.CLOCK_SKEW, '+inf', withscores=True
+    )
+
+    with self._bloom_lock:
+      for jti, revoked_at in entries:
+        TokenBlacklist._bloom.add(self._to_str(jti))
+        TokenBlacklist._watermark = max(TokenBlacklist._watermark, revoked_at)
+
+  @classmethod
+  def reset_local(cls):
+    with cls._bloom_lock:
+      cls._bloom = None
+      cls._bloom_built_at = 0.0
+      cls._last_sync = 0.0
+      cls._watermark = 0.0
+
+  # ========================================
+  # ヘルパー
+  # ========================================
+
+  @classmethod
+  def _get_key(cls, jti):
+    return f"{cls.KEY_PREFIX}:{jti}"
+
+  @staticmethod
+  def _get_retention():
+    return api_settings.REFRESH_TOKEN_LIFETIME.total_seconds()
+
+  @staticmethod
+  def _to_str(value):
+    return value.decode() if isinstance(value, bytes) else str(value)
@@ -0,0 +1,259 @@
+from datetime import datetime, timezone as dt_timezone
+import logging
+import time
+
+from rest_framework_simplejwt.settings import api_settings
+from common.utils.redis_client import get_redis_client
+from authentication.utils.token_blacklist import TokenBlacklist
+
+logger = logging.getLogger(__name__)
+
+
+class TokenFamilyRegistry:
+  """
+  トークンファミリー（ログインセッション）のレジストリ
+  ログインごとに発行したファミリーIDをユーザー・プラットフォーム別のRedisセットで管理し、
+  ファミリーごとに現在のリフレッシュトークン（jti）を保持する
+  全端末からのログアウトは端末数に比例するO(devices)の操作
+  Redisを使わない環境では何も記録しない（本番はsettings.CACHESでRedisを使う）
+    ログアウト: SessionService.logoutがクライアントのリフレッシュトークンを直接失効させる
+    全端末からのログアウト: User.token_versionの更新で発行済みのトークンを無効にする
+  """
+
+  PLATFORMS = ('web', 'ios', 'android', 'unknown')
+
+  USER_KEY = 'auth:families:{user_id}:{platform}'
+  FAMILY_KEY = 'auth:family:{family}'
+
+  def __init__(self, redis_client=None):
+    self.redis_client = redis_client if redis_client is not None else get_redis_client()
+
+  @property
+  def is_available(self):
+    return self.redis_client is not None
+
+  # ========================================
+  # 登録・更新
+  # ========================================
+
+  def register(self, user_id, family, platform, jti, exp):
+    """新しいファミリーを登録（ログイン時）"""
+    if self.redis_client is None:
+      return False
+
+    platform = self._normalize_platform(platform)
+    now = time.time()
+    ttl = max(1, int(exp - now))
+    user_key = self._get_user_key(user_id, platform)
+    family_key = self._get_family_key(family)
+
+    try:
+      pipe = self.redis_client.pipeline()
+      pipe.hset(family_key, mapping={
+        'user_id': str(user_id),
+        'platform': platform,
+        'jti': jti,
+        'exp': exp,
+        'created_at': now,
+        'last_used_at': now,
+      })
+      pipe.expire(family_key, ttl)
+      pipe.sadd(user_key, family)
+      # セット内のどのファミリーよりも長く保持する
+      pipe.expire(user_key, self._get_lifetime())
+      pipe.execute()
+      return True
+    except Exception as e:
+      logger.error(f"Redis error in token family registration: {str(e)}")
+      return False
+
+  def rotate(self, family, jti, exp):
+    """ファミリーの現在のリフレッシュトークンを更新（リフレッシュ時）"""
+    if self.redis_client is None:
+      return False
+
+    family_key = self._get_family_key(family)
+    try:
+      user_id, platform = self.redis_client.hmget(family_key, 'user_id', 'platform')
+      if user_id is None:
+        return False
+
+      ttl = max(1, int(exp - time.time()))
+      user_key = self._get_user_key(self._to_str(user_id), self._to_str(platform))
+      pipe = self.redis_client.pipeline()
+      pipe.hset(family_key, mapping={'jti': jti, 'exp': exp, 'last_used_at': time.time()})
+      pipe.expire(family_key, ttl)
+      pipe.expire(user_key, self._get_lifetime())
+      pipe.execute()
+      return True
+    except Exception as e:
+      logger.error(f"Redis error in token family rotation: {str(e)}")
+      return False
+
+  # ========================================
+  # 参照
+  # ========================================
+
+  def is_active(self, family):
+    """
+    ファミリーが有効か
+    Returns: True/False, Redis未使用・障害時はNone（判定不能）
+    """
+    if self.redis_client is None:
+      return None
+
+    try:
+      return bool(self.redis_client.exists(self._get_family_key(family)))
+    except Exception as e:
+      logger.error(f"Redis error in token family lookup: {str(e)}")
+      return None
+
+  def list_sessions(self, user_id):
+    """ユーザーの有効なセッション一覧（期限切れのメンバーはセットから削除）"""
+    if self.redis_client is None:
+      return []
+
+    try:
+      families = self._get_families(user_id)
+      if not families:
+        return []
+
+      pipe = self.redis_client.pipeline()
+      for _, family in families:
+        pipe.hgetall(self._get_family_key(family))
+      details = pipe.execute()
+    except Exception as e:
+      logger.error(f"Redis error in token family listing: {str(e)}")
+      return []
+
+    sessions = []
+    expired = []
+    for (platform, family), detail in zip(families, details):
+      if not detail:
+        expired.append((platform, family))
+        continue
+      detail = {self._to_str(k): self._to_str(v) for k, v in detail.items()}
+      sessions.append({
+        'family': family,
+        'platform': platform,
+        'created_at': self._from_timestamp(detail['created_at']),
+        'last_used_at': self._from_timestamp(detail['last_used_at']),
+        'expires_at': self._from_timestamp(detail['exp']),
+      })
+
+    if expired:
+      self._remove_members(user_id, expired)
+
+    return sorted(sessions, key=lambda s: s['last_used_at'], reverse=True)
+
+  # ========================================
+  # 失効
+  # ========================================
+
+  def revoke(self, user_id, family):
+    """ファミリーを失効（現在のリフレッシュトークンをブラックリストへ）"""
+    if self.redis_client is None:
+      return False
+
+    family_key = self._get_family_key(family)
+    try:
+      jti, exp, platform = self.redis_client.hmget(family_key, 'jti', 'exp', 'platform')
+      if jti is None:
+        return False
+
+      TokenBlacklist(self.redis_client).add(self._to_str(jti), float(self._to_str(exp)))
+      pipe = self.redis_client.pipeline()
+      pipe.delete(family_key)
+      pipe.srem(self._get_user_key(user_id, self._to_str(platform)), family)
+      pipe.execute()
+      return True
+    except Exception as e:
+      logger.error(f"Redis error in token family revocation: {str(e)}")
+      return False
+
+  def revoke_all(self, user_id):
+    """
+    ユーザーの全ファミリーを失効
+    Returns: 失効したセッション数
+    """
+    if self.redis_client is None:
+      return 0
+
+    try:
+      families = self._get_families(user_id)
+      if not families:
+        return 0
+
+      pipe = self.redis_client.pipeline()
+      for _, family in families:
+        pipe.hmget(self._get_family_key(family), 'jti', 'exp')
+      details = pipe.execute()
+
+      blacklist = TokenBlacklist(self.redis_client)
+      revoked = 0
+      for jti, exp in details:
+        if jti is None:
+          continue
+        blacklist.add(self._to_str(jti), float(self._to_str(exp)))
+        revoked += 1
+
+      pipe = self.redis_client.pipeline()
+      for _, family in families:
+        pipe.delete(self._get_family_key(family))
+      for platform in self.PLATFORMS:
+        pipe.delete(self._get_user_key(user_id, platform))
+      pipe.execute()
+      return revoked
+    except Exception as e:
+      logger.error(f"Redis error in token family revocation: {str(e)}")
+      return 0
+
+  # ========================================
+  # ヘルパー
+  # ========================================
+
+  def _get_families(self, user_id):
+    """[(platform, family), ...]"""
+    pipe = self.redis_client.pipeline()
+    for platform in self.PLATFORMS:
+      pipe.smembers(self._get_user_key(user_id, platform))
+    members = pipe.execute()
+
+    return [
+      (platform, self._to_str(family))
+      for platform, families in zip(self.PLATFORMS, members)
+      for family in families
+    ]
+
+  def _remove_members(self, user_id, families):
+    try:
+      pipe = self.redis_client.pipeline()
+      for platform, family in families:
+        pipe.srem(self._get_user_key(user_id, platform), family)
+      pipe.execute()
+    except Exception as e:
+      logger.error(f"Redis error in token family cleanup: {str(e)}")
+
+  @staticmethod
+  def _get_lifetime():
+    return int(api_settings.REFRESH_TOKEN_LIFETIME.total_seconds())
+
+  @classmethod
+  def _normalize_platform(cls, platform):
+    return platform if platform in cls.PLATFORMS else 'unknown'
+
+  @classmethod
+  def _get_user_key(cls, user_id, platform):
+    return cls.USER_KEY.format(user_id=user_id, platform=platform)
+
+  @classmethod
+  def _get_family_key(cls, family):
+    return cls.FAMILY_KEY.format(family=family)
+
+  @staticmethod
+  def _to_str(value):
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+  @classmethod
+  def _from_timestamp(cls, value):
+    return datetime.fromtimestamp(float(cls._to_str(value)), tz=dt_timezone.utc)
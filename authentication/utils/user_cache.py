@@ -0,0 +1,74 @@
+import copy
+import threading
+from cachetools import TTLCache
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+
+
+class CachedUserResolver:
+  """
+  JWT認証用のユーザーキャッシュ
+  L1: プロセス内TTLキャッシュ（他プロセスでの更新はL1_TTL秒以内に反映）
+  L2: Djangoキャッシュ（Redis）, User保存・削除時に無効化
+  """
+
+  L1_TTL = 5
+  L1_MAXSIZE = 10000
+  L2_TTL = 60
+
+  # 登録進捗はCurrentUserView等でシリアライズされるため一緒にキャッシュする
+  RELATED_FIELDS = ('staff_progress', 'customer_progress')
+
+  _l1 = TTLCache(maxsize=L1_MAXSIZE, ttl=L1_TTL)
+  _l1_lock = threading.Lock()
+
+  @classmethod
+  def get_user(cls, user_id):
+    """
+    ユーザーを取得（L1 → L2 → DBの順）
+    Raises: User.DoesNotExist
+    """
+    user_id = str(user_id)
+
+    with cls._l1_lock:
+      user = cls._l1.get(user_id)
+    if user is not None:
+      return copy.copy(user)
+
+    cache_key = cls._get_cache_key(user_id)
+    user = cache.get(cache_key)
+    if user is None:
+      user = cls._load_user(user_id)
+      cache.set(cache_key, user, cls.L2_TTL)
+
+    with cls._l1_lock:
+      cls._l1[user_id] = user
+    return copy.copy(user)
+
+  @classmethod
+  def invalidate(cls, user_id):
+    """L1・L2からユーザーを削除（トランザクション中ならコミット後にも再度削除）"""
+    user_id = str(user_id)
+    cls._evict(user_id)
+    transaction.on_commit(lambda: cls._evict(user_id))
+
+  @classmethod
+  def clear_local(cls):
+    with cls._l1_lock:
+      cls._l1.clear()
+
+  @classmethod
+  def _evict(cls, user_id):
+    with cls._l1_lock:
+      cls._l1.pop(user_id, None)
+    cache.delete(cls._get_cache_key(user_id))
+
+  @classmethod
+  def _load_user(cls, user_id):
+    User = get_user_model()
+    return User.objects.select_related(*cls.RELATED_FIELDS).get(pk=user_id)
+
+  @staticmethod
+  def _get_cache_key(user_id):
+    return f"auth:user:{user_id}"
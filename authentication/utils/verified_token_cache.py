@@ -0,0 +1,57 @@
+import hashlib
+import threading
+import time
+
+from cachetools import TLRUCache
+from rest_framework_simplejwt.settings import api_settings
+from authentication.utils.token_blacklist import TokenBlacklist
+
+
+class VerifiedTokenCache:
+  """
+  検証済みアクセストークンのプロセス内LRUキャッシュ
+  同じトークンの署名検証・デコードをexpまで省略する
+  キーはトークンのダイジェスト, ヒット時も失効（jti）はチェックする
+  """
+
+  MAXSIZE = 10000
+
+  _cache = TLRUCache(
+    maxsize=MAXSIZE,
+    ttu=lambda key, token, now: token['exp'],
+    timer=time.time,
+  )
+  _lock = threading.Lock()
+
+  @classmethod
+  def get(cls, raw_token):
+    """キャッシュ済みの検証済みトークン（なければNone）"""
+    with cls._lock:
+      return cls._cache.get(cls._get_key(raw_token))
+
+  @classmethod
+  def set(cls, raw_token, validated_token):
+    with cls._lock:
+      cls._cache[cls._get_key(raw_token)] = validated_token
+
+  @classmethod
+  def discard(cls, raw_token):
+    with cls._lock:
+      cls._cache.pop(cls._get_key(raw_token), None)
+
+  @classmethod
+  def clear(cls):
+    with cls._lock:
+      cls._cache.clear()
+
+  @staticmethod
+  def is_revoked(validated_token):
+    """失効済みのトークンか（キャッシュのヒット・ミスどちらでもチェック）"""
+    jti = validated_token.get(api_settings.JTI_CLAIM)
+    return jti is not None and TokenBlacklist().is_blacklisted(jti)
+
+  @staticmethod
+  def _get_key(raw_token):
+    if isinstance(raw_token, str):
+      raw_token = raw_token.encode()
+    return hashlib.blake2b(raw_token, digest_size=16).digest()
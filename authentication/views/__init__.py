@@ -13,6 +13,15 @@ from .login import (
   StaffOwnerLoginView,
   RefreshTokenView
 )
+from .token_refresh import TokenRefreshView
+from .async_login import AsyncCustomerLoginView, AsyncStaffOwnerLoginView
+from .async_registration import AsyncOwnerRegisterView, AsyncVerifyEmailView
+from .social_login import SocialLoginAPIView
+from .session import (
+  SessionListView,
+  LogoutView,
+  LogoutAllView
+)
 
 __all__ = [
   'OwnerRegisterView',
@@ -25,5 +34,14 @@ __all__ = [
   'CurrentUserView',
   'CustomerLoginView',
   'StaffOwnerLoginView',
-  'RefreshTokenView'
+  'RefreshTokenView',
+  'TokenRefreshView',
+  'AsyncCustomerLoginView',
+  'AsyncStaffOwnerLoginView',
+  'AsyncOwnerRegisterView',
+  'AsyncVerifyEmailView',
+  'SocialLoginAPIView',
+  'SessionListView',
+  'LogoutView',
+  'LogoutAllView'
 ]
\ No newline at end of file
@@ -0,0 +1,71 @@
+from django.contrib.auth.signals import user_logged_in
+from django.http import JsonResponse
+from django.utils.translation import gettext as _
+from django.views import View
+from rest_framework import status
+from rest_framework.exceptions import Throttled
+
+from .mixins import TokenResponseMixin, AsyncAPIViewMixin
+from authentication.serializers import CustomerLoginSerializer, BusinessLoginSerializer
+from authentication.utils import AuthRateLimiter
+from common.utils import get_client_ip
+from users.models.backends import CustomerAuthBackend, StaffOwnerAuthBackend
+from users.serializers import UserSerializer
+
+
+class BaseAsyncLoginView(TokenResponseMixin, AsyncAPIViewMixin, View):
+  """
+  ログインの非同期版（ASGI用）
+  パスワードのハッシュ計算はスレッドで行い、待機中もワーカーを塞がない
+  """
+  http_method_names = ['post']
+  serializer_class = None
+  backend_class = None
+
+  async def post(self, request):
+    rate_limiter = AuthRateLimiter()
+    ip = get_client_ip(request)
+
+    if not await rate_limiter.acheck_login_limit(ip):
+      remaining_time = await rate_limiter.aget_login_reset_time(ip)
+      raise Throttled(
+        detail=_('Too many attempts.Please try again in %(remaining_time)s seconds.') % {
+          'remaining_time': remaining_time
+        }
+      )
+
+    data = self.parse_body(request)
+    serializer = self.serializer_class(data=data)
+    serializer.is_valid(raise_exception=True)
+
+    email = serializer.validated_data['email']
+    password = serializer.validated_data['password']
+    platform = serializer.validated_data['platform']
+    user = await self.backend_class().aauthenticate(request, username=email, password=password)
+
+    if not user:
+      return JsonResponse({
+        'error': _('メールアドレスまたはパスワードが正しくありません')
+      }, status=status.HTTP_401_UNAUTHORIZED)
+
+    await user_logged_in.asend(sender=user.__class__, request=request, user=user)
+    access_token, refresh_token = await self.aissue_tokens(user, platform)
+
+    user_serializer = UserSerializer(user, fields=['id', 'email', 'first_name', 'last_name', 'user_type', 'progress', 'language'])
+
+    response_data = {
+      'detail': _('ログインしました'),
+      'user': user_serializer.data,
+    }
+
+    return self.create_json_token_response(access_token, refresh_token, response_data, status.HTTP_200_OK, platform)
+
+
+class AsyncCustomerLoginView(BaseAsyncLoginView):
+  serializer_class = CustomerLoginSerializer
+  backend_class = CustomerAuthBackend
+
+
+class AsyncStaffOwnerLoginView(BaseAsyncLoginView):
+  serializer_class = BusinessLoginSerializer
+  backend_class = StaffOwnerAuthBackend
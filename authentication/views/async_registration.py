@@ -0,0 +1,79 @@
+from django.contrib.auth.signals import user_logged_in
+from django.http import JsonResponse
+from django.utils.translation import gettext as _
+from django.views import View
+from django.middleware.csrf import get_token
+from rest_framework import status
+from rest_framework.exceptions import Throttled, ValidationError
+
+from .mixins import TokenResponseMixin, AsyncAPIViewMixin
+from authentication.serializers import OwnerSignupSerializer
+from authentication.services import UserRegistrationService
+from authentication.utils import AuthRateLimiter, DisposableEmailChecker
+from common.utils import get_client_ip
+from users.serializers import UserSerializer
+
+
+class AsyncOwnerRegisterView(AsyncAPIViewMixin, View):
+  """OwnerRegisterViewの非同期版（ASGI用）"""
+  http_method_names = ['post']
+
+  async def post(self, request):
+    rate_limiter = AuthRateLimiter()
+    ip = get_client_ip(request)
+
+    if not await rate_limiter.acheck_register_limit(ip):
+      remaining_time = await rate_limiter.aget_register_reset_time(ip)
+      raise Throttled(
+        detail=_('Too many attempts.Please try again in %(remaining_time)s seconds.') % {
+          'remaining_time': remaining_time
+        }
+      )
+
+    serializer = OwnerSignupSerializer(data=self.parse_body(request), context={'check_disposable': False})
+    serializer.is_valid(raise_exception=True)
+
+    if await DisposableEmailChecker.ais_disposable(serializer.validated_data['email']):
+      raise ValidationError({'email': [_('使い捨てメールアドレスは使用できません。')]})
+
+    is_link_social, message = await UserRegistrationService.aregister_pending_user(
+      email=serializer.validated_data['email'],
+      password=serializer.validated_data['password'],
+      user_type='OWNER',
+      country=serializer.validated_data['country'],
+      user_timezone=serializer.validated_data['user_timezone'],
+      last_name=serializer.validated_data['last_name'],
+      first_name=serializer.validated_data['first_name'],
+    )
+
+    return JsonResponse({
+      'is_link_social': is_link_social,
+      'detail': message,
+    }, status=status.HTTP_201_CREATED)
+
+
+class AsyncVerifyEmailView(TokenResponseMixin, AsyncAPIViewMixin, View):
+  """VerifyEmailViewの非同期版（ASGI用）"""
+  http_method_names = ['post']
+
+  async def post(self, request):
+    # ensure_csrf_cookieと同じ（method_decoratorは非同期のハンドラーに使えないため）
+    get_token(request)
+
+    data = self.parse_body(request)
+    token = data.get('token')
+    platform = self.get_platform(request, data)
+
+    user, is_link_social, message = await UserRegistrationService.averify_and_activate(token)
+
+    await user_logged_in.asend(sender=user.__class__, request=request, user=user)
+    access_token, refresh_token = await self.aissue_tokens(user, platform)
+
+    serializer = UserSerializer(user, fields=['id', 'email', 'first_name', 'last_name', 'user_type', 'progress'])
+    response_data = {
+      'detail': message,
+      'user': serializer.data,
+      'is_link_social': is_link_social
+    }
+
+    return self.create_json_token_response(access_token, refresh_token, response_data, status.HTTP_201_CREATED, platform)
@@ -2,7 +2,9 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from django.contrib.auth import authenticate
-from rest_framework_simplejwt.tokens import RefreshToken
+from django.contrib.auth.signals import user_logged_in
+from rest_framework_simplejwt.exceptions import TokenError
+from authentication.services import TokenRefreshService
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from users.serializers import UserSerializer
 from django.utils.translation import gettext as _
@@ -14,6 +16,8 @@ from users.models.backends import CustomerAuthBackend, StaffOwnerAuthBackend
 
 
 class CustomerLoginView(TokenResponseMixin, APIView):
+  permission_classes = [AllowAny]
+
   def post(self, request):
     serializer = CustomerLoginSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
@@ -29,9 +33,8 @@ class CustomerLoginView(TokenResponseMixin, APIView):
         'error': _('メールアドレスまたはパスワードが正しくありません')
       }, status=status.HTTP_401_UNAUTHORIZED)
     
-    refresh = RefreshToken.for_user(user)
-    access_token = str(refresh.access_token)
-    refresh_token = str(refresh)
+    user_logged_in.send(sender=user.__class__, request=request, user=user)
+    access_token, refresh_token = self.issue_tokens(user, platform)
 		
     user_serializer = UserSerializer(user, fields=['id', 'email', 'first_name', 'last_name', 'user_type', 'progress', 'language'])
 
@@ -44,6 +47,8 @@ class CustomerLoginView(TokenResponseMixin, APIView):
 
 
 class StaffOwnerLoginView(TokenResponseMixin, APIView):
+  permission_classes = [AllowAny]
+
   def post(self, request):
     serializer = BusinessLoginSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
@@ -59,9 +64,8 @@ class StaffOwnerLoginView(TokenResponseMixin, APIView):
         'error': _('メールアドレスまたはパスワードが正しくありません')
       }, status=status.HTTP_401_UNAUTHORIZED)
     
-    refresh = RefreshToken.for_user(user)
-    access_token = str(refresh.access_token)
-    refresh_token = str(refresh)
+    user_logged_in.send(sender=user.__class__, request=request, user=user)
+    access_token, refresh_token = self.issue_tokens(user, platform)
 		
     user_serializer = UserSerializer(user, fields=['id', 'email', 'first_name', 'last_name', 'user_type', 'progress', 'language'])
 
@@ -92,7 +96,7 @@ class RefreshTokenView(TokenResponseMixin, APIView):
   def post(self, request):
     platform = self.get_platform(request)
     if platform != 'web':
-      refresh_token = request.get('refresh_token')
+      refresh_token = request.data.get('refresh_token') or request.data.get('refresh')
     else:
       refresh_token = request.COOKIES.get('refresh_token')
     
@@ -104,17 +108,16 @@ class RefreshTokenView(TokenResponseMixin, APIView):
       )
     
     try:
-      refresh = RefreshToken(refresh_token)
-      access_token = str(refresh.access_token)
-      
-      response_data = {
-        'detail': _('トークンを更新しました')
-      }
-      
-      return self.create_token_response(access_token, refresh_token, response_data, status.HTTP_200_OK, platform)
-        
-    except Exception as e:
+      # 使用済みのリフレッシュトークンはRedisの失効リストに登録（DBには書き込まない）
+      access_token, refresh_token = TokenRefreshService.refresh(refresh_token)
+    except TokenError:
       return Response(
         {'detail': _('トークンが無効です')},
         status=status.HTTP_401_UNAUTHORIZED
-      )
\ No newline at end of file
+      )
+
+    response_data = {
+      'detail': _('トークンを更新しました')
+    }
+
+    return self.create_token_response(access_token, refresh_token, response_data, status.HTTP_200_OK, platform)
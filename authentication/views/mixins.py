@@ -1,11 +1,20 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import APIException, ParseError
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework_simplejwt.tokens import RefreshToken
+from authentication.tokens import RefreshToken
 from users.serializers import UserSerializer
 
 class TokenResponseMixin:
-  def get_platform(self, request):
-    platform = request.data.get('platform')
+  def get_platform(self, request, data=None):
+    # DRFを通さないビューではパース済みのボディを渡す
+    data = request.data if data is None else data
+    platform = data.get('platform')
     
     if not platform:
       platform = request.headers.get('X-Platform')
@@ -21,6 +30,22 @@ class TokenResponseMixin:
     
     return platform
   
+  def issue_tokens(self, user, platform='web'):
+    """ログインセッションを開始してトークンを発行
+    Returns: (access_token, refresh_token)
+    """
+    refresh = RefreshToken.for_user(user, platform)
+    return str(refresh.access_token), str(refresh)
+
+  async def aissue_tokens(self, user, platform='web'):
+    # トークンファミリーの登録・権限情報の取得（同期のRedis・ORM）を含むため同期で実行
+    return await sync_to_async(self.issue_tokens)(user, platform)
+
+  def clear_token_cookies(self, response):
+    response.delete_cookie('access_token', samesite='Strict')
+    response.delete_cookie('refresh_token', samesite='Strict')
+    return response
+
   def create_token_response(self, access_token, refresh_token, response_data, http_status, platform='web', ):
         
     if platform in ['ios', 'android']:
@@ -29,21 +54,86 @@ class TokenResponseMixin:
       response = Response(response_data, status=http_status)
     else:
       response = Response(response_data, status=http_status)
-      response.set_cookie(
-        key='access_token',
-        value=access_token,
-        httponly=True,
-        secure=False,
-        samesite='Strict',
-        max_age=900,
-      )
-      response.set_cookie(
-        key='refresh_token',
-        value=refresh_token,
-        httponly=True,
-        secure=False,
-        samesite='Strict',
-        max_age=86400,
-      )
-
-    return response
\ No newline at end of file
+      self.set_token_cookies(response, access_token, refresh_token)
+
+    return response
+
+  def create_json_token_response(self, access_token, refresh_token, response_data, http_status, platform='web'):
+    """create_token_responseのDRFを通さないビュー用"""
+    if platform in ['ios', 'android']:
+      response_data['access'] = access_token
+      response_data['refresh'] = refresh_token
+      return JsonResponse(response_data, status=http_status)
+
+    response = JsonResponse(response_data, status=http_status)
+    return self.set_token_cookies(response, access_token, refresh_token)
+
+  def set_token_cookies(self, response, access_token, refresh_token):
+    response.set_cookie(
+      key='access_token',
+      value=access_token,
+      httponly=True,
+      secure=False,
+      samesite='Strict',
+      max_age=900,
+    )
+    response.set_cookie(
+      key='refresh_token',
+      value=refresh_token,
+      httponly=True,
+      secure=False,
+      samesite='Strict',
+      max_age=86400,
+    )
+    return response
+
+
+class JSONViewMixin:
+  """DRFを通さないビュー（django.views.View）でJSONを扱う"""
+
+  @staticmethod
+  def parse_body(request):
+    """
+    Returns: リクエストボディ（JSONまたはフォーム）
+    Raises: ParseError
+    """
+    if not request.body:
+      return {}
+    if request.content_type == 'application/json':
+      try:
+        data = json.loads(request.body)
+      except ValueError:
+        raise ParseError()
+      if not isinstance(data, dict):
+        raise ParseError()
+      return data
+    return request.POST
+
+  def exception_response(self, exc):
+    """DRFの例外をDRFのexception_handlerと同じ形式のJSONレスポンスに変換"""
+    if isinstance(exc.detail, (list, dict)):
+      data = exc.detail
+    else:
+      data = {'detail': exc.detail}
+    return JsonResponse(data, status=exc.status_code, safe=False)
+
+
+class AsyncAPIViewMixin(JSONViewMixin):
+  """
+  非同期ビュー（async defのハンドラー）用
+  DRFのAPIViewは非同期に対応していないため、django.views.Viewと組み合わせて使う
+  """
+
+  @classmethod
+  def as_view(cls, **initkwargs):
+    # APIViewと同じくCSRFはトークン認証側で扱う
+    return csrf_exempt(super().as_view(**initkwargs))
+
+  async def dispatch(self, request, *args, **kwargs):
+    try:
+      response = super().dispatch(request, *args, **kwargs)
+      if asyncio.iscoroutine(response):
+        response = await response
+    except APIException as exc:
+      return self.exception_response(exc)
+    return response
@@ -3,9 +3,9 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny
-from rest_framework_simplejwt.tokens import RefreshToken
 from authentication.utils import AuthRateLimiter
 from rest_framework.exceptions import Throttled
+from django.contrib.auth.signals import user_logged_in
 
 from ..serializers import OwnerSignupSerializer, CustomerSignupSerializer,  EmailChangeSerializer
 from users.serializers import UserSerializer
@@ -27,9 +27,7 @@ class OwnerRegisterView(APIView):
 		ip = get_client_ip(request)
 			
 		if not rate_limiter.check_register_limit(ip):
-			remaining_time = rate_limiter.get_register_reset_time(
-				f"auth:register:{ip}"
-			)
+			remaining_time = rate_limiter.get_register_reset_time(ip)
 			raise Throttled(
 				detail=_('Too many attempts.Please try again in %(remaining_time)s seconds.') % {
 					'remaining_time': remaining_time
@@ -96,9 +94,8 @@ class VerifyEmailView(TokenResponseMixin, APIView):
 		except (NotFound, ValidationError):
 			raise
 
-		refresh = RefreshToken.for_user(user)
-		access_token = str(refresh.access_token)
-		refresh_token = str(refresh)
+		user_logged_in.send(sender=user.__class__, request=request, user=user)
+		access_token, refresh_token = self.issue_tokens(user, platform)
 		
 		serializer = UserSerializer(user, fields=['id', 'email', 'first_name', 'last_name', 'user_type', 'progress'])
 		response_data = {
@@ -119,9 +116,7 @@ class ResendVerificationEmailView(APIView):
 		ip = get_client_ip(request)
 			
 		if not rate_limiter.check_email_resend_limit(ip):
-			remaining_time = rate_limiter.get_email_resend_reset_time(
-				f"auth:register:{ip}"
-			)
+			remaining_time = rate_limiter.get_email_resend_reset_time(ip)
 			raise Throttled(
 				detail=_('Too many attempts.Please try again in %(remaining_time)s seconds.') % {
 					'remaining_time': remaining_time
@@ -148,9 +143,7 @@ class ChangePendingEmailView(APIView):
 		ip = get_client_ip(request)
 			
 		if not rate_limiter.check_email_resend_limit(ip):
-			remaining_time = rate_limiter.get_email_resend_reset_time(
-				f"auth:register:{ip}"
-			)
+			remaining_time = rate_limiter.get_email_resend_reset_time(ip)
 			raise Throttled(
 				detail=_('Too many attempts.Please try again in %(remaining_time)s seconds.') % {
 					'remaining_time': remaining_time
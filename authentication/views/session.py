@@ -0,0 +1,45 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from django.utils.translation import gettext as _
+from .mixins import TokenResponseMixin
+from authentication.services import SessionService
+
+
+class SessionListView(APIView):
+  """ログイン中の端末（セッション）一覧"""
+  permission_classes = [IsAuthenticated]
+
+  def get(self, request):
+    sessions = SessionService.list_sessions(request.user, request.auth)
+    return Response({'sessions': sessions})
+
+
+class LogoutView(TokenResponseMixin, APIView):
+  """現在の端末からログアウト"""
+  permission_classes = [IsAuthenticated]
+
+  def post(self, request):
+    # Webはクッキー、モバイルはボディのリフレッシュトークン
+    refresh_token = (
+      request.COOKIES.get('refresh_token') or request.data.get('refresh') or request.data.get('refresh_token')
+    )
+    SessionService.logout(request.user, request.auth, refresh_token)
+
+    response = Response({'detail': _('ログアウトしました')}, status=status.HTTP_200_OK)
+    return self.clear_token_cookies(response)
+
+
+class LogoutAllView(TokenResponseMixin, APIView):
+  """全端末からログアウト"""
+  permission_classes = [IsAuthenticated]
+
+  def post(self, request):
+    revoked = SessionService.logout_all(request.user)
+
+    response = Response({
+      'detail': _('すべての端末からログアウトしました'),
+      'revoked_sessions': revoked,
+    }, status=status.HTTP_200_OK)
+    return self.clear_token_cookies(response)
@@ -8,8 +8,9 @@ from django.core.cache import cache
 from ..serializers import SocialLoginSerializer
 from users.serializers import UserSerializer
 from ..services import SocialLoginService
+from .mixins import TokenResponseMixin
 
-class SocialLoginAPIView(APIView):
+class SocialLoginAPIView(TokenResponseMixin, APIView):
 	permission_classes = [AllowAny]
 	
 	def post(self, request):
@@ -20,13 +21,14 @@ class SocialLoginAPIView(APIView):
 		data = serializer.validated_data
 		session_token = data.get('session_token')
 		provider = data['provider']
-		access_token = data['access_token']
+		access_token = data.get('access_token')
 		user_type = data['user_type']
-		id_token = data['id_token']
+		id_token = data.get('id_token')
 
 		try:
 			user, refresh, message = SocialLoginService.get_or_create_user(
-				user_type, access_token, provider, session_token, id_token
+				user_type, access_token, provider, session_token, id_token,
+				platform=self.get_platform(request)
 			)
 			
 			serializer = UserSerializer(
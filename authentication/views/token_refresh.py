@@ -0,0 +1,47 @@
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.utils.translation import gettext as _
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import ParseError
+from rest_framework_simplejwt.exceptions import TokenError
+
+from .mixins import TokenResponseMixin, JSONViewMixin
+from authentication.services import TokenRefreshService
+from authentication.utils import AuthRateLimiter
+from common.utils import get_client_ip
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class TokenRefreshView(TokenResponseMixin, JSONViewMixin, View):
+  """
+  軽量なトークンリフレッシュ（DRFの認証・スロットル・レンダラーを通さない）
+  モバイルはボディ、Webはクッキーでトークンを返す（RefreshTokenViewと同じ形式）
+  """
+  http_method_names = ['post']
+
+  def post(self, request):
+    try:
+      data = self.parse_body(request)
+    except ParseError as exc:
+      return self.exception_response(exc)
+
+    if not AuthRateLimiter().check_token_refresh_limit(get_client_ip(request)):
+      return JsonResponse({'detail': _('リクエストが多すぎます')}, status=429)
+
+    platform = self.get_platform(request, data)
+    if platform != 'web':
+      refresh_token = data.get('refresh_token') or data.get('refresh')
+    else:
+      refresh_token = request.COOKIES.get('refresh_token')
+
+    if not refresh_token:
+      return JsonResponse({'detail': _('リフレッシュトークンがありません')}, status=401)
+
+    try:
+      access_token, refresh_token = TokenRefreshService.refresh(refresh_token)
+    except TokenError:
+      return JsonResponse({'detail': _('トークンが無効です')}, status=401)
+
+    response_data = {'detail': _('トークンを更新しました')}
+    return self.create_json_token_response(access_token, refresh_token, response_data, 200, platform)
@@ -0,0 +1,142 @@
+"""
+同時接続時のスループットベンチマーク（I/O待ちが支配的な登録処理）
+
+同期ビュー（WSGI: 1ワーカー・--threadsスレッド）と
+非同期ビュー（ASGI: 1ワーカー・1イベントループ）で OwnerRegisterView を比較する
+SMTP送信とKickbox APIは --smtp-latency / --kickbox-latency 秒の待機で置き換える
+
+  python benchmarks/bench_async_views.py [--requests N] [--concurrency N] [--threads N]
+                                         [--executor-threads N] [--smtp-latency S] [--kickbox-latency S] [--pbkdf2]
+
+--pbkdf2: 本番と同じパスワードハッシャーを使う（既定はテスト用のMD5）
+DBはSQLiteのため、--threadsを2以上にすると書き込みがロック待ちで失敗することがある
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'meldish.settings_test')
+
+import django
+from django.conf import settings
+
+# スレッド間で同じDBを使うため、メモリではなくファイルのSQLiteにする
+settings.DATABASES['default']['NAME'] = os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')
+
+django.setup()
+
+from django.core.management import call_command
+from django.test import AsyncClient, Client
+from rest_framework.throttling import SimpleRateThrottle
+from authentication.utils import AuthRateLimiter
+
+SYNC_URL = '/api/auth/business_register/'
+ASYNC_URL = '/api/auth/async/business_register/'
+
+
+def signup_data(prefix, i):
+  # ドメインごとに使い捨て判定の結果がキャッシュされるため、毎回別のドメインにする
+  return {
+    'user_type': 'OWNER',
+    'email': f'owner{i}@{prefix}{i}.example.com',
+    'password': 'Str0ng-passw0rd!',
+    'confirm_password': 'Str0ng-passw0rd!',
+    'country': 'AU',
+    'user_timezone': 'Australia/Sydney',
+    'first_name': 'Taro',
+    'last_name': 'Yamada',
+  }
+
+
+def summarize(label, latencies, elapsed):
+  latencies = sorted(latencies)
+  p95 = latencies[int(len(latencies) * 0.95) - 1]
+  print(f'{label:<28}: {len(latencies) / elapsed:8.1f} req/s  '
+        f'p50 {statistics.median(latencies) * 1000:7.1f} ms  p95 {p95 * 1000:7.1f} ms')
+
+
+def run_wsgi(requests, threads):
+  def call(i):
+    start = time.perf_counter()
+    response = Client().post(SYNC_URL, signup_data('wsgi', i), content_type='application/json', secure=True)
+    assert response.status_code == 201, response.content
+    return time.perf_counter() - start
+
+  start = time.perf_counter()
+  with ThreadPoolExecutor(max_workers=threads) as executor:
+    latencies = list(executor.map(call, range(requests)))
+  return latencies, time.perf_counter() - start
+
+
+async def run_asgi(requests, concurrency, executor_threads):
+  if executor_threads:
+    # sync_to_async(thread_sensitive=False)の処理（ハッシュ計算・SMTP）はループの既定のExecutorで実行される
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=executor_threads))
+  semaphore = asyncio.Semaphore(concurrency)
+
+  async def call(i):
+    async with semaphore:
+      start = time.perf_counter()
+      response = await AsyncClient().post(ASYNC_URL, signup_data('asgi', i), content_type='application/json', secure=True)
+      assert response.status_code == 201, response.content
+      return time.perf_counter() - start
+
+  start = time.perf_counter()
+  latencies = await asyncio.gather(*(call(i) for i in range(requests)))
+  return latencies, time.perf_counter() - start
+
+
+def main():
+  parser = argparse.ArgumentParser()
+  parser.add_argument('--requests', type=int, default=100)
+  parser.add_argument('--concurrency', type=int, default=50, help='ASGIの同時リクエスト数')
+  parser.add_argument('--threads', type=int, default=1, help='WSGIワーカーのスレッド数')
+  parser.add_argument('--executor-threads', type=int, default=None, help='ASGIのオフロード用スレッド数（既定: Pythonの既定値）')
+  parser.add_argument('--smtp-latency', type=float, default=0.2)
+  parser.add_argument('--kickbox-latency', type=float, default=0.1)
+  parser.add_argument('--pbkdf2', action='store_true')
+  args = parser.parse_args()
+
+  if args.pbkdf2:
+    settings.PASSWORD_HASHERS = ['django.contrib.auth.hashers.PBKDF2PasswordHasher']
+
+  call_command('migrate', verbosity=0)
+
+  def send_email(*_args, **_kwargs):
+    time.sleep(args.smtp_latency)
+    return True
+
+  def check_with_api(domain):
+    time.sleep(args.kickbox_latency)
+    return False
+
+  async def acheck_with_api(domain):
+    await asyncio.sleep(args.kickbox_latency)
+    return False
+
+  with contextlib.ExitStack() as stack:
+    stack.enter_context(patch('common.service.EmailService.send_template_email', side_effect=send_email))
+    stack.enter_context(patch('authentication.utils.DisposableEmailChecker._check_with_api', side_effect=check_with_api))
+    stack.enter_context(patch('authentication.utils.DisposableEmailChecker._acheck_with_api', side_effect=acheck_with_api))
+    stack.enter_context(patch.object(AuthRateLimiter, 'REGISTER_LIMIT', float('inf')))
+    stack.enter_context(patch.dict(SimpleRateThrottle.THROTTLE_RATES, {'anon': f'{10 ** 9}/hour', 'user': f'{10 ** 9}/hour'}))
+
+    wsgi = run_wsgi(args.requests, args.threads)
+    asgi = asyncio.run(run_asgi(args.requests, args.concurrency, args.executor_threads))
+
+  print(f'requests={args.requests} smtp={args.smtp_latency}s kickbox={args.kickbox_latency}s pbkdf2={args.pbkdf2}')
+  summarize(f'WSGI sync ({args.threads} thread)', *wsgi)
+  summarize(f'ASGI async (concurrency {args.concurrency})', *asgi)
+  print(f'throughput ratio            : {wsgi[1] / asgi[1]:8.2f}x')
+
+
+if __name__ == '__main__':
+  main()
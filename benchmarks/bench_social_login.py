@@ -0,0 +1,106 @@
+"""
+ソーシャルログインのスループットベンチマーク（スタブプロバイダーを使ったエンドツーエンド）
+
+ローカルのStubProviderServerへ実際にHTTPで接続し、SocialLoginAPIViewのログインを計測する
+（Google・Facebook・LINEへは接続しない）
+
+  python benchmarks/bench_social_login.py [--iterations N] [--latency 0.05] [--threads 1]
+
+--latency: スタブの各レスポンスの待ち時間（秒, プロバイダーの応答時間を模擬）
+--threads: 同時にログインするスレッド数（SQLiteのため書き込みが多いと競合する）
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'meldish.settings_test')
+
+import django
+
+django.setup()
+
+import requests
+from django.conf import settings
+from django.core.management import call_command
+from django.test import RequestFactory
+from rest_framework.throttling import SimpleRateThrottle
+from authentication.providers.stub_server import StubProviderServer
+from authentication.views import SocialLoginAPIView
+
+
+def build_payloads(stub, flow, count):
+  """フローごとのリクエストボディ（ログインとして計測するため事前に1回登録しておく）"""
+  provider = flow.split('-')[0]
+  payloads = []
+  for i in range(count):
+    email = f'{flow}-{i}@example.com'
+    payload = {'provider': provider, 'user_type': 'CUSTOMER'}
+    if flow in ('google-access', 'facebook-access'):
+      payload['access_token'] = StubProviderServer.access_token(email)
+    else:
+      params = {'email': email, 'profile': '1' if flow == 'line-claims' else '0'}
+      issued = requests.get(f'{stub.url}/{provider}/id_token', params=params, timeout=5).json()
+      payload['id_token'] = issued['id_token']
+      if provider == 'line':
+        payload['access_token'] = issued['access_token']
+    payloads.append(json.dumps(payload))
+  return payloads
+
+
+def login(view, factory, body):
+  response = view(factory.post('/', body, content_type='application/json', secure=True))
+  response.render()
+  if response.status_code != 200:
+    raise RuntimeError(f'login failed: {response.status_code} {response.content!r}')
+
+
+def measure(stub, flow, iterations, threads, users=20):
+  view = SocialLoginAPIView.as_view()
+  factory = RequestFactory()
+  payloads = build_payloads(stub, flow, users)
+  for body in payloads:
+    login(view, factory, body)
+
+  bodies = [payloads[i % users] for i in range(iterations)]
+  start = time.perf_counter()
+  if threads == 1:
+    for body in bodies:
+      login(view, factory, body)
+  else:
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+      list(executor.map(lambda body: login(view, factory, body), bodies))
+  return iterations / (time.perf_counter() - start)
+
+
+def main():
+  parser = argparse.ArgumentParser()
+  parser.add_argument('--iterations', type=int, default=500)
+  parser.add_argument('--latency', type=float, default=0)
+  parser.add_argument('--threads', type=int, default=1)
+  args = parser.parse_args()
+
+  call_command('migrate', verbosity=0)
+  stub = StubProviderServer(latency=args.latency).start()
+
+  with contextlib.ExitStack() as stack:
+    stack.enter_context(patch.dict(SimpleRateThrottle.THROTTLE_RATES, {'anon': f'{10 ** 9}/hour', 'user': f'{10 ** 9}/hour'}))
+    settings.SOCIAL_PROVIDER_STUB_URL = stub.url
+    settings.GOOGLE_OAUTH2_CLIENT_ID = 'stub-google-client'
+    settings.LINE_CHANNEL_ID = 'stub-line-channel'
+
+    print(f'iterations={args.iterations} latency={args.latency}s threads={args.threads}')
+    for flow in ('google-access', 'google-id', 'facebook-access', 'line-claims', 'line-profile'):
+      rate = measure(stub, flow, args.iterations, args.threads)
+      print(f'{flow:16}: {rate:8.1f} logins/sec')
+
+  stub.stop()
+
+
+if __name__ == '__main__':
+  main()
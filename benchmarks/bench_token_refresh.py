@@ -0,0 +1,98 @@
+"""
+トークンリフレッシュのスループットベンチマーク（1ワーカー）
+
+RefreshTokenView（DRF）と TokenRefreshView（軽量ビュー）を比較する
+
+  python benchmarks/bench_token_refresh.py [--iterations N] [--platform ios|web] [--redis]
+
+--redis: 失効リスト・トークンファミリーをfakeredis経由で扱う（本番の構成）
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'meldish.settings_test')
+
+import django
+
+django.setup()
+
+from django.core.management import call_command
+from django.test import RequestFactory
+from rest_framework.throttling import SimpleRateThrottle
+from authentication.tests.factories import UserFactory
+from authentication.tokens import RefreshToken
+from authentication.utils import AuthRateLimiter, TokenBlacklist
+from authentication.views import RefreshTokenView, TokenRefreshView
+
+
+def build_request(factory, platform, refresh_token):
+  if platform == 'web':
+    request = factory.post('/', json.dumps({'platform': 'web'}), content_type='application/json', secure=True)
+    request.COOKIES['refresh_token'] = refresh_token
+  else:
+    body = json.dumps({'platform': platform, 'refresh': refresh_token})
+    request = factory.post('/', body, content_type='application/json', secure=True)
+  return request
+
+
+def read_refresh_token(response, platform):
+  if platform == 'web':
+    return response.cookies['refresh_token'].value
+  return json.loads(response.content)['refresh']
+
+
+def measure(view, user, platform, iterations):
+  factory = RequestFactory()
+  refresh_token = str(RefreshToken.for_user(user, platform))
+
+  start = time.perf_counter()
+  for _ in range(iterations):
+    response = view(build_request(factory, platform, refresh_token))
+    if hasattr(response, 'render'):
+      # DRFのレスポンスはミドルウェアの代わりにここでレンダリング
+      response.render()
+    if response.status_code != 200:
+      raise RuntimeError(f'refresh failed: {response.status_code} {response.content!r}')
+    refresh_token = read_refresh_token(response, platform)
+  return iterations / (time.perf_counter() - start)
+
+
+def main():
+  parser = argparse.ArgumentParser()
+  parser.add_argument('--iterations', type=int, default=2000)
+  parser.add_argument('--platform', default='ios', choices=['ios', 'android', 'web'])
+  parser.add_argument('--redis', action='store_true')
+  args = parser.parse_args()
+
+  call_command('migrate', verbosity=0)
+  user = UserFactory.build(user_type='CUSTOMER', is_active=True)
+  user.save(skip_validation=True)
+
+  with contextlib.ExitStack() as stack:
+    # レート制限のチェック自体は両方のビューで行い、上限だけ外す
+    stack.enter_context(patch.object(AuthRateLimiter, 'TOKEN_REFRESH_LIMIT', float('inf')))
+    stack.enter_context(patch.dict(SimpleRateThrottle.THROTTLE_RATES, {'anon': f'{10 ** 9}/hour', 'user': f'{10 ** 9}/hour'}))
+    if args.redis:
+      import fakeredis
+      client = fakeredis.FakeStrictRedis(decode_responses=True)
+      stack.enter_context(patch('authentication.utils.token_blacklist.get_redis_client', return_value=client))
+      stack.enter_context(patch('authentication.utils.token_family_registry.get_redis_client', return_value=client))
+    TokenBlacklist.reset_local()
+
+    drf = measure(RefreshTokenView.as_view(), user, args.platform, args.iterations)
+    fast = measure(TokenRefreshView.as_view(), user, args.platform, args.iterations)
+
+  print(f'platform={args.platform} iterations={args.iterations} redis={args.redis}')
+  print(f'RefreshTokenView (DRF)   : {drf:8.1f} refreshes/sec')
+  print(f'TokenRefreshView         : {fast:8.1f} refreshes/sec')
+  print(f'speedup                  : {fast / drf:8.2f}x')
+
+
+if __name__ == '__main__':
+  main()
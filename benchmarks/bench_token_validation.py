@@ -0,0 +1,74 @@
+"""
+アクセストークン検証のCPU時間ベンチマーク
+
+JWTAuthentication（毎回デコード・署名検証）と
+CookieJWTAuthentication（VerifiedTokenCache使用）を比較する
+
+  python benchmarks/bench_token_validation.py [--iterations N] [--tokens N] [--redis]
+
+--redis: 失効チェックをfakeredis経由で行う（本番のBloomフィルタ経路）
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'meldish.settings_test')
+
+import django
+
+django.setup()
+
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+from authentication.authentication import CookieJWTAuthentication
+from authentication.utils import VerifiedTokenCache
+
+
+def build_tokens(count):
+  tokens = []
+  for i in range(count):
+    token = AccessToken()
+    token['user_id'] = f'00000000-0000-0000-0000-{i:012d}'
+    token.set_exp(lifetime=timedelta(hours=1))
+    tokens.append(str(token).encode())
+  return tokens
+
+
+def measure(auth, tokens, iterations):
+  start = time.process_time()
+  for i in range(iterations):
+    auth.get_validated_token(tokens[i % len(tokens)])
+  return (time.process_time() - start) / iterations * 1_000_000
+
+
+def main():
+  parser = argparse.ArgumentParser()
+  parser.add_argument('--iterations', type=int, default=50000)
+  parser.add_argument('--tokens', type=int, default=100, help='同時にアクティブなトークン数')
+  parser.add_argument('--redis', action='store_true')
+  args = parser.parse_args()
+
+  tokens = build_tokens(args.tokens)
+  VerifiedTokenCache.clear()
+
+  before = measure(JWTAuthentication(), tokens, args.iterations)
+
+  if args.redis:
+    import fakeredis
+    with patch('authentication.utils.token_blacklist.get_redis_client', return_value=fakeredis.FakeStrictRedis()):
+      after = measure(CookieJWTAuthentication(), tokens, args.iterations)
+  else:
+    after = measure(CookieJWTAuthentication(), tokens, args.iterations)
+
+  print(f'tokens={args.tokens} iterations={args.iterations} redis={args.redis}')
+  print(f'JWTAuthentication        : {before:8.2f} us/request (CPU)')
+  print(f'CookieJWTAuthentication  : {after:8.2f} us/request (CPU)')
+  print(f'speedup                  : {before / after:8.2f}x')
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,165 @@
+"""
+ユーザー検索のレイテンシベンチマーク（UserQuerySet.search）
+
+icontainsのOR検索（従来の実装, usersを全件スキャン）と
+user_search_tokensのトークン検索（UserSearchIndex）を比較する
+
+  python benchmarks/bench_user_search.py [--users 1000000] [--db /tmp/bench_user_search.sqlite3] [--repeat 5]
+
+--db: SQLiteのファイル（指定時は投入済みのデータを再利用する。未指定ならメモリ上）
+テナント検索はユーザーの1%が所属するテナントで計測する
+  tenant: システム管理者のテナント指定（in_tenant）, owner: テナントを所有するオーナー（accessible_by）
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'meldish.settings_test')
+
+import django
+
+django.setup()
+
+from django.conf import settings
+from django.db.models import Q
+
+LAST_NAMES = [('山田', 'yamada'), ('佐藤', 'sato'), ('鈴木', 'suzuki'), ('高橋', 'takahashi'), ('田中', 'tanaka'),
+              ('伊藤', 'ito'), ('渡辺', 'watanabe'), ('中村', 'nakamura'), ('小林', 'kobayashi'), ('加藤', 'kato')]
+FIRST_NAMES = [('太郎', 'taro'), ('花子', 'hanako'), ('健', 'ken'), ('陽菜', 'hina'), ('翔', 'sho'),
+               ('美咲', 'misaki'), ('大輔', 'daisuke'), ('結衣', 'yui'), ('拓海', 'takumi'), ('葵', 'aoi')]
+DOMAINS = ['example.com', 'example.jp', 'mail.example.net', 'corp.example.co.jp']
+
+
+def use_database(path):
+  if path:
+    settings.DATABASES['default']['NAME'] = path
+
+
+def legacy_search(queryset, query):
+  """変更前のUserQuerySet.search"""
+  return queryset.filter(
+    Q(id__icontains=query) | Q(email__icontains=query) | Q(first_name__icontains=query) | Q(last_name__icontains=query)
+  )
+
+
+def seed(count, batch_size=20000):
+  from django.db import connection, transaction
+  from django.utils import timezone
+  from organizations.models import Company, Tenant
+  from permissions.models import TenantMembership
+  from users.models import User, UserSearchToken
+  from users.utils import UserSearchIndex
+
+  now = timezone.now()
+  rng = random.Random(0)
+  template = User(user_type='STAFF', user_group='STAFF_OWNER', password='!', date_joined=now, updated_at=now)
+  fields = list(User._meta.concrete_fields)
+  columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+  user_sql = f'INSERT INTO {User._meta.db_table} ({columns}) VALUES ({", ".join(["%s"] * len(fields))})'
+  token_sql = f'INSERT INTO {UserSearchToken._meta.db_table} (user_id, token) VALUES (%s, %s)'
+  member_sql = (
+    f'INSERT INTO {TenantMembership._meta.db_table} (user_id, tenant_id, started_at, is_active, created_at) '
+    'VALUES (%s, %s, %s, 1, %s)'
+  )
+
+  company = Company.objects.create(name='Bench Company')
+  tenant = Tenant.objects.create(
+    company=company, name='BENCH01', code='BENCH01', address='1 Bench St',
+    state='NSW', post_code='2000', country='AU', phone_number='0200000000',
+  )
+  started_at = now.date().isoformat()
+  created_at = TenantMembership._meta.get_field('created_at').get_db_prep_save(now, connection)
+  tenant_id = TenantMembership._meta.get_field('tenant').get_db_prep_save(tenant.pk, connection)
+
+  with transaction.atomic(), connection.cursor() as cursor:
+    for start in range(0, count, batch_size):
+      users, tokens, members = [], [], []
+      for i in range(start, min(start + batch_size, count)):
+        (last_name, last_romaji), (first_name, first_romaji) = rng.choice(LAST_NAMES), rng.choice(FIRST_NAMES)
+        template.id = uuid.uuid4()
+        template.email = f'{first_romaji}.{last_romaji}{i}@{rng.choice(DOMAINS)}'
+        template.last_name, template.first_name = last_name, first_name
+        users.append([field.get_db_prep_save(getattr(template, field.attname), connection) for field in fields])
+        tokens.extend((template.id.hex, token) for token in UserSearchIndex.tokens(template))
+        if i % 100 == 0:
+          members.append((template.id.hex, tenant_id, started_at, created_at))
+      cursor.executemany(user_sql, users)
+      cursor.executemany(token_sql, tokens)
+      cursor.executemany(member_sql, members)
+  with connection.cursor() as cursor:
+    cursor.execute('ANALYZE')
+  return tenant
+
+
+def bench_owner(tenant):
+  """ベンチマーク用のテナントを所有するオーナー（シードはシグナルを通さないため、アクセスの表を作り直す）"""
+  from permissions.models import CompanyOwnership
+  from permissions.utils import TenantAccessIndex
+  from users.models import User
+
+  owner = User.objects.filter(email='bench-owner@example.com').first()
+  if owner is None:
+    owner = User.objects.create_user('bench-owner@example.com', user_type='OWNER')
+    CompanyOwnership.objects.create(owner=owner, company=tenant.company)
+    TenantAccessIndex.rebuild()
+  return owner
+
+
+def measure(queryset, repeat):
+  """1回あたりのレイテンシ（ミリ秒, 中央値）"""
+  timings = []
+  for _ in range(repeat):
+    start = time.perf_counter()
+    list(queryset[:20])
+    timings.append((time.perf_counter() - start) * 1000)
+  return statistics.median(timings)
+
+
+def main():
+  parser = argparse.ArgumentParser()
+  parser.add_argument('--users', type=int, default=1_000_000)
+  parser.add_argument('--db', default='')
+  parser.add_argument('--repeat', type=int, default=5)
+  args = parser.parse_args()
+
+  use_database(args.db)
+  from django.core.management import call_command
+  from organizations.models import Tenant
+  from users.models import User
+
+  call_command('migrate', verbosity=0)
+  tenant = Tenant.objects.filter(code='BENCH01').first()
+  if tenant is None:
+    start = time.perf_counter()
+    tenant = seed(args.users)
+    print(f'seeded {args.users} users in {time.perf_counter() - start:.0f}s')
+
+  rare_email = User.objects.order_by('email').values_list('email', flat=True)[len(DOMAINS)]
+  queries = {
+    'rare email': rare_email.split('@')[0],
+    'common name': '山田 太郎',
+    'email prefix': 'hanako.sato12',
+    'no match': 'zzzz',
+  }
+  scopes = {
+    'all users': User.objects.all(),
+    'tenant (1%)': User.objects.in_tenant(tenant),
+    'owner (1%)': User.objects.accessible_by(bench_owner(tenant)),
+  }
+
+  print(f'{"scope":12} {"query":14} {"legacy ms":>10} {"index ms":>10}')
+  for scope_name, queryset in scopes.items():
+    for name, query in queries.items():
+      # 従来の実装は単語に分けないため、先頭の単語で検索する
+      legacy = measure(legacy_search(queryset, query.split()[0]), args.repeat)
+      indexed = measure(queryset.search(query), args.repeat)
+      print(f'{scope_name:12} {name:14} {legacy:10.1f} {indexed:10.2f}')
+
+
+if __name__ == '__main__':
+  main()
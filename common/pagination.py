@@ -0,0 +1,134 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+  """
+  キーセット（シーク）方式のページネーション
+  (日時, id)の組で並べ、前ページの最後の行より後ろをWHEREで引く（COUNT(*)・OFFSETを使わない）
+  並び順の複合インデックスがあれば、ページの深さに関係なく一定時間で返せる
+
+  ビューでpagination_orderingを指定する（例: ('-date_joined', '-id')）
+  2列目は一意な列（id）にし、同じ日時の行も重複・欠落なく辿れるようにする
+  レスポンス: {'next': 次ページのURL（最後のページならNone）, 'results': [...]}
+  """
+
+  page_size = api_settings.PAGE_SIZE or 20
+  max_page_size = 100
+  page_size_query_param = 'page_size'
+  cursor_query_param = 'cursor'
+  ordering = ('-created_at', '-id')
+  invalid_cursor_message = '無効なカーソルです'
+
+  def paginate_queryset(self, queryset, request, view=None):
+    self.request = request
+    self.ordering = getattr(view, 'pagination_ordering', self.ordering)
+    self.page_size = self.get_page_size(request)
+
+    queryset = queryset.order_by(*self.ordering)
+    position = self.decode_cursor(request, queryset.model)
+    if position is not None:
+      queryset = queryset.filter(self.after(self.ordering, position))
+
+    # 1件多く取得して次ページの有無を判定
+    rows = list(queryset[:self.page_size + 1])
+    self.has_next = len(rows) > self.page_size
+    self.page = rows[:self.page_size]
+    return self.page
+
+  def get_paginated_response(self, data):
+    return Response({
+      'next': self.get_next_link(),
+      'results': data,
+    })
+
+  def get_paginated_response_schema(self, schema):
+    return {
+      'type': 'object',
+      'required': ['results'],
+      'properties': {
+        'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+        'results': schema,
+      },
+    }
+
+  def get_page_size(self, request):
+    try:
+      page_size = int(request.query_params[self.page_size_query_param])
+    except (KeyError, ValueError):
+      return self.page_size
+    return min(max(page_size, 1), self.max_page_size)
+
+  def get_next_link(self):
+    if not self.has_next:
+      return None
+    last = self.page[-1]
+    position = [str(value) for value in self.position_of(last, self.ordering)]
+    return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, self.encode_cursor(position))
+
+  @staticmethod
+  def encode_cursor(position):
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode().rstrip('=')
+
+  def decode_cursor(self, request, model):
+    """
+    Returns: 並び順の各列の値（カーソルなしならNone）
+    Raises: NotFound（改ざん・別の並び順のカーソル）
+    """
+    encoded = request.query_params.get(self.cursor_query_param)
+    if not encoded:
+      return None
+    try:
+      position = json.loads(base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)))
+      if not isinstance(position, list) or len(position) != len(self.ordering):
+        raise ValueError
+      return [
+        model._meta.get_field(field.lstrip('-')).to_python(value)
+        for field, value in zip(self.ordering, position)
+      ]
+    except (binascii.Error, ValueError, TypeError, DjangoValidationError):
+      raise NotFound(self.invalid_cursor_message)
+
+  @classmethod
+  def iterate(cls, queryset, ordering, chunk_size):
+    """
+    キーセットでchunk_size件ずつ取得するイテレータ（エクスポート等の全件処理用）
+    1チャンクごとに別のクエリで引くため、DBドライバが結果セット全体をクライアントに保持しない
+    prefetch_relatedもチャンクごとに実行される
+    Yields: 各チャンクのリスト
+    """
+    queryset = queryset.order_by(*ordering)
+    position = None
+    while True:
+      chunk_queryset = queryset if position is None else queryset.filter(cls.after(ordering, position))
+      chunk = list(chunk_queryset[:chunk_size])
+      if chunk:
+        yield chunk
+      if len(chunk) < chunk_size:
+        return
+      position = cls.position_of(chunk[-1], ordering)
+
+  @staticmethod
+  def position_of(row, ordering):
+    return [getattr(row, field.lstrip('-')) for field in ordering]
+
+  @staticmethod
+  def after(ordering, position):
+    """(a, b) > (x, y) の行比較をインデックスで引ける形に展開: a > x OR (a = x AND b > y)"""
+    condition = Q()
+    equal = {}
+    for field, value in zip(ordering, position):
+      name = field.lstrip('-')
+      lookup = 'lt' if field.startswith('-') else 'gt'
+      condition |= Q(**equal, **{f'{name}__{lookup}': value})
+      equal[name] = value
+    return condition
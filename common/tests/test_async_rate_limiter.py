@@ -0,0 +1,77 @@
+import asyncio
+import pytest
+from asgiref.sync import async_to_sync
+from unittest.mock import patch
+from django.core.cache import cache
+
+from common.utils import RateLimiter
+
+
+@pytest.fixture
+def redis_clients(fake_redis, fake_async_redis):
+  """同期・非同期の両方でfakeredisを使う"""
+  with patch('common.utils.rate_limiter.get_redis_client', return_value=fake_redis), \
+       patch('common.utils.rate_limiter.get_async_redis_client', return_value=fake_async_redis):
+    yield fake_redis
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+  cache.clear()
+  yield
+  cache.clear()
+
+
+class TestRateLimiterRedis:
+
+  def test_sync_and_async_share_counter(self, redis_clients):
+    limiter = RateLimiter()
+    acheck = async_to_sync(limiter.acheck_rate_limit)
+
+    results = [
+      limiter.check_rate_limit('test:shared', 3, 60),
+      acheck('test:shared', 3, 60),
+      limiter.check_rate_limit('test:shared', 3, 60),
+      acheck('test:shared', 3, 60),
+    ]
+
+    assert results == [True, True, True, False]
+    assert redis_clients.get(cache.make_key('test:shared')) == '4'
+    assert limiter.get_remaining('test:shared', 3) == 0
+    assert async_to_sync(limiter.aget_remaining)('test:shared', 3) == 0
+
+  def test_window_starts_at_first_request(self, redis_clients):
+    limiter = RateLimiter()
+    limiter.check_rate_limit('test:window', 5, 60)
+    redis_clients.expire(cache.make_key('test:window'), 30)
+
+    async_to_sync(limiter.acheck_rate_limit)('test:window', 5, 60)
+
+    # 2回目以降のリクエストで期限は延びない
+    assert 0 < limiter.get_reset_time('test:window') <= 30
+    assert 0 < async_to_sync(limiter.aget_reset_time)('test:window') <= 30
+
+  def test_concurrent_async_requests_are_counted_exactly(self, redis_clients):
+    limiter = RateLimiter()
+
+    async def burst():
+      return await asyncio.gather(*(limiter.acheck_rate_limit('test:burst', 5, 60) for _ in range(20)))
+
+    assert async_to_sync(burst)().count(True) == 5
+
+
+class TestRateLimiterCacheFallback:
+  """Redis未使用時はキャッシュで同じ判定を行う"""
+
+  def test_sync_and_async_share_counter(self):
+    limiter = RateLimiter()
+    acheck = async_to_sync(limiter.acheck_rate_limit)
+
+    results = [
+      acheck('test:fallback', 2, 60),
+      limiter.check_rate_limit('test:fallback', 2, 60),
+      acheck('test:fallback', 2, 60),
+    ]
+
+    assert results == [True, True, False]
+    assert limiter.get_reset_time('test:fallback') == 0
@@ -0,0 +1,163 @@
+import pytest
+import requests
+from unittest.mock import patch, MagicMock
+
+from common.utils import HTTPClient, CircuitBreaker, CircuitOpenError
+
+
+@pytest.fixture(autouse=True)
+def reset_clients():
+  HTTPClient.reset()
+  yield
+  HTTPClient.reset()
+
+
+def make_response(status_code):
+  response = MagicMock()
+  response.status_code = status_code
+  return response
+
+
+class TestCircuitBreaker:
+
+  def test_opens_after_threshold_and_fails_fast(self):
+    breaker = CircuitBreaker('test', failure_threshold=3, reset_timeout=30)
+
+    for _ in range(2):
+      assert breaker.allow_request() is True
+      breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.allow_request() is False
+
+  def test_success_resets_failure_count(self):
+    breaker = CircuitBreaker('test', failure_threshold=2)
+
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.CLOSED
+
+  def test_half_open_allows_single_trial(self):
+    breaker = CircuitBreaker('test', failure_threshold=1, reset_timeout=30)
+
+    with patch('common.utils.http_client.time.monotonic', return_value=100):
+      breaker.record_failure()
+
+    with patch('common.utils.http_client.time.monotonic', return_value=131):
+      assert breaker.state == CircuitBreaker.HALF_OPEN
+      assert breaker.allow_request() is True
+      # 試行中は他のリクエストを通さない
+      assert breaker.allow_request() is False
+
+      breaker.record_success()
+      assert breaker.state == CircuitBreaker.CLOSED
+
+  def test_failed_trial_reopens(self):
+    breaker = CircuitBreaker('test', failure_threshold=1, reset_timeout=30)
+
+    with patch('common.utils.http_client.time.monotonic', return_value=100):
+      breaker.record_failure()
+
+    with patch('common.utils.http_client.time.monotonic', return_value=131):
+      assert breaker.allow_request() is True
+      breaker.record_failure()
+      assert breaker.state == CircuitBreaker.OPEN
+
+
+class TestHTTPClient:
+
+  def test_client_is_shared_per_service(self):
+    assert HTTPClient.for_service('google') is HTTPClient.for_service('google')
+    assert HTTPClient.for_service('google') is not HTTPClient.for_service('line')
+
+  def test_adapter_retries_idempotent_requests_only(self):
+    client = HTTPClient.for_service('google')
+    retry = client.session.get_adapter('https://example.com').max_retries
+
+    assert retry.total == HTTPClient.RETRIES
+    assert set(HTTPClient.RETRY_STATUSES) <= set(retry.status_forcelist)
+    assert 'GET' in retry.allowed_methods
+    assert 'POST' not in retry.allowed_methods
+
+  def test_read_errors_are_not_retried(self):
+    """読み込みタイムアウトはリトライしない（接続エラーと502/503/504のみ）"""
+    retry = HTTPClient.for_service('google').session.get_adapter('https://example.com').max_retries
+
+    assert retry.read == 0
+    assert retry.connect == HTTPClient.RETRIES
+
+  def test_default_timeout(self):
+    client = HTTPClient.for_service('google')
+
+    with patch.object(client.session, 'request', return_value=make_response(200)) as mock_request:
+      client.get('https://example.com')
+      client.get('https://example.com', timeout=1)
+
+    assert mock_request.call_args_list[0].kwargs['timeout'] == (HTTPClient.CONNECT_TIMEOUT, HTTPClient.READ_TIMEOUT)
+    assert mock_request.call_args_list[1].kwargs['timeout'] == 1
+
+  def test_circuit_opens_on_connection_errors(self):
+    client = HTTPClient.for_service('google')
+
+    with patch.object(client.session, 'request', side_effect=requests.exceptions.ConnectTimeout) as mock_request:
+      for _ in range(CircuitBreaker.FAILURE_THRESHOLD):
+        with pytest.raises(requests.exceptions.ConnectTimeout):
+          client.get('https://example.com')
+
+      with pytest.raises(CircuitOpenError):
+        client.get('https://example.com')
+
+    assert mock_request.call_count == CircuitBreaker.FAILURE_THRESHOLD
+
+  def test_server_errors_count_as_failures(self):
+    client = HTTPClient.for_service('google')
+
+    with patch.object(client.session, 'request', return_value=make_response(503)):
+      for _ in range(CircuitBreaker.FAILURE_THRESHOLD):
+        client.get('https://example.com')
+
+    assert client.breaker.state == CircuitBreaker.OPEN
+
+  def test_client_errors_do_not_open_circuit(self):
+    client = HTTPClient.for_service('google')
+
+    with patch.object(client.session, 'request', return_value=make_response(401)):
+      for _ in range(CircuitBreaker.FAILURE_THRESHOLD):
+        client.get('https://example.com')
+
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+  def test_circuits_are_independent_per_service(self):
+    google = HTTPClient.for_service('google')
+    line = HTTPClient.for_service('line')
+
+    with patch.object(google.session, 'request', side_effect=requests.exceptions.ConnectionError):
+      for _ in range(CircuitBreaker.FAILURE_THRESHOLD):
+        with pytest.raises(requests.exceptions.ConnectionError):
+          google.get('https://example.com')
+
+    with patch.object(line.session, 'request', return_value=make_response(200)):
+      assert line.get('https://example.com').status_code == 200
+
+  def test_unexpected_error_releases_half_open_trial(self):
+    """半開状態の試行がRequestException以外で失敗しても、次のリクエストで再試行できる"""
+    client = HTTPClient.for_service('google')
+    client.breaker.reset_timeout = 30
+
+    with patch('common.utils.http_client.time.monotonic', return_value=100):
+      for _ in range(CircuitBreaker.FAILURE_THRESHOLD):
+        client.breaker.record_failure()
+
+    with patch('common.utils.http_client.time.monotonic', return_value=131):
+      with patch.object(client.session, 'request', side_effect=ValueError('bad header')):
+        with pytest.raises(ValueError):
+          client.get('https://example.com')
+
+      with patch.object(client.session, 'request', return_value=make_response(200)):
+        assert client.get('https://example.com').status_code == 200
+
+    assert client.breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,125 @@
+import pytest
+from datetime import timedelta
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from invitation.models import StaffInvitation
+from authentication.tests.factories import CompanyFactory
+from permissions.models import CompanyOwnership, TenantMembership
+
+
+def client_for(user):
+  client = APIClient()
+  client.force_authenticate(user=user)
+  return client
+
+
+def fetch_all(client, url, params=None):
+  """nextを辿って全ページを取得"""
+  pages = []
+  response = client.get(url, params or {}, secure=True)
+  while True:
+    assert response.status_code == 200, response.content
+    body = response.json()
+    pages.append(body['results'])
+    if not body['next']:
+      return pages
+    response = client.get(body['next'], secure=True)
+
+
+@pytest.fixture
+def admin(create_user):
+  return create_user(user_type='OWNER', is_system_admin=True)
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+
+  def test_pages_cover_all_rows_in_order(self, admin, create_user):
+    # 同じ登録日時のユーザーもidで順序が決まり、重複・欠落しない
+    joined = timezone.now() - timedelta(days=1)
+    users = [admin] + [create_user(date_joined=joined - timedelta(seconds=i // 3)) for i in range(11)]
+
+    pages = fetch_all(client_for(admin), reverse('user-list'), {'page_size': 4})
+
+    ids = [row['id'] for page in pages for row in page]
+    expected = sorted(users, key=lambda user: (user.date_joined, str(user.pk)), reverse=True)
+    assert [len(page) for page in pages] == [4, 4, 4]
+    assert ids == [str(user.pk) for user in expected]
+
+  def test_no_count_or_offset_query(self, admin, create_user):
+    for _ in range(5):
+      create_user()
+    client = client_for(admin)
+    first = client.get(reverse('user-list'), {'page_size': 2}, secure=True).json()
+
+    with CaptureQueriesContext(connection) as queries:
+      response = client.get(first['next'], secure=True)
+
+    assert response.status_code == 200
+    sql = ' '.join(query['sql'] for query in queries.captured_queries).upper()
+    assert 'COUNT(' not in sql and 'OFFSET' not in sql
+
+  def test_invalid_cursor(self, admin):
+    response = client_for(admin).get(reverse('user-list'), {'cursor': 'not-a-cursor'}, secure=True)
+
+    assert response.status_code == 404
+
+  def test_keyset_query_uses_index(self, admin):
+    from users.models import User
+    plan = User.objects.order_by('-date_joined', '-id').filter(date_joined__lt=timezone.now())[:20].explain()
+
+    assert 'idx_user_joined' in plan, plan
+
+
+@pytest.mark.django_db
+class TestListViews:
+
+  @pytest.fixture
+  def owner_setup(self, create_user, create_tenant, company):
+    owner = create_user(user_type='OWNER')
+    CompanyOwnership.objects.create(owner=owner, company=company)
+    tenants = [create_tenant(f'OWN{i:03d}') for i in range(3)]
+    create_tenant('OTHER01', company=CompanyFactory(name='Other Company'))
+    return owner, tenants
+
+  def test_staff_sees_members_of_own_tenant(self, owner_setup, create_user):
+    _, tenants = owner_setup
+    staff = create_user(user_type='STAFF')
+    colleague = create_user(user_type='STAFF')
+    outsider = create_user(user_type='STAFF')
+    for user, tenant in ((staff, tenants[0]), (colleague, tenants[0]), (outsider, tenants[1])):
+      TenantMembership.objects.create(user=user, tenant=tenant)
+
+    pages = fetch_all(client_for(staff), reverse('user-list'))
+
+    assert {row['id'] for page in pages for row in page} == {str(staff.pk), str(colleague.pk)}
+
+  def test_tenant_list_is_scoped_to_owner(self, owner_setup):
+    owner, tenants = owner_setup
+
+    pages = fetch_all(client_for(owner), reverse('tenant-list'), {'page_size': 2})
+
+    assert [row['code'] for page in pages for row in page] == [tenant.code for tenant in reversed(tenants)]
+
+  def test_invitation_list(self, owner_setup, create_user):
+    owner, tenants = owner_setup
+    for tenant in tenants[:2]:
+      StaffInvitation.objects.create(
+        invited_by=owner, tenant=tenant, user=create_user(user_type='STAFF', is_active=False),
+        email=f'{tenant.code.lower()}@example.com', country='AU', timezone='Australia/Sydney',
+      )
+
+    all_pages = fetch_all(client_for(owner), reverse('staff-invitation-list'))
+    tenant_pages = fetch_all(client_for(owner), reverse('staff-invitation-list'), {'tenant': str(tenants[1].pk)})
+
+    assert len(all_pages[0]) == 2
+    assert [row['tenant_name'] for row in tenant_pages[0]] == [tenants[1].name]
+
+  def test_invitation_list_is_hidden_from_staff(self, owner_setup, create_user):
+    response = client_for(create_user(user_type='STAFF')).get(reverse('staff-invitation-list'), secure=True)
+
+    assert response.json()['results'] == []
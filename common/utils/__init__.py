@@ -1,7 +1,18 @@
 from .rate_limiter import RateLimiter
 from .request_utils import get_client_ip
+from .redis_client import get_redis_client, get_async_redis_client
+from .bloom_filter import BloomFilter
+from .http_client import HTTPClient, CircuitBreaker, CircuitOpenError
+from .db_functions import CaseSensitive
 
 __all__ = [
   'get_client_ip',
-  'RateLimiter'
-]
\ No newline at end of file
+  'RateLimiter',
+  'get_redis_client',
+  'get_async_redis_client',
+  'BloomFilter',
+  'HTTPClient',
+  'CircuitBreaker',
+  'CircuitOpenError',
+  'CaseSensitive',
+]
@@ -0,0 +1,38 @@
+import hashlib
+import math
+
+
+class BloomFilter:
+  """
+  プロセス内Bloomフィルタ
+  「含まれない」判定は確実（偽陰性なし）, 「含まれる」判定は誤検知の可能性あり
+  """
+
+  def __init__(self, capacity: int, error_rate: float = 0.001):
+    self.capacity = capacity
+    self.error_rate = error_rate
+    self.size = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+    self.hash_count = max(1, int(round(self.size / capacity * math.log(2))))
+    self.bits = bytearray((self.size + 7) // 8)
+    self.count = 0
+
+  def _positions(self, item: str):
+    # ダブルハッシュ法（h1 + i*h2）でk個の位置を求める
+    digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], 'big')
+    h2 = int.from_bytes(digest[8:], 'big') | 1
+    return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+  def add(self, item: str):
+    for position in self._positions(item):
+      self.bits[position >> 3] |= 1 << (position & 7)
+    self.count += 1
+
+  def __contains__(self, item: str) -> bool:
+    return all(
+      self.bits[position >> 3] & (1 << (position & 7))
+      for position in self._positions(item)
+    )
+
+  def __len__(self) -> int:
+    return self.count
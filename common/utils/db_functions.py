@@ -0,0 +1,15 @@
+from django.db.models import Func
+
+
+class CaseSensitive(Func):
+  """
+  大文字小文字を区別して比較するための式
+  MySQLの既定の照合順序（*_ci）では 'A' = 'a' が真になるため、バイナリ文字列として比較する
+  （文字セットに依存しないようCOLLATEではなくCAST ... AS BINARYを使う）
+  SQLite・PostgreSQLは既定で区別するため、そのまま比較する
+  """
+  arity = 1
+  template = '%(expressions)s'
+
+  def as_mysql(self, compiler, connection, **extra_context):
+    return self.as_sql(compiler, connection, template='CAST(%(expressions)s AS BINARY)', **extra_context)
@@ -0,0 +1,170 @@
+import threading
+import time
+import logging
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+  """サーキットブレーカーが開いているため、リクエストを送らずに失敗"""
+  pass
+
+
+class CircuitBreaker:
+  """
+  外部サービスごとのサーキットブレーカー（プロセス内）
+    closed: 通常通りリクエストする
+    open: FAILURE_THRESHOLD回連続で失敗したらRESET_TIMEOUT秒間リクエストせずに失敗させる
+    half_open: RESET_TIMEOUT経過後、1件だけ試行し、成功すればclosed・失敗すれば再びopen
+  """
+
+  CLOSED = 'closed'
+  OPEN = 'open'
+  HALF_OPEN = 'half_open'
+
+  FAILURE_THRESHOLD = 5
+  RESET_TIMEOUT = 30
+
+  def __init__(self, name, failure_threshold=None, reset_timeout=None):
+    self.name = name
+    self.failure_threshold = failure_threshold or self.FAILURE_THRESHOLD
+    self.reset_timeout = reset_timeout or self.RESET_TIMEOUT
+    self._failures = 0
+    self._opened_at = None
+    self._trial_in_progress = False
+    self._lock = threading.Lock()
+
+  @property
+  def state(self):
+    if self._opened_at is None:
+      return self.CLOSED
+    if time.monotonic() - self._opened_at >= self.reset_timeout:
+      return self.HALF_OPEN
+    return self.OPEN
+
+  def allow_request(self):
+    with self._lock:
+      state = self.state
+      if state == self.CLOSED:
+        return True
+      if state == self.HALF_OPEN and not self._trial_in_progress:
+        self._trial_in_progress = True
+        return True
+      return False
+
+  def record_success(self):
+    with self._lock:
+      self._failures = 0
+      self._opened_at = None
+      self._trial_in_progress = False
+
+  def release_trial(self):
+    """結果を記録せずに終わった試行の枠を返す（半開状態なら次のリクエストで再び試行する）"""
+    with self._lock:
+      self._trial_in_progress = False
+
+  def record_failure(self):
+    with self._lock:
+      self._failures += 1
+      if self._trial_in_progress or self._failures >= self.failure_threshold:
+        if self._opened_at is None or self._trial_in_progress:
+          logger.warning(f"Circuit opened: {self.name} ({self._failures} consecutive failures)")
+        self._opened_at = time.monotonic()
+      self._trial_in_progress = False
+
+
+class HTTPClient:
+  """
+  外部サービスごとに使い回すHTTPクライアント
+  - コネクションプール（keep-alive）: 同じサービスへの接続・TLSハンドシェイクを使い回す
+  - タイムアウト: 接続CONNECT_TIMEOUT秒・読み込みREAD_TIMEOUT秒（呼び出し側で指定がない場合）
+  - リトライ: 冪等なメソッドのみ、接続エラー・502/503/504をRETRIES回まで
+    （読み込みタイムアウトはリトライしない。遅いサービスで待ち時間がREAD_TIMEOUTの倍数に膨らむため）
+  - サーキットブレーカー: 障害中のサービスへはリクエストせずCircuitOpenErrorで即失敗
+  """
+
+  CONNECT_TIMEOUT = 3
+  READ_TIMEOUT = 5
+  RETRIES = 2
+  BACKOFF_FACTOR = 0.2
+  RETRY_STATUSES = (502, 503, 504)
+  POOL_MAXSIZE = 10
+
+  _clients = {}
+  _clients_lock = threading.Lock()
+
+  def __init__(self, name):
+    self.name = name
+    self.breaker = CircuitBreaker(name)
+    self.session = requests.Session()
+
+    retry = Retry(
+      total=self.RETRIES,
+      connect=self.RETRIES,
+      read=0,
+      status=self.RETRIES,
+      status_forcelist=self.RETRY_STATUSES,
+      allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+      backoff_factor=self.BACKOFF_FACTOR,
+      raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.POOL_MAXSIZE, max_retries=retry)
+    self.session.mount('https://', adapter)
+    self.session.mount('http://', adapter)
+
+  @classmethod
+  def for_service(cls, name):
+    """サービス名ごとのクライアント（プロセス内で共有）"""
+    client = cls._clients.get(name)
+    if client is None:
+      with cls._clients_lock:
+        client = cls._clients.get(name)
+        if client is None:
+          client = cls(name)
+          cls._clients[name] = client
+    return client
+
+  @classmethod
+  def reset(cls):
+    """全クライアントを破棄（テスト用）"""
+    with cls._clients_lock:
+      for client in cls._clients.values():
+        client.session.close()
+      cls._clients = {}
+
+  def request(self, method, url, **kwargs):
+    """
+    Raises: CircuitOpenError, requests.exceptions.RequestException
+    """
+    if not self.breaker.allow_request():
+      raise CircuitOpenError(f"{self.name} is unavailable (circuit open)")
+
+    kwargs.setdefault('timeout', (self.CONNECT_TIMEOUT, self.READ_TIMEOUT))
+    recorded = False
+    try:
+      response = self.session.request(method, url, **kwargs)
+      # 4xxはリクエスト側の問題（トークン無効など）のため障害として数えない
+      if response.status_code >= 500:
+        self.breaker.record_failure()
+      else:
+        self.breaker.record_success()
+      recorded = True
+      return response
+    except requests.exceptions.RequestException:
+      self.breaker.record_failure()
+      recorded = True
+      raise
+    finally:
+      # RequestException以外の例外で抜けた場合も試行枠を返す（残ると半開状態のまま二度と試行されない）
+      if not recorded:
+        self.breaker.release_trial()
+
+  def get(self, url, **kwargs):
+    return self.request('GET', url, **kwargs)
+
+  def post(self, url, **kwargs):
+    return self.request('POST', url, **kwargs)
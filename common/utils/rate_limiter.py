@@ -1,47 +1,91 @@
 from django.core.cache import cache
-from django_redis import get_redis_connection
+from .redis_client import get_redis_client, get_async_redis_client
 import logging
 
 logger = logging.getLogger(__name__)
 
 class RateLimiter:
-  """汎用レート制限（どのアプリからも使用可能）"""
-  
+  """
+  汎用レート制限（どのアプリからも使用可能）
+  同期版・非同期版（a〜）は同じキー（cache.make_key）・同じカウントを使うため、制限を共有する
+  カウントはSET NX（期限付き）+ INCRをまとめて実行し、同時リクエストでも数え漏れない
+  """
+
   def __init__(self):
-    self.redis_client = None
-    try:
-      self.redis_client = get_redis_connection("default")
-    except Exception as e:
-      logger.warning(f"Redis connection not available: {e}")
+    self.redis_client = get_redis_client()
 
   def check_rate_limit(self, key: str, limit: int, period: int) -> bool:
+    """
+    Returns: True: リクエスト許可, False: レート制限超過
+    """
     try:
-      current = cache.get(key)
-      
-      if current is None:
-        cache.set(key, 1, timeout=period)
-        return True
-      
-      current = int(current)
-      if current >= limit:
-        logger.warning(f"Rate limit exceeded for key: {key}")
-        return False
-      cache.incr(key)
+      if self.redis_client is None:
+        cache.add(key, 0, timeout=period)
+        current = cache.incr(key)
+      else:
+        redis_key = cache.make_key(key)
+        pipe = self.redis_client.pipeline()
+        pipe.set(redis_key, 0, ex=period, nx=True)
+        pipe.incr(redis_key)
+        _, current = pipe.execute()
+      return self._is_allowed(key, current, limit)
+
+    except Exception as e:
+      logger.error(f"Cache error in rate limiting: {str(e)}")
       return True
-      
+
+  async def acheck_rate_limit(self, key: str, limit: int, period: int) -> bool:
+    """check_rate_limitの非同期版（redis.asyncio）"""
+    try:
+      client = get_async_redis_client()
+      if client is None:
+        await cache.aadd(key, 0, timeout=period)
+        current = await cache.aincr(key)
+      else:
+        redis_key = cache.make_key(key)
+        async with client.pipeline() as pipe:
+          pipe.set(redis_key, 0, ex=period, nx=True)
+          pipe.incr(redis_key)
+          _, current = await pipe.execute()
+      return self._is_allowed(key, current, limit)
+
     except Exception as e:
       logger.error(f"Cache error in rate limiting: {str(e)}")
       return True
-  
+
+  @staticmethod
+  def _is_allowed(key, current, limit):
+    if current > limit:
+      logger.warning(f"Rate limit exceeded for key: {key}")
+      return False
+    return True
+
   def get_remaining(self, key: str, limit: int) -> int:
     try:
-      current = cache.get(key)
+      if self.redis_client is None:
+        current = cache.get(key)
+      else:
+        current = self.redis_client.get(cache.make_key(key))
       if current is None:
         return limit
       return max(0, limit - int(current))
     except Exception:
+      return limit
+
+  async def aget_remaining(self, key: str, limit: int) -> int:
+    """get_remainingの非同期版"""
+    try:
+      client = get_async_redis_client()
+      if client is None:
+        current = await cache.aget(key)
+      else:
+        current = await client.get(cache.make_key(key))
+      if current is None:
         return limit
-  
+      return max(0, limit - int(current))
+    except Exception:
+      return limit
+
   def get_reset_time(self, key: str) -> int:
     """
     Note: この機能はRedis使用時のみ正確に動作します
@@ -49,9 +93,21 @@ class RateLimiter:
     """
     if self.redis_client is None:
       return 0
-    
+
+    try:
+      ttl = self.redis_client.ttl(cache.make_key(key))
+      return ttl if ttl > 0 else 0
+    except Exception:
+      return 0
+
+  async def aget_reset_time(self, key: str) -> int:
+    """get_reset_timeの非同期版（Redis未使用時は0）"""
+    client = get_async_redis_client()
+    if client is None:
+      return 0
+
     try:
-      ttl = self.redis_client.ttl(key)
+      ttl = await client.ttl(cache.make_key(key))
       return ttl if ttl > 0 else 0
     except Exception:
-      return 0
\ No newline at end of file
+      return 0
@@ -1,18 +1,58 @@
-# import redis
-# from django.conf import settings
-
-# _redis_client = None
-
-# def get_redis_client():
-#   global _redis_client
-#   if _redis_client is None:
-#     _redis_client = redis.Redis(
-#       host=settings.REDIS_HOST,
-#       port=settings.REDIS_PORT,
-#       db=settings.REDIS_DB,
-#       decode_responses=True,
-#       socket_connect_timeout=5,
-#       socket_timeout=5,
-#     )
-#   return _redis_client
+import asyncio
+import logging
+import weakref
 
+import redis.asyncio
+from django.conf import settings
+from django_redis import get_redis_connection
+
+logger = logging.getLogger(__name__)
+
+_backend_warning_logged = False
+
+
+def get_redis_client():
+  """
+  django-redisの接続を取得
+
+  Returns: Redisクライアント（Redis未使用のキャッシュバックエンドではNone）
+  """
+  global _backend_warning_logged
+
+  try:
+    return get_redis_connection("default")
+  except NotImplementedError as e:
+    # キャッシュバックエンドがRedisでない（設定による）ため、警告は1回のみ
+    if not _backend_warning_logged:
+      logger.warning(f"Redis connection not available: {e}")
+      _backend_warning_logged = True
+    return None
+  except Exception as e:
+    logger.warning(f"Redis connection not available: {e}")
+    return None
+
+
+# イベントループ → redis.asyncioクライアント（コネクションプールはループごとに必要）
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_redis_client():
+  """
+  キャッシュ設定（django-redis）と同じRedisへのredis.asyncioクライアントを取得
+
+  Returns: Redisクライアント（Redis未使用のキャッシュバックエンドではNone）
+  """
+  cache_settings = settings.CACHES.get('default', {})
+  if not cache_settings.get('BACKEND', '').startswith('django_redis.'):
+    return None
+
+  loop = asyncio.get_running_loop()
+  client = _async_clients.get(loop)
+  if client is None:
+    location = cache_settings['LOCATION']
+    if isinstance(location, (list, tuple)):
+      location = location[0]
+    pool_kwargs = cache_settings.get('OPTIONS', {}).get('CONNECTION_POOL_KWARGS', {})
+    client = redis.asyncio.Redis.from_url(location, **pool_kwargs)
+    _async_clients[loop] = client
+  return client
@@ -1,5 +1,6 @@
 """pytest全体の設定とフィクスチャ"""
 import pytest
+from unittest.mock import patch
 from rest_framework.test import APIClient
 from faker import Faker
 import fakeredis
@@ -20,14 +21,63 @@ def api_client():
 
 
 @pytest.fixture
-def fake_redis():
+def fake_redis_server():
+  """fake_redis・fake_async_redisで共有するfake Redisサーバー"""
+  return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def fake_redis(fake_redis_server):
   """テスト用のfake Redis"""
-  redis_client = fakeredis.FakeStrictRedis(decode_responses=True)
+  redis_client = fakeredis.FakeStrictRedis(server=fake_redis_server, decode_responses=True)
   # テスト前にクリア
   redis_client.flushdb()
   return redis_client
 
 
+@pytest.fixture
+def fake_async_redis(fake_redis_server):
+  """テスト用のfake Redis（redis.asyncio互換, fake_redisとデータを共有）"""
+  return fakeredis.FakeAsyncRedis(server=fake_redis_server, decode_responses=True)
+
+
+@pytest.fixture
+def create_user(db):
+  """バリデーションを通さずにユーザーを作成するヘルパー（パスワード: testpassword123）"""
+  from authentication.tests.factories import UserFactory
+
+  def _create_user(**kwargs):
+    user = UserFactory.build(**kwargs)
+    user.set_password('testpassword123')
+    user.save(skip_validation=True)
+    return user
+  return _create_user
+
+
+@pytest.fixture
+def company(db):
+  from authentication.tests.factories import CompanyFactory
+  return CompanyFactory()
+
+
+@pytest.fixture
+def create_tenant(company):
+  """テナントを作成するヘルパー（company省略時はcompanyフィクスチャの会社）"""
+  from authentication.tests.factories import TenantFactory
+
+  def _create_tenant(code, **kwargs):
+    kwargs.setdefault('company', company)
+    return TenantFactory(code=code, **kwargs)
+  return _create_tenant
+
+
+@pytest.fixture
+def redis_blacklist(fake_redis):
+  """fakeredisを使うTokenBlacklist（本番と同じくRedisで失効を管理）"""
+  with patch('authentication.utils.token_blacklist.get_redis_client', return_value=fake_redis):
+    yield fake_redis
+
+
 @pytest.fixture
 def authenticated_client(api_client, owner_user):
   """認証済みAPIクライアント"""
@@ -0,0 +1,52 @@
+import sys
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from invitation.utils import StaffImporter
+from organizations.models import Tenant
+from users.models import User
+
+
+class Command(BaseCommand):
+  help = 'CSV・JSONLのスタッフ一覧からスタッフを一括招待する（1行ずつ読み、バッチごとに作成）'
+
+  def add_arguments(self, parser):
+    parser.add_argument('path', help='CSV・JSONLファイル（-で標準入力）')
+    parser.add_argument('--tenant', required=True, help='招待先のテナントコード')
+    parser.add_argument('--invited-by', required=True, help='招待するオーナーのメールアドレス')
+    parser.add_argument('--format', choices=StaffImporter.FORMATS, help='省略時は拡張子から判定')
+    parser.add_argument('--batch-size', type=int, default=StaffImporter.BATCH_SIZE)
+
+  def handle(self, *args, **options):
+    tenant = Tenant.objects.filter(code=options['tenant']).select_related('company').first()
+    if tenant is None:
+      raise CommandError(f"テナントが見つかりません: {options['tenant']}")
+    owner = User.objects.owners().by_email(options['invited_by']).first()
+    if owner is None:
+      raise CommandError(f"オーナーが見つかりません: {options['invited_by']}")
+
+    path = options['path']
+    try:
+      format = StaffImporter.detect_format(path, options['format'] or ('csv' if path == '-' else None))
+    except ValidationError as e:
+      raise CommandError(e.messages[0])
+
+    importer = StaffImporter(tenant, owner, batch_size=options['batch_size'], on_batch=self._report_progress)
+    if path == '-':
+      result = importer.run(sys.stdin, format)
+    else:
+      with open(path, newline='', encoding='utf-8-sig') as stream:
+        result = importer.run(stream, format)
+
+    for line, errors in result.errors:
+      for field, messages in errors.items():
+        self.stderr.write(f"line {line}: {field}: {' '.join(messages)}")
+    if result.failed > len(result.errors):
+      self.stderr.write(f'... {result.failed - len(result.errors)} more errors')
+    self.stdout.write(self.style.SUCCESS(
+      f'Created {result.created} staff, {result.failed} failed '
+      f'({result.elapsed:.1f}s, {result.rows_per_second:.0f} rows/s)'
+    ))
+
+  def _report_progress(self, result):
+    self.stdout.write(f'{result.processed} rows ({result.rows_per_second:.0f} rows/s)')
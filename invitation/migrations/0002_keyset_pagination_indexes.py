@@ -0,0 +1,24 @@
+# Generated by Django 5.0 on 2026-10-19 07:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('invitation', '0001_initial'),
+        ('organizations', '0002_keyset_pagination_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='staffinvitation',
+            index=models.Index(fields=['tenant', 'created_at', 'id'], name='idx_invitation_tenant_created'),
+        ),
+        migrations.AddIndex(
+            model_name='staffinvitation',
+            index=models.Index(fields=['created_at', 'id'], name='idx_invitation_created'),
+        ),
+    ]
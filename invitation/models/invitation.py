@@ -141,12 +141,20 @@ class StaffInvitation(models.Model):
     indexes = [
       models.Index(fields=['token', 'is_used']),
       models.Index(fields=['email', 'is_used']),
+      # 一覧のキーセットページネーション（common.pagination.KeysetPagination）
+      models.Index(fields=['tenant', 'created_at', 'id'], name='idx_invitation_tenant_created'),
+      models.Index(fields=['created_at', 'id'], name='idx_invitation_created'),
     ]
     
   def __str__(self):
       return f"{self.email} - {self.tenant.name}"
   
   def save(self, *args, **kwargs):
+    self.set_defaults()
+    super().save(*args, **kwargs)
+
+  def set_defaults(self):
+    """トークン・有効期限を設定（bulk_createはsaveを通さないため、作成前に呼ぶ）"""
     # トークン生成
     if not self.token:
       self.token = uuid.uuid4().hex
@@ -154,8 +162,6 @@ class StaffInvitation(models.Model):
     # 有効期限設定（7日間）
     if not self.expires_at:
       self.expires_at = timezone.now() + timedelta(days=7)
-    
-    super().save(*args, **kwargs)
   
   """招待が有効かチェック"""
   def is_valid(self):
@@ -1,5 +1,6 @@
-from staff_invitation import ValidateInvitationSerializer
+from .staff_invitation import ValidateInvitationSerializer, StaffInvitationSerializer
 
 __all__ = [
   'ValidateInvitationSerializer',
+  'StaffInvitationSerializer',
 ]
\ No newline at end of file
@@ -1,5 +1,18 @@
 from rest_framework import serializers
+from invitation.models import StaffInvitation
 
 class ValidateInvitationSerializer(serializers.Serializer):
   """招待トークンの検証用"""
-  token = serializers.CharField(required=True, max_length=255)
\ No newline at end of file
+  token = serializers.CharField(required=True, max_length=255)
+
+class StaffInvitationSerializer(serializers.ModelSerializer):
+  """招待一覧用"""
+  tenant_name = serializers.CharField(source='tenant.name', read_only=True)
+
+  class Meta:
+    model = StaffInvitation
+    fields = [
+      'id', 'email', 'first_name', 'last_name', 'tenant', 'tenant_name',
+      'is_used', 'created_at', 'expires_at', 'used_at'
+    ]
+    read_only_fields = fields
@@ -0,0 +1,213 @@
+import io
+import json
+import pytest
+from unittest.mock import patch
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import resolve, reverse
+from rest_framework.test import APIClient
+
+from invitation.models import StaffInvitation
+from invitation.utils import StaffImporter
+from permissions.models import CompanyOwnership, TenantMembership
+from users.models import User
+
+
+CSV = (
+  'Email,First_Name,Last_Name,Country\n'
+  'Hanako@Example.com,花子,佐藤,\n'
+  'not-an-email,太郎,山田,\n'
+  'taken@example.com,既存,ユーザー,\n'
+  'temp@mailinator.com,使い捨て,メール,\n'
+  'jiro@example.com,次郎,鈴木,XX\n'
+  'hanako@example.com,花子,重複,\n'
+  '"ken@example.com","健","""高橋""",JP\n'
+)
+
+
+@pytest.fixture(autouse=True)
+def no_disposable_api(settings):
+  settings.USE_DISPOSABLE_EMAIL_API = False
+
+
+@pytest.fixture
+def owner(create_user):
+  return create_user(user_type='OWNER', email='owner@example.com')
+
+
+@pytest.fixture
+def tenant(owner, create_tenant):
+  tenant = create_tenant('SBY001')
+  CompanyOwnership.objects.create(owner=owner, company=tenant.company)
+  return tenant
+
+
+@pytest.fixture
+def taken(db):
+  return User.objects.create_user('taken@example.com', 'testpassword123', user_type='STAFF')
+
+
+@pytest.mark.django_db
+class TestStaffImporter:
+
+  def test_csv_rows_are_imported_with_per_row_errors(self, owner, tenant, taken):
+    result = StaffImporter(tenant, owner, batch_size=3).run(io.StringIO(CSV, newline=''), 'csv')
+
+    assert (result.created, result.failed) == (2, 5)
+    assert [(line, list(errors)) for line, errors in result.errors] == [
+      (3, ['email']), (4, ['email']), (5, ['email']), (6, ['country']), (7, ['email']),
+    ]
+    hanako = User.objects.get(email='hanako@example.com', user_group='STAFF_OWNER')
+    assert not hanako.is_active and hanako.user_type == 'STAFF'
+    invitation = StaffInvitation.objects.get(user=hanako)
+    assert (invitation.tenant, invitation.invited_by, invitation.timezone) == (tenant, owner, 'Australia/Sydney')
+    assert invitation.token and invitation.is_valid()
+    assert TenantMembership.objects.filter(tenant=tenant, user=hanako).exists()
+    assert User.objects.get(email='ken@example.com').last_name == '"高橋"'
+    assert StaffInvitation.objects.get(email='ken@example.com').timezone == 'Asia/Tokyo'
+
+  def test_jsonl_with_malformed_lines(self, owner, tenant):
+    lines = [
+      json.dumps({'email': 'a@example.com', 'first_name': '一郎'}),
+      '{broken',
+      '',
+      json.dumps(['not', 'an', 'object']),
+      json.dumps({'email': 'b@example.com', 'language': 'ja'}),
+    ]
+
+    result = StaffImporter(tenant, owner).run(io.StringIO('\n'.join(lines)), 'jsonl')
+
+    assert result.created == 2
+    assert [line for line, _ in result.errors] == [2, 4]
+    assert StaffInvitation.objects.get(email='b@example.com').language == 'ja'
+
+  def test_batches_use_a_fixed_number_of_queries(self, owner, tenant, django_assert_max_num_queries):
+    rows = ''.join(f'staff{i}@example.com,名{i},姓{i}\n' for i in range(200))
+
+    # 1行ずつなら200 × 10文以上
+    with django_assert_max_num_queries(60):
+      result = StaffImporter(tenant, owner).run(io.StringIO('email,first_name,last_name\n' + rows, newline=''), 'csv')
+
+    assert result.created == 200 and result.rows_per_second > 0
+
+  def test_reports_progress_per_batch(self, owner, tenant):
+    rows = ''.join(f'staff{i}@example.com\n' for i in range(5))
+    progress = []
+
+    StaffImporter(tenant, owner, batch_size=2, on_batch=lambda result: progress.append(result.processed)).run(
+      io.StringIO('email\n' + rows, newline=''), 'csv'
+    )
+
+    assert progress == [2, 4, 5]
+
+  def test_repeated_conflict_is_reported_per_row(self, owner, tenant):
+    """検証後の重複で2回続けて作成に失敗しても、行のエラーとして記録して続ける"""
+    conflict = ValidationError({'email': [User.DUPLICATE_EMAIL_MESSAGE]})
+    rows = ''.join(f'staff{i}@example.com\n' for i in range(3))
+
+    conflicts = iter([conflict, conflict])
+    bulk_provision = User.objects.bulk_provision
+
+    def provision(*args, **kwargs):
+      error = next(conflicts, None)
+      if error:
+        raise error
+      return bulk_provision(*args, **kwargs)
+
+    with patch.object(type(User.objects), 'bulk_provision', side_effect=provision) as mock_provision:
+      result = StaffImporter(tenant, owner, batch_size=2).run(io.StringIO('email\n' + rows, newline=''), 'csv')
+
+    assert mock_provision.call_count == 3
+    assert (result.created, result.failed) == (1, 2)
+    assert result.errors == [(2, {'email': [User.DUPLICATE_EMAIL_MESSAGE]}), (3, {'email': [User.DUPLICATE_EMAIL_MESSAGE]})]
+
+  def test_unreadable_rest_of_file_is_reported(self, owner, tenant):
+    """途中で読めなくなっても、それまでの行は作成して結果を返す"""
+    text = 'email\na@example.com\nb@example.com\n"' + 'x' * 200_000 + '"\nc@example.com\n'
+
+    result = StaffImporter(tenant, owner, batch_size=1).run(io.StringIO(text, newline=''), 'csv')
+
+    assert (result.created, result.failed) == (2, 1)
+    assert list(result.errors[0][1]) == ['file']
+    assert set(User.objects.filter(user_type='STAFF').values_list('email', flat=True)) == {'a@example.com', 'b@example.com'}
+
+  def test_detect_format(self):
+    assert StaffImporter.detect_format('staff.CSV') == 'csv'
+    assert StaffImporter.detect_format('staff.ndjson') == 'jsonl'
+    assert StaffImporter.detect_format('staff.txt', 'jsonl') == 'jsonl'
+    with pytest.raises(ValidationError):
+      StaffImporter.detect_format('staff.xlsx')
+
+
+@pytest.mark.django_db
+class TestStaffImportEntryPoints:
+
+  def test_command(self, owner, tenant, taken, tmp_path):
+    path = tmp_path / 'staff.csv'
+    path.write_text(CSV, encoding='utf-8')
+    stdout, stderr = io.StringIO(), io.StringIO()
+
+    call_command('import_staff', str(path), tenant='SBY001', invited_by='OWNER@example.com', stdout=stdout, stderr=stderr)
+
+    assert 'Created 2 staff, 5 failed' in stdout.getvalue()
+    assert 'line 3: email:' in stderr.getvalue()
+
+  def test_api(self, owner, tenant, taken):
+    client = APIClient()
+    client.force_authenticate(user=owner)
+    upload = SimpleUploadedFile('staff.csv', CSV.encode('utf-8-sig'), content_type='text/csv')
+
+    response = client.post(
+      reverse('staff-invitation-import'), {'tenant': str(tenant.pk), 'file': upload}, format='multipart', secure=True
+    )
+
+    assert response.status_code == 200, response.content
+    body = response.json()
+    assert (body['created'], body['failed']) == (2, 5)
+    assert body['errors'][0]['line'] == 3
+
+  def test_api_reports_undecodable_file(self, owner, tenant):
+    client = APIClient()
+    client.force_authenticate(user=owner)
+    upload = SimpleUploadedFile('staff.csv', 'email\n佐藤@example.com\n'.encode('shift_jis'), content_type='text/csv')
+
+    response = client.post(
+      reverse('staff-invitation-import'), {'tenant': str(tenant.pk), 'file': upload}, format='multipart', secure=True
+    )
+
+    assert response.status_code == 200, response.content
+    assert list(response.json()['errors'][0]['errors']) == ['file']
+
+  def test_api_reports_invalid_tenant_under_tenant(self, owner):
+    client = APIClient()
+    client.force_authenticate(user=owner)
+    upload = SimpleUploadedFile('staff.csv', b'email\na@example.com\n', content_type='text/csv')
+
+    response = client.post(
+      reverse('staff-invitation-import'), {'tenant': 'not-a-uuid', 'file': upload}, format='multipart', secure=True
+    )
+
+    assert response.status_code == 400
+    assert list(response.json()) == ['tenant']
+
+  def test_api_commits_per_batch(self):
+    """ATOMIC_REQUESTSでもリクエスト全体を1つのトランザクションにしない"""
+    view = resolve(reverse('staff-invitation-import')).func
+
+    assert 'default' in getattr(view, '_non_atomic_requests', set())
+
+  def test_api_rejects_staff_and_foreign_tenants(self, owner, tenant):
+    staff = User.objects.create_user('staff@example.com', 'testpassword123', user_type='STAFF')
+    other_owner = User.objects.create_user('other@example.com', 'testpassword123', user_type='OWNER')
+    url = reverse('staff-invitation-import')
+
+    def post(user):
+      client = APIClient()
+      client.force_authenticate(user=user)
+      upload = SimpleUploadedFile('staff.csv', b'email\na@example.com\n', content_type='text/csv')
+      return client.post(url, {'tenant': str(tenant.pk), 'file': upload}, format='multipart', secure=True)
+
+    assert post(staff).status_code == 403
+    assert post(other_owner).status_code == 400
+    assert not StaffInvitation.objects.exists()
@@ -0,0 +1,9 @@
+from django.urls import path
+from invitation.views import ValidateInvitationAPIView, StaffInvitationListView, StaffImportAPIView
+
+
+urlpatterns = [
+  path('staff/', StaffInvitationListView.as_view(), name='staff-invitation-list'),
+  path('staff/import/', StaffImportAPIView.as_view(), name='staff-invitation-import'),
+  path('staff/validate/', ValidateInvitationAPIView.as_view(), name='staff-invitation-validate'),
+]
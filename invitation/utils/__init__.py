@@ -0,0 +1,6 @@
+from .staff_importer import StaffImporter, StaffImportResult
+
+__all__ = [
+  'StaffImporter',
+  'StaffImportResult',
+]
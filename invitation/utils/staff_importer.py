@@ -0,0 +1,206 @@
+import csv
+import json
+import time
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+
+class StaffImportResult:
+  """インポートの結果（エラーはMAX_ERRORS件まで保持し、件数は全て数える）"""
+
+  MAX_ERRORS = 1000
+
+  def __init__(self):
+    self.created = 0
+    self.failed = 0
+    # [(行番号, {フィールド: [メッセージ]})]
+    self.errors = []
+    self.started_at = time.perf_counter()
+    self.elapsed = 0.0
+
+  @property
+  def processed(self):
+    return self.created + self.failed
+
+  @property
+  def rows_per_second(self):
+    elapsed = self.elapsed or (time.perf_counter() - self.started_at)
+    return self.processed / elapsed if elapsed else 0.0
+
+  def add_error(self, line, messages):
+    self.failed += 1
+    if len(self.errors) < self.MAX_ERRORS:
+      self.errors.append((line, messages))
+
+  def finish(self):
+    self.elapsed = time.perf_counter() - self.started_at
+    return self
+
+  def as_dict(self):
+    return {
+      'created': self.created,
+      'failed': self.failed,
+      'elapsed': round(self.elapsed, 3),
+      'rows_per_second': round(self.rows_per_second, 1),
+      'errors': [{'line': line, 'errors': messages} for line, messages in self.errors],
+    }
+
+
+class StaffImporter:
+  """
+  スタッフの一括招待（CSV・JSONL）
+  ファイルを1行ずつ読み、BATCH_SIZE行ごとに検証・作成する（ファイル全体をメモリに載せない）
+    検証: フィールド・重複（UserManager.validate_bulk, IN句）・使い捨てメール（ドメインごとにまとめて判定）
+    作成: UserManager.bulk_provision（未有効のスタッフ・テナント所属）+ StaffInvitationのbulk_create
+  エラーの行は行番号とともに記録し、同じバッチの他の行は作成する
+  列: email（必須）, first_name, last_name, language, country, timezone（国・タイムゾーンは省略時テナントの国から決める）
+  """
+
+  BATCH_SIZE = 500
+  FORMATS = ('csv', 'jsonl')
+  FIELDS = ('email', 'first_name', 'last_name', 'language', 'country', 'timezone')
+  DEFAULT_TIMEZONES = {'AU': 'Australia/Sydney', 'JP': 'Asia/Tokyo'}
+  DISPOSABLE_EMAIL_MESSAGE = '使い捨てメールアドレスは使用できません。'
+  UNREADABLE_FILE_MESSAGE = 'ファイルを読み込めませんでした（UTF-8のCSV・JSONLを指定してください）'
+
+  def __init__(self, tenant, invited_by, batch_size=None, on_batch=None):
+    """on_batch: バッチごとに結果（StaffImportResult）を受け取る関数（進捗の表示用）"""
+    self.tenant = tenant
+    self.invited_by = invited_by
+    self.batch_size = batch_size or self.BATCH_SIZE
+    self.on_batch = on_batch
+
+  @classmethod
+  def detect_format(cls, filename, format=None):
+    """format指定がなければ拡張子から判定（.json・.ndjsonはJSONL）"""
+    if not format:
+      extension = (filename or '').rsplit('.', 1)[-1].lower()
+      format = 'jsonl' if extension in ('json', 'jsonl', 'ndjson') else extension
+    if format not in cls.FORMATS:
+      raise ValidationError(f'対応していない形式です: {format}')
+    return format
+
+  @classmethod
+  def read_rows(cls, stream, format):
+    """
+    stream: テキストのファイルオブジェクト（CSVはnewline=''で開く）
+    Yields: (行番号, {列: 値} または ValidationError)
+    """
+    if format == 'csv':
+      reader = csv.DictReader(stream)
+      if reader.fieldnames:
+        reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+      for row in reader:
+        yield reader.line_num, row
+      return
+
+    for line, text in enumerate(stream, start=1):
+      if not text.strip():
+        continue
+      try:
+        row = json.loads(text)
+      except ValueError as e:
+        yield line, ValidationError(f'JSONの形式が正しくありません: {e}')
+        continue
+      if not isinstance(row, dict):
+        yield line, ValidationError('各行はJSONのオブジェクトで指定してください')
+        continue
+      yield line, row
+
+  def run(self, stream, format):
+    """
+    Returns: StaffImportResult
+    ファイルの途中で読めなくなった場合（UTF-8でない・CSVの形式の誤り）は、それまでの行を作成し、
+    読めなくなった行をエラーとして記録して返す（それ以前のバッチはコミット済みのため）
+    """
+    result = StaffImportResult()
+    batch = []
+    line = 0
+    try:
+      for line, row in self.read_rows(stream, format):
+        if isinstance(row, ValidationError):
+          result.add_error(line, {'row': row.messages})
+          continue
+        batch.append((line, row))
+        if len(batch) >= self.batch_size:
+          self._import_batch(batch, result)
+          batch = []
+    except (UnicodeDecodeError, csv.Error) as e:
+      result.add_error(line + 1, {'file': [f'{self.UNREADABLE_FILE_MESSAGE}: {e}']})
+    if batch:
+      self._import_batch(batch, result)
+    return result.finish()
+
+  def _build(self, row):
+    from invitation.models import StaffInvitation
+    from users.models import User
+    values = {field: str(row.get(field) or '').strip() for field in self.FIELDS}
+    country = values['country'].upper() or self.tenant.country
+    timezone = values['timezone'] or self.DEFAULT_TIMEZONES.get(country, '')
+    language = values['language'].lower() or None
+
+    user = User(
+      email=values['email'], user_type='STAFF', is_active=False,
+      first_name=values['first_name'], last_name=values['last_name'],
+      language=language, country=country, user_timezone=timezone,
+    )
+    invitation = StaffInvitation(
+      invited_by=self.invited_by, tenant=self.tenant,
+      first_name=values['first_name'], last_name=values['last_name'],
+      language=language or 'en', country=country, timezone=timezone,
+    )
+    return user, invitation
+
+  def _validate(self, users, invitations):
+    """Returns: {バッチ内のインデックス: {フィールド: [メッセージ]}}"""
+    from authentication.utils import DisposableEmailChecker
+    from users.models import User
+    errors = {index: error.message_dict for index, error in User.objects.validate_bulk(users).items()}
+
+    for index, invitation in enumerate(invitations):
+      if index in errors:
+        continue
+      invitation.email = users[index].email
+      try:
+        invitation.clean_fields(exclude=['user', 'invited_by', 'tenant', 'token', 'expires_at'])
+      except ValidationError as e:
+        errors[index] = e.message_dict
+
+    candidates = [index for index in range(len(users)) if index not in errors]
+    disposable = DisposableEmailChecker.disposable_domains(users[index].email for index in candidates)
+    for index in candidates:
+      if users[index].email.rsplit('@', 1)[-1] in disposable:
+        errors[index] = {'email': [self.DISPOSABLE_EMAIL_MESSAGE]}
+    return errors
+
+  def _import_batch(self, batch, result, retry=True):
+    from invitation.models import StaffInvitation
+    from users.models import User
+    users, invitations = zip(*(self._build(row) for _, row in batch))
+    errors = self._validate(users, invitations)
+    valid = [index for index in range(len(batch)) if index not in errors]
+
+    try:
+      with transaction.atomic():
+        User.objects.bulk_provision(
+          [users[index] for index in valid], tenant=self.tenant, added_by=self.invited_by, skip_validation=True
+        )
+        for index in valid:
+          invitations[index].user = users[index]
+          invitations[index].set_defaults()
+        StaffInvitation.objects.bulk_create([invitations[index] for index in valid], batch_size=self.batch_size)
+    except ValidationError as e:
+      # 検証後に同じメールアドレスが登録された場合は、検証からやり直す
+      if retry:
+        return self._import_batch(batch, result, retry=False)
+      # 再度失敗した場合は、作成できなかった行をエラーとして記録し、次のバッチに進む
+      for index in valid:
+        errors[index] = e.message_dict if hasattr(e, 'error_dict') else {'email': e.messages}
+      valid = []
+
+    result.created += len(valid)
+    for index in sorted(errors):
+      result.add_error(batch[index][0], errors[index])
+    if self.on_batch:
+      self.on_batch(result)
@@ -1,6 +1,9 @@
-from .staff_invitation import ValidateInvitationAPIView
+from .staff_invitation import ValidateInvitationAPIView, StaffInvitationListView
+from .staff_import import StaffImportAPIView
 
 
 __all__ = [
   'ValidateInvitationAPIView',
+  'StaffInvitationListView',
+  'StaffImportAPIView',
 ]
\ No newline at end of file
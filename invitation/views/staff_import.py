@@ -0,0 +1,51 @@
+import io
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.utils.decorators import method_decorator
+from rest_framework import status
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from invitation.utils import StaffImporter
+from organizations.models import Tenant
+
+
+# バッチごとにコミットするため、リクエスト全体のトランザクション（ATOMIC_REQUESTS）を使わない
+@method_decorator(transaction.non_atomic_requests, name='dispatch')
+class StaffImportAPIView(APIView):
+  """
+  スタッフの一括招待（オーナーのみ）
+  multipart: tenant=<テナントID>, file=<CSV・JSONL>, format=csv|jsonl（省略時は拡張子から判定）
+  アップロードされたファイルを1行ずつ読み、行ごとのエラーと処理速度を返す
+  """
+  parser_classes = [MultiPartParser]
+
+  def post(self, request):
+    user = request.user
+    if user.user_type != 'OWNER':
+      return Response({'error': 'スタッフを招待できるのはオーナーのみです'}, status=status.HTTP_403_FORBIDDEN)
+
+    upload = request.FILES.get('file')
+    if upload is None:
+      return Response({'file': ['ファイルを指定してください']}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+      format = StaffImporter.detect_format(upload.name, request.data.get('format'))
+    except DjangoValidationError as e:
+      return Response({'format': e.messages}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+      tenant = Tenant.objects.accessible_by(user).filter(pk=request.data.get('tenant')).first()
+    except DjangoValidationError:
+      tenant = None
+    if tenant is None:
+      return Response({'tenant': ['テナントが見つかりません']}, status=status.HTTP_400_BAD_REQUEST)
+
+    # 一時ファイル（大きいアップロード）・メモリ上のどちらも行単位で読む
+    upload.seek(0)
+    stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+    try:
+      result = StaffImporter(tenant, user).run(stream, format)
+    finally:
+      stream.detach()
+    return Response(result.as_dict(), status=status.HTTP_200_OK)
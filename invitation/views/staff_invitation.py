@@ -3,10 +3,15 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny
 from django.core.cache import cache
+from django.core.exceptions import ValidationError as DjangoValidationError
 import secrets
 
-from invitation.serializers import ValidateInvitationSerializer
-from authentication.services import  RegistrationUtilsService
+from rest_framework.generics import ListAPIView
+from common.pagination import KeysetPagination
+from invitation.models import StaffInvitation
+from invitation.serializers import ValidateInvitationSerializer, StaffInvitationSerializer
+from organizations.models import Tenant
+from authentication.services import UserActivationService
 
 
 class ValidateInvitationAPIView(APIView):
@@ -23,7 +28,7 @@ class ValidateInvitationAPIView(APIView):
     invitation_token = serializer.validated_data['token']
     
     try:
-      invitation = RegistrationUtilsService.validate_invitation(invitation_token)
+      invitation = UserActivationService.validate_invitation(invitation_token)
       session_token = secrets.token_urlsafe(32)
       
       # Redisに保存（15分間有効）
@@ -50,4 +55,28 @@ class ValidateInvitationAPIView(APIView):
       },status=status.HTTP_200_OK)
         
     except Exception as e:
-      return Response( {'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+      return Response( {'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class StaffInvitationListView(ListAPIView):
+  """
+  オーナーが管理するテナントのスタッフ招待一覧（新しい順, キーセットページネーション）
+  ?tenant=<テナントID>: テナントで絞り込み
+  """
+  serializer_class = StaffInvitationSerializer
+  pagination_class = KeysetPagination
+  pagination_ordering = ('-created_at', '-id')
+
+  def get_queryset(self):
+    user = self.request.user
+    if not (user.is_system_admin or user.user_type == 'OWNER'):
+      return StaffInvitation.objects.none()
+
+    tenants = Tenant.objects.accessible_by(user)
+    tenant_id = self.request.query_params.get('tenant')
+    if tenant_id:
+      try:
+        tenants = tenants.filter(pk=tenant_id)
+      except DjangoValidationError:
+        return StaffInvitation.objects.none()
+    return StaffInvitation.objects.filter(tenant__in=tenants.values('pk')).select_related('tenant')
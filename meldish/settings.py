@@ -44,7 +44,8 @@ INSTALLED_APPS = [
   'dj_rest_auth',
   'dj_rest_auth.registration',
   'allauth',
-  'allauth.account',
+  # allauth.account（ミドルウェアを非同期対応版に置き換えるため独自のAppConfigを使う）
+  'authentication.apps.AccountConfig',
   'allauth.socialaccount',
   'allauth.socialaccount.providers.google',
   'allauth.socialaccount.providers.apple',
@@ -62,7 +63,8 @@ MIDDLEWARE = [
   'django.contrib.auth.middleware.AuthenticationMiddleware',
   'django.contrib.messages.middleware.MessageMiddleware',
   'django.middleware.clickjacking.XFrameOptionsMiddleware',
-  'allauth.account.middleware.AccountMiddleware',
+  # allauthのAccountMiddlewareの非同期対応版（ASGIで非同期ビューを並行実行するため）
+  'authentication.middleware.AsyncAccountMiddleware',
 ]
 
 ROOT_URLCONF = 'meldish.urls'
@@ -239,6 +241,16 @@ GOOGLE_OAUTH2_CLIENT_ID = os.environ.get('GOOGLE_WEB_CLIENT_ID', '')
 GOOGLE_IOS_CLIENT_ID = os.environ.get('GOOGLE_IOS_CLIENT_ID', '')
 GOOGLE_ANDROID_CLIENT_ID = os.environ.get('GOOGLE_ANDROID_CLIENT_ID', '')
 
+# LINEログイン（IDトークンの検証用）
+LINE_CHANNEL_ID = os.environ.get('LINE_CHANNEL_ID', '')
+LINE_CHANNEL_SECRET = os.environ.get('LINE_CHANNEL_SECRET', '')
+
+# ローカルのスタブプロバイダー（python manage.py run_social_stub）へ向ける場合に設定（負荷試験用）
+# DEBUG以外では、テスト・負荷試験用の設定ファイルでSOCIAL_PROVIDER_STUB_ALLOWED = Trueにした場合のみ使える
+# （環境変数だけでは有効にならない。許可されていない環境で設定すると起動時にImproperlyConfigured）
+SOCIAL_PROVIDER_STUB_URL = os.environ.get('SOCIAL_PROVIDER_STUB_URL', '')
+SOCIAL_PROVIDER_STUB_ALLOWED = False
+
 # カスタムアダプター
 SOCIALACCOUNT_FORMS = {
   'signup': 'your_app.forms.CustomSocialSignupForm',
@@ -287,8 +299,10 @@ SIMPLE_JWT = {
   'ACCESS_TOKEN_LIFETIME': timedelta(hours=1),
   'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
   'ROTATE_REFRESH_TOKENS': True,
+  # 失効はRedis（authentication.utils.TokenBlacklist）で管理する（Redis未使用時のみBlacklistedTokenに保存）
   'BLACKLIST_AFTER_ROTATION': True,
-  'UPDATE_LAST_LOGIN': True,
+  # last_loginはLastLoginBuffer（user_logged_inシグナル）でまとめて更新
+  'UPDATE_LAST_LOGIN': False,
   
   'ALGORITHM': 'HS256',
   'SIGNING_KEY': SECRET_KEY,
@@ -303,6 +317,10 @@ SIMPLE_JWT = {
   'TOKEN_TYPE_CLAIM': 'token_type',
 }
 
+# アクセストークンに権限情報（user_type, テナント, 権限ビットマスク）を含める
+# 有効にすると権限チェックでDB・キャッシュを参照しない（User.authz_versionで無効化）
+AUTHZ_TOKEN_CLAIMS = config('AUTHZ_TOKEN_CLAIMS', default=False, cast=bool)
+
 # ===== dj-rest-auth設定 =====
 
 REST_AUTH = {
@@ -452,25 +470,26 @@ LOGGING = {
 
 # ===== キャッシュ設定（Redis） =====
 
-# CACHES = {
-#     'default': {
-#         'BACKEND': 'django_redis.cache.RedisCache',
-#         'LOCATION': config('REDIS_URL', default='redis://127.0.0.1:6379/0'),
-#         'OPTIONS': {
-#             'CLIENT_CLASS': 'django_redis.client.DefaultClient',
-#             'CONNECTION_POOL_KWARGS': {
-#                 'max_connections': 50,
-#             }
-#         }
-#     }
-# }
-
-
-# 開発環境ではダミーキャッシュ
-if DEBUG:
+# トークンの失効リスト・ログインセッション（authentication.utils）・レート制限はワーカー間で共有するためRedisを使う
+CACHES = {
+  'default': {
+    'BACKEND': 'django_redis.cache.RedisCache',
+    'LOCATION': config('REDIS_URL', default='redis://127.0.0.1:6379/0'),
+    'OPTIONS': {
+      'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+      'CONNECTION_POOL_KWARGS': {
+        'max_connections': 50,
+      }
+    }
+  }
+}
+
+# 開発環境でREDIS_URLを設定していない場合はプロセス内キャッシュ
+# （トークンの失効はDB（BlacklistedToken）に保存される）
+if DEBUG and not config('REDIS_URL', default=''):
   CACHES = {
     'default': {
-      'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+      'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
   }
 
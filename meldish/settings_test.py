@@ -54,6 +54,11 @@ CACHES = {
     }
 }
 
+# ===================================
+# Social login - スタブプロバイダー（テスト・負荷試験用）
+# ===================================
+SOCIAL_PROVIDER_STUB_ALLOWED = True
+
 # ===================================
 # Logging - テスト時は最小限に
 # ===================================
@@ -6,6 +6,9 @@ from django.conf.urls.static import static
 urlpatterns = [
   path('admin/', admin.site.urls),
   path('api/auth/', include('authentication.urls')),
+  path('api/users/', include('users.urls')),
+  path('api/organizations/', include('organizations.urls')),
+  path('api/invitations/', include('invitation.urls')),
   path('accounts/', include('allauth.urls')),
 ]
 
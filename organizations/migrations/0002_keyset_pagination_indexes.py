@@ -0,0 +1,21 @@
+# Generated by Django 5.0 on 2026-10-19 07:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tenant',
+            index=models.Index(fields=['company', 'created_at', 'id'], name='idx_tenant_company_created'),
+        ),
+        migrations.AddIndex(
+            model_name='tenant',
+            index=models.Index(fields=['created_at', 'id'], name='idx_tenant_created'),
+        ),
+    ]
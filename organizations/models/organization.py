@@ -61,6 +61,9 @@ class Tenant(models.Model):
       indexes = [
           models.Index(fields=['company', 'is_active']),
           models.Index(fields=['code']),
+          # 一覧のキーセットページネーション（common.pagination.KeysetPagination）
+          models.Index(fields=['company', 'created_at', 'id'], name='idx_tenant_company_created'),
+          models.Index(fields=['created_at', 'id'], name='idx_tenant_created'),
       ]
     
     def __str__(self):
@@ -13,12 +13,12 @@ class CompanyQuerySet(models.QuerySet):
   
   # === オーナー関連 ===
   def owned_by(self, user):
-    """特定のユーザーが所有する会社"""
+    """特定のユーザーが所有する会社（テナントがまだない会社も含むため、CompanyOwnershipへの準結合で引く）"""
+    from permissions.models import CompanyOwnership
     return self.filter(
-      ownerships__owner=user,
-      ownerships__is_active=True,
+      pk__in=CompanyOwnership.objects.filter(owner=user, is_active=True).values('company_id'),
       is_active=True
-    ).distinct()
+    )
   
   def with_owner(self, owner):
     """特定のオーナーを持つ会社（エイリアス）"""
@@ -48,11 +48,11 @@ class CompanyQuerySet(models.QuerySet):
     
     if user.user_type == 'STAFF':
       # スタッフが所属するテナントの会社
+      from permissions.models import UserTenantAccess
       return self.filter(
-        tenants__memberships__user=user,
-        tenants__memberships__is_active=True,
+        pk__in=UserTenantAccess.objects.filter(user=user, via=UserTenantAccess.VIA_MEMBER).values('company_id'),
         is_active=True
-      ).distinct()
+      )
     
     return self.none()
   
@@ -152,24 +152,16 @@ class TenantQuerySet(models.QuerySet):
     
   # === アクセス制御 ===
   def accessible_by(self, user):
-    from ..models import Company
-    """ユーザーがアクセス可能なテナント"""
+    """
+    ユーザーがアクセス可能なテナント
+    オーナー・スタッフはUserTenantAccess（アクティブなテナントのみ）への準結合で引く
+    """
     if user.is_system_admin:
         return self.active()
     
-    if user.user_type == 'OWNER':
-      companies = Company.objects.owned_by(user)
-      return self.filter(
-        company__in=companies,
-        is_active=True
-      )
-    
-    if user.user_type == 'STAFF':
-      return self.filter(
-        memberships__user=user,
-        memberships__is_active=True,
-        is_active=True
-      ).distinct()
+    if user.user_type in ('OWNER', 'STAFF'):
+      from permissions.models import UserTenantAccess
+      return self.filter(pk__in=UserTenantAccess.objects.filter(user=user).values('tenant_id'))
     
     return self.none()
   
@@ -0,0 +1,5 @@
+from .tenant import TenantSerializer
+
+__all__ = [
+  'TenantSerializer',
+]
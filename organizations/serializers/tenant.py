@@ -0,0 +1,11 @@
+from rest_framework import serializers
+from organizations.models import Tenant
+
+
+class TenantSerializer(serializers.ModelSerializer):
+  company_name = serializers.CharField(source='company.name', read_only=True)
+
+  class Meta:
+    model = Tenant
+    fields = ['id', 'name', 'code', 'company', 'company_name', 'state', 'country', 'is_active', 'created_at']
+    read_only_fields = fields
@@ -0,0 +1,7 @@
+from django.urls import path
+from organizations.views import TenantListView
+
+
+urlpatterns = [
+  path('tenants/', TenantListView.as_view(), name='tenant-list'),
+]
@@ -0,0 +1,6 @@
+from .tenant import TenantListView
+
+
+__all__ = [
+  'TenantListView',
+]
@@ -0,0 +1,17 @@
+from rest_framework.generics import ListAPIView
+from common.pagination import KeysetPagination
+from organizations.models import Tenant
+from organizations.serializers import TenantSerializer
+
+
+class TenantListView(ListAPIView):
+  """アクセス可能なテナントの一覧（新しい作成順, キーセットページネーション） ?q=<検索語>"""
+  serializer_class = TenantSerializer
+  pagination_class = KeysetPagination
+  pagination_ordering = ('-created_at', '-id')
+
+  def get_queryset(self):
+    return (Tenant.objects
+      .accessible_by(self.request.user)
+      .search(self.request.query_params.get('q'))
+      .with_company_info())
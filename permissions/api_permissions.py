@@ -0,0 +1,27 @@
+from rest_framework.permissions import BasePermission
+from permissions.utils import AuthzClaims
+
+
+class HasTenantPermission(BasePermission):
+  """
+  テナント単位の権限チェック（DRF用）
+  ビューのrequired_permissionに権限コードを指定し、テナントはURLのtenant_idまたはX-Tenant-IDヘッダーで指定
+  トークンに有効な権限情報があればDB・キャッシュを参照しない
+  """
+
+  def has_permission(self, request, view):
+    user = request.user
+    if not user or not user.is_authenticated:
+      return False
+
+    claims = AuthzClaims.for_user(user)
+    tenant_id = view.kwargs.get('tenant_id') or request.headers.get('X-Tenant-ID')
+
+    if tenant_id and not claims.has_tenant_access(tenant_id):
+      return False
+
+    permission_code = getattr(view, 'required_permission', None)
+    if permission_code is None:
+      return True
+
+    return claims.has_permission(permission_code, tenant_id)
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from permissions.utils import TenantAccessIndex
+
+
+class Command(BaseCommand):
+  help = 'テナントアクセス（user_tenant_accesses）を所有・所属から作り直す（導入時・一括更新の後に実行）'
+
+  def add_arguments(self, parser):
+    parser.add_argument('--batch-size', type=int, default=TenantAccessIndex.BATCH_SIZE)
+
+  def handle(self, *args, **options):
+    count = TenantAccessIndex.rebuild(batch_size=options['batch_size'])
+    self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} tenant access rows'))
@@ -0,0 +1,62 @@
+# Generated by Django 5.0 on 2026-10-19 07:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_user_tenant_access(apps, schema_editor):
+    """既存の所有・所属からテナントアクセスを作る（permissions.utils.TenantAccessIndex.rebuildと同じ条件）"""
+    CompanyOwnership = apps.get_model('permissions', 'CompanyOwnership')
+    TenantMembership = apps.get_model('permissions', 'TenantMembership')
+    UserTenantAccess = apps.get_model('permissions', 'UserTenantAccess')
+
+    sources = [
+        ('OWNER', CompanyOwnership.objects.filter(
+            is_active=True, company__is_active=True, company__tenants__is_active=True,
+        ).values_list('owner_id', 'company__tenants__id', 'company_id')),
+        ('MEMBER', TenantMembership.objects.filter(
+            is_active=True, tenant__is_active=True,
+        ).values_list('user_id', 'tenant_id', 'tenant__company_id')),
+    ]
+    for via, rows in sources:
+        batch = []
+        for user_id, tenant_id, company_id in rows.order_by().distinct().iterator(chunk_size=1000):
+            batch.append(UserTenantAccess(user_id=user_id, tenant_id=tenant_id, company_id=company_id, via=via))
+            if len(batch) >= 1000:
+                UserTenantAccess.objects.bulk_create(batch)
+                batch = []
+        UserTenantAccess.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0002_keyset_pagination_indexes'),
+        ('permissions', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserTenantAccess',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('via', models.CharField(choices=[('OWNER', 'オーナー'), ('MEMBER', 'メンバー')], max_length=10, verbose_name='経路')),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_accesses', to='organizations.company')),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_accesses', to='organizations.tenant')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tenant_accesses', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'User Tenant Access / テナントアクセス',
+                'verbose_name_plural': 'User Tenant Accesses / テナントアクセス',
+                'db_table': 'user_tenant_accesses',
+                'indexes': [models.Index(fields=['user', 'via', 'company'], name='idx_access_user_company'), models.Index(fields=['tenant', 'via', 'user'], name='idx_access_tenant_user')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='usertenantaccess',
+            constraint=models.UniqueConstraint(fields=('user', 'tenant', 'via'), name='unique_user_tenant_access'),
+        ),
+        migrations.RunPython(populate_user_tenant_access, migrations.RunPython.noop),
+    ]
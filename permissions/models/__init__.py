@@ -1,6 +1,7 @@
 from .permission import Role, Permission, UserRole, RolePermission
 from .company_ownership import CompanyOwnership
 from .tenant_membership import TenantMembership
+from .user_tenant_access import UserTenantAccess
 
 
 __all__ = [
@@ -9,5 +10,6 @@ __all__ = [
   'UserRole',
   'RolePermission',
   'CompanyOwnership',
-  'TenantMembership'
+  'TenantMembership',
+  'UserTenantAccess',
 ]
\ No newline at end of file
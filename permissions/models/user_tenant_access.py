@@ -0,0 +1,42 @@
+from django.db import models
+from organizations.models import Company, Tenant
+
+
+class UserTenantAccess(models.Model):
+  """
+  ユーザーがアクセスできるテナントの一覧（CompanyOwnership・TenantMembershipから作る実体化テーブル）
+  accessible_by系のクエリを多段の結合 + DISTINCTではなく、このテーブルへの1回の準結合で引くために使う
+  permissions.signalsで更新し、ずれた場合はrebuild_user_tenant_accessで作り直す（permissions.utils.TenantAccessIndex）
+    OWNER: アクティブな会社のオーナー（所有中）→ その会社のアクティブな全テナント
+    MEMBER: スタッフ（所属中）→ 所属するアクティブなテナント
+  """
+
+  VIA_OWNER = 'OWNER'
+  VIA_MEMBER = 'MEMBER'
+  VIA_CHOICES = [
+    (VIA_OWNER, 'オーナー'),
+    (VIA_MEMBER, 'メンバー'),
+  ]
+
+  user = models.ForeignKey('users.User', on_delete=models.CASCADE, related_name='tenant_accesses')
+  tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name='user_accesses')
+  company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name='user_accesses')
+  via = models.CharField('経路', max_length=10, choices=VIA_CHOICES)
+
+  class Meta:
+    db_table = 'user_tenant_accesses'
+    verbose_name = 'User Tenant Access / テナントアクセス'
+    verbose_name_plural = 'User Tenant Accesses / テナントアクセス'
+    constraints = [
+      # ユーザー → アクセスできるテナント（Tenant.accessible_by）
+      models.UniqueConstraint(fields=['user', 'tenant', 'via'], name='unique_user_tenant_access'),
+    ]
+    indexes = [
+      # ユーザー → アクセスできる会社（Company.accessible_by）
+      models.Index(fields=['user', 'via', 'company'], name='idx_access_user_company'),
+      # テナント → 所属するユーザー（User.accessible_by）
+      models.Index(fields=['tenant', 'via', 'user'], name='idx_access_tenant_user'),
+    ]
+
+  def __str__(self):
+    return f"{self.user_id} - {self.tenant_id} ({self.via})"
@@ -0,0 +1,80 @@
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+from organizations.models import Company, Tenant
+from permissions.models import Permission, Role, UserRole, RolePermission, TenantMembership, CompanyOwnership, UserTenantAccess
+from permissions.utils import AuthzClaims, TenantAccessIndex
+
+
+# 所属・ロール・権限の変更時にauthz_versionを更新し、トークン内の権限情報を無効にする
+
+@receiver(post_save, sender=TenantMembership)
+@receiver(post_delete, sender=TenantMembership)
+@receiver(post_save, sender=UserRole)
+@receiver(post_delete, sender=UserRole)
+def bump_authz_version_for_user(sender, instance, **kwargs):
+  AuthzClaims.bump_version([instance.user_id])
+
+
+@receiver(post_save, sender=CompanyOwnership)
+@receiver(post_delete, sender=CompanyOwnership)
+def bump_authz_version_for_owner(sender, instance, **kwargs):
+  AuthzClaims.bump_version([instance.owner_id])
+
+
+@receiver(post_save, sender=RolePermission)
+@receiver(post_delete, sender=RolePermission)
+def bump_authz_version_for_role_permission(sender, instance, **kwargs):
+  AuthzClaims.bump_version(UserRole.objects.filter(role_id=instance.role_id).values_list('user_id', flat=True))
+
+
+@receiver(post_save, sender=Role)
+@receiver(pre_delete, sender=Role)
+def bump_authz_version_for_role(sender, instance, **kwargs):
+  AuthzClaims.bump_version(UserRole.objects.filter(role_id=instance.pk).values_list('user_id', flat=True))
+
+
+@receiver(post_save, sender=Tenant)
+def bump_authz_version_for_tenant(sender, instance, raw=False, update_fields=None, created=False, **kwargs):
+  # 権限情報に影響するのは状態・会社の変更のみ（新規テナントはオーナーのトークンに含めるため作成時も更新する）
+  if raw or (not created and update_fields is not None and not {'is_active', 'company'} & set(update_fields)):
+    return
+  members = TenantMembership.objects.filter(tenant=instance).values_list('user_id', flat=True)
+  owners = CompanyOwnership.objects.filter(company_id=instance.company_id).values_list('owner_id', flat=True)
+  AuthzClaims.bump_version(list(members) + list(owners))
+
+
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+def clear_permission_index(sender, instance, **kwargs):
+  AuthzClaims.clear_permission_index()
+
+
+# UserTenantAccessを元のテーブルに合わせる（削除はon_delete=CASCADEで消えるため、所属・所有の削除のみ扱う）
+
+@receiver(post_save, sender=TenantMembership)
+@receiver(post_delete, sender=TenantMembership)
+def sync_tenant_access_for_member(sender, instance, raw=False, **kwargs):
+  if not raw:
+    TenantAccessIndex.sync('user', [instance.user_id])
+
+
+@receiver(post_save, sender=CompanyOwnership)
+@receiver(post_delete, sender=CompanyOwnership)
+def sync_tenant_access_for_owner(sender, instance, raw=False, **kwargs):
+  if not raw:
+    TenantAccessIndex.sync('user', [instance.owner_id], via=UserTenantAccess.VIA_OWNER)
+
+
+@receiver(post_save, sender=Tenant)
+def sync_tenant_access_for_tenant(sender, instance, raw=False, update_fields=None, **kwargs):
+  if raw or (update_fields is not None and not {'is_active', 'company'} & set(update_fields)):
+    return
+  TenantAccessIndex.sync('tenant', [instance.pk])
+
+
+@receiver(post_save, sender=Company)
+def sync_tenant_access_for_company(sender, instance, raw=False, update_fields=None, created=False, **kwargs):
+  # 会社の状態はオーナー経由の行にのみ影響する（新規の会社にはテナントがない）
+  if raw or created or (update_fields is not None and 'is_active' not in update_fields):
+    return
+  TenantAccessIndex.sync('company', [instance.pk], via=UserTenantAccess.VIA_OWNER)
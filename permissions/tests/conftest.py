@@ -0,0 +1,45 @@
+import pytest
+from django.core.cache import cache
+from permissions.models import Permission, Role, RolePermission, TenantMembership
+from permissions.utils import AuthzClaims
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+  """各テスト前後でキャッシュと権限コードのインデックスをクリア"""
+  from authentication.utils import CachedUserResolver
+  cache.clear()
+  CachedUserResolver.clear_local()
+  AuthzClaims.clear_permission_index()
+  yield
+  cache.clear()
+  CachedUserResolver.clear_local()
+  AuthzClaims.clear_permission_index()
+
+
+@pytest.fixture
+def permissions(db):
+  return {
+    code: Permission.objects.create(code=code, name=code, category='pos')
+    for code in ('pos.view', 'pos.refund', 'staff.manage')
+  }
+
+
+@pytest.fixture
+def create_role(permissions):
+  def _create_role(tenant, code, permission_codes):
+    role = Role.objects.create(tenant=tenant, code=code, name=code)
+    for permission_code in permission_codes:
+      RolePermission.objects.create(role=role, permission=permissions[permission_code])
+    return role
+  return _create_role
+
+
+@pytest.fixture
+def staff(create_user, create_tenant):
+  user = create_user(user_type='STAFF', is_active=True)
+  tenant = create_tenant('SBY001')
+  TenantMembership.objects.create(user=user, tenant=tenant)
+  # 所属の追加でauthz_versionが更新されるため再取得
+  user.refresh_from_db()
+  return user, tenant
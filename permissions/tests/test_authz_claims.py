@@ -0,0 +1,241 @@
+import pytest
+from datetime import timedelta
+from types import SimpleNamespace
+from django.utils import timezone
+
+from authentication.authentication import CookieJWTAuthentication
+from authentication.tokens import RefreshToken
+from permissions.api_permissions import HasTenantPermission
+from permissions.models import UserRole
+from permissions.utils import AuthzClaims
+from users.models import User
+from users.models.mixins import PermissionMixin
+
+
+@pytest.fixture
+def authz_enabled(settings):
+  settings.AUTHZ_TOKEN_CLAIMS = True
+
+
+def authenticate(access_token):
+  auth = CookieJWTAuthentication()
+  validated = auth.get_validated_token(str(access_token))
+  return auth.get_user(validated)
+
+
+@pytest.mark.django_db
+class TestAuthzClaims:
+
+  def test_load_staff_permissions(self, staff, create_tenant, create_role, permissions):
+    user, tenant = staff
+    other = create_tenant('MEL002')
+    UserRole.objects.create(user=user, role=create_role(tenant, 'cashier', ['pos.view', 'pos.refund']))
+    # 所属していないテナントのロールは含めない
+    UserRole.objects.create(user=user, role=create_role(other, 'manager', ['staff.manage']))
+
+    claims = AuthzClaims.load(user)
+
+    assert set(claims.tenants) == {str(tenant.pk)}
+    assert claims.has_permission('pos.refund', tenant.pk)
+    assert not claims.has_permission('staff.manage', tenant.pk)
+    assert not claims.has_tenant_access(other.pk)
+
+  def test_owner_has_all_permissions_in_owned_tenants(self, create_user, company, create_tenant, permissions):
+    from permissions.models import CompanyOwnership
+    owner = create_user(user_type='OWNER', is_active=True)
+    tenant = create_tenant('SBY001')
+    CompanyOwnership.objects.create(company=company, owner=owner)
+
+    claims = AuthzClaims.load(owner)
+
+    assert all(claims.has_permission(code, tenant.pk) for code in permissions)
+
+  def test_future_role_sets_expiry(self, staff, create_role):
+    user, tenant = staff
+    starts_at = timezone.now() + timedelta(hours=1)
+    UserRole.objects.create(user=user, role=create_role(tenant, 'cashier', ['pos.view']), valid_from=starts_at)
+
+    claims = AuthzClaims.load(user)
+
+    assert not claims.has_permission('pos.view', tenant.pk)
+    assert claims.expires_at == pytest.approx(starts_at.timestamp())
+
+  def test_db_fallback_matches_claims_for_inactive_tenant(self, staff, create_role, permissions):
+    """トークンの権限情報がない場合も、無効なテナントには同じくアクセスできない"""
+    user, tenant = staff
+    UserRole.objects.create(user=user, role=create_role(tenant, 'cashier', ['pos.view']))
+    tenant.is_active = False
+    tenant.save(update_fields=['is_active'])
+    user = User.objects.get(pk=user.pk)
+
+    claims = AuthzClaims.load(user)
+
+    assert not claims.has_tenant_access(tenant.pk)
+    assert PermissionMixin.can_access_tenant(user, tenant) is False
+    assert not claims.has_permission('pos.view', tenant.pk)
+    assert PermissionMixin.has_permission(user, 'pos.view', tenant) is False
+    assert PermissionMixin.get_all_permissions(user, tenant) == []
+
+  def test_tenant_update_bumps_version_only_for_access_changes(self, staff, create_tenant):
+    user, tenant = staff
+    version = User.objects.get(pk=user.pk).authz_version
+
+    tenant.name = '新しい店舗名'
+    tenant.save(update_fields=['name'])
+    assert User.objects.get(pk=user.pk).authz_version == version
+
+    tenant.is_active = False
+    tenant.save(update_fields=['is_active'])
+    assert User.objects.get(pk=user.pk).authz_version == version + 1
+
+  def test_new_tenant_bumps_owner_version(self, create_user, company, create_tenant):
+    from permissions.models import CompanyOwnership
+    owner = create_user(user_type='OWNER', is_active=True)
+    CompanyOwnership.objects.create(company=company, owner=owner)
+    version = User.objects.get(pk=owner.pk).authz_version
+
+    create_tenant('SBY002')
+
+    assert User.objects.get(pk=owner.pk).authz_version == version + 1
+
+  def test_disabled_by_default(self, staff):
+    user, _ = staff
+    refresh = RefreshToken.for_user(user)
+
+    assert AuthzClaims.VERSION_CLAIM not in refresh.access_token
+
+
+@pytest.mark.django_db
+class TestAuthzClaimsInToken:
+
+  def test_permission_check_without_queries(
+    self, authz_enabled, redis_blacklist, staff, create_role, django_assert_num_queries
+  ):
+    """トークンの権限情報で判定し、DBを参照しない"""
+    user, tenant = staff
+    UserRole.objects.create(user=user, role=create_role(tenant, 'cashier', ['pos.view']))
+    user.refresh_from_db()
+    access_token = RefreshToken.for_user(user).access_token
+    assert access_token[AuthzClaims.USER_TYPE_CLAIM] == 'STAFF'
+
+    authenticate(access_token)
+    AuthzClaims.get_permission_index()
+
+    with django_assert_num_queries(0):
+      request_user = authenticate(access_token)
+      claims = AuthzClaims.for_user(request_user)
+      assert claims.has_tenant_access(tenant.pk)
+      assert claims.has_permission('pos.view', tenant.pk)
+      assert not claims.has_permission('pos.refund', tenant.pk)
+
+  def test_role_change_invalidates_claims(self, authz_enabled, staff, create_role):
+    """ロール変更後はトークンの権限情報を使わずDBで判定"""
+    user, tenant = staff
+    access_token = RefreshToken.for_user(user).access_token
+    assert authenticate(access_token)._authz_claims is not None
+
+    UserRole.objects.create(user=user, role=create_role(tenant, 'cashier', ['pos.refund']))
+
+    assert User.objects.get(pk=user.pk).authz_version == user.authz_version + 1
+    request_user = authenticate(access_token)
+    assert request_user._authz_claims is None
+    assert AuthzClaims.for_user(request_user).has_permission('pos.refund', tenant.pk)
+
+  def test_rotation_refreshes_stale_claims(self, authz_enabled, staff, create_role):
+    user, tenant = staff
+    refresh = RefreshToken.for_user(user)
+    UserRole.objects.create(user=user, role=create_role(tenant, 'cashier', ['pos.refund']))
+
+    access_token, _ = RefreshToken(str(refresh)).rotate()
+
+    request_user = authenticate(access_token)
+    assert request_user._authz_claims.has_permission('pos.refund', tenant.pk)
+
+  def test_drf_permission_class(self, authz_enabled, staff, create_tenant, create_role):
+    user, tenant = staff
+    other = create_tenant('MEL002')
+    UserRole.objects.create(user=user, role=create_role(tenant, 'cashier', ['pos.view']))
+    user.refresh_from_db()
+    request_user = authenticate(RefreshToken.for_user(user).access_token)
+
+    permission = HasTenantPermission()
+    request = SimpleNamespace(user=request_user, headers={})
+
+    def view(tenant_id, code):
+      return SimpleNamespace(kwargs={'tenant_id': str(tenant_id)}, required_permission=code)
+
+    assert permission.has_permission(request, view(tenant.pk, 'pos.view'))
+    assert not permission.has_permission(request, view(tenant.pk, 'pos.refund'))
+    assert not permission.has_permission(request, view(other.pk, 'pos.view'))
+
+
+@pytest.mark.django_db
+class TestAuthzClaimsSize:
+
+  @pytest.fixture
+  def owner_of(self, create_user, company):
+    from authentication.tests.factories import TenantFactory
+    from organizations.models import Tenant
+    from permissions.models import CompanyOwnership, Permission
+
+    def _owner_of(tenant_count, permission_count=40):
+      # 削除済みの権限でidが大きくなってもマスクの桁数は有効な権限数で決まる
+      Permission.objects.bulk_create(
+        Permission(code=f'old.{i}', name=f'old.{i}', category='old') for i in range(300)
+      )
+      Permission.objects.filter(category='old').delete()
+      Permission.objects.bulk_create(
+        Permission(code=f'perm.{i}', name=f'perm.{i}', category='perm') for i in range(permission_count)
+      )
+      Tenant.objects.bulk_create(
+        TenantFactory.build(company=company, code=f'T{i:05}') for i in range(tenant_count)
+      )
+      owner = create_user(user_type='OWNER', is_active=True)
+      CompanyOwnership.objects.create(company=company, owner=owner)
+      owner.refresh_from_db()
+      return owner
+    return _owner_of
+
+  @staticmethod
+  def cookie_sizes(user):
+    from django.http import HttpResponse
+    from authentication.views.mixins import TokenResponseMixin
+
+    refresh = RefreshToken.for_user(user)
+    response = TokenResponseMixin().set_token_cookies(HttpResponse(), str(refresh.access_token), str(refresh))
+    return refresh.access_token, [len(morsel.OutputString()) for morsel in response.cookies.values()]
+
+  def test_masks_use_dense_bits(self, authz_enabled, owner_of):
+    owner = owner_of(3)
+
+    access_token, _ = self.cookie_sizes(owner)
+
+    assert {len(mask) for mask in access_token[AuthzClaims.TENANTS_CLAIM].values()} == {10}
+
+  @pytest.mark.parametrize('tenant_count', [20, 50, 200])
+  def test_cookies_fit_browser_limit(self, authz_enabled, owner_of, tenant_count):
+    owner = owner_of(tenant_count)
+
+    access_token, sizes = self.cookie_sizes(owner)
+
+    assert max(sizes) < 4096
+    if tenant_count == 20:
+      assert len(access_token[AuthzClaims.TENANTS_CLAIM]) == 20
+    if tenant_count == 200:
+      # 収まらない場合は埋め込まずDBで判定
+      assert AuthzClaims.VERSION_CLAIM not in access_token
+      assert authenticate(access_token)._authz_claims is None
+
+  def test_permission_index_change_invalidates_claims(self, authz_enabled, staff, create_role, permissions):
+    user, tenant = staff
+    UserRole.objects.create(user=user, role=create_role(tenant, 'cashier', ['pos.refund']))
+    user.refresh_from_db()
+    access_token = RefreshToken.for_user(user).access_token
+
+    # 前の権限を削除するとビット位置がずれる
+    permissions['pos.view'].delete()
+    assert User.objects.get(pk=user.pk).authz_version == user.authz_version
+
+    request_user = authenticate(access_token)
+    assert request_user._authz_claims is None
+    assert AuthzClaims.for_user(request_user).has_permission('pos.refund', tenant.pk)
@@ -0,0 +1,169 @@
+import pytest
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from organizations.models import Company, Tenant
+from permissions.models import CompanyOwnership, TenantMembership, UserTenantAccess
+from permissions.utils import TenantAccessIndex
+from users.models import User
+
+
+def access_rows(**filters):
+  return set(UserTenantAccess.objects.filter(**filters).values_list('user_id', 'tenant_id', 'company_id', 'via'))
+
+
+@pytest.fixture
+def owner(create_user, company):
+  user = create_user(user_type='OWNER')
+  CompanyOwnership.objects.create(owner=user, company=company)
+  return user
+
+
+@pytest.mark.django_db
+class TestTenantAccessSync:
+
+  def test_membership_lifecycle(self, create_user, create_tenant):
+    staff = create_user(user_type='STAFF')
+    tenant = create_tenant('SBY001')
+
+    membership = TenantMembership.objects.create(user=staff, tenant=tenant)
+    assert access_rows(user=staff) == {(staff.pk, tenant.pk, tenant.company_id, 'MEMBER')}
+
+    membership.is_active = False
+    membership.save()
+    assert access_rows(user=staff) == set()
+
+    membership.is_active = True
+    membership.save()
+    membership.delete()
+    assert access_rows(user=staff) == set()
+
+  def test_owner_gets_every_active_tenant(self, owner, create_tenant):
+    first = create_tenant('SBY001')
+    create_tenant('SBY002', is_active=False)
+    second = create_tenant('SBY003')
+
+    assert {row[1] for row in access_rows(user=owner, via='OWNER')} == {first.pk, second.pk}
+
+  def test_tenant_deactivation_removes_all_paths(self, owner, create_user, create_tenant):
+    tenant = create_tenant('SBY001')
+    staff = create_user(user_type='STAFF')
+    TenantMembership.objects.create(user=staff, tenant=tenant)
+
+    tenant.is_active = False
+    tenant.save(update_fields=['is_active'])
+    assert access_rows(tenant=tenant) == set()
+
+    tenant.is_active = True
+    tenant.save()
+    assert {row[3] for row in access_rows(tenant=tenant)} == {'OWNER', 'MEMBER'}
+
+  def test_unrelated_tenant_update_skips_sync(self, owner, create_tenant):
+    tenant = create_tenant('SBY001')
+    tenant.name = 'Renamed'
+
+    with CaptureQueriesContext(connection) as queries:
+      tenant.save(update_fields=['name'])
+
+    assert not any('user_tenant_accesses' in query['sql'] for query in queries.captured_queries)
+
+  def test_company_deactivation_only_affects_owner_rows(self, owner, company, create_user, create_tenant):
+    tenant = create_tenant('SBY001')
+    staff = create_user(user_type='STAFF')
+    TenantMembership.objects.create(user=staff, tenant=tenant)
+
+    company.is_active = False
+    company.save()
+
+    assert access_rows(tenant=tenant) == {(staff.pk, tenant.pk, company.pk, 'MEMBER')}
+
+  def test_tenant_moved_to_other_company(self, owner, create_user, create_tenant):
+    tenant = create_tenant('SBY001')
+    staff = create_user(user_type='STAFF')
+    TenantMembership.objects.create(user=staff, tenant=tenant)
+    other = Company.objects.create(name='Other Company')
+
+    tenant.company = other
+    tenant.save()
+
+    assert access_rows(tenant=tenant) == {(staff.pk, tenant.pk, other.pk, 'MEMBER')}
+
+
+@pytest.mark.django_db
+class TestTenantAccessRebuild:
+
+  def test_rebuild_repairs_drift(self, owner, create_user, create_tenant):
+    tenant = create_tenant('SBY001')
+    staff = create_user(user_type='STAFF')
+    TenantMembership.objects.create(user=staff, tenant=tenant)
+    expected = access_rows()
+
+    # シグナルを通さない一括更新
+    TenantMembership.objects.filter(user=staff).update(is_active=False)
+    UserTenantAccess.objects.filter(via='OWNER').delete()
+    call_command('rebuild_user_tenant_access', stdout=StringIO())
+
+    assert access_rows() == {row for row in expected if row[3] == 'OWNER'}
+
+  def test_sync_writes_only_the_difference(self, owner, create_tenant):
+    create_tenant('SBY001')
+    create_tenant('SBY002')
+    UserTenantAccess.objects.filter(user=owner).first().delete()
+
+    assert TenantAccessIndex.sync('user', [owner.pk]) == (1, 0)
+    assert TenantAccessIndex.sync('user', [owner.pk]) == (0, 0)
+
+
+@pytest.mark.django_db
+class TestAccessibleBy:
+
+  @pytest.fixture
+  def setup(self, owner, company, create_user, create_tenant):
+    tenants = [create_tenant(f'SBY00{i}') for i in range(3)]
+    staff = []
+    for tenant in tenants:
+      for _ in range(2):
+        user = create_user(user_type='STAFF')
+        TenantMembership.objects.create(user=user, tenant=tenant)
+        staff.append(user)
+    # 2つのテナントに所属するスタッフ（DISTINCTなしでも重複しない）
+    TenantMembership.objects.create(user=staff[0], tenant=tenants[1])
+    other_company = Company.objects.create(name='Other Company')
+    outsider = create_user(user_type='STAFF')
+    TenantMembership.objects.create(user=outsider, tenant=create_tenant('OTHER01', company=other_company))
+    return tenants, staff
+
+  def test_owner(self, owner, company, setup):
+    tenants, staff = setup
+
+    assert set(Tenant.objects.accessible_by(owner)) == set(tenants)
+    assert list(Company.objects.accessible_by(owner)) == [company]
+    users = list(User.objects.accessible_by(owner))
+    assert sorted(user.pk for user in users) == sorted(user.pk for user in staff)
+    assert set(User.objects.accessible_by(owner, tenants[2])) == set(staff[4:6])
+
+  def test_staff(self, company, setup):
+    tenants, staff = setup
+
+    assert set(Tenant.objects.accessible_by(staff[0])) == {tenants[0], tenants[1]}
+    assert list(Company.objects.accessible_by(staff[0])) == [company]
+    assert sorted(user.pk for user in User.objects.accessible_by(staff[0])) == sorted(user.pk for user in staff[:4])
+    assert not User.objects.accessible_by(staff[0], tenants[2]).exists()
+
+  def test_owner_without_tenants_still_owns_company(self, owner, company):
+    assert list(Company.objects.accessible_by(owner)) == [company]
+
+  def test_queries_use_access_table_without_distinct(self, owner, setup):
+    for queryset in (User.objects.accessible_by(owner), Tenant.objects.accessible_by(owner)):
+      sql = str(queryset.query).upper()
+      assert 'USER_TENANT_ACCESSES' in sql
+      assert 'DISTINCT' not in sql and 'TENANT_MEMBERSHIPS' not in sql and 'COMPANY_OWNERSHIPS' not in sql
+
+  def test_access_table_is_read_from_covering_indexes(self, owner, setup):
+    plan = User.objects.accessible_by(owner).explain()
+
+    # テーブル側はどちらの参照もインデックスのみで読む（SQLiteではユニーク制約はautoindexの名前になる）
+    assert 'COVERING INDEX idx_access_tenant_user' in plan, plan
+    assert 'COVERING INDEX sqlite_autoindex_user_tenant_accesses' in plan, plan
@@ -0,0 +1,7 @@
+from .authz_claims import AuthzClaims
+from .tenant_access_index import TenantAccessIndex
+
+__all__ = [
+  'AuthzClaims',
+  'TenantAccessIndex',
+]
@@ -0,0 +1,288 @@
+import json
+import threading
+import time
+import zlib
+from collections import namedtuple
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+
+
+# bits: 権限コード → ビット位置（有効な権限のみ）, id_bits: Permission.id → ビット位置, version: 割り当ての識別子
+PermissionIndex = namedtuple('PermissionIndex', ['bits', 'id_bits', 'version'])
+EMPTY_PERMISSION_INDEX = PermissionIndex({}, {}, None)
+
+
+class AuthzClaims:
+  """
+  アクセストークンに埋め込む権限情報
+    ut: user_type, ug: user_group, sa: システム管理者
+    tn: {tenant_id: 権限ビットマスク（16進, ビット位置=Permissionをid順に並べた連番）}
+    pv: ビット位置の割り当ての識別子
+    av: User.authz_version, ae: ロールの有効期間の境界（この時刻以降は無効）
+  authz_version・pvが一致しない・期限切れの場合はトークンの情報を使わずDBで判定する
+  """
+
+  USER_TYPE_CLAIM = 'ut'
+  USER_GROUP_CLAIM = 'ug'
+  SYSTEM_ADMIN_CLAIM = 'sa'
+  TENANTS_CLAIM = 'tn'
+  VERSION_CLAIM = 'av'
+  EXPIRES_CLAIM = 'ae'
+  PERMISSION_INDEX_CLAIM = 'pv'
+  CLAIMS = (USER_TYPE_CLAIM, USER_GROUP_CLAIM, SYSTEM_ADMIN_CLAIM, TENANTS_CLAIM,
+            VERSION_CLAIM, EXPIRES_CLAIM, PERMISSION_INDEX_CLAIM)
+
+  # 埋め込み後のペイロード（JSON）の上限。超える場合は埋め込まずDBで判定
+  # Base64化で約4/3倍になり、ヘッダー・署名・Cookie属性を加えてもブラウザのCookie上限（約4KB）に収まる大きさ
+  MAX_PAYLOAD_BYTES = 2560
+
+  # 権限のビット位置の割り当て（プロセス内で保持）
+  PERMISSION_INDEX_TTL = 300
+  PERMISSION_MISS_RELOAD_INTERVAL = 10
+  _permission_index = EMPTY_PERMISSION_INDEX
+  _permission_index_loaded_at = -float('inf')
+  _permission_lock = threading.Lock()
+
+  def __init__(self, user_type, user_group, tenants, is_system_admin=False, expires_at=None,
+               permission_index=EMPTY_PERMISSION_INDEX):
+    self.user_type = user_type
+    self.user_group = user_group
+    self.tenants = tenants
+    self.is_system_admin = is_system_admin
+    self.expires_at = expires_at
+    # マスクを作成した時点のビット位置の割り当て
+    self.permission_index = permission_index
+
+  @staticmethod
+  def is_enabled():
+    return getattr(settings, 'AUTHZ_TOKEN_CLAIMS', False)
+
+  # ========================================
+  # 生成
+  # ========================================
+
+  @classmethod
+  def load(cls, user):
+    """DBから権限情報を取得"""
+    tenants = {}
+    expires_at = None
+    index = cls.get_permission_index()
+
+    if user.is_system_admin:
+      # 全テナント・全権限（saクレームで判定）
+      pass
+
+    elif user.user_type == 'OWNER':
+      from organizations.models import Tenant
+      from permissions.models import Permission
+
+      tenant_ids = Tenant.objects.filter(
+        company__ownerships__owner=user,
+        company__ownerships__is_active=True,
+        is_active=True,
+      ).values_list('id', flat=True).distinct()
+      permission_ids = list(Permission.objects.active().values_list('id', flat=True))
+      index = cls._index_covering(index, permission_ids)
+      all_permissions = cls._to_mask(index.id_bits[permission_id] for permission_id in permission_ids)
+      tenants = {str(tenant_id): all_permissions for tenant_id in tenant_ids}
+
+    elif user.user_type == 'STAFF':
+      from permissions.models import TenantMembership, UserRole
+
+      tenant_ids = list(TenantMembership.objects.filter(
+        user=user, is_active=True, tenant__is_active=True
+      ).values_list('tenant_id', flat=True))
+      tenants = {str(tenant_id): 0 for tenant_id in tenant_ids}
+
+      now = timezone.now()
+      rows = UserRole.objects.filter(
+        user=user,
+        role__is_active=True,
+        role__tenant_id__in=tenant_ids,
+      ).filter(
+        Q(valid_until__isnull=True) | Q(valid_until__gte=now)
+      ).values_list(
+        'role__tenant_id', 'role__role_permissions__permission_id',
+        'role__role_permissions__permission__is_active', 'valid_from', 'valid_until',
+      )
+      rows = list(rows)
+      index = cls._index_covering(index, [row[1] for row in rows if row[1] is not None])
+
+      for tenant_id, permission_id, permission_active, valid_from, valid_until in rows:
+        # 開始前のロールは含めず、開始時刻で権限情報を無効にする
+        boundary = valid_from if valid_from > now else valid_until
+        if boundary is not None:
+          expires_at = boundary if expires_at is None else min(expires_at, boundary)
+        if valid_from > now or permission_id is None or not permission_active:
+          continue
+        tenants[str(tenant_id)] |= 1 << index.id_bits[permission_id]
+
+    return cls(
+      user.user_type, user.user_group, tenants,
+      is_system_admin=user.is_system_admin,
+      expires_at=expires_at.timestamp() if expires_at else None,
+      permission_index=index,
+    )
+
+  def to_claims(self, version):
+    claims = {
+      self.USER_TYPE_CLAIM: self.user_type,
+      self.USER_GROUP_CLAIM: self.user_group,
+      self.TENANTS_CLAIM: {tenant_id: format(mask, 'x') for tenant_id, mask in self.tenants.items()},
+      self.VERSION_CLAIM: version,
+      self.PERMISSION_INDEX_CLAIM: self.permission_index.version,
+    }
+    if self.is_system_admin:
+      claims[self.SYSTEM_ADMIN_CLAIM] = 1
+    if self.expires_at:
+      claims[self.EXPIRES_CLAIM] = int(self.expires_at)
+    return claims
+
+  @classmethod
+  def embed(cls, token, user):
+    """トークンに権限情報を書き込む（無効時は何もしない）"""
+    if not cls.is_enabled():
+      return
+    for claim in cls.CLAIMS:
+      token.payload.pop(claim, None)
+
+    payload = {**token.payload, **cls.load(user).to_claims(user.authz_version)}
+    # 所属テナントが多くCookieに収まらない場合は埋め込まない（DBで判定）
+    if len(json.dumps(payload, separators=(',', ':'), default=str)) > cls.MAX_PAYLOAD_BYTES:
+      return
+    token.payload.update(payload)
+
+  @classmethod
+  def is_stale(cls, token, user):
+    """トークンの権限情報が古いか（再発行が必要か）"""
+    return cls.is_enabled() and cls.from_token(token, user) is None
+
+  # ========================================
+  # 読み取り
+  # ========================================
+
+  @classmethod
+  def from_token(cls, token, user):
+    """トークンの権限情報（無効・古い場合はNone）"""
+    if not cls.is_enabled() or cls.VERSION_CLAIM not in token:
+      return None
+    if token[cls.VERSION_CLAIM] != user.authz_version:
+      return None
+
+    expires_at = token.get(cls.EXPIRES_CLAIM)
+    if expires_at and time.time() >= expires_at:
+      return None
+
+    # 権限の追加・削除でビット位置が変わった場合は使わない
+    index = cls.get_permission_index(token.get(cls.PERMISSION_INDEX_CLAIM))
+    if token.get(cls.PERMISSION_INDEX_CLAIM) != index.version:
+      return None
+
+    return cls(
+      token.get(cls.USER_TYPE_CLAIM),
+      token.get(cls.USER_GROUP_CLAIM),
+      {tenant_id: int(mask, 16) for tenant_id, mask in token.get(cls.TENANTS_CLAIM, {}).items()},
+      is_system_admin=bool(token.get(cls.SYSTEM_ADMIN_CLAIM)),
+      expires_at=expires_at,
+      permission_index=index,
+    )
+
+  @classmethod
+  def for_user(cls, user):
+    """リクエストのユーザーの権限情報（トークンになければDBから取得し、インスタンスに保持）"""
+    claims = getattr(user, '_authz_claims', None)
+    if claims is None:
+      claims = cls.load(user)
+      user._authz_claims = claims
+    return claims
+
+  def has_tenant_access(self, tenant_id):
+    return self.is_system_admin or str(tenant_id) in self.tenants
+
+  def has_permission(self, permission_code, tenant_id=None):
+    if self.is_system_admin:
+      return True
+
+    bit = self.permission_index.bits.get(permission_code)
+    if bit is None:
+      return False
+
+    if tenant_id is None:
+      return any(mask >> bit & 1 for mask in self.tenants.values())
+    return bool(self.tenants.get(str(tenant_id), 0) >> bit & 1)
+
+  # ========================================
+  # 権限のビット位置
+  # ========================================
+
+  @classmethod
+  def get_permission_index(cls, expected_version=None):
+    """
+    権限のビット位置の割り当て
+    Args: expected_version: トークンの割り当てと異なる場合は再読み込みを試みる
+    """
+    index = cls._permission_index
+    age = time.monotonic() - cls._permission_index_loaded_at
+
+    # 他プロセスでの変更に追従しつつ毎回DBを引かないよう、不一致での再読み込みはPERMISSION_MISS_RELOAD_INTERVAL秒に1回まで
+    stale = expected_version is not None and expected_version != index.version
+    if age >= cls.PERMISSION_INDEX_TTL or (stale and age >= cls.PERMISSION_MISS_RELOAD_INTERVAL):
+      index = cls._load_permission_index()
+    return index
+
+  @classmethod
+  def _index_covering(cls, index, permission_ids):
+    """permission_idsを全て含む割り当て（プロセス内の割り当てにない権限があれば読み直す）"""
+    if all(permission_id in index.id_bits for permission_id in permission_ids):
+      return index
+    return cls._load_permission_index()
+
+  @classmethod
+  def _load_permission_index(cls):
+    from permissions.models import Permission
+
+    # 無効化でビット位置がずれないよう、無効な権限にも位置を割り当てる
+    rows = list(Permission.objects.order_by('id').values_list('id', 'code', 'is_active'))
+    ids = [str(permission_id) for permission_id, _, _ in rows]
+    index = PermissionIndex(
+      bits={code: bit for bit, (_, code, is_active) in enumerate(rows) if is_active},
+      id_bits={permission_id: bit for bit, (permission_id, _, _) in enumerate(rows)},
+      version=format(zlib.crc32(','.join(ids).encode()), 'x'),
+    )
+    with cls._permission_lock:
+      cls._permission_index = index
+      cls._permission_index_loaded_at = time.monotonic()
+    return index
+
+  @classmethod
+  def clear_permission_index(cls):
+    with cls._permission_lock:
+      cls._permission_index = EMPTY_PERMISSION_INDEX
+      cls._permission_index_loaded_at = -float('inf')
+
+  # ========================================
+  # 無効化
+  # ========================================
+
+  @staticmethod
+  def bump_version(user_ids):
+    """ユーザーのauthz_versionを更新し、発行済みトークンの権限情報を無効にする"""
+    from django.contrib.auth import get_user_model
+    from authentication.utils import CachedUserResolver
+
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if not user_ids:
+      return
+
+    get_user_model().objects.filter(pk__in=user_ids).update(authz_version=F('authz_version') + 1)
+    for user_id in user_ids:
+      CachedUserResolver.invalidate(user_id)
+
+  @staticmethod
+  def _to_mask(bits):
+    mask = 0
+    for bit in bits:
+      mask |= 1 << bit
+    return mask
@@ -0,0 +1,104 @@
+from django.db import transaction
+
+
+class TenantAccessIndex:
+  """
+  UserTenantAccess（ユーザー → アクセスできるテナント）の更新
+  元のテーブル（CompanyOwnership・TenantMembership）から作るべき行を求め、既存の行との差分だけを書き込む
+  範囲（scope）はユーザー・テナント・会社のいずれかのIDで指定する
+  """
+
+  BATCH_SIZE = 1000
+  SCOPES = ('user', 'tenant', 'company')
+
+  @staticmethod
+  def sources():
+    """
+    経路ごとの元のクエリ
+    Returns: [(via, QuerySet, 条件, (user_id, tenant_id, company_idに対応する列))]
+    多値の関連（company__tenants）は条件と範囲を同じfilter()で指定しないと別の結合になるため、条件はdictで返す
+    """
+    from permissions.models import CompanyOwnership, TenantMembership, UserTenantAccess
+    return [
+      (
+        UserTenantAccess.VIA_OWNER,
+        CompanyOwnership.objects.all(),
+        {'is_active': True, 'company__is_active': True, 'company__tenants__is_active': True},
+        ('owner_id', 'company__tenants__id', 'company_id'),
+      ),
+      (
+        UserTenantAccess.VIA_MEMBER,
+        TenantMembership.objects.all(),
+        {'is_active': True, 'tenant__is_active': True},
+        ('user_id', 'tenant_id', 'tenant__company_id'),
+      ),
+    ]
+
+  @classmethod
+  def expected_rows(cls, scope=None, ids=None, via=None):
+    """作るべき行の(user_id, tenant_id, company_id, via)のイテレータ（重複なし）"""
+    for source_via, queryset, conditions, columns in cls.sources():
+      if via is not None and source_via != via:
+        continue
+      conditions = dict(conditions)
+      if scope is not None:
+        conditions[f'{columns[cls.SCOPES.index(scope)]}__in'] = ids
+      rows = queryset.filter(**conditions).order_by().values_list(*columns).distinct()
+      for user_id, tenant_id, company_id in rows.iterator(chunk_size=cls.BATCH_SIZE):
+        yield user_id, tenant_id, company_id, source_via
+
+  @classmethod
+  def sync(cls, scope, ids, via=None):
+    """
+    範囲内の行を元のテーブルに合わせる（scope: 'user' | 'tenant' | 'company', via: 経路を限定）
+    Returns: (追加した行数, 削除した行数)
+    """
+    from permissions.models import UserTenantAccess
+    ids = [pk for pk in ids if pk is not None]
+    if not ids:
+      return 0, 0
+
+    existing = UserTenantAccess.objects.filter(**{f'{scope}_id__in': ids})
+    if via is not None:
+      existing = existing.filter(via=via)
+
+    with transaction.atomic():
+      current = {
+        (user_id, tenant_id, company_id, row_via): pk
+        for pk, user_id, tenant_id, company_id, row_via
+        in existing.values_list('pk', 'user_id', 'tenant_id', 'company_id', 'via')
+      }
+      expected = set(cls.expected_rows(scope, ids, via))
+
+      stale = [pk for row, pk in current.items() if row not in expected]
+      if stale:
+        UserTenantAccess.objects.filter(pk__in=stale).delete()
+      missing = [
+        UserTenantAccess(user_id=user_id, tenant_id=tenant_id, company_id=company_id, via=row_via)
+        for user_id, tenant_id, company_id, row_via in expected - current.keys()
+      ]
+      # 同じ行を同時に追加した場合はユニーク制約で片方を捨てる
+      UserTenantAccess.objects.bulk_create(missing, batch_size=cls.BATCH_SIZE, ignore_conflicts=True)
+    return len(missing), len(stale)
+
+  @classmethod
+  def rebuild(cls, batch_size=None):
+    """
+    全ての行を作り直す（導入時・シグナルを通さない一括更新の後に実行）
+    Returns: 作成した行数
+    """
+    from permissions.models import UserTenantAccess
+    batch_size = batch_size or cls.BATCH_SIZE
+    count = 0
+    with transaction.atomic():
+      UserTenantAccess.objects.all().delete()
+      batch = []
+      for user_id, tenant_id, company_id, via in cls.expected_rows():
+        batch.append(UserTenantAccess(user_id=user_id, tenant_id=tenant_id, company_id=company_id, via=via))
+        if len(batch) >= batch_size:
+          UserTenantAccess.objects.bulk_create(batch)
+          count += len(batch)
+          batch = []
+      UserTenantAccess.objects.bulk_create(batch)
+      count += len(batch)
+    return count
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+from users.utils import LastLoginBuffer
+
+
+class Command(BaseCommand):
+  help = 'バッファ済みのlast_loginをDBへ反映（cronで毎分実行、または--loopで常駐）'
+
+  def add_arguments(self, parser):
+    parser.add_argument(
+      '--loop', action='store_true',
+      help=f'終了せずLastLoginBuffer.FLUSH_INTERVAL（{LastLoginBuffer.FLUSH_INTERVAL}秒）ごとに反映'
+    )
+
+  def handle(self, *args, **options):
+    while True:
+      updated = LastLoginBuffer().flush()
+      self.stdout.write(self.style.SUCCESS(f'Flushed last_login for {updated} users'))
+      if not options['loop']:
+        return
+      time.sleep(LastLoginBuffer.FLUSH_INTERVAL)
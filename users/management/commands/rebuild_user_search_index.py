@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from users.utils import UserSearchIndex
+
+
+class Command(BaseCommand):
+  help = 'ユーザー検索のトークン（user_search_tokens）を全ユーザー分作り直す（導入時・一括更新の後に実行）'
+
+  def add_arguments(self, parser):
+    parser.add_argument('--batch-size', type=int, default=UserSearchIndex.BATCH_SIZE)
+
+  def handle(self, *args, **options):
+    count = UserSearchIndex.rebuild(batch_size=options['batch_size'])
+    self.stdout.write(self.style.SUCCESS(f'Rebuilt search tokens for {count} users'))
@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-19 06:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_alter_user_user_timezone'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='token_version',
+            field=models.PositiveIntegerField(default=0, help_text='更新すると発行済みの全トークンが無効になる', verbose_name='トークンバージョン'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-19 06:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_user_token_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='authz_version',
+            field=models.PositiveIntegerField(default=0, help_text='所属・ロール変更時に更新。トークン内の権限情報を無効にする', verbose_name='権限バージョン'),
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 5.0 on 2026-10-19 07:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+PROVIDERS = ('google', 'line', 'facebook')
+BATCH_SIZE = 5000
+
+
+def copy_social_ids(apps, schema_editor):
+    """Userの{provider}_user_id列をSocialIdentityへ移す"""
+    User = apps.get_model('users', 'User')
+    SocialIdentity = apps.get_model('users', 'SocialIdentity')
+    for provider in PROVIDERS:
+        column = f'{provider}_user_id'
+        rows = User.objects.filter(**{f'{column}__isnull': False}).exclude(**{column: ''}).values_list('pk', column)
+        batch = []
+        for user_id, subject in rows.iterator(chunk_size=BATCH_SIZE):
+            batch.append(SocialIdentity(user_id=user_id, provider=provider, subject=subject))
+            if len(batch) >= BATCH_SIZE:
+                SocialIdentity.objects.bulk_create(batch)
+                batch = []
+        SocialIdentity.objects.bulk_create(batch)
+
+
+def restore_social_ids(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    SocialIdentity = apps.get_model('users', 'SocialIdentity')
+    for identity in SocialIdentity.objects.iterator(chunk_size=BATCH_SIZE):
+        User.objects.filter(pk=identity.user_id).update(**{f'{identity.provider}_user_id': identity.subject})
+
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_user_authz_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SocialIdentity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('provider', models.CharField(choices=[('google', 'Google'), ('line', 'Line'), ('facebook', 'Facebook')], max_length=20, verbose_name='プロバイダー')),
+                ('subject', models.CharField(max_length=255, verbose_name='プロバイダーのユーザーID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='連携日時')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='social_identities', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'ソーシャルアカウント連携',
+                'verbose_name_plural': 'ソーシャルアカウント連携',
+                'db_table': 'social_identities',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='socialidentity',
+            constraint=models.UniqueConstraint(fields=('provider', 'subject'), name='unique_social_provider_subject'),
+        ),
+        migrations.AddConstraint(
+            model_name='socialidentity',
+            constraint=models.UniqueConstraint(fields=('user', 'provider'), name='unique_social_user_provider'),
+        ),
+        migrations.RunPython(copy_social_ids, restore_social_ids),
+        migrations.RemoveField(
+            model_name='user',
+            name='facebook_user_id',
+        ),
+        migrations.RemoveField(
+            model_name='user',
+            name='google_user_id',
+        ),
+        migrations.RemoveField(
+            model_name='user',
+            name='line_user_id',
+        ),
+    ]
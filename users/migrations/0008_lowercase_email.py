@@ -0,0 +1,37 @@
+# Generated by Django 5.0 on 2026-10-19 07:07
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def lowercase_emails(apps, schema_editor):
+    """既存のメールアドレスを小文字へ正規化（大文字小文字違いの重複がある場合は手動で統合が必要）"""
+    User = apps.get_model('users', 'User')
+    duplicates = list(
+        User.objects.annotate(normalized=Lower('email'))
+        .values('normalized', 'user_group')
+        .annotate(count=Count('pk'))
+        .filter(count__gt=1)
+        .values_list('normalized', 'user_group')[:10]
+    )
+    if duplicates:
+        raise RuntimeError(f'大文字小文字だけが異なるメールアドレスのユーザーを統合してください: {duplicates}')
+    User.objects.exclude(email=Lower('email')).update(email=Lower('email'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0007_social_identity'),
+    ]
+
+    operations = [
+        migrations.RunPython(lowercase_emails, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.CheckConstraint(check=models.Q(('email', django.db.models.functions.text.Lower('email'))), name='users_email_lowercase'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.0 on 2026-10-19 07:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_user_search_tokens(apps, schema_editor):
+    """既存ユーザーの検索トークンを作る（users.utils.UserSearchIndex.rebuildと同じトークン）"""
+    from users.utils import UserSearchIndex
+
+    User = apps.get_model('users', 'User')
+    UserSearchToken = apps.get_model('users', 'UserSearchToken')
+
+    batch = []
+    users = User.objects.only('pk', *UserSearchIndex.SEARCH_FIELDS).order_by().iterator(chunk_size=1000)
+    for user in users:
+        batch.extend(UserSearchToken(user_id=user.pk, token=token) for token in UserSearchIndex.tokens(user))
+        if len(batch) >= 1000:
+            UserSearchToken.objects.bulk_create(batch)
+            batch = []
+    UserSearchToken.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0008_lowercase_email'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserSearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=16, verbose_name='トークン')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'ユーザー検索トークン',
+                'verbose_name_plural': 'ユーザー検索トークン',
+                'db_table': 'user_search_tokens',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='usersearchtoken',
+            constraint=models.UniqueConstraint(fields=('token', 'user'), name='unique_user_search_token'),
+        ),
+        migrations.RunPython(populate_user_search_tokens, migrations.RunPython.noop),
+    ]
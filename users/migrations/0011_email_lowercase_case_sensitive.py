@@ -0,0 +1,37 @@
+# Generated by Django 5.0 on 2026-10-19 08:26
+
+import common.utils.db_functions
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models.functions import Lower
+
+from common.utils.db_functions import CaseSensitive
+
+
+def lowercase_emails(apps, schema_editor):
+    """
+    0008の正規化はMySQLの既定の照合順序では大文字を含む行を検出できないため、
+    大文字小文字を区別して比較し直す（大文字小文字違いの重複はメールアドレスのユニーク制約で作られない）
+    """
+    User = apps.get_model('users', 'User')
+    User.objects.exclude(email=CaseSensitive(Lower('email'))).update(email=Lower('email'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0010_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='user',
+            name='users_email_lowercase',
+        ),
+        migrations.RunPython(lowercase_emails, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.CheckConstraint(check=models.Q(('email', common.utils.db_functions.CaseSensitive(django.db.models.functions.text.Lower('email')))), name='users_email_lowercase'),
+        ),
+    ]
@@ -1,8 +1,10 @@
-from .user import User, StaffProfile, AustralianTaxInfo, JapaneseTaxInfo, StaffRegistrationProgress,CustomerRegistrationProgress
+from .user import User, SocialIdentity, UserSearchToken, StaffProfile, AustralianTaxInfo, JapaneseTaxInfo, StaffRegistrationProgress,CustomerRegistrationProgress
 
 
 __all__ = [
   'User',
+  'SocialIdentity',
+  'UserSearchToken',
   'StaffProfile',
   'AustralianTaxInfo',
   'JapaneseTaxInfo',
@@ -1,13 +1,30 @@
+from asgiref.sync import sync_to_async
 from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import check_password
 from users.models import User
 
+
+async def acheck_password(user, raw_password):
+  """User.check_passwordの非同期版（ハッシュ計算はイベントループを塞がないようスレッドで実行）"""
+  must_update = []
+  is_correct = await sync_to_async(check_password, thread_sensitive=False)(
+    raw_password, user.password, must_update.append
+  )
+
+  # ハッシュのアルゴリズム・反復回数が古い場合は更新（同期版と同じ）
+  if is_correct and must_update:
+    await sync_to_async(user.set_password, thread_sensitive=False)(raw_password)
+    await user.asave(update_fields=['password'])
+  return is_correct
+
+
 class CustomerAuthBackend(ModelBackend):
   def authenticate(self, request, username=None, password=None, **kwargs):
     if username is None or password is None:
       return None
     
     try:
-      user = User.objects.get( email=username, user_group='CUSTOMER')
+      user = User.objects.get( email=User.objects.normalize_email(username), user_group='CUSTOMER')
     except User.DoesNotExist:
       return None  
     
@@ -16,6 +33,22 @@ class CustomerAuthBackend(ModelBackend):
     
     return None
 
+  async def aauthenticate(self, request, username=None, password=None, **kwargs):
+    if username is None or password is None:
+      return None
+
+    # 非同期では遅延読み込みできないため、レスポンスで使うprogressも取得
+    user = await User.objects.select_related('customer_progress').filter(
+      email=User.objects.normalize_email(username), user_group='CUSTOMER'
+    ).afirst()
+    if user is None:
+      return None
+
+    if await acheck_password(user, password) and self.user_can_authenticate(user):
+      return user
+
+    return None
+
 
 class StaffOwnerAuthBackend(ModelBackend):
   def authenticate(self, request, username=None, password=None, **kwargs):
@@ -23,11 +56,26 @@ class StaffOwnerAuthBackend(ModelBackend):
       return None
     
     try:
-      user = User.objects.get(email=username, user_group='STAFF_OWNER')
+      user = User.objects.get(email=User.objects.normalize_email(username), user_group='STAFF_OWNER')
     except User.DoesNotExist:
       return None
     
     if user.check_password(password) and self.user_can_authenticate(user):
       return user
     
-    return None
\ No newline at end of file
+    return None
+
+  async def aauthenticate(self, request, username=None, password=None, **kwargs):
+    if username is None or password is None:
+      return None
+
+    user = await User.objects.select_related('staff_progress').filter(
+      email=User.objects.normalize_email(username), user_group='STAFF_OWNER'
+    ).afirst()
+    if user is None:
+      return None
+
+    if await acheck_password(user, password) and self.user_can_authenticate(user):
+      return user
+
+    return None
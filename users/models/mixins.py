@@ -1,33 +1,55 @@
 from django.utils import timezone
 from django.db import models
+from datetime import timedelta
 
 
 # === セキュリティ関連メソッド ===
 class SecurityMixin:
+  # 失敗回数・ロック状態はRedisで管理し、DBへはロック確定時のみ書き込む
+  # Redis未使用時は従来通りDBのカラムで管理する
 
-  """アカウントロック状態チェック"""
+  def _get_login_attempt_tracker(self):
+    from users.utils import LoginAttemptTracker
+    return LoginAttemptTracker()
+
+  """アカウントロック状態チェック（読み取りのみ、DB書き込みなし）"""
   def is_account_locked(self):
-    if self.account_locked_until:
-      if self.account_locked_until > timezone.now():
-        return True
-      else:
-        self.account_locked_until = None
-        self.failed_login_attempts = 0
-        self.save(update_fields=['account_locked_until', 'failed_login_attempts'])
+    locked = self._get_login_attempt_tracker().is_locked(self.pk)
+    if locked:
+      return True
+
+    if self.account_locked_until and self.account_locked_until > timezone.now():
+      return True
     return False
 
   """ログイン失敗回数を増やし、必要に応じてロック"""
   def increment_failed_login(self):
-    self.failed_login_attempts += 1
-    
-    if self.failed_login_attempts >= 5:
-      from datetime import timedelta
-      self.account_locked_until = timezone.now() + timedelta(minutes=30)
-    
-    self.save(update_fields=['failed_login_attempts', 'account_locked_until'])
+    from users.utils import LoginAttemptTracker
+    tracker = self._get_login_attempt_tracker()
+    attempts = tracker.increment(self.pk)
+
+    if attempts is None:
+      # ロック期限切れ後は失敗回数を数え直す（1回の失敗で再ロックしないように）
+      if self.account_locked_until and self.account_locked_until <= timezone.now():
+        self.failed_login_attempts = 0
+        self.account_locked_until = None
+      self.failed_login_attempts += 1
+      if self.failed_login_attempts >= LoginAttemptTracker.MAX_ATTEMPTS:
+        self.account_locked_until = timezone.now() + timedelta(seconds=LoginAttemptTracker.LOCK_DURATION)
+      self.save(update_fields=['failed_login_attempts', 'account_locked_until'])
+      return
+
+    self.failed_login_attempts = attempts
+    if attempts >= LoginAttemptTracker.MAX_ATTEMPTS:
+      tracker.lock(self.pk)
+      # ロック確定時のみ永続化（Redis消失時もロックを維持するため）
+      self.account_locked_until = timezone.now() + timedelta(seconds=LoginAttemptTracker.LOCK_DURATION)
+      self.save(update_fields=['failed_login_attempts', 'account_locked_until'])
 
   """ログイン成功時に失敗回数をリセット"""
   def reset_failed_login(self):
+    self._get_login_attempt_tracker().reset(self.pk)
+
     if self.failed_login_attempts > 0 or self.account_locked_until:
       self.failed_login_attempts = 0
       self.account_locked_until = None
@@ -77,6 +99,15 @@ class PermissionMixin:
   def can_access_tenant(self, tenant):
     if self.is_system_admin:
       return True
+
+    # トークンの権限情報があればDBを参照しない
+    claims = getattr(self, '_authz_claims', None)
+    if claims is not None:
+      return claims.has_tenant_access(tenant.pk)
+
+    # トークンの権限情報と同じく、無効なテナントにはアクセスできない
+    if not tenant.is_active:
+      return False
     
     if self.user_type == 'OWNER':
       from permissions.models import CompanyOwnership
@@ -87,7 +118,7 @@ class PermissionMixin:
       ).exists()
     
     elif self.user_type == 'STAFF':
-      from .organization import TenantMembership
+      from permissions.models import TenantMembership
       return TenantMembership.objects.filter(
         user=self,
         tenant=tenant,
@@ -127,16 +158,22 @@ class PermissionMixin:
     
     if self.user_type == 'OWNER':
       if tenant:
-        return self.can_access_company(tenant.company)
+        return tenant.is_active and self.can_access_company(tenant.company)
       return False
+
+    # トークンの権限情報があればDBを参照しない
+    claims = getattr(self, '_authz_claims', None)
+    if claims is not None:
+      return claims.has_permission(permission_code, tenant.pk if tenant else None)
     
     #For staff
-    from core.models import UserRole, RolePermission
+    from permissions.models import UserRole, RolePermission
     now = timezone.now()
     # 有効なロールを取得
     role_query = UserRole.objects.filter(
       user=self,
       role__is_active=True,
+      role__tenant__is_active=True,
       valid_from__lte=now
     ).filter(
       models.Q(valid_until__isnull=True) | models.Q(valid_until__gte=now)
@@ -159,7 +196,7 @@ class PermissionMixin:
   """ユーザーが持つすべての権限コードを取得"""
   """Args:tenant:  Returns:list: """
   def get_all_permissions(self, tenant=None):
-    from core.models import Permission, UserRole, RolePermission
+    from permissions.models import Permission, UserRole
     
     #For Admin
     if self.is_system_admin:
@@ -169,7 +206,7 @@ class PermissionMixin:
     
     #For Owner
     if self.user_type == 'OWNER':
-      if tenant and self.can_access_company(tenant.company):
+      if tenant and tenant.is_active and self.can_access_company(tenant.company):
         return list(Permission.objects.filter(
           is_active=True
         ).values_list('code', flat=True))
@@ -184,6 +221,7 @@ class PermissionMixin:
     role_query = UserRole.objects.filter(
       user=self,
       role__is_active=True,
+      role__tenant__is_active=True,
       valid_from__lte=now
     ).filter(
       models.Q(valid_until__isnull=True) | models.Q(valid_until__gte=now)
@@ -228,54 +266,7 @@ class PermissionMixin:
   """ユーザーがアクセスできるユーザーを取得"""
   """Args:tenant(filter, option) Returns:QuerySet:"""  
   def get_accessible_users(self, tenant=None):
-    model = self.__class__
-    if self.is_system_admin:
-      if tenant:
-        return model.objects.filter(
-          tenant_memberships__tenant=tenant,
-          tenant_memberships__is_active=True
-        ).distinct()
-      return model.objects.all()
-    
-    if self.user_type == 'OWNER':
-      companies = self.get_owned_companies()
-
-      #For specific tenant filter
-      if tenant:
-        if tenant.company in companies:
-          return model.objects.filter(
-            tenant_memberships__tenant=tenant,
-            tenant_memberships__is_active=True
-          ).distinct()
-        return model.objects.none()
-        
-      #For all tenant
-      from .organization import Tenant
-      tenants = Tenant.objects.filter(company__in=companies, is_active=True)
-      return model.objects.filter(
-          tenant_memberships__tenant__in=tenants,
-          tenant_memberships__is_active=True
-      ).distinct()
-      
-    # スタッフは同じテナントのユーザー
-    if self.user_type == 'STAFF':
-      accessible_tenants = self.get_all_tenants()
-      if tenant:
-        #For specific tenant
-        if tenant in accessible_tenants:
-          return model.objects.filter(
-            tenant_memberships__tenant=tenant,
-            tenant_memberships__is_active=True
-          ).distinct()
-        return model.objects.none()
-      
-      #For all tenant(所属しているテナントに限る)
-      return model.objects.filter(
-        tenant_memberships__tenant__in=accessible_tenants,
-        tenant_memberships__is_active=True
-      ).distinct()
-    
-    return None
+    return self.__class__.objects.accessible_by(self, tenant)
     
   # === デバッグ用メソッド ===
   """ 権限情報のサマリーを取得（デバッグ用）"""  
@@ -1,5 +1,8 @@
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
-from django.db import models
+from contextlib import nullcontext
+from django.db import models, router, transaction, IntegrityError
+from django.db.models.functions import Lower
+from common.utils import CaseSensitive
 from django.utils import timezone
 import uuid
 from .mixins import SecurityMixin
@@ -34,9 +37,6 @@ class User(AbstractBaseUser, SecurityMixin, PermissionsMixin,):
     
   # === Base  ===
   id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False, verbose_name='ユーザーID')
-  google_user_id = models.CharField( 'Google User ID', max_length=255, blank=True, null=True, unique=True )
-  line_user_id = models.CharField( 'Line User ID', max_length=255, blank=True, null=True, unique=True )
-  facebook_user_id = models.CharField( 'Facebook User ID', max_length=255, blank=True, null=True, unique=True )
   email = models.EmailField( 'メールアドレス', blank=False)
   user_type = models.CharField('ユーザータイプ', max_length=10, choices=USER_TYPE_CHOICES)
   user_group = models.CharField('ユーザーグループ', max_length=20, choices=USER_GROUP_CHOICES, editable=False )
@@ -62,6 +62,8 @@ class User(AbstractBaseUser, SecurityMixin, PermissionsMixin,):
   failed_login_attempts = models.IntegerField('ログイン失敗回数', default=0)
   account_locked_until = models.DateTimeField( 'アカウントロック期限', null=True, blank=True)
   password_changed_at = models.DateTimeField('パスワード変更日時', default=timezone.now )
+  token_version = models.PositiveIntegerField('トークンバージョン', default=0, help_text='更新すると発行済みの全トークンが無効になる')
+  authz_version = models.PositiveIntegerField('権限バージョン', default=0, help_text='所属・ロール変更時に更新。トークン内の権限情報を無効にする')
     
   # === 認証方法 ===
   auth_provider = models.CharField( '認証プロバイダー', max_length=20, default='email', choices=AUTH_PROVIDER_CHOICES )
@@ -72,6 +74,12 @@ class User(AbstractBaseUser, SecurityMixin, PermissionsMixin,):
   user_timezone = models.CharField('タイムゾーン', max_length=50, blank=True, null=True)
     
   objects = UserManager()
+
+  # 変更時にメールアドレスの重複チェック（クエリ）が必要なフィールド
+  IDENTITY_FIELDS = frozenset({'email', 'user_type', 'user_group'})
+  DUPLICATE_EMAIL_MESSAGE = 'このメールアドレスは既に登録されています'
+  # DB上の値を記録し、保存時に変更を判定するフィールド（重複チェック・検索インデックスの更新）
+  TRACKED_FIELDS = ('email', 'user_type', 'first_name', 'last_name')
     
   USERNAME_FIELD = 'email'
   REQUIRED_FIELDS = ['user_type']
@@ -85,18 +93,25 @@ class User(AbstractBaseUser, SecurityMixin, PermissionsMixin,):
         fields=['email', 'user_group'],
         name='unique_email_user_group'
       ),
+      # 保存時に小文字へ正規化（大文字小文字違いの重複・照合順序に依存した検索を防ぐ）
+      models.CheckConstraint(check=models.Q(email=CaseSensitive(Lower('email'))), name='users_email_lowercase'),
     ]
     indexes = [
       models.Index(fields=['email', 'user_group'], name='idx_email_user_group'),
       models.Index(fields=['user_type', 'is_active'], name='idx_user_type_active'),
+      # 一覧のキーセットページネーション（common.pagination.KeysetPagination）
+      models.Index(fields=['date_joined', 'id'], name='idx_user_joined'),
     ]
     
   def __str__(self):
     return f"{self.email} ({self.get_user_type_display()})"
     
   def clean(self):
-    """バリデーション（新規作成 + 更新時）"""
+    """バリデーション（重複チェックのクエリは新規作成時とemail・user_typeの変更時のみ）"""
     super().clean()
+    if not self._identity_changed():
+      return
+
     if self.user_type == 'CUSTOMER':
       existing = User.objects.filter(
         email=self.email,
@@ -104,23 +119,155 @@ class User(AbstractBaseUser, SecurityMixin, PermissionsMixin,):
       ).exclude(pk=self.pk)
       
       if existing.exists():
-        raise ValidationError({'email': 'このメールアドレスは既に登録されています'})
+        raise ValidationError({'email': self.DUPLICATE_EMAIL_MESSAGE})
     
     elif self.user_type in ['STAFF', 'OWNER']:
       existing = User.objects.filter(email=self.email, user_type__in=['STAFF', 'OWNER']).exclude(pk=self.pk)  # ← 自分を除外
       
-      if existing.exists(): raise ValidationError({ 'email': 'このメールアドレスは既に登録されています'})
+      if existing.exists(): raise ValidationError({ 'email': self.DUPLICATE_EMAIL_MESSAGE})
+
+  @classmethod
+  def from_db(cls, db, field_names, values):
+    instance = super().from_db(db, field_names, values)
+    instance._remember_loaded_values()
+    return instance
+
+  def refresh_from_db(self, using=None, fields=None, **kwargs):
+    super().refresh_from_db(using=using, fields=fields, **kwargs)
+    self._remember_loaded_values(fields)
+
+  def _remember_loaded_values(self, fields=None):
+    """
+    保存時に変更を判定するフィールドのDB上の値を記録（遅延読み込みのフィールドは記録しない）
+    fields: 読み込み・保存したフィールド（Noneなら全て）
+    """
+    if fields is None or not hasattr(self, '_loaded_values'):
+      self._loaded_values = {}
+    deferred = self.get_deferred_fields()
+    for name in self.TRACKED_FIELDS:
+      if name not in deferred and (fields is None or name in fields):
+        self._loaded_values[name] = getattr(self, name)
+
+  def has_changed(self, *fields):
+    """DBから読み込んだ時点から変更されたか（新規作成・値が不明なフィールドは変更ありとみなす）"""
+    loaded = getattr(self, '_loaded_values', None)
+    if self._state.adding or loaded is None:
+      return True
+    return any(name not in loaded or loaded[name] != getattr(self, name) for name in fields)
+
+  def _identity_changed(self):
+    return self.has_changed('email', 'user_type')
     
+  @staticmethod
+  def get_user_group(user_type):
+    """ユーザータイプから所属するグループ（メールアドレスの重複はグループ内で判定）"""
+    return 'CUSTOMER' if user_type == 'CUSTOMER' else 'STAFF_OWNER'
+
   def save(self, *args, **kwargs):
-    if self.user_type == 'CUSTOMER':
-        self.user_group = 'CUSTOMER'
-    else:
-        self.user_group = 'STAFF_OWNER'
+    """
+    バリデーションの段階
+      新規作成・email/user_typeの変更: full_clean（重複チェックのクエリあり）
+      それ以外の更新: フィールドの検証のみ（重複はDBのユニーク制約に任せる）
+      update_fieldsがemail・user_typeを含まない: 指定フィールドのみ検証（クエリなし）
+    skip_validation=True: 検証しない
+    ユニーク制約違反（IntegrityError）はemailのValidationErrorに変換する
+    （違反しうる保存はセーブポイント内で行い、外側のトランザクションはそのまま使い続けられる）
+    """
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None:
+      update_fields = set(update_fields)
+      # user_groupはuser_typeから決まるため一緒に保存する
+      if 'user_type' in update_fields:
+        update_fields.add('user_group')
+      kwargs['update_fields'] = update_fields
+
+    if update_fields is None or 'user_group' in update_fields:
+      self.user_group = self.get_user_group(self.user_type)
+    if update_fields is None or 'email' in update_fields:
+      self.email = User.objects.normalize_email(self.email)
     
     if not kwargs.pop('skip_validation', False):
-        self.full_clean()
-    
-    super().save(*args, **kwargs)
+      self._validate_for_save(update_fields)
+
+    # email・user_typeを書き込まない・変更していない保存はユニーク制約に違反しないため、セーブポイントを作らない
+    writes_identity = update_fields is None or bool(update_fields & self.IDENTITY_FIELDS)
+    using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+    savepoint = transaction.atomic(using=using) if writes_identity and self._identity_changed() else nullcontext()
+    try:
+      with savepoint:
+        super().save(*args, **kwargs)
+    except IntegrityError as e:
+      if self._is_duplicate_email_error(e):
+        raise ValidationError({'email': self.DUPLICATE_EMAIL_MESSAGE}) from e
+      raise
+    self._remember_loaded_values(update_fields)
+
+  def _validate_for_save(self, update_fields):
+    if update_fields is not None and not (update_fields & self.IDENTITY_FIELDS):
+      self.clean_fields(exclude=[field.name for field in self._meta.fields if field.name not in update_fields])
+      return
+
+    # 重複チェックはclean()で行う（同じ内容のUniqueConstraintの検証クエリは省く）
+    self.full_clean(validate_constraints=False)
+
+  def _is_duplicate_email_error(self, error):
+    message = str(error)
+    return 'unique_email_user_group' in message or f'{self._meta.db_table}.email' in message
+
+  def get_social_id(self, provider):
+    """プロバイダーのユーザーID（未連携ならNone）"""
+    return self.social_identities.filter(provider=provider).values_list('subject', flat=True).first()
+
+  def link_social_identity(self, provider, subject):
+    return SocialIdentity.objects.create(user=self, provider=provider, subject=subject)
+
+
+class SocialIdentity(models.Model):
+  """
+  ソーシャルアカウントの連携（プロバイダーごとの列をUserに持たない）
+  (provider, subject)のユニークインデックスで、プロバイダーに関係なく1回の検索で引ける
+  """
+  PROVIDER_CHOICES = (
+    ('google', 'Google'),
+    ('line', 'Line'),
+    ('facebook', 'Facebook'),
+  )
+
+  user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='social_identities')
+  provider = models.CharField('プロバイダー', max_length=20, choices=PROVIDER_CHOICES)
+  subject = models.CharField('プロバイダーのユーザーID', max_length=255)
+  created_at = models.DateTimeField('連携日時', auto_now_add=True)
+
+  class Meta:
+    db_table = 'social_identities'
+    verbose_name = 'ソーシャルアカウント連携'
+    verbose_name_plural = 'ソーシャルアカウント連携'
+    constraints = [
+      models.UniqueConstraint(fields=['provider', 'subject'], name='unique_social_provider_subject'),
+      # 1ユーザーにつき1プロバイダー1アカウント
+      models.UniqueConstraint(fields=['user', 'provider'], name='unique_social_user_provider'),
+    ]
+
+  def __str__(self):
+    return f"{self.get_provider_display()}: {self.subject} ({self.user_id})"
+
+
+class UserSearchToken(models.Model):
+  """
+  ユーザー検索用のトークン（メールアドレス・氏名の各単語の先頭部分）
+  検索語をトークンの完全一致で引くため、(token, user)のインデックスだけで前方一致検索できる
+  内容はusers.utils.UserSearchIndexが保存時に更新する
+  """
+  user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='search_tokens')
+  token = models.CharField('トークン', max_length=16)
+
+  class Meta:
+    db_table = 'user_search_tokens'
+    verbose_name = 'ユーザー検索トークン'
+    verbose_name_plural = 'ユーザー検索トークン'
+    constraints = [
+      models.UniqueConstraint(fields=['token', 'user'], name='unique_user_search_token'),
+    ]
 
 
 class StaffProfile(models.Model):
@@ -227,3 +374,11 @@ class CustomerRegistrationProgress(models.Model):
     ('detail', '詳細'),
     ('done', '完了'),
   ])
+
+  @staticmethod
+  def initial_step(user):
+    """作成時のステップ（氏名・電話番号が揃っていれば完了）"""
+    if not user.first_name or not user.last_name or not user.phone_number:
+      return 'detail'
+    return 'done'
+
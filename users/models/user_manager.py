@@ -1,10 +1,14 @@
 
 from django.contrib.auth.models import BaseUserManager
+from django.db import IntegrityError, transaction
 from .user_querysets import UserQuerySet
 from django.core.exceptions import ValidationError
 
 
 class UserManager(BaseUserManager):
+  # bulk_provisionの1文あたりの行数・重複チェックのIN句の件数
+  BULK_BATCH_SIZE = 500
+
   def get_queryset(self):
     """デフォルトのQuerySetをUserQuerySetに置き換え"""
     return UserQuerySet(self.model, using=self._db)
@@ -33,11 +37,19 @@ class UserManager(BaseUserManager):
     return self.get_queryset().find_by_email(email)
   
   def email_exists_in_group(self, email, user_type):
+    queryset = self._email_in_group(email, user_type)
+    return queryset.first() if queryset is not None else None
+
+  async def aemail_exists_in_group(self, email, user_type):
+    queryset = self._email_in_group(email, user_type)
+    return await queryset.afirst() if queryset is not None else None
+
+  def _email_in_group(self, email, user_type):
     if user_type == 'CUSTOMER':
-      return self.by_email(email).customers().first()
+      return self.by_email(email).customers()
     
     elif user_type in ['STAFF', 'OWNER']:
-      return self.by_email(email).staff_or_owner().first()
+      return self.by_email(email).staff_or_owner()
     
     return None
   
@@ -58,7 +70,19 @@ class UserManager(BaseUserManager):
   
   def search(self, query):
     return self.get_queryset().search(query)
-  
+
+  def with_tenant_info(self):
+    return self.get_queryset().with_tenant_info()
+
+  def with_role_info(self):
+    return self.get_queryset().with_role_info()
+
+  def with_ownership_info(self):
+    return self.get_queryset().with_ownership_info()
+
+  def with_full_info(self):
+    return self.get_queryset().with_full_info()
+
   # === ソーシャルログイン関連のメソッド ===
   def by_google_id(self, google_user_id):
     return self.get_queryset().by_google_id(google_user_id)
@@ -70,8 +94,18 @@ class UserManager(BaseUserManager):
     return self.get_queryset().by_social_id(provider, social_user_id)
   def find_by_social_id(self, provider, social_user_id):
     return self.get_queryset().find_by_social_id(provider, social_user_id)
+  def find_for_social_login(self, provider, social_user_id, email, user_type):
+    return self.get_queryset().find_for_social_login(provider, social_user_id, email, user_type)
   
 
+  @classmethod
+  def normalize_email(cls, email):
+    """
+    メールアドレス全体を小文字に正規化（Django標準はドメイン部のみ）
+    保存・検索の両方で使い、検索をインデックスの完全一致1回にする
+    """
+    return (email or '').strip().lower()
+
   # === ユーザーを作成メソッド ===
   def create_user(self, email, password=None, **extra_fields):
     """通常のユーザーを作成"""
@@ -105,4 +139,108 @@ class UserManager(BaseUserManager):
     if extra_fields.get('is_superuser') is not True:
         raise ValueError('スーパーユーザーのis_superuserはTrueである必要があります')
     
-    return self.create_user(email, password, **extra_fields)
\ No newline at end of file
+    return self.create_user(email, password, **extra_fields)
+
+  # === 一括作成メソッド ===
+  def validate_bulk(self, users):
+    """
+    bulk_provision前の検証（フィールドの検証はメモリ上、重複チェックはBULK_BATCH_SIZE件ごとのIN句で1クエリ）
+    users: 未保存のUserのリスト（emailの正規化・user_groupの設定を行う）
+    Returns: {usersのインデックス: ValidationError}（エラーがなければ空）
+    """
+    errors = {}
+    seen = {}
+    for index, user in enumerate(users):
+      self._prepare_for_bulk(user)
+      try:
+        user.clean_fields(exclude=['password'])
+      except ValidationError as e:
+        errors[index] = e
+        continue
+      key = (user.email, user.user_group)
+      if key in seen:
+        errors[index] = ValidationError({'email': self.model.DUPLICATE_EMAIL_MESSAGE})
+      else:
+        seen[key] = index
+
+    keys = list(seen)
+    for start in range(0, len(keys), self.BULK_BATCH_SIZE):
+      chunk = keys[start:start + self.BULK_BATCH_SIZE]
+      existing = self.get_queryset().filter(
+        email__in={email for email, _ in chunk},
+        user_group__in={group for _, group in chunk},
+      ).values_list('email', 'user_group')
+      for key in existing:
+        if key in seen:
+          errors[seen[key]] = ValidationError({'email': self.model.DUPLICATE_EMAIL_MESSAGE})
+    return errors
+
+  def bulk_provision(self, users, tenant=None, added_by=None, skip_validation=False):
+    """
+    ユーザーと関連する行を一括作成（1ユーザーずつのsave・post_saveシグナルを通さない）
+    1つのトランザクション内で、テーブルごとにBULK_BATCH_SIZE件ずつのINSERTで作成する
+      ユーザー, スタッフ: StaffProfile・StaffRegistrationProgress, 顧客: CustomerRegistrationProgress,
+      検索トークン, tenant指定時: スタッフのTenantMembershipとテナントアクセス
+    users: 未保存のUserのリスト（パスワード未設定ならログイン不可のパスワードにする）
+    skip_validation=True: validate_bulkを呼び出し側で済ませた場合（重複はユニーク制約で検出する）
+    Returns: 作成したUserのリスト
+    Raises: ValidationError（{usersのインデックス: エラー}, 1件でもあれば何も作成しない）
+    """
+    users = list(users)
+    if skip_validation:
+      for user in users:
+        self._prepare_for_bulk(user)
+    else:
+      errors = self.validate_bulk(users)
+      if errors:
+        raise ValidationError({index: error.messages for index, error in errors.items()})
+    if not users:
+      return users
+
+    try:
+      with transaction.atomic(using=self.db):
+        self.bulk_create(users, batch_size=self.BULK_BATCH_SIZE)
+        self._bulk_create_related(users, tenant, added_by)
+    except IntegrityError as e:
+      if users[0]._is_duplicate_email_error(e):
+        raise ValidationError({'email': self.model.DUPLICATE_EMAIL_MESSAGE}) from e
+      raise
+    return users
+
+  def _prepare_for_bulk(self, user):
+    """saveと同じ正規化（emailの小文字化・user_typeからuser_group）"""
+    user.email = self.normalize_email(user.email)
+    user.user_group = self.model.get_user_group(user.user_type)
+    if not user.password:
+      user.set_unusable_password()
+
+  def _bulk_create_related(self, users, tenant, added_by):
+    """post_saveシグナル（authentication.signals, users.signals, permissions.signals）で作る行をまとめて作成"""
+    from users.models import StaffProfile, StaffRegistrationProgress, CustomerRegistrationProgress, UserSearchToken
+    from users.utils import UserSearchIndex
+    batch_size = self.BULK_BATCH_SIZE
+
+    staff = [user for user in users if user.user_type == 'STAFF']
+    customers = [user for user in users if user.user_type == 'CUSTOMER']
+    StaffProfile.objects.bulk_create([StaffProfile(user=user) for user in staff], batch_size=batch_size)
+    StaffRegistrationProgress.objects.bulk_create(
+      [StaffRegistrationProgress(user=user, step='basic_info') for user in staff], batch_size=batch_size
+    )
+    CustomerRegistrationProgress.objects.bulk_create(
+      [CustomerRegistrationProgress(user=user, step=CustomerRegistrationProgress.initial_step(user)) for user in customers],
+      batch_size=batch_size,
+    )
+    UserSearchToken.objects.bulk_create(
+      [UserSearchToken(user_id=user.pk, token=token) for user in users for token in UserSearchIndex.tokens(user)],
+      batch_size=batch_size,
+    )
+
+    if tenant is not None and staff:
+      from permissions.models import TenantMembership
+      from permissions.utils import TenantAccessIndex
+      TenantMembership.objects.bulk_create(
+        [TenantMembership(user=user, tenant=tenant, added_by=added_by) for user in staff], batch_size=batch_size
+      )
+      user_ids = [user.pk for user in staff]
+      for start in range(0, len(user_ids), batch_size):
+        TenantAccessIndex.sync('user', user_ids[start:start + batch_size])
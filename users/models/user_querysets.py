@@ -1,5 +1,4 @@
 from django.db import models
-from django.db.models import Q
 
 # ========================================
 # User関連のQuerySet
@@ -28,33 +27,40 @@ class UserQuerySet(models.QuerySet):
     return self.by_user_type('CUSTOMER')
   
   def by_email(self, email):
-    return self.filter(email=email)
+    return self.filter(email=self.model.objects.normalize_email(email))
   def find_by_email(self, email):
     return self.by_email(email).first()
   
   # === ソーシャルログイン関連のメソッド ===
   def by_google_id(self, google_user_id):
     """GoogleユーザーIDで検索"""
-    return self.filter(google_user_id=google_user_id)
+    return self.by_social_id('google', google_user_id)
   
   def by_facebook_id(self, facebook_user_id):
     """FacebookユーザーIDで検索"""
-    return self.filter(facebook_user_id=facebook_user_id)
+    return self.by_social_id('facebook', facebook_user_id)
   
   def by_social_id(self, provider, social_user_id):
-    """ソーシャルプロバイダーIDで検索"""
-    field_name = f'{provider}_user_id'
-    return self.filter(**{field_name: social_user_id})
+    """ソーシャルプロバイダーIDで検索（social_identitiesのユニークインデックス + 主キーで結合）"""
+    return self.filter(social_identities__provider=provider, social_identities__subject=social_user_id)
   def find_by_social_id(self, provider, social_user_id):
     return self.by_social_id(provider, social_user_id).first()
+
+  def find_for_social_login(self, provider, social_user_id, email, user_type):
+    """
+    ソーシャルIDで検索し、なければ同じグループのメールアドレスで検索
+    ORでまとめるとインデックスが使われにくいため、それぞれのユニークインデックスで2回に分けて引く
+    Returns: User or None（ソーシャルIDで見つかった場合は別グループのユーザーのこともある）
+    """
+    user = self.find_by_social_id(provider, social_user_id)
+    if user is not None:
+      return user
+    return self.by_email(email).filter(user_group=self.model.get_user_group(user_type)).first()
   
   def social_login_users(self):
     """ソーシャルログインユーザーのみ"""
-    return self.filter(
-      models.Q(google_user_id__isnull=False) |
-      models.Q(facebook_user_id__isnull=False) |
-      models.Q(line_user_id__isnull=False)
-    )
+    from .user import SocialIdentity
+    return self.filter(models.Exists(SocialIdentity.objects.filter(user=models.OuterRef('pk'))))
   
   def email_login_users(self):
     """メール/パスワードログインユーザーのみ"""
@@ -90,11 +96,10 @@ class UserQuerySet(models.QuerySet):
   def own_company(self, company):
     """特定のカンパニーを所持しているオーナー"""
     return self.filter(
-      company_ownership__company=company,
-      company_ownership__is_active=True
-		).distinct()
+      company_ownerships__company=company,
+      company_ownerships__is_active=True
+    ).distinct()
   
-	
   def owned_by_companies(self, company):
     """特定のcompanyに所属している全ユーザー"""
     owners = self.own_company(company)
@@ -105,76 +110,81 @@ class UserQuerySet(models.QuerySet):
   # === UserAccessのフィルタ ===
   def accessible_by(self, requesting_user, tenant=None):
     """
-    指定されたユーザーがアクセス可能なユーザーを返す
+    指定されたユーザーがアクセス可能なユーザー（アクセスできるテナントに所属するスタッフ）を返す
+    オーナー・スタッフはUserTenantAccessへの準結合で引く（多段の結合・DISTINCTを使わない）
     Returns: アクセス可能なユーザーのQuerySet
     """
     if requesting_user.is_system_admin:
       if tenant:
         return self.in_tenant(tenant)
       return self.all()
-    if requesting_user.user_type == 'OWNER':
-      return self._accessible_by_owner(requesting_user, tenant)
-    if requesting_user.user_type == 'STAFF':
-      return self._accessible_by_staff(requesting_user, tenant)
-    return self.none()
-  
-  def _accessible_by_owner(self, owner, tenant):
-    """オーナーがアクセス可能なユーザー"""
-    from organizations.models import Company
-    companies = Company.objects.owned_by(owner)
-    if tenant:
-      if tenant.company in companies:
-        return self.in_tenant(tenant)
+    if requesting_user.user_type not in ('OWNER', 'STAFF'):
       return self.none()
     
-    return self.in_companies(companies)
-  
-  def _accessible_by_staff(self, staff, tenant):
-    """スタッフがアクセス可能なユーザー"""
-    from organizations.models import Tenant
-    accessible_tenants = Tenant.objects.with_membrt(staff)
-    
+    from permissions.models import UserTenantAccess
+    tenants = UserTenantAccess.objects.filter(user=requesting_user)
     if tenant:
-      if tenant in accessible_tenants:
-        return self.in_tenant(tenant)
-      return self.none()
+      if not tenants.filter(tenant=tenant).exists():
+        return self.none()
+      tenant_ids = [tenant.pk]
+    else:
+      tenant_ids = tenants.values('tenant_id')
     
-    # 所属している全テナントの場合
-    return self.in_tenants(accessible_tenants)
+    members = UserTenantAccess.objects.filter(tenant_id__in=tenant_ids, via=UserTenantAccess.VIA_MEMBER)
+    return self.filter(pk__in=members.values('user_id'))
 
   # === 検索関連のメソッド ===
   def search(self, query):
-    """ユーザーを検索"""
+    """
+    ユーザーを検索（メールアドレス・氏名の単語の前方一致, UUIDはユーザーIDの完全一致）
+    user_search_tokensのインデックスで引くため、usersテーブルをスキャンしない
+    """
     if not query:
       return self
     
-    return self.filter(
-      Q(id__icontains=query) |
-      Q(email__icontains=query) |
-      Q(first_name__icontains=query) |
-      Q(last_name__icontains=query)
-    )
+    from users.utils import UserSearchIndex
+    return UserSearchIndex.filter(self, query)
   
   # === パフォーマンス最適化用メソッド ===
+  # 有効な行だけをPrefetch(to_attr=...)でリストとして持たせる（ユーザー数に関係なく一定のクエリ数）
+  #   user.active_memberships: 所属中のTenantMembership（tenant, tenant.companyを含む）
+  #   user.active_roles: 有効期間内のUserRole（role, role.active_permissionsを含む）
+  #   user.active_ownerships: 所有中のCompanyOwnership（companyを含む）
   def with_tenant_info(self):
-    """テナント情報を含めてプリフェッチ"""
+    """所属中のテナント情報をプリフェッチ"""
+    from permissions.models import TenantMembership
+    memberships = TenantMembership.objects.filter(
+      is_active=True,
+      tenant__is_active=True
+    ).select_related('tenant__company')
     return self.prefetch_related(
-      'tenant_memberships__tenant',
-      'tenant_memberships__tenant__company'
+      models.Prefetch('tenant_memberships', queryset=memberships, to_attr='active_memberships')
     )
   
   def with_role_info(self):
-    """ロール情報を含めてプリフェッチ"""
+    """有効なロールと権限をプリフェッチ"""
+    from permissions.models import RolePermission, UserRole
+    permissions = RolePermission.objects.filter(permission__is_active=True).select_related('permission')
+    roles = UserRole.objects.valid().filter(role__is_active=True).select_related('role').prefetch_related(
+      models.Prefetch('role__role_permissions', queryset=permissions, to_attr='active_permissions')
+    )
     return self.prefetch_related(
-      'user_roles__role__permission_roles__permission'
+      models.Prefetch('user_roles', queryset=roles, to_attr='active_roles')
+    )
+  
+  def with_ownership_info(self):
+    """所有中の会社をプリフェッチ"""
+    from permissions.models import CompanyOwnership
+    ownerships = CompanyOwnership.objects.filter(
+      is_active=True,
+      company__is_active=True
+    ).select_related('company')
+    return self.prefetch_related(
+      models.Prefetch('company_ownerships', queryset=ownerships, to_attr='active_ownerships')
     )
   
   def with_full_info(self):
     """全ての関連情報を含めてプリフェッチ"""
     return self.select_related(
-      'profile'
-    ).prefetch_related(
-      'tenant_memberships__tenant__company',
-      'user_roles__role__permission_roles__permission',
-      'ownerships__company'
-    )
+      'staff_profile'
+    ).with_tenant_info().with_role_info().with_ownership_info()
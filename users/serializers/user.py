@@ -1,6 +1,7 @@
 
 from rest_framework import serializers
 from users.models import User, StaffProfile, StaffRegistrationProgress, CustomerRegistrationProgress
+from users.utils import LastLoginBuffer
 
 
 class ProfileSerializer(serializers.ModelSerializer):
@@ -19,18 +20,39 @@ class CustomerProgressSerializer(serializers.ModelSerializer):
     fields = ['step']
 
 
+class UserListSerializer(serializers.ListSerializer):
+  """一覧ではlast_login（LastLoginBufferの未反映分）を1回でまとめて参照する"""
+
+  def to_representation(self, data):
+    users = list(data.all() if hasattr(data, 'all') else data)
+    if 'last_login' in self.child.fields:
+      self.child.last_logins = LastLoginBuffer().get_last_logins(users)
+    return super().to_representation(users)
+
+
 class UserSerializer(serializers.ModelSerializer):
   profile = ProfileSerializer(read_only=True)
   progress = serializers.SerializerMethodField()
+  # DBの値はflush_last_loginで反映されるまで古いため、バッファの値を含めて返す
+  last_login = serializers.SerializerMethodField()
 
   class Meta:
     model = User
     fields = [
       'id', 'email', 'first_name', 'last_name',
       'phone_number', 'user_type', 'profile', 'progress',
-      'country', 'user_timezone', 'language'
+      'country', 'user_timezone', 'language', 'last_login'
     ]
     read_only_fields = ['id', 'user_type']
+    list_serializer_class = UserListSerializer
+
+  def get_last_login(self, obj):
+    last_logins = getattr(self, 'last_logins', None)
+    if last_logins is not None and str(obj.pk) in last_logins:
+      value = last_logins[str(obj.pk)]
+    else:
+      value = LastLoginBuffer().get_last_login(obj)
+    return serializers.DateTimeField().to_representation(value) if value else None
 
   def get_progress(self, obj):
     if obj.user_type == 'STAFF':
@@ -0,0 +1,15 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from users.models import User
+from users.utils import UserSearchIndex
+
+
+# 検索対象のフィールドが変わった場合のみトークンを作り直す（ロック・ログイン等の保存ではクエリを増やさない）
+@receiver(post_save, sender=User)
+def update_search_index(sender, instance, created, update_fields=None, raw=False, **kwargs):
+  if raw:
+    return
+  if update_fields is not None and not set(update_fields) & set(UserSearchIndex.SEARCH_FIELDS):
+    return
+  if created or instance.has_changed(*UserSearchIndex.SEARCH_FIELDS):
+    UserSearchIndex.index(instance, created=created)
@@ -0,0 +1,10 @@
+import pytest
+from django.core.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+  """各テスト前後でキャッシュをクリア"""
+  cache.clear()
+  yield
+  cache.clear()
@@ -0,0 +1,97 @@
+import pytest
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from permissions.models import CompanyOwnership, TenantMembership, UserTenantAccess
+from users.models import CustomerRegistrationProgress, StaffProfile, StaffRegistrationProgress, User
+
+
+def staff_rows(n, prefix='staff'):
+  return [
+    User(email=f'{prefix}{i}@Example.com', user_type='STAFF', first_name='太郎', last_name=f'山田{i}')
+    for i in range(n)
+  ]
+
+
+@pytest.fixture
+def tenant(create_tenant):
+  return create_tenant('SBY001')
+
+
+@pytest.mark.django_db
+class TestBulkProvision:
+
+  def test_creates_users_and_related_rows(self, tenant):
+    owner = User.objects.create_user('owner@example.com', 'testpassword123', user_type='OWNER')
+    CompanyOwnership.objects.create(owner=owner, company=tenant.company)
+
+    users = User.objects.bulk_provision(staff_rows(3), tenant=tenant, added_by=owner)
+
+    ids = [user.pk for user in users]
+    user = User.objects.get(pk=ids[0])
+    assert user.email == 'staff0@example.com' and user.user_group == 'STAFF_OWNER'
+    assert not user.has_usable_password()
+    assert StaffProfile.objects.filter(user_id__in=ids).count() == 3
+    assert set(StaffRegistrationProgress.objects.filter(user_id__in=ids).values_list('step', flat=True)) == {'basic_info'}
+    assert TenantMembership.objects.filter(user_id__in=ids, tenant=tenant, added_by=owner).count() == 3
+    assert UserTenantAccess.objects.filter(user_id__in=ids, via='MEMBER').count() == 3
+    assert set(User.objects.accessible_by(owner)) == set(users)
+    assert list(User.objects.search('山田2')) == [users[2]]
+
+  def test_customer_progress_step(self):
+    users = User.objects.bulk_provision([
+      User(email='a@example.com', user_type='CUSTOMER', first_name='太郎', last_name='山田', phone_number='0400000000'),
+      User(email='b@example.com', user_type='CUSTOMER'),
+    ])
+
+    steps = dict(CustomerRegistrationProgress.objects.values_list('user_id', 'step'))
+    assert [steps[user.pk] for user in users] == ['done', 'detail']
+
+  def test_query_count_does_not_grow_with_rows(self, tenant):
+    # INSERTの文数はDBの1文あたりのパラメータ上限で決まる（SQLiteは999個）ため、それ以外のクエリ数を比べる
+    counts = []
+    for n, prefix in ((5, 'small'), (300, 'large')):
+      with CaptureQueriesContext(connection) as queries:
+        User.objects.bulk_provision(staff_rows(n, prefix), tenant=tenant)
+      sql = [query['sql'] for query in queries.captured_queries]
+      counts.append((len([q for q in sql if not q.startswith('INSERT')]), len(sql)))
+
+    assert counts[0][0] == counts[1][0]
+    # 1ユーザーずつなら300 × 6文以上
+    assert counts[1][1] < 60
+    assert User.objects.filter(email__startswith='large').count() == 300
+
+  def test_validation_errors_are_reported_by_index(self):
+    User.objects.create_user('taken@example.com', 'testpassword123', user_type='STAFF')
+    User.objects.create_user('customer@example.com', 'testpassword123', user_type='CUSTOMER')
+    users = [
+      User(email='new@example.com', user_type='STAFF'),
+      User(email='TAKEN@example.com', user_type='OWNER'),
+      User(email='not-an-email', user_type='STAFF'),
+      User(email='new@example.com', user_type='STAFF'),
+      User(email='customer@example.com', user_type='STAFF'),
+    ]
+
+    errors = User.objects.validate_bulk(users)
+
+    assert sorted(errors) == [1, 2, 3]
+    assert errors[1].message_dict['email'] == [User.DUPLICATE_EMAIL_MESSAGE]
+
+  def test_invalid_batch_creates_nothing(self):
+    User.objects.create_user('taken@example.com', 'testpassword123', user_type='STAFF')
+
+    with pytest.raises(ValidationError) as exc:
+      User.objects.bulk_provision(staff_rows(2) + [User(email='taken@example.com', user_type='STAFF')])
+
+    assert list(exc.value.message_dict) == [2]
+    assert not User.objects.filter(email__startswith='staff').exists()
+
+  def test_skip_validation_translates_integrity_error(self):
+    User.objects.create_user('staff1@example.com', 'testpassword123', user_type='STAFF')
+
+    with pytest.raises(ValidationError) as exc:
+      User.objects.bulk_provision(staff_rows(3), skip_validation=True)
+
+    assert exc.value.message_dict['email'] == [User.DUPLICATE_EMAIL_MESSAGE]
+    assert User.objects.filter(email__startswith='staff').count() == 1
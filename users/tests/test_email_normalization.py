@@ -0,0 +1,64 @@
+import pytest
+from django.db import IntegrityError, connection
+from django.db.models.functions import Lower
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from authentication.models import PendingUser
+from authentication.tests.factories import PendingUserFactory
+from common.utils import CaseSensitive
+from users.models import User
+
+
+@pytest.mark.django_db
+class TestEmailNormalization:
+
+  def test_email_is_lowercased_on_save(self, create_user):
+    user = create_user(email=' Taro.Yamada@Example.COM ')
+
+    assert User.objects.get(pk=user.pk).email == 'taro.yamada@example.com'
+
+  def test_create_user_lowercases_local_part(self):
+    user = User.objects.create_user('Owner@Example.com', 'testpassword123', user_type='OWNER')
+
+    assert user.email == 'owner@example.com'
+
+  def test_lookups_ignore_case(self, create_user):
+    user = create_user(email='customer@example.com', user_type='CUSTOMER')
+
+    assert User.objects.find_by_email('Customer@EXAMPLE.com') == user
+    assert User.objects.email_exists_in_group('CUSTOMER@example.com', 'CUSTOMER') == user
+
+  def test_login_lookup_is_single_indexed_equality(self):
+    plan = User.objects.by_email('Customer@Example.com').filter(user_group='CUSTOMER').explain()
+
+    assert 'SCAN ' not in plan, plan
+
+  def test_constraint_rejects_uppercase(self, create_user):
+    user = create_user()
+
+    with pytest.raises(IntegrityError):
+      User.objects.filter(pk=user.pk).update(email='Upper@example.com')
+
+  def test_constraint_compares_case_sensitively_on_mysql(self):
+    """MySQLの既定の照合順序（大文字小文字を区別しない）でも制約が効くようバイナリで比較する"""
+    query = User.objects.annotate(lowered=CaseSensitive(Lower('email'))).query
+    compiler = query.get_compiler(connection=connection)
+
+    sql, _ = query.annotations['lowered'].as_mysql(compiler, connection)
+
+    assert sql.startswith('CAST(LOWER(') and sql.endswith(' AS BINARY)')
+
+  def test_pending_user_email_is_lowercased(self):
+    pending = PendingUserFactory(email='Pending@Example.com')
+
+    assert PendingUser.objects.get(pk=pending.pk).email == 'pending@example.com'
+
+  def test_login_with_mixed_case_email(self, create_user):
+    create_user(email='customer@example.com', user_type='CUSTOMER', is_active=True)
+
+    response = APIClient().post(reverse('customer-login'), {
+      'user_type': 'CUSTOMER', 'email': 'Customer@Example.com', 'password': 'testpassword123', 'platform': 'ios',
+    }, format='json', secure=True)
+
+    assert response.status_code == 200, response.content
@@ -0,0 +1,126 @@
+import io
+import pytest
+from datetime import timedelta
+from unittest.mock import patch
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.test import APIClient
+
+from users.models import User
+from users.utils import LastLoginBuffer
+
+
+@pytest.fixture
+def redis_buffer(fake_redis):
+  """fakeredisを使うLastLoginBuffer"""
+  with patch('users.utils.last_login_buffer.get_redis_client', return_value=fake_redis):
+    yield fake_redis
+
+
+@pytest.mark.django_db
+class TestLastLoginBufferWithRedis:
+
+  def test_records_are_coalesced_within_interval(self, create_user, redis_buffer, django_assert_num_queries):
+    """インターバル内の記録はDBに書き込まず、1ユーザー1件にまとめる"""
+    user = create_user()
+    other = create_user()
+    buffer = LastLoginBuffer()
+    base = timezone.now()
+
+    with django_assert_num_queries(0):
+      for i in range(3):
+        buffer.record(user, base + timedelta(seconds=i))
+      buffer.record(other, base)
+
+    assert redis_buffer.hlen(LastLoginBuffer.PENDING_KEY) == 2
+    assert user.last_login == base + timedelta(seconds=2)
+
+    with django_assert_num_queries(1):
+      assert buffer.flush() == 2
+
+    user.refresh_from_db()
+    assert abs(user.last_login - (base + timedelta(seconds=2))) < timedelta(milliseconds=1)
+    assert not redis_buffer.exists(LastLoginBuffer.PENDING_KEY)
+
+  def test_flush_command(self, create_user, redis_buffer):
+    """反映はログインのリクエストではなくflush_last_loginコマンドで行う"""
+    user = create_user()
+    LastLoginBuffer().record(user)
+    assert User.objects.get(pk=user.pk).last_login is None
+
+    stdout = io.StringIO()
+    call_command('flush_last_login', stdout=stdout)
+
+    assert 'Flushed last_login for 1 users' in stdout.getvalue()
+    assert User.objects.get(pk=user.pk).last_login is not None
+
+  def test_get_last_login_prefers_pending(self, create_user, redis_buffer):
+    """未反映の記録があればそちらを返す"""
+    user = create_user()
+    login_time = timezone.now()
+    LastLoginBuffer().record(user, login_time)
+
+    fresh = User.objects.get(pk=user.pk)
+    assert fresh.last_login is None
+    assert abs(LastLoginBuffer().get_last_login(fresh) - login_time) < timedelta(milliseconds=1)
+
+  def test_flush_empty_buffer(self, redis_buffer, django_assert_num_queries):
+    with django_assert_num_queries(0):
+      assert LastLoginBuffer().flush() == 0
+
+
+@pytest.mark.django_db
+class TestLastLoginBufferWithoutRedis:
+
+  def test_writes_directly(self, create_user, django_assert_num_queries):
+    """Redis未使用時は記録を共有できないため、ログインごとに直接更新"""
+    user = create_user()
+    buffer = LastLoginBuffer()
+    buffer.redis_client = None
+
+    with django_assert_num_queries(1):
+      buffer.record(user)
+
+    assert User.objects.get(pk=user.pk).last_login == user.last_login
+    assert buffer.get_pending(user.pk) is None
+    assert buffer.flush() == 0
+
+
+@pytest.mark.django_db
+class TestLoginRecordsLastLogin:
+
+  def test_customer_login_buffers_last_login(self, create_user, api_client, redis_buffer):
+    """ログイン成功時にlast_loginがバッファに記録される"""
+    user = create_user(user_type='CUSTOMER', email='login@example.com')
+
+    response = api_client.post(reverse('customer-login'), {
+      'user_type': 'CUSTOMER',
+      'email': 'login@example.com',
+      'password': 'testpassword123',
+      'platform': 'ios',
+    }, format='json', secure=True)
+
+    assert response.status_code == 200, response.content
+    assert LastLoginBuffer().get_pending(user.pk) is not None
+    user.refresh_from_db()
+    assert user.last_login is None
+
+  def test_user_list_includes_pending_last_login(self, create_user, redis_buffer):
+    """一覧のlast_loginは未反映の記録を含む"""
+    admin = create_user(user_type='OWNER', is_system_admin=True)
+    user = create_user(user_type='CUSTOMER')
+    login_time = timezone.now()
+    LastLoginBuffer().record(user, login_time)
+    client = APIClient()
+    client.force_authenticate(user=admin)
+
+    with patch.object(redis_buffer, 'hmget', wraps=redis_buffer.hmget) as hmget:
+      response = client.get(reverse('user-list'), secure=True)
+
+    assert response.status_code == 200, response.content
+    last_logins = {row['id']: row['last_login'] for row in response.data['results']}
+    assert last_logins[str(admin.pk)] is None
+    assert abs(parse_datetime(last_logins[str(user.pk)]) - login_time) < timedelta(milliseconds=1)
+    assert hmget.call_count == 1
@@ -0,0 +1,137 @@
+import pytest
+from datetime import timedelta
+from unittest.mock import patch
+from django.utils import timezone
+
+from users.models import User
+from users.utils import LoginAttemptTracker
+
+
+@pytest.fixture
+def redis_tracker(fake_redis):
+  """fakeredisを使うLoginAttemptTracker"""
+  with patch('users.utils.login_attempt_tracker.get_redis_client', return_value=fake_redis):
+    yield fake_redis
+
+
+@pytest.fixture
+def no_redis_tracker():
+  """Redis未使用環境（LocMemCache等）"""
+  with patch('users.utils.login_attempt_tracker.get_redis_client', return_value=None):
+    yield
+
+
+@pytest.mark.django_db
+class TestSecurityMixinWithRedis:
+  """Redisでのログイン失敗管理"""
+
+  def test_failed_login_below_limit_does_not_write_db(self, create_user, redis_tracker, django_assert_num_queries):
+    """ロック前の失敗はDBに書き込まない"""
+    user = create_user()
+
+    with django_assert_num_queries(0):
+      for _ in range(LoginAttemptTracker.MAX_ATTEMPTS - 1):
+        user.increment_failed_login()
+
+    assert user.failed_login_attempts == LoginAttemptTracker.MAX_ATTEMPTS - 1
+    assert redis_tracker.get(f'auth:failed_login:{user.pk}') == str(LoginAttemptTracker.MAX_ATTEMPTS - 1)
+
+    user.refresh_from_db()
+    assert user.failed_login_attempts == 0
+    assert user.account_locked_until is None
+
+  def test_lock_is_persisted_when_limit_reached(self, create_user, redis_tracker):
+    """上限到達時のみロックをDBに永続化"""
+    user = create_user()
+
+    for _ in range(LoginAttemptTracker.MAX_ATTEMPTS):
+      user.increment_failed_login()
+
+    assert user.is_account_locked() is True
+    assert redis_tracker.ttl(f'auth:account_locked:{user.pk}') > 0
+    assert redis_tracker.get(f'auth:failed_login:{user.pk}') is None
+
+    user.refresh_from_db()
+    assert user.failed_login_attempts == LoginAttemptTracker.MAX_ATTEMPTS
+    assert user.account_locked_until > timezone.now()
+
+  def test_is_account_locked_is_read_only(self, create_user, redis_tracker, django_assert_num_queries):
+    """期限切れロックのチェックでDB書き込みをしない"""
+    user = create_user()
+    User.objects.filter(pk=user.pk).update(
+      failed_login_attempts=5,
+      account_locked_until=timezone.now() - timedelta(minutes=1),
+    )
+    user.refresh_from_db()
+
+    with django_assert_num_queries(0):
+      assert user.is_account_locked() is False
+
+  def test_durable_lock_survives_redis_flush(self, create_user, redis_tracker):
+    """Redisのロックが消えてもDBのロック期限内はロック状態"""
+    user = create_user()
+    for _ in range(LoginAttemptTracker.MAX_ATTEMPTS):
+      user.increment_failed_login()
+
+    redis_tracker.flushdb()
+    assert user.is_account_locked() is True
+
+  def test_reset_without_lock_does_not_write_db(self, create_user, redis_tracker, django_assert_num_queries):
+    """ロックされていなければリセットはRedisのみ"""
+    user = create_user()
+    user.increment_failed_login()
+    user.failed_login_attempts = 0
+
+    with django_assert_num_queries(0):
+      user.reset_failed_login()
+
+    assert redis_tracker.get(f'auth:failed_login:{user.pk}') is None
+
+  def test_reset_after_lock_clears_db(self, create_user, redis_tracker):
+    user = create_user()
+    for _ in range(LoginAttemptTracker.MAX_ATTEMPTS):
+      user.increment_failed_login()
+
+    user.reset_failed_login()
+
+    assert user.is_account_locked() is False
+    user.refresh_from_db()
+    assert user.failed_login_attempts == 0
+    assert user.account_locked_until is None
+
+
+@pytest.mark.django_db
+class TestSecurityMixinWithoutRedis:
+  """Redis未使用時は従来通りDBで管理"""
+
+  def test_fallback_to_db(self, create_user, no_redis_tracker):
+    user = create_user()
+
+    user.increment_failed_login()
+    user.refresh_from_db()
+    assert user.failed_login_attempts == 1
+
+    for _ in range(LoginAttemptTracker.MAX_ATTEMPTS - 1):
+      user.increment_failed_login()
+
+    assert user.is_account_locked() is True
+
+    user.reset_failed_login()
+    user.refresh_from_db()
+    assert user.failed_login_attempts == 0
+    assert user.is_account_locked() is False
+
+  def test_count_restarts_after_lock_expires(self, create_user, no_redis_tracker):
+    """ロック期限切れ後の1回の失敗では再ロックしない"""
+    user = create_user()
+    for _ in range(LoginAttemptTracker.MAX_ATTEMPTS):
+      user.increment_failed_login()
+    User.objects.filter(pk=user.pk).update(account_locked_until=timezone.now() - timedelta(minutes=1))
+    user.refresh_from_db()
+
+    user.increment_failed_login()
+
+    assert user.is_account_locked() is False
+    user.refresh_from_db()
+    assert user.failed_login_attempts == 1
+    assert user.account_locked_until is None
@@ -0,0 +1,140 @@
+import os
+import time
+import uuid
+import pytest
+from django.db import connection
+from django.utils import timezone
+
+from users.models import User, SocialIdentity
+
+# 100万件の投入は数分かかるため、RUN_SLOW_TESTS=1 の場合のみ実行
+run_slow = pytest.mark.skipif(not os.environ.get('RUN_SLOW_TESTS'), reason='RUN_SLOW_TESTS=1 で実行')
+
+
+# インデックスで引くときのMySQLのEXPLAINのtype列
+MYSQL_INDEX_ACCESS = ('const', 'eq_ref', 'ref')
+
+
+def assert_uses_index(queryset):
+  """
+  クエリプランがテーブルをスキャンせず、インデックスで引いていること
+  SQLiteはEXPLAIN QUERY PLANの文字列、MySQLはEXPLAINの各行のtype/key列で確認する
+  （ユニークインデックスで該当行がない場合、MySQLはtypeがNULLで「const table」と報告する）
+  """
+  if connection.vendor == 'mysql':
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+      cursor.execute(f'EXPLAIN {sql}', params)
+      columns = [column[0] for column in cursor.description]
+      rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+    for row in rows:
+      assert (row['type'] in MYSQL_INDEX_ACCESS and row['key']) or 'const table' in (row['Extra'] or ''), rows
+    return
+
+  plan = queryset.explain()
+  assert 'SCAN ' not in plan, plan
+  assert 'USING INDEX' in plan or 'USING COVERING INDEX' in plan, plan
+
+
+def social_probe(provider, social_id):
+  return User.objects.by_social_id(provider, social_id)
+
+
+def email_probe(email, user_type):
+  return User.objects.filter(email=email, user_group=User.get_user_group(user_type))
+
+
+@pytest.mark.django_db
+class TestFindForSocialLogin:
+
+  def test_finds_by_social_id_with_single_query(self, create_user, django_assert_num_queries):
+    user = create_user()
+    user.link_social_identity('google', 'g-1')
+
+    with django_assert_num_queries(1):
+      found = User.objects.find_for_social_login('google', 'g-1', 'other@example.com', 'CUSTOMER')
+
+    assert found == user
+
+  def test_falls_back_to_email_in_same_group(self, create_user, django_assert_num_queries):
+    customer = create_user(email='same@example.com', user_type='CUSTOMER')
+    create_user(email='same@example.com', user_type='OWNER')
+
+    with django_assert_num_queries(2):
+      found = User.objects.find_for_social_login('google', 'g-unknown', 'same@example.com', 'CUSTOMER')
+
+    assert found == customer
+
+  def test_ignores_email_in_other_group(self, create_user):
+    create_user(email='owner@example.com', user_type='OWNER')
+
+    assert User.objects.find_for_social_login('line', 'l-1', 'owner@example.com', 'CUSTOMER') is None
+
+  def test_social_id_match_may_be_in_other_group(self, create_user):
+    owner = create_user(email='owner@example.com', user_type='OWNER')
+    owner.link_social_identity('facebook', 'f-1')
+
+    found = User.objects.find_for_social_login('facebook', 'f-1', 'owner@example.com', 'CUSTOMER')
+
+    # 呼び出し側（SocialLoginService）でグループの不一致を拒否する
+    assert found == owner and found.user_group == 'STAFF_OWNER'
+
+  @pytest.mark.parametrize('provider', ['google', 'line', 'facebook'])
+  def test_probes_use_unique_indexes(self, create_user, provider):
+    create_user().link_social_identity(provider, 'id-1')
+
+    assert_uses_index(social_probe(provider, 'id-1'))
+    assert_uses_index(email_probe('user@example.com', 'CUSTOMER'))
+
+
+def seed_users(count, batch_size=50000):
+  """users・social_identitiesテーブルへ直接大量投入（モデルのsave・バリデーションを通さない）"""
+  now = timezone.now()
+  template = User(user_type='CUSTOMER', user_group='CUSTOMER', password='!', date_joined=now, updated_at=now)
+  fields = [field for field in User._meta.concrete_fields]
+  columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+  placeholders = ', '.join(['%s'] * len(fields))
+  user_sql = f'INSERT INTO {User._meta.db_table} ({columns}) VALUES ({placeholders})'
+  identity_sql = f'INSERT INTO {SocialIdentity._meta.db_table} (user_id, provider, subject, created_at) VALUES (%s, %s, %s, %s)'
+  created_at = SocialIdentity._meta.get_field('created_at').get_db_prep_save(now, connection)
+
+  with connection.cursor() as cursor:
+    for start in range(0, count, batch_size):
+      users, identities = [], []
+      for i in range(start, min(start + batch_size, count)):
+        template.id = uuid.uuid4()
+        template.email = f'user{i}@example.com'
+        template.user_type, template.user_group = ('CUSTOMER', 'CUSTOMER') if i % 2 else ('OWNER', 'STAFF_OWNER')
+        users.append([field.get_db_prep_save(getattr(template, field.attname), connection) for field in fields])
+        provider = ('google', 'line', 'facebook')[i % 3]
+        identities.append([template.id.hex, provider, f'{provider[0]}-{i}', created_at])
+      cursor.executemany(user_sql, users)
+      cursor.executemany(identity_sql, identities)
+    if connection.vendor == 'mysql':
+      tables = ', '.join(connection.ops.quote_name(model._meta.db_table) for model in (User, SocialIdentity))
+      cursor.execute(f'ANALYZE TABLE {tables}')
+    else:
+      cursor.execute('ANALYZE')
+
+
+@run_slow
+@pytest.mark.slow
+@pytest.mark.django_db
+class TestSocialLookupAtScale:
+
+  USERS = 1_000_000
+
+  def test_lookup_uses_indexes_on_million_users(self):
+    seed_users(self.USERS)
+
+    for provider, social_id in (('google', 'g-300'), ('line', 'l-301'), ('facebook', 'f-302')):
+      assert_uses_index(social_probe(provider, social_id))
+    assert_uses_index(email_probe('user999999@example.com', 'CUSTOMER'))
+
+    start = time.perf_counter()
+    for i in range(1000):
+      User.objects.find_for_social_login('google', f'g-missing-{i}', f'user{i * 2 + 1}@example.com', 'CUSTOMER')
+    elapsed = time.perf_counter() - start
+
+    # インデックスで引けていれば1件あたり数ミリ秒以内（スキャンなら数百ミリ秒）
+    assert elapsed / 1000 < 0.01
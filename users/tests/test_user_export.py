@@ -0,0 +1,112 @@
+import csv
+import io
+import json
+import math
+import pytest
+from asgiref.sync import async_to_sync
+from django.http import StreamingHttpResponse
+from django.test import AsyncRequestFactory
+from django.urls import reverse
+from rest_framework.test import APIClient, force_authenticate
+
+from permissions.models import TenantMembership
+from users.models import StaffProfile, User
+from users.utils import UserExporter
+from users.views import UserExportView
+
+
+@pytest.fixture
+def admin(create_user):
+  return create_user(user_type='OWNER', is_system_admin=True)
+
+
+def export(user, **params):
+  client = APIClient()
+  client.force_authenticate(user=user)
+  return client.get(reverse('user-export'), params, secure=True)
+
+
+def read(response):
+  return b''.join(response.streaming_content).decode('utf-8')
+
+
+async def read_async(response):
+  return b''.join([chunk async for chunk in response.streaming_content]).decode('utf-8')
+
+
+@pytest.mark.django_db
+class TestUserExport:
+
+  def test_csv(self, admin, create_user):
+    staff = create_user(user_type='STAFF', email='staff@example.com', first_name='=HYPERLINK("x")')
+    StaffProfile.objects.filter(user=staff).update(state='NSW', suburb='Bondi')
+    create_user(user_type='CUSTOMER', email='customer@example.com', phone_number=None)
+
+    response = export(admin)
+
+    assert isinstance(response, StreamingHttpResponse)
+    assert response['Content-Disposition'] == 'attachment; filename="users.csv"'
+    rows = {row['email']: row for row in csv.DictReader(io.StringIO(read(response)))}
+    assert set(rows) == {admin.email, 'staff@example.com', 'customer@example.com'}
+    assert (rows['staff@example.com']['progress'], rows['staff@example.com']['state']) == ('basic_info', 'NSW')
+    assert rows['staff@example.com']['first_name'] == '\'=HYPERLINK("x")'
+    assert rows['customer@example.com']['progress'] == 'detail'
+    assert rows[admin.email]['progress'] == '' and rows[admin.email]['state'] == ''
+
+  def test_jsonl_is_scoped_like_the_list(self, create_user, create_tenant):
+    tenants = [create_tenant(code) for code in ('SBY001', 'SBY002')]
+    staff = [create_user(user_type='STAFF') for _ in range(3)]
+    for user, tenant in zip(staff, (tenants[0], tenants[0], tenants[1])):
+      TenantMembership.objects.create(user=user, tenant=tenant)
+
+    response = export(staff[0], file_format='jsonl')
+
+    rows = [json.loads(line) for line in read(response).splitlines()]
+    assert response['Content-Type'].startswith('application/x-ndjson')
+    assert {row['id'] for row in rows} == {str(staff[0].pk), str(staff[1].pk)}
+
+  def test_asgi_streams_without_buffering(self, admin, create_user):
+    """ASGIでは非同期イテレーターで返し、チャンクごとに取得する"""
+    for _ in range(4):
+      create_user(user_type='CUSTOMER')
+    request = AsyncRequestFactory().get(reverse('user-export'), {'file_format': 'jsonl'}, secure=True)
+    force_authenticate(request, user=admin)
+
+    response = UserExportView.as_view()(request)
+
+    assert response.is_async
+    rows = [json.loads(line) for line in async_to_sync(read_async)(response).splitlines()]
+    assert len(rows) == 5
+
+  def test_async_lines_match_sync_lines(self, admin, create_user):
+    for _ in range(4):
+      create_user(user_type='STAFF')
+    exporter = UserExporter(User.objects.all(), 'csv', chunk_size=2)
+
+    async def collect():
+      return [line async for line in exporter.alines()]
+
+    assert async_to_sync(collect)() == list(exporter.lines())
+
+  def test_unknown_format(self, admin):
+    assert export(admin, file_format='xlsx').status_code == 400
+
+  def test_queries_per_chunk_do_not_depend_on_rows(self, admin, create_user, django_assert_num_queries):
+    for i in range(6):
+      create_user(user_type='STAFF' if i % 2 else 'CUSTOMER')
+    count, chunk_size = 7, 2
+
+    # チャンクごとに本体1 + プリフェッチ3、最後のチャンクが満杯なら空のチャンクの確認に1
+    expected = math.ceil(count / chunk_size) * 4 + (count % chunk_size == 0)
+    with django_assert_num_queries(expected):
+      lines = list(UserExporter(User.objects.all(), 'csv', chunk_size=chunk_size).lines())
+
+    assert len(lines) == count + 1
+
+  def test_chunks_cover_rows_with_equal_join_dates(self, admin, create_user):
+    joined = admin.date_joined
+    users = [admin] + [create_user(date_joined=joined) for _ in range(4)]
+
+    rows = list(UserExporter(User.objects.all(), 'jsonl', chunk_size=2).rows())
+
+    assert sorted(row['id'] for row in rows) == sorted(str(user.pk) for user in users)
@@ -0,0 +1,91 @@
+import pytest
+from datetime import timedelta
+from django.utils import timezone
+
+from organizations.models import Company
+from permissions.models import CompanyOwnership, Permission, Role, RolePermission, TenantMembership, UserRole
+from users.models import StaffProfile, User
+
+
+@pytest.fixture
+def graph(create_user, create_tenant, company):
+  """
+  アクティブな行と無効な行（退任・無効テナント・期限切れロール・無効権限）を混ぜたユーザー群を作る
+  Returns: 作成したユーザーのIDを返す関数（n: 追加するスタッフ数）
+  """
+  tenant = create_tenant('ACTIVE01')
+  closed = create_tenant('CLOSED01', is_active=False)
+  role = Role.objects.create(code='manager', tenant=tenant, name='Manager')
+  inactive_role = Role.objects.create(code='retired', tenant=tenant, name='Retired', is_active=False)
+  for code, is_active in (('pos.view', True), ('pos.refund', True), ('report.legacy', False)):
+    permission = Permission.objects.create(code=code, name=code, category='pos', is_active=is_active)
+    RolePermission.objects.create(role=role, permission=permission)
+
+  owner = create_user(user_type='OWNER')
+  CompanyOwnership.objects.create(company=company, owner=owner)
+  CompanyOwnership.objects.create(
+    company=Company.objects.create(name='Sold Company'), owner=owner, is_active=False,
+  )
+  user_ids = [owner.pk]
+
+  def add_staff(n):
+    for _ in range(n):
+      staff = create_user(user_type='STAFF')
+      StaffProfile.objects.filter(user=staff).update(state='NSW')
+      TenantMembership.objects.create(user=staff, tenant=tenant)
+      TenantMembership.objects.create(user=staff, tenant=closed)
+      UserRole.objects.create(user=staff, role=role)
+      UserRole.objects.create(user=staff, role=inactive_role)
+      user_ids.append(staff.pk)
+    return list(user_ids)
+
+  return add_staff
+
+
+@pytest.mark.django_db
+class TestUserPrefetch:
+
+  @pytest.mark.parametrize('loader, queries', [
+    ('with_tenant_info', 2),
+    ('with_role_info', 3),
+    ('with_ownership_info', 2),
+    ('with_full_info', 5),
+  ])
+  def test_query_count_does_not_grow_with_users(self, graph, django_assert_num_queries, loader, queries):
+    for n in (1, 10):
+      user_ids = graph(n)
+      with django_assert_num_queries(queries):
+        users = list(getattr(User.objects, loader)().filter(pk__in=user_ids))
+        for user in users:
+          self._touch(user)
+
+  def test_only_active_rows_are_loaded(self, graph):
+    owner_id, staff_id = graph(1)
+
+    users = User.objects.with_full_info().in_bulk([owner_id, staff_id])
+    owner, staff = users[owner_id], users[staff_id]
+
+    assert [m.tenant.code for m in staff.active_memberships] == ['ACTIVE01']
+    assert [r.role.code for r in staff.active_roles] == ['manager']
+    assert sorted(p.permission.code for p in staff.active_roles[0].role.active_permissions) == ['pos.refund', 'pos.view']
+    assert [o.company.name for o in owner.active_ownerships] == ['Test Company']
+    assert staff.staff_profile.state == 'NSW'
+    assert owner.active_memberships == [] and staff.active_ownerships == []
+
+  def test_expired_role_is_excluded(self, graph):
+    _, staff_id = graph(1)
+    UserRole.objects.filter(user_id=staff_id).update(valid_until=timezone.now() - timedelta(days=1))
+
+    staff = User.objects.with_role_info().get(pk=staff_id)
+
+    assert staff.active_roles == []
+
+  @staticmethod
+  def _touch(user):
+    """プリフェッチ済みの関連を全て辿る（追加のクエリが出ればテストが失敗する）"""
+    for membership in getattr(user, 'active_memberships', []):
+      membership.tenant.company.name
+    for user_role in getattr(user, 'active_roles', []):
+      [permission.permission.code for permission in user_role.role.active_permissions]
+    for ownership in getattr(user, 'active_ownerships', []):
+      ownership.company.name
@@ -0,0 +1,87 @@
+import pytest
+from django.core.exceptions import ValidationError
+
+from users.models import User
+
+
+@pytest.mark.django_db
+class TestUserSaveValidation:
+
+  def test_create_rejects_duplicate_email_in_group(self, create_user):
+    create_user(email='dup@example.com', user_type='CUSTOMER')
+
+    with pytest.raises(ValidationError) as exc:
+      User(email='dup@example.com', user_type='CUSTOMER', password='!').save()
+
+    assert 'email' in exc.value.message_dict
+
+  def test_same_email_in_other_group_is_allowed(self, create_user):
+    create_user(email='dup@example.com', user_type='CUSTOMER')
+
+    User(email='dup@example.com', user_type='OWNER', password='!').save()
+
+    assert User.objects.filter(email='dup@example.com').count() == 2
+
+  def test_update_fields_without_identity_skips_queries(self, create_user, django_assert_num_queries):
+    user = User.objects.get(pk=create_user().pk)
+    user.failed_login_attempts = 3
+
+    with django_assert_num_queries(1):
+      user.save(update_fields=['failed_login_attempts', 'account_locked_until'])
+
+  def test_update_fields_are_still_validated(self, create_user):
+    user = User.objects.get(pk=create_user().pk)
+    user.country = 'XX'
+
+    with pytest.raises(ValidationError) as exc:
+      user.save(update_fields=['country'])
+
+    assert 'country' in exc.value.message_dict
+
+  def test_unchanged_email_skips_uniqueness_query(self, create_user, django_assert_num_queries):
+    user = User.objects.get(pk=create_user().pk)
+    user.phone_number = '0400000000'
+
+    with django_assert_num_queries(1):
+      user.save()
+
+  def test_deferred_instance_does_not_load_fields(self, create_user, django_assert_num_queries):
+    user = User.objects.only('id').get(pk=create_user().pk)
+    user.is_active = False
+
+    with django_assert_num_queries(1):
+      user.save(update_fields=['is_active'])
+
+  def test_email_change_is_checked(self, create_user):
+    create_user(email='taken@example.com')
+    user = User.objects.get(pk=create_user().pk)
+    user.email = 'taken@example.com'
+
+    with pytest.raises(ValidationError):
+      user.save(update_fields=['email'])
+
+  def test_user_type_change_saves_user_group(self, create_user):
+    user = User.objects.get(pk=create_user(user_type='CUSTOMER').pk)
+    user.user_type = 'STAFF'
+
+    user.save(update_fields=['user_type'])
+
+    assert User.objects.get(pk=user.pk).user_group == 'STAFF_OWNER'
+
+  def test_integrity_error_is_translated(self, create_user):
+    create_user(email='dup@example.com', user_type='CUSTOMER')
+
+    with pytest.raises(ValidationError) as exc:
+      create_user(email='dup@example.com', user_type='CUSTOMER')
+
+    assert exc.value.message_dict['email'] == [User.DUPLICATE_EMAIL_MESSAGE]
+
+  def test_translated_error_keeps_outer_transaction_usable(self, create_user):
+    """変換後も同じトランザクション（ATOMIC_REQUESTS）でクエリを続けられる"""
+    create_user(email='dup@example.com', user_type='CUSTOMER')
+    user = User(email='dup@example.com', user_type='CUSTOMER', password='!')
+
+    with pytest.raises(ValidationError):
+      user.save(skip_validation=True)
+
+    assert User.objects.filter(email='dup@example.com').count() == 1
@@ -0,0 +1,110 @@
+import pytest
+from importlib import import_module
+from django.apps import apps
+
+from permissions.models import TenantMembership
+from users.models import User, UserSearchToken
+from users.utils import UserSearchIndex
+
+
+@pytest.fixture
+def taro(create_user):
+  return create_user(email='taro.yamada@example.com', last_name='山田', first_name='太郎')
+
+
+@pytest.fixture
+def hanako(create_user):
+  return create_user(email='hanako@sample.jp', last_name='佐藤', first_name='花子')
+
+
+def search(query, queryset=None):
+  return set((queryset if queryset is not None else User.objects.all()).search(query))
+
+
+@pytest.mark.django_db
+class TestUserSearch:
+
+  @pytest.mark.parametrize('query', ['taro', 'yama', 'taro.yam', 'example', 'example.com', 'taro.yamada@example.com'])
+  def test_email_prefix(self, taro, hanako, query):
+    assert search(query) == {taro}
+
+  @pytest.mark.parametrize('query', ['山', '山田', '山田太郎', '山田 太郎', '太郎'])
+  def test_name_prefix(self, taro, hanako, query):
+    assert search(query) == {taro}
+
+  def test_ignores_case_and_width(self, taro):
+    assert search('ＴＡＲＯ') == {taro}
+
+  def test_all_words_must_match(self, taro, hanako):
+    assert search('yamada 花子') == set()
+
+  def test_matches_only_prefixes(self, taro):
+    assert search('amada') == set()
+
+  def test_uuid_matches_id(self, taro, hanako):
+    assert search(str(hanako.pk)) == {hanako}
+
+  def test_long_words_are_checked_beyond_tokens(self, create_user):
+    user = create_user(email='abcdefghijklmnopqrst@example.com')
+    create_user(email='abcdefghijklmnopXXXX@example.com')
+
+    assert search('abcdefghijklmnopqrst') == {user}
+
+  def test_index_follows_name_change(self, taro):
+    taro.last_name = '田中'
+    taro.save(update_fields=['last_name'])
+
+    assert search('田中') == {taro}
+    assert search('山田') == set()
+
+  def test_unrelated_saves_do_not_touch_index(self, taro, django_assert_num_queries):
+    user = User.objects.get(pk=taro.pk)
+
+    with django_assert_num_queries(1):
+      user.save(update_fields=['failed_login_attempts'])
+    with django_assert_num_queries(1):
+      user.phone_number = '0400000000'
+      user.save()
+
+  def test_rebuild(self, taro, hanako):
+    UserSearchToken.objects.all().delete()
+
+    assert UserSearchIndex.rebuild(batch_size=10) == 2
+    assert search('hanako') == {hanako}
+
+  def test_migration_backfills_existing_users(self, taro, hanako):
+    UserSearchToken.objects.all().delete()
+
+    import_module('users.migrations.0009_user_search_token').populate_user_search_tokens(apps, None)
+
+    assert search('yamada') == {taro}
+    assert search('花子') == {hanako}
+
+  def test_scoped_by_accessible_users(self, create_user, create_tenant, taro):
+    admin = create_user(user_type='OWNER', is_system_admin=True)
+    tenant = create_tenant('SBY001')
+    member = create_user(email='taro@tenant.example.com', user_type='STAFF')
+    TenantMembership.objects.create(user=member, tenant=tenant)
+
+    assert search('taro', User.objects.accessible_by(admin, tenant)) == {member}
+    assert search('taro tenant', User.objects.in_tenant(tenant)) == {member}
+
+  def test_common_words_in_scope_are_driven_by_scoped_users(self, create_user, monkeypatch):
+    """絞り込み済みのquerysetで多数に一致する単語は、全体のトークンから候補を集めない"""
+    users = [create_user(email=f'taro{i}@example.com', last_name='山田', first_name='太郎') for i in range(3)]
+    monkeypatch.setattr(UserSearchIndex, 'CANDIDATE_LIMIT', 2)
+    scope = User.objects.filter(user_type='CUSTOMER')
+
+    common = scope.search('山田 太郎')
+    selective = scope.search('taro1')
+    unscoped = User.objects.search('山田 太郎')
+
+    assert str(common.query).count('EXISTS') == 2 and ' IN (SELECT' not in str(common.query)
+    assert ' IN (SELECT' in str(selective.query) and ' IN (SELECT' in str(unscoped.query)
+    assert set(common) == set(users) and set(selective) == {users[1]}
+
+  def test_search_uses_token_index(self, taro):
+    plan = User.objects.search('yamada').explain()
+
+    assert 'SCAN users' not in plan, plan
+    assert 'unique_user_search_token' in plan or 'INDEX' in plan, plan
@@ -0,0 +1,8 @@
+from django.urls import path
+from users.views import UserListView, UserExportView
+
+
+urlpatterns = [
+  path('', UserListView.as_view(), name='user-list'),
+  path('export/', UserExportView.as_view(), name='user-export'),
+]
@@ -0,0 +1,11 @@
+from .login_attempt_tracker import LoginAttemptTracker
+from .last_login_buffer import LastLoginBuffer
+from .user_search_index import UserSearchIndex
+from .user_exporter import UserExporter
+
+__all__ = [
+  'LoginAttemptTracker',
+  'LastLoginBuffer',
+  'UserSearchIndex',
+  'UserExporter',
+]
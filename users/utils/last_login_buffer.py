@@ -0,0 +1,169 @@
+from datetime import datetime, timezone as dt_timezone
+import logging
+import uuid
+
+from django.utils import timezone
+from common.utils.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class LastLoginBuffer:
+  """
+  last_loginの書き込みをまとめて反映（write-behind）
+  ログインのたびにusersを更新せず、Redisのハッシュに記録してflush_last_loginコマンド
+  （cron等でFLUSH_INTERVAL秒ごとに実行）がbulk_updateで反映する（ログインのリクエストではフラッシュしない）
+  同じユーザーの記録は上書きされるため、1回のフラッシュで1ユーザー1行のみ更新
+  未反映の値はget_last_login・get_last_loginsで読めるため、last_loginを返す箇所はこれらを使う
+  Redisを使わない環境では記録を共有できないため、ログインごとに直接更新する
+  """
+
+  FLUSH_INTERVAL = 60
+  BATCH_SIZE = 500
+
+  PENDING_KEY = 'auth:last_login:pending'
+
+  def __init__(self, redis_client=None):
+    self.redis_client = redis_client if redis_client is not None else get_redis_client()
+
+  # ========================================
+  # 記録
+  # ========================================
+
+  def record(self, user, login_time=None):
+    """ログイン日時をバッファに記録（インスタンスの値は即時更新）"""
+    login_time = login_time or timezone.now()
+    user.last_login = login_time
+
+    if not self._record_redis(user.pk, login_time):
+      from users.models import User
+      User.objects.filter(pk=user.pk).update(last_login=login_time)
+
+  def _record_redis(self, user_id, login_time):
+    if self.redis_client is None:
+      return False
+
+    try:
+      self.redis_client.hset(self.PENDING_KEY, str(user_id), login_time.timestamp())
+      return True
+    except Exception as e:
+      logger.error(f"Redis error in last_login buffering: {str(e)}")
+      return False
+
+  # ========================================
+  # 読み取り
+  # ========================================
+
+  def get_pending(self, user_id):
+    """未反映のログイン日時（なければNone）"""
+    return self.get_pending_many([user_id]).get(str(user_id))
+
+  def get_pending_many(self, user_ids):
+    """
+    未反映のログイン日時（1回のHMGET）
+    Returns: {ユーザーID（文字列）: ログイン日時}
+    """
+    user_ids = [str(user_id) for user_id in user_ids]
+    if self.redis_client is None or not user_ids:
+      return {}
+
+    try:
+      values = self.redis_client.hmget(self.PENDING_KEY, user_ids)
+    except Exception as e:
+      logger.error(f"Redis error in last_login lookup: {str(e)}")
+      return {}
+    return {
+      user_id: self._from_timestamp(value)
+      for user_id, value in zip(user_ids, values)
+      if value is not None
+    }
+
+  def get_last_login(self, user):
+    """バッファを考慮した最新のlast_login"""
+    return self.get_last_logins([user])[str(user.pk)]
+
+  def get_last_logins(self, users):
+    """
+    バッファを考慮した最新のlast_login（複数ユーザーをまとめて参照）
+    Returns: {ユーザーID（文字列）: last_login}
+    """
+    pending = self.get_pending_many([user.pk for user in users])
+    result = {}
+    for user in users:
+      value = pending.get(str(user.pk))
+      if value is None or (user.last_login is not None and value <= user.last_login):
+        value = user.last_login
+      result[str(user.pk)] = value
+    return result
+
+  # ========================================
+  # フラッシュ
+  # ========================================
+
+  def flush(self):
+    """
+    バッファの内容をbulk_updateでDBへ反映
+    Returns: 更新したユーザー数
+    """
+    pending = self._drain_redis()
+
+    if not pending:
+      return 0
+
+    from users.models import User
+    users = [
+      User(pk=uuid.UUID(user_id), last_login=login_time)
+      for user_id, login_time in pending.items()
+    ]
+    try:
+      User.objects.bulk_update(users, ['last_login'], batch_size=self.BATCH_SIZE)
+    except Exception as e:
+      logger.error(f"Failed to flush last_login buffer: {str(e)}")
+      self._restore(pending)
+      return 0
+
+    return len(users)
+
+  def _drain_redis(self):
+    if self.redis_client is None:
+      return {}
+
+    # フラッシュ中の記録を取りこぼさないよう、別キーへ退避してから読み出す
+    processing_key = f'{self.PENDING_KEY}:flushing:{uuid.uuid4().hex}'
+    try:
+      self.redis_client.rename(self.PENDING_KEY, processing_key)
+    except Exception:
+      # バッファが空の場合（キーが存在しない）
+      return {}
+
+    try:
+      pipe = self.redis_client.pipeline()
+      pipe.hgetall(processing_key)
+      pipe.delete(processing_key)
+      entries, _ = pipe.execute()
+    except Exception as e:
+      logger.error(f"Redis error in last_login flush: {str(e)}")
+      return {}
+
+    return {
+      self._to_str(user_id): self._from_timestamp(value)
+      for user_id, value in entries.items()
+    }
+
+  def _restore(self, pending):
+    """DB反映に失敗した記録をバッファへ戻す（新しい記録は上書きしない）"""
+    try:
+      pipe = self.redis_client.pipeline()
+      for user_id, login_time in pending.items():
+        pipe.hsetnx(self.PENDING_KEY, user_id, login_time.timestamp())
+      pipe.execute()
+    except Exception as e:
+      logger.error(f"Redis error in last_login restore ({len(pending)} users lost): {str(e)}")
+
+  @staticmethod
+  def _to_str(value):
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+  @classmethod
+  def _from_timestamp(cls, value):
+    return datetime.fromtimestamp(float(cls._to_str(value)), tz=dt_timezone.utc)
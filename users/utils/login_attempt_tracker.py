@@ -0,0 +1,111 @@
+from common.utils.redis_client import get_redis_client
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class LoginAttemptTracker:
+  """
+  ログイン失敗回数とアカウントロックをRedisで管理
+  失敗のたびにusersテーブルへ書き込まないよう、カウンタはRedisのみに保持する
+  """
+
+  MAX_ATTEMPTS = 5
+  ATTEMPT_WINDOW = 1800
+  LOCK_DURATION = 1800
+
+  def __init__(self, redis_client=None):
+    self.redis_client = redis_client if redis_client is not None else get_redis_client()
+
+  @property
+  def is_available(self):
+    return self.redis_client is not None
+
+  def increment(self, user_id):
+    """
+    失敗回数を1増やす（最後の失敗からATTEMPT_WINDOW秒で自動リセット）
+    Returns: 現在の失敗回数, Redisエラー時はNone
+    """
+    if not self.is_available:
+      return None
+
+    key = self._get_attempts_key(user_id)
+    try:
+      pipe = self.redis_client.pipeline()
+      pipe.incr(key)
+      pipe.expire(key, self.ATTEMPT_WINDOW)
+      attempts, _ = pipe.execute()
+      return int(attempts)
+    except Exception as e:
+      logger.error(f"Redis error in login attempt tracking: {str(e)}")
+      return None
+
+  def get_attempts(self, user_id):
+    if not self.is_available:
+      return None
+
+    try:
+      attempts = self.redis_client.get(self._get_attempts_key(user_id))
+      return int(attempts) if attempts is not None else 0
+    except Exception as e:
+      logger.error(f"Redis error in login attempt tracking: {str(e)}")
+      return None
+
+  def lock(self, user_id):
+    """ロックキーをTTL付きで保存し、失敗回数をクリア"""
+    if not self.is_available:
+      return False
+
+    try:
+      pipe = self.redis_client.pipeline()
+      pipe.set(self._get_lock_key(user_id), 1, ex=self.LOCK_DURATION)
+      pipe.delete(self._get_attempts_key(user_id))
+      pipe.execute()
+      return True
+    except Exception as e:
+      logger.error(f"Redis error in account locking: {str(e)}")
+      return False
+
+  def is_locked(self, user_id):
+    """
+    Returns: True/False, Redisエラー時はNone
+    """
+    if not self.is_available:
+      return None
+
+    try:
+      return bool(self.redis_client.exists(self._get_lock_key(user_id)))
+    except Exception as e:
+      logger.error(f"Redis error in account lock check: {str(e)}")
+      return None
+
+  def get_lock_remaining(self, user_id):
+    """ロック解除までの秒数（ロックなし・Redis未使用時は0）"""
+    if not self.is_available:
+      return 0
+
+    try:
+      ttl = self.redis_client.ttl(self._get_lock_key(user_id))
+      return ttl if ttl > 0 else 0
+    except Exception:
+      return 0
+
+  def reset(self, user_id):
+    if not self.is_available:
+      return False
+
+    try:
+      self.redis_client.delete(
+        self._get_attempts_key(user_id),
+        self._get_lock_key(user_id),
+      )
+      return True
+    except Exception as e:
+      logger.error(f"Redis error in login attempt reset: {str(e)}")
+      return False
+
+  def _get_attempts_key(self, user_id):
+    return f"auth:failed_login:{user_id}"
+
+  def _get_lock_key(self, user_id):
+    return f"auth:account_locked:{user_id}"
@@ -0,0 +1,119 @@
+import csv
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ObjectDoesNotExist
+
+
+class UserExporter:
+  """
+  ユーザー一覧のエクスポート（CSV・JSONL）
+  CHUNK_SIZE件ずつキーセットで取得し、進捗・プロフィールはチャンクごとにプリフェッチする
+  1行ずつ文字列を返すため、StreamingHttpResponseに渡せばメモリ使用量は件数に関係なく一定
+    WSGI: lines()（同期イテレーター）
+    ASGI: alines()（非同期イテレーター。同期イテレーターを渡すとDjangoが全件をリストにしてから送る）
+  """
+
+  CHUNK_SIZE = 1000
+  FORMATS = ('csv', 'jsonl')
+  CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+  }
+  ORDERING = ('-date_joined', '-id')
+  COLUMNS = (
+    'id', 'email', 'first_name', 'last_name', 'user_type', 'is_active', 'phone_number',
+    'country', 'language', 'date_joined', 'progress',
+    'address', 'suburb', 'state', 'post_code', 'hire_date',
+  )
+  PROFILE_FIELDS = ('address', 'suburb', 'state', 'post_code', 'hire_date')
+  PROGRESS_RELATIONS = {'STAFF': 'staff_progress', 'CUSTOMER': 'customer_progress'}
+  # 表計算ソフトで数式として解釈される先頭文字（CSVインジェクション対策）
+  FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+  def __init__(self, queryset, format, chunk_size=None):
+    self.queryset = queryset.prefetch_related(*self.PROGRESS_RELATIONS.values(), 'staff_profile')
+    self.format = format
+    self.chunk_size = chunk_size or self.CHUNK_SIZE
+
+  def rows(self):
+    from common.pagination import KeysetPagination
+    for chunk in KeysetPagination.iterate(self.queryset, self.ORDERING, self.chunk_size):
+      for user in chunk:
+        yield self.to_row(user)
+
+  def lines(self):
+    """出力する行（CSVはヘッダーから）"""
+    for lines in self._chunks():
+      yield from lines
+
+  async def alines(self):
+    """lines()の非同期版（チャンクの取得・変換を1チャンクずつsync_to_asyncで行う）"""
+    chunks = self._chunks()
+    while True:
+      lines = await sync_to_async(next)(chunks, None)
+      if lines is None:
+        return
+      for line in lines:
+        yield line
+
+  def _chunks(self):
+    """チャンクごとの出力行のリスト"""
+    from common.pagination import KeysetPagination
+    writer = csv.writer(_LineBuffer()) if self.format == 'csv' else None
+    if writer is not None:
+      yield [writer.writerow(self.COLUMNS)]
+    for chunk in KeysetPagination.iterate(self.queryset, self.ORDERING, self.chunk_size):
+      yield [self._encode(writer, self.to_row(user)) for user in chunk]
+
+  def _encode(self, writer, row):
+    if writer is None:
+      return json.dumps(row, ensure_ascii=False) + '\n'
+    return writer.writerow([self._escape_formula(row[column]) for column in self.COLUMNS])
+
+  @classmethod
+  def to_row(cls, user):
+    progress = cls._related(user, cls.PROGRESS_RELATIONS.get(user.user_type))
+    profile = cls._related(user, 'staff_profile')
+    row = {
+      'id': str(user.pk),
+      'email': user.email,
+      'first_name': user.first_name,
+      'last_name': user.last_name,
+      'user_type': user.user_type,
+      'is_active': user.is_active,
+      'phone_number': user.phone_number,
+      'country': user.country,
+      'language': user.language,
+      'date_joined': user.date_joined.isoformat(),
+      'progress': progress.step if progress else None,
+    }
+    for field in cls.PROFILE_FIELDS:
+      value = getattr(profile, field, None)
+      row[field] = value.isoformat() if hasattr(value, 'isoformat') else value
+    return row
+
+  @staticmethod
+  def _related(user, name):
+    """プリフェッチ済みの1対1の関連（なければNone, クエリは発行しない）"""
+    if name is None:
+      return None
+    try:
+      return getattr(user, name)
+    except ObjectDoesNotExist:
+      return None
+
+  @classmethod
+  def _escape_formula(cls, value):
+    if value is None:
+      return ''
+    if isinstance(value, str) and value.startswith(cls.FORMULA_PREFIXES):
+      return "'" + value
+    return value
+
+
+class _LineBuffer:
+  """csv.writerの書き込み先（書いた行をそのまま返す）"""
+
+  def write(self, value):
+    return value
@@ -0,0 +1,129 @@
+import re
+import unicodedata
+import uuid
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+
+
+class UserSearchIndex:
+  """
+  ユーザー検索のインデックス（user_search_tokensテーブル）
+  メールアドレス・氏名を単語に分け、各単語の先頭MAX_TOKEN_LENGTH文字までの全ての前方部分をトークンとして保存する
+    taro.yamada@example.com → taro.yamada, taro, yamada, example.com の各前方部分
+    山田 太郎 → 山田, 太郎, 山田太郎 の各前方部分
+  検索語の各単語をトークンの完全一致で引き、全単語に一致するユーザーを返す（前方一致のAND検索）
+  """
+
+  MAX_TOKEN_LENGTH = 16
+  BATCH_SIZE = 1000
+  # 絞り込み済みのquerysetで、最も長い単語に一致するユーザーがこれより多ければ対象のユーザーから引く
+  CANDIDATE_LIMIT = 1000
+  # 変更されたらインデックスを更新するフィールド
+  SEARCH_FIELDS = ('email', 'first_name', 'last_name')
+
+  # メールアドレスのローカル部を単語に分ける区切り
+  LOCAL_PART_SEPARATOR = re.compile(r'[._+\-]+')
+  # 検索語を単語に分ける区切り（メールアドレスはローカル部・ドメインの単位で検索する）
+  QUERY_SEPARATOR = re.compile(r'[\s@]+')
+
+  @staticmethod
+  def normalize(text):
+    """全角・半角と大文字小文字を区別しない"""
+    return unicodedata.normalize('NFKC', text or '').lower()
+
+  @classmethod
+  def words(cls, user):
+    local_part, _, domain = cls.normalize(user.email).partition('@')
+    names = [cls.normalize(name).split() for name in (user.last_name, user.first_name)]
+    last_name, first_name = (''.join(parts) for parts in names)
+
+    words = {local_part, domain, last_name + first_name}
+    words.update(cls.LOCAL_PART_SEPARATOR.split(local_part))
+    for parts in names:
+      words.update(parts)
+    words.discard('')
+    return words
+
+  @classmethod
+  def tokens(cls, user):
+    tokens = set()
+    for word in cls.words(user):
+      for length in range(1, min(len(word), cls.MAX_TOKEN_LENGTH) + 1):
+        tokens.add(word[:length])
+    return tokens
+
+  @classmethod
+  def index(cls, user, created=False):
+    """ユーザーのトークンを作り直す（created: 新規作成時は既存トークンの削除を省く）"""
+    from users.models import UserSearchToken
+    with transaction.atomic():
+      if not created:
+        UserSearchToken.objects.filter(user_id=user.pk).delete()
+      UserSearchToken.objects.bulk_create(
+        [UserSearchToken(user_id=user.pk, token=token) for token in cls.tokens(user)]
+      )
+
+  @classmethod
+  def rebuild(cls, batch_size=None):
+    """
+    全ユーザーのトークンを作り直す（インデックス導入時・save()を通さない一括更新の後に実行）
+    Returns: 処理したユーザー数
+    """
+    from users.models import User, UserSearchToken
+    batch_size = batch_size or cls.BATCH_SIZE
+    UserSearchToken.objects.all().delete()
+
+    count = 0
+    tokens = []
+    users = User.objects.only('pk', *cls.SEARCH_FIELDS).order_by().iterator(chunk_size=batch_size)
+    for user in users:
+      tokens.extend(UserSearchToken(user_id=user.pk, token=token) for token in cls.tokens(user))
+      count += 1
+      if len(tokens) >= batch_size:
+        UserSearchToken.objects.bulk_create(tokens, batch_size=batch_size)
+        tokens = []
+    UserSearchToken.objects.bulk_create(tokens, batch_size=batch_size)
+    return count
+
+  @classmethod
+  def query_words(cls, query):
+    return [word for word in cls.QUERY_SEPARATOR.split(cls.normalize(query)) if word]
+
+  @classmethod
+  def filter(cls, queryset, query):
+    """
+    queryset（accessible_by等で絞り込み済みでもよい）を検索語で絞り込む
+    UUIDはユーザーIDの完全一致で検索する
+    """
+    from users.models import UserSearchToken
+    try:
+      return queryset.filter(pk=uuid.UUID(query.strip()))
+    except ValueError:
+      pass
+
+    # 長い単語ほど一致するユーザーが少ないため、最も長い単語のトークンから候補を引き（IN）、
+    # 残りの単語は候補ごとに(token, user)のインデックスで確認する（EXISTS）
+    # 絞り込み済み（accessible_by・in_tenant等）で最も長い単語が全体で多数のユーザーに一致する場合は、
+    # 候補を先に集めず対象のユーザーから引き、全ての単語をEXISTSで確認する
+    words = sorted(cls.query_words(query), key=len, reverse=True)
+    drive_from_scope = bool(words) and queryset.query.has_filters() and cls._is_common(words[0])
+    for i, word in enumerate(words):
+      tokens = UserSearchToken.objects.filter(token=word[:cls.MAX_TOKEN_LENGTH])
+      if i == 0 and not drive_from_scope:
+        queryset = queryset.filter(pk__in=tokens.values('user_id'))
+      else:
+        queryset = queryset.filter(Exists(tokens.filter(user=OuterRef('pk'))))
+      if len(word) > cls.MAX_TOKEN_LENGTH:
+        # トークンは先頭のみのため、残りの部分は候補のユーザーに対して確認する
+        queryset = queryset.filter(
+          Q(email__icontains=word) | Q(first_name__icontains=word) | Q(last_name__icontains=word)
+        )
+    return queryset
+
+  @classmethod
+  def _is_common(cls, word):
+    """単語に一致するユーザーがCANDIDATE_LIMITより多いか（インデックスをCANDIDATE_LIMIT + 1件まで数える）"""
+    from users.models import UserSearchToken
+    tokens = UserSearchToken.objects.filter(token=word[:cls.MAX_TOKEN_LENGTH]).values('pk')
+    return tokens[:cls.CANDIDATE_LIMIT + 1].count() > cls.CANDIDATE_LIMIT
@@ -0,0 +1,8 @@
+from .user_list import UserListView
+from .user_export import UserExportView
+
+
+__all__ = [
+  'UserListView',
+  'UserExportView',
+]
@@ -0,0 +1,27 @@
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.response import Response
+from users.utils import UserExporter
+from .user_list import UserListView
+
+
+class UserExportView(UserListView):
+  """
+  アクセス可能なユーザーのエクスポート（一覧と同じ絞り込み: ?tenant=, ?q=）
+  ?file_format=csv|jsonl（既定はcsv, ?formatはDRFのレンダラー選択に使われるため別名）
+  UserExporterの出力をそのままストリーミングで返す
+  ASGIでは非同期イテレーターを渡す（同期イテレーターはDjangoが全件をリストにしてから送るため）
+  """
+  pagination_class = None
+
+  def list(self, request, *args, **kwargs):
+    format = request.query_params.get('file_format', 'csv')
+    if format not in UserExporter.FORMATS:
+      return Response({'file_format': [f'対応していない形式です: {format}']}, status=status.HTTP_400_BAD_REQUEST)
+
+    exporter = UserExporter(self.get_queryset(), format)
+    lines = exporter.alines() if isinstance(request._request, ASGIRequest) else exporter.lines()
+    response = StreamingHttpResponse(lines, content_type=UserExporter.CONTENT_TYPES[format])
+    response['Content-Disposition'] = f'attachment; filename="users.{format}"'
+    return response
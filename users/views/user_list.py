@@ -0,0 +1,34 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework.generics import ListAPIView
+from common.pagination import KeysetPagination
+from organizations.models import Tenant
+from users.models import User
+from users.serializers import UserSerializer
+
+
+class UserListView(ListAPIView):
+  """
+  アクセス可能なユーザーの一覧（新しい登録順, キーセットページネーション）
+  ?tenant=<テナントID>: テナントで絞り込み  ?q=<検索語>: UserQuerySet.searchで検索
+  """
+  serializer_class = UserSerializer
+  pagination_class = KeysetPagination
+  pagination_ordering = ('-date_joined', '-id')
+  list_fields = ['id', 'email', 'first_name', 'last_name', 'user_type', 'last_login']
+
+  def get_queryset(self):
+    tenant = None
+    tenant_id = self.request.query_params.get('tenant')
+    if tenant_id:
+      try:
+        tenant = Tenant.objects.accessible_by(self.request.user).filter(pk=tenant_id).first()
+      except DjangoValidationError:
+        tenant = None
+      if tenant is None:
+        return User.objects.none()
+
+    return User.objects.accessible_by(self.request.user, tenant).search(self.request.query_params.get('q'))
+
+  def get_serializer(self, *args, **kwargs):
+    kwargs.setdefault('fields', self.list_fields)
+    return super().get_serializer(*args, **kwargs)